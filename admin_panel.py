@@ -26,7 +26,7 @@ from datetime import datetime, timedelta, timezone
 import joblib
 from flask import Blueprint, jsonify, request, send_from_directory  # type: ignore
 
-from engine.data import DATA_DIR, active_provider, csv_path, get_data, normalize_symbol, validate_interval, supported_intervals
+from engine.data import DATA_DIR, active_provider, cache_file, get_data, normalize_symbol, validate_interval, supported_intervals
 from engine.model_trainer import MODEL_DIR, train_and_predict
 from engine.pipeline import predict_symbol
 from utils import settings
@@ -35,6 +35,7 @@ from utils.config import (
     INTERVAL, OANDA_API_KEY, OANDA_ENV, TELEGRAM_BOT_TOKEN,
 )
 from utils.logger import LOG_FILE, get_logger
+from utils.pairs import pairs_from_data_dir
 from utils.security import admin_required, check_password, hash_password
 from utils import mailer
 from services.user_service import login_user
@@ -376,15 +377,15 @@ def overview(admin_id):
     data_status = []
     cache_pairs_count = 0
     for pair in pairs:
-        path = csv_path(pair, INTERVAL)
-        entry = {"symbol": pair, "exists": os.path.exists(path)}
+        path = cache_file(pair, INTERVAL)
+        entry = {"symbol": pair, "exists": path is not None}
         if entry["exists"]:
             cache_pairs_count += 1
             entry["age_minutes"] = round((time.time() - os.path.getmtime(path)) / 60, 1)
             entry["size_kb"] = round(os.path.getsize(path) / 1024, 1)
         data_status.append(entry)
 
-    cached_csv_files = len(glob.glob(os.path.join(DATA_DIR, f"*_{INTERVAL}.csv")))
+    cached_csv_files = len(pairs_from_data_dir(DATA_DIR, INTERVAL))
     if cache_pairs_count == 0 and cached_csv_files > 0:
         cache_pairs_count = cached_csv_files
 
@@ -832,12 +833,26 @@ def refresh_data(admin_id):
     if data.get("all"):
         if _refresh_state["running"]:
             return jsonify({"error": "A refresh-all run is already in progress"}), 409
+        intervals = data.get("intervals")
+        if intervals is not None and intervals != "all":
+            try:
+                intervals = [validate_interval(str(i)) for i in intervals]
+            except (TypeError, ValueError) as exc:
+                return jsonify({"error": str(exc), "supported_intervals": supported_intervals()}), 400
+        train = bool(data.get("train", True))
+
+        def on_progress(state):
+            _refresh_state.update(state, progress=f"{state['done']}/{state['total']}")
 
         def worker():
             from batch_fetch import refresh_all
-            _refresh_state.update(running=True, started_at=datetime.now(timezone.utc).isoformat())
+            _refresh_state.update(
+                running=True, progress="", done=0, total=None, failed=0, current=None,
+                started_at=datetime.now(timezone.utc).isoformat(), summary=None,
+            )
             try:
-                refresh_all()
+                summary = refresh_all(train=train, intervals=intervals, progress=on_progress)
+                _refresh_state["summary"] = {k: v for k, v in summary.items() if k != "results"}
             finally:
                 _refresh_state["running"] = False
 
@@ -1917,7 +1932,10 @@ def ml_admin_exports(admin_id):
 @admin_required
 def system_health(admin_id):
     from db.models import ConfirmationWatch, ExportJob, NotificationDelivery, TrainingRun
-    from engine.data import provider_health
+    from engine.analysis_memo import analysis_memo_stats
+    from engine.data import fetch_coalescing_stats, frame_cache_stats, provider_health
+    from engine.lazy_analysis import analysis_access_stats
+    from engine.result_cache import prediction_cache_stats
     from services.runtime_monitor import redis_health, record_heartbeat, service_heartbeats, system_resources
 
     record_heartbeat("api")
@@ -1953,6 +1971,11 @@ def system_health(admin_id):
         "queue_size": sum(queue.get(key, 0) for key in ("pending", "processing", "retry")),
         "services": service_heartbeats(),
         "providers": provider_health(),
+        "frame_cache": frame_cache_stats(),
+        "fetch_coalescing": fetch_coalescing_stats(),
+        "analysis_memo": analysis_memo_stats(),
+        "lazy_analysis": analysis_access_stats(),
+        "prediction_cache": prediction_cache_stats(),
         "jobs": jobs,
         "checked_at": datetime.now(timezone.utc).isoformat(),
     })
@@ -17,12 +17,13 @@ from utils.config import (
     IS_DEVELOPMENT,
     MARKET_STREAMS_ENABLED,
     RATELIMIT_STORAGE_URI,
+    SCAN_CONFIRM_TOP,
 )
 from utils.logger import get_logger
 from utils.settings import get_supported_pairs
 from utils import settings as runtime_settings
 from utils.compliance import assert_safe_wording, DISCLAIMER
-from utils.security import generate_token, token_required, approved_user_required, prediction_access_required, exchange_refresh_token, generate_refresh_token, revoke_refresh_tokens
+from utils.security import generate_token, token_required, approved_user_required, prediction_access_required, prediction_access_error, exchange_refresh_token, generate_refresh_token, revoke_refresh_tokens
 from services.user_access import decrement_quota, increment_quota, DEFAULT_SIGNALS_QUOTA
 from services.user_service import (
     change_password, login_user, register_user, request_password_reset,
@@ -687,6 +688,7 @@ def index():
             "GET /data": "List available data files",
             "POST /analyze": "{symbol} -> full SMC/ICT + ML prediction (no trade opened)",
             "POST /predict/<account_id>": "{symbol} -> SSE stream: fetch latest data, retrain, predict, open trade",
+            "GET /api/scan": "?interval&horizon&limit&confirm -> ranked setups across every cached pair",
         },
     })
 
@@ -808,6 +810,49 @@ def analyze(user_id):
         return jsonify({"error": str(exc)}), 500
 
 
+@app.route("/api/scan", methods=["GET"])
+@limiter.limit("6 per minute")
+@approved_user_required
+def scan_pairs(user_id):
+    """Ranked setups across the whole pair catalog (cached candles).
+
+    The panel pre-screen is free; confirm=N runs the full pipeline on the
+    top N and is gated like /analyze (prediction access, risk disclosure,
+    kill switch, one quota unit per confirmation).
+    """
+    args = request.args
+    try:
+        interval = _parse_interval(args)
+        limit = min(max(int(args.get("limit", 20)), 1), 100)
+        confirm = min(max(int(args.get("confirm", 0)), 0), SCAN_CONFIRM_TOP)
+    except ValueError as exc:
+        return jsonify({"error": str(exc), "supported_intervals": supported_intervals()}), 400
+
+    charge = refund = None
+    if confirm:
+        denied = prediction_access_error(user_id)
+        if denied is not None:
+            return denied
+        if not _user_has_disclosure(user_id):
+            return jsonify({
+                "error": "You must accept the risk disclosure before running predictions.",
+                "code": "disclosure_required",
+                "disclaimer": DISCLAIMER,
+            }), 403
+
+        def charge():
+            return _check_and_decrement_quota(user_id)
+
+        def refund():
+            increment_quota(user_id)
+
+    from services.pair_scanner import scan_all_pairs
+    return jsonify(scan_all_pairs(
+        interval, trading_style=_parse_horizon(args), limit=limit, confirm=confirm,
+        allow=_check_kill_switch, charge=charge, refund=refund,
+    ))
+
+
 @app.route("/predict/<int:account_id>", methods=["POST"])
 @prediction_access_required
 def predict_stream(user_id, account_id):
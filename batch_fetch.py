@@ -1,12 +1,22 @@
 # batch_fetch.py
-"""Refresh the CSVs (and models) for all supported pairs.
+"""Refresh the cached candles (and models) for all supported pairs.
 
 No config rewriting — the symbol is passed straight into the engine.
-Alpha Vantage's free tier allows ~5 requests/minute, hence the pause.
+Pairs × intervals are fetched on a bounded thread pool; provider quotas
+are enforced by the per-provider token buckets in engine/provider_http
+(generous for OANDA, 5/min for Alpha Vantage) rather than fixed sleeps,
+and every request reuses the shared keep-alive session.
+
+Only the provider I/O runs on the pool. Models are retrained one at a
+time in the collecting thread as fetches land, so training never
+oversubscribes the CPU or writes model files concurrently.
 """
+import argparse
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from engine.data import get_data
+from engine.data import get_data, supported_intervals, validate_interval
 from engine.model_trainer import train_and_predict
 from utils.config import INTERVAL
 from utils.logger import get_logger
@@ -14,22 +24,96 @@ from utils.settings import get_supported_pairs
 
 log = get_logger("batch_fetch")
 
-PAUSE_SECONDS = 15
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "8"))
+
+
+def _fetch_one(symbol: str, interval: str):
+    """(result, frame or None) of one provider fetch; runs on the pool."""
+    started = time.perf_counter()
+    df = None
+    try:
+        df, source = get_data(symbol, interval, fetch=True)
+        log.info("%s @ %s: %d candles (%s)", symbol, interval, len(df), source)
+        ok, detail = True, f"{len(df)} candles ({source})"
+    except Exception as exc:
+        log.error("Refresh failed for %s @ %s: %s", symbol, interval, exc)
+        ok, detail = False, str(exc)[:200]
+    result = {
+        "symbol": symbol,
+        "interval": interval,
+        "ok": ok,
+        "detail": detail,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    return result, df
+
+
+def _train_one(result: dict, df) -> None:
+    """Retrain one pair's model on its fresh candles; runs serially."""
+    started = time.perf_counter()
+    try:
+        train_and_predict(result["symbol"], df, result["interval"])
+    except Exception as exc:
+        log.error("Training failed for %s @ %s: %s", result["symbol"], result["interval"], exc)
+        result.update(ok=False, detail=f"training failed: {str(exc)[:180]}")
+    result["seconds"] = round(result["seconds"] + time.perf_counter() - started, 3)
 
 
-def refresh_all(pairs=None, train: bool = True):
+def refresh_all(
+    pairs=None, train: bool = True, intervals=None, workers: int = REFRESH_WORKERS, progress=None,
+) -> dict:
+    """Fetch every (pair, interval) concurrently; returns a run summary.
+
+    intervals defaults to [INTERVAL] ("all" = every supported interval);
+    models are retrained for INTERVAL only, one at a time. progress, when given, is
+    called after each job with {"done", "total", "failed", "current"}.
+    """
     pairs = pairs or get_supported_pairs()
-    for symbol in pairs:
-        log.info("=== Refreshing %s ===", symbol)
-        try:
-            df, source = get_data(symbol, INTERVAL, fetch=True)
-            log.info("%s: %d candles (%s)", symbol, len(df), source)
-            if train:
-                train_and_predict(symbol, df, INTERVAL)
-        except Exception as exc:
-            log.error("Refresh failed for %s: %s", symbol, exc)
-        time.sleep(PAUSE_SECONDS)
+    if intervals == "all":
+        intervals = [i for i in supported_intervals() if i != "day"]  # alias of "daily"
+    intervals = [validate_interval(i) for i in (intervals or [INTERVAL])]
+    jobs = [(symbol, interval) for symbol in pairs for interval in intervals]
+    state = {"done": 0, "total": len(jobs), "failed": 0, "current": None}
+    results = []
+    started = time.perf_counter()
+    log.info("=== Refreshing %d pairs x %d intervals (%d workers) ===", len(pairs), len(intervals), workers)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="refresh") as pool:
+        futures = [pool.submit(_fetch_one, symbol, interval) for symbol, interval in jobs]
+        for future in as_completed(futures):
+            result, df = future.result()
+            if train and result["ok"] and result["interval"] == INTERVAL:
+                _train_one(result, df)  # the pool keeps fetching meanwhile
+            results.append(result)
+            state["done"] += 1
+            state["failed"] += 0 if result["ok"] else 1
+            state["current"] = f"{result['symbol']} @ {result['interval']}"
+            if progress:
+                progress(dict(state))
+
+    seconds = round(time.perf_counter() - started, 2)
+    log.info("Refresh finished: %d/%d ok in %.1fs", state["total"] - state["failed"], state["total"], seconds)
+    return {
+        "total": state["total"],
+        "ok": state["total"] - state["failed"],
+        "failed": state["failed"],
+        "seconds": seconds,
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Refresh cached candles (and models) for all pairs")
+    parser.add_argument("--intervals", default=None, help="comma-separated intervals, or 'all'")
+    parser.add_argument("--workers", type=int, default=REFRESH_WORKERS, help="concurrent fetches")
+    parser.add_argument("--no-train", action="store_true", help="skip model retraining")
+    args = parser.parse_args(argv)
+    intervals = args.intervals
+    if intervals and intervals != "all":
+        intervals = [i for i in intervals.split(",") if i.strip()]
+    summary = refresh_all(train=not args.no_train, intervals=intervals, workers=args.workers)
+    return 0 if summary["failed"] == 0 else 1
 
 
 if __name__ == "__main__":
-    refresh_all()
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+# engine/analysis_memo.py
+"""Memoised confluence.analyze for the top-down stack.
+
+One top-down run analyses the same frame several times with identical
+inputs (intraday: 1H as a parent layer, as the structure layer and again
+for the liquidity map; scalping's 1H setup frame is also its structure
+frame). AnalysisMemo returns one shared analysis per
+
+    (symbol, interval, bar count, last bar time, last bar OHLC,
+     threshold fingerprint, trading style)
+
+so each distinct frame is analysed once. The last bar's prices are part
+of the key so a re-fetched, still-forming candle is never served from a
+stale entry.
+
+Scope (ANALYSIS_MEMO_SCOPE): "request" (default) gives every top-down
+run a private memo; "process" shares one bounded LRU
+(ANALYSIS_MEMO_SIZE entries) across requests, so concurrent predictions
+for the same pair and candle reuse each other's layers.
+
+Shared analyses are read-only by contract. Callers that decorate an
+analysis (topdown's entry layer) take private_copy() first.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from engine import confluence
+
+ANALYSIS_MEMO_SCOPE = os.getenv("ANALYSIS_MEMO_SCOPE", "request").strip().lower()
+ANALYSIS_MEMO_SIZE = int(os.getenv("ANALYSIS_MEMO_SIZE", "64"))
+
+
+def threshold_fingerprint(thresholds) -> str:
+    """Stable digest of a threshold config (model or plain dict)."""
+    if hasattr(thresholds, "model_dump_json"):
+        raw = thresholds.model_dump_json()
+    else:
+        raw = json.dumps(thresholds, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def frame_key(df: pd.DataFrame) -> tuple:
+    last = df.iloc[-1]
+    return (
+        len(df),
+        df.index[-1],
+        tuple(float(last[c]) for c in ("Open", "High", "Low", "Close")),
+    )
+
+
+def private_copy(analysis: dict) -> dict:
+    """Copy safe to decorate: new top-level dict and pools list.
+
+    Deferred fields stay shared, so they are still computed at most once.
+    """
+    out = analysis.copy()
+    out["pools"] = list(analysis["pools"])
+    return out
+
+
+class AnalysisMemo:
+    """Thread-safe LRU of confluence.analyze results."""
+
+    def __init__(self, max_entries: int = ANALYSIS_MEMO_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def analyze(
+        self,
+        df: pd.DataFrame,
+        symbol: str,
+        interval: str = "60min",
+        *,
+        thresholds=None,
+        trading_style: str = "intraday",
+    ) -> dict:
+        """confluence.analyze(...) — shared result; do not mutate it."""
+        if df is None or df.empty:
+            return confluence.analyze(df, symbol, interval=interval, thresholds=thresholds, trading_style=trading_style)
+        if thresholds is None:
+            from services.threshold_service import resolve_thresholds_model
+            thresholds = resolve_thresholds_model(symbol, interval, trading_style)
+        key = (symbol.upper(), interval, *frame_key(df), threshold_fingerprint(thresholds), trading_style)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit
+            self.misses += 1
+        analysis = confluence.analyze(df, symbol, interval=interval, thresholds=thresholds, trading_style=trading_style)
+        with self._lock:
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return analysis
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_shared = AnalysisMemo()
+
+
+def request_memo() -> AnalysisMemo:
+    """Memo for one top-down run, honouring ANALYSIS_MEMO_SCOPE."""
+    return _shared if ANALYSIS_MEMO_SCOPE == "process" else AnalysisMemo()
+
+
+def analysis_memo_stats() -> dict:
+    """Counters of the process-wide memo (empty unless scope is "process")."""
+    return {"scope": ANALYSIS_MEMO_SCOPE, **_shared.stats()}
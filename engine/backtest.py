@@ -1,8 +1,12 @@
 # engine/backtest.py
 """Walk-forward backtest of the confluence engine over historical CSV data."""
+import numpy as np
 import pandas as pd
 
 from engine import confluence
+from engine.indicators import StreamingATR
+from engine.patterns import scan_patterns
+from engine.tp_sl import HIT_NONE, HIT_TARGET, first_hit
 from schemas.threshold_schema import SmcIctThresholds
 from services.threshold_service import resolve_thresholds_model
 from utils.logger import get_logger
@@ -11,6 +15,27 @@ log = get_logger("engine.backtest")
 
 STEP_BARS = 12
 MIN_WARMUP = 100
+HOLD_BARS = 20
+
+
+def walk_steps(df: pd.DataFrame):
+    """The evaluation points: (end, window, atr_values or None) every STEP_BARS bars.
+
+    One ATR kernel is advanced across the steps instead of recomputing
+    ATR per window; analyze() restarts the ATR at its MAX_BARS tail, so
+    only a window that fits can reuse the values.
+    """
+    highs, lows, closes = (df[c].to_numpy(dtype=float) for c in ("High", "Low", "Close"))
+    atr_kernel = StreamingATR()
+    atr_values = np.empty(len(df))
+    atr_fed = 0
+    for end in range(MIN_WARMUP, len(df) - HOLD_BARS, STEP_BARS):
+        window = df.iloc[: end + 1]
+        atr_values[atr_fed:end + 1] = atr_kernel.update_many(
+            highs[atr_fed:end + 1], lows[atr_fed:end + 1], closes[atr_fed:end + 1],
+        )
+        atr_fed = end + 1
+        yield end, window, atr_values[:end + 1] if len(window) <= confluence.MAX_BARS else None
 
 
 def run_backtest(
@@ -31,6 +56,26 @@ def run_backtest(
     if thresholds is None:
         thresholds = resolve_thresholds_model(symbol, interval, trading_style)
 
+    # every step reads its pattern row from one full-history scan
+    pattern_scan = scan_patterns(df, start=MIN_WARMUP)
+    decisions = []
+    for end, window, atr_values in walk_steps(df):
+        analysis = confluence.analyze(
+            window, symbol, interval=interval, thresholds=thresholds, trading_style=trading_style,
+            pattern_scan=pattern_scan, atr_values=atr_values,
+        )
+        analysis["trading_style"] = trading_style
+        decisions.append((end, confluence.decide(analysis, ml_signal=None, thresholds=thresholds)))
+    return backtest_report(df, symbol, decisions)
+
+
+def backtest_report(
+    df: pd.DataFrame, symbol: str, decisions: list[tuple[int, dict]], step_bars: int = STEP_BARS,
+) -> dict:
+    """Trades and metrics of the (end, decision) pairs of one walk over df every step_bars bars."""
+    from engine.confluence import ACTION_NO_TRADE, ACTION_WAIT, is_trade_action, trade_side_from_action
+
+    signals = []
     trades = []
     no_trade = 0
     wait = 0
@@ -41,16 +86,8 @@ def run_backtest(
     peak = equity
     max_drawdown = 0.0
 
-    for end in range(MIN_WARMUP, len(df) - 20, STEP_BARS):
-        window = df.iloc[: end + 1]
-        analysis = confluence.analyze(
-            window, symbol, interval=interval, thresholds=thresholds, trading_style=trading_style,
-        )
-        analysis["trading_style"] = trading_style
-        decision = confluence.decide(analysis, ml_signal=None, thresholds=thresholds)
+    for end, decision in decisions:
         action = decision["action"]
-        from engine.confluence import ACTION_NO_TRADE, ACTION_WAIT, is_trade_action, trade_side_from_action
-
         if action == ACTION_NO_TRADE:
             no_trade += 1
             continue
@@ -68,34 +105,23 @@ def run_backtest(
             continue
 
         bias_total += 1
-        outcome = None
-        exit_price = entry
-        hit_invalidation = False
-        for j in range(end + 1, min(end + 21, len(df))):
-            bar = df.iloc[j]
-            hi, lo = float(bar["High"]), float(bar["Low"])
-            if side == "BUY":
-                if lo <= sl:
-                    outcome, exit_price, hit_invalidation = "loss", sl, True
-                    break
-                if hi >= tp:
-                    outcome, exit_price = "win", tp
-                    break
-            else:
-                if hi >= sl:
-                    outcome, exit_price, hit_invalidation = "loss", sl, True
-                    break
-                if lo <= tp:
-                    outcome, exit_price = "win", tp
-                    break
-
-        if hit_invalidation:
-            invalidation_hits += 1
-        if outcome is None:
-            continue
+        signals.append((end + 1, float(entry), float(sl), float(tp), side == "BUY", action))
 
-        if outcome == "win":
+    # every signal's next HOLD_BARS bars are resolved in one batch; the
+    # stop is checked first, so a bar touching both levels is a loss
+    starts, entries, stops, targets, longs, actions = zip(*signals) if signals else ((),) * 6
+    highs, lows = df["High"].to_numpy(dtype=float), df["Low"].to_numpy(dtype=float)
+    hits = first_hit(highs, lows, list(starts), list(entries), list(stops), list(targets), list(longs), horizon=HOLD_BARS)
+    for k, code in enumerate(hits.outcome.tolist()):
+        if code == HIT_NONE:
+            continue
+        entry, sl = entries[k], stops[k]
+        if code == HIT_TARGET:
+            outcome, exit_price = "win", targets[k]
             bias_correct += 1
+        else:
+            outcome, exit_price = "loss", sl
+            invalidation_hits += 1
 
         risk = abs(entry - sl)
         reward = abs(exit_price - entry)
@@ -105,11 +131,11 @@ def run_backtest(
         peak = max(peak, equity)
         dd = (peak - equity) / peak if peak > 0 else 0
         max_drawdown = max(max_drawdown, dd)
-        trades.append({"outcome": outcome, "rr": round(rr, 2), "action": action})
+        trades.append({"outcome": outcome, "rr": round(rr, 2), "action": actions[k]})
 
     wins = sum(1 for t in trades if t["outcome"] == "win")
     total = len(trades)
-    steps = max(1, (len(df) - MIN_WARMUP - 20) // STEP_BARS)
+    steps = max(1, (len(df) - MIN_WARMUP - HOLD_BARS) // step_bars)
     avg_rr = round(sum(t["rr"] for t in trades) / total, 2) if total else 0.0
     return {
         "symbol": symbol.upper(),
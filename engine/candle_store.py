@@ -0,0 +1,161 @@
+# engine/candle_store.py
+"""Binary columnar candle store.
+
+One file per symbol/interval next to where its CSV would live
+(data/EURUSD_60min.csv -> data/EURUSD_60min.candles). Layout, all
+little-endian:
+
+    header   magic b"SFCANDL\0", int64 version, int64 rows, int64 columns
+    time     int64[rows]         nanoseconds since epoch (tz-naive DATA_TZ clock)
+    ohlcv    float64[5, rows]    Open, High, Low, Close, Volume — one
+                                 contiguous run per column
+
+Reading is one np.fromfile plus zero-copy views instead of a text parse
+plus pd.to_datetime, and read_candles() returns exactly the frame shape
+load_ohlc_csv() does, so callers cannot tell the two apart.
+
+Writes go to a temp file and are swapped in with os.replace, so a
+reader never sees a half-written store.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import get_logger
+
+log = get_logger("engine.candle_store")
+
+STORE_EXT = ".candles"
+FORMAT_VERSION = 1
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+_MAGIC = b"SFCANDL\0"
+_HEADER = np.dtype([("magic", "S8"), ("version", "<i8"), ("rows", "<i8"), ("columns", "<i8")])
+
+
+def store_path_for(csv_file: str) -> str:
+    """Sibling store path for a CSV path (same dir, same stem)."""
+    root, _ = os.path.splitext(csv_file)
+    return root + STORE_EXT
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce to the load_ohlc_csv() contract before persisting."""
+    out = df.copy()
+    if "Volume" not in out.columns:
+        out["Volume"] = 0.0
+    out = out[COLUMNS].astype(float)
+    out = out.dropna(subset=["Open", "High", "Low", "Close"])
+    if not out.index.is_monotonic_increasing:
+        out = out.sort_index()
+    return out
+
+
+def _epoch_ns(index: pd.Index) -> np.ndarray:
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ns").asi8.astype("<i8", copy=False)
+
+
+def write_candles(path: str, df: pd.DataFrame) -> None:
+    """Persist an OHLCV frame atomically."""
+    df = _normalized(df)
+    header = np.array([(_MAGIC, FORMAT_VERSION, len(df), len(COLUMNS))], dtype=_HEADER)
+    times = _epoch_ns(df.index)
+    block = np.ascontiguousarray(df.to_numpy(dtype="<f8").T)
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".candles-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(header.tobytes())
+            fh.write(times.tobytes())
+            fh.write(block.tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _read_header(raw: np.ndarray, path: str) -> tuple[int, int]:
+    if raw.size < _HEADER.itemsize:
+        raise ValueError(f"truncated candle store {path}")
+    header = raw[: _HEADER.itemsize].view(_HEADER)[0]
+    if header["magic"] != _MAGIC.rstrip(b"\0"):
+        raise ValueError(f"{path} is not a candle store")
+    if int(header["version"]) != FORMAT_VERSION:
+        raise ValueError(f"unsupported candle store version {int(header['version'])} in {path}")
+    rows, columns = int(header["rows"]), int(header["columns"])
+    if raw.size != _HEADER.itemsize + 8 * rows * (1 + columns):
+        raise ValueError(f"truncated candle store {path}")
+    return rows, columns
+
+
+def read_candles(path: str) -> pd.DataFrame:
+    """Load a store file as a load_ohlc_csv()-compatible frame."""
+    raw = np.fromfile(path, dtype=np.uint8)
+    rows, columns = _read_header(raw, path)
+    offset = _HEADER.itemsize
+    times = raw[offset: offset + 8 * rows].view("<i8")
+    block = raw[offset + 8 * rows:].view("<f8").reshape(columns, rows)
+    index = pd.DatetimeIndex(times.view("datetime64[ns]"), name="Timestamp")
+    return pd.DataFrame(block.T, index=index, columns=COLUMNS, copy=False)
+
+
+def last_timestamp(path: str) -> pd.Timestamp | None:
+    """Newest candle time in a store file without building a frame."""
+    with open(path, "rb") as fh:
+        raw = np.frombuffer(fh.read(_HEADER.itemsize), dtype=np.uint8)
+        if raw.size < _HEADER.itemsize:
+            raise ValueError(f"truncated candle store {path}")
+        header = raw.view(_HEADER)[0]
+        rows = int(header["rows"])
+        if rows == 0:
+            return None
+        fh.seek(_HEADER.itemsize + 8 * (rows - 1))
+        return pd.Timestamp(int(np.frombuffer(fh.read(8), dtype="<i8")[0]))
+
+
+def migrate_tree(data_dir: str, *, force: bool = False) -> dict:
+    """One-shot conversion of every *_<interval>.csv under data_dir.
+
+    Walks subdirectories too (e.g. 1H_DATA_MAJOR_CURRENCIES). A store
+    newer than its CSV is left alone unless force=True. Returns counts
+    plus the files that could not be read.
+    """
+    from engine.data import load_ohlc_csv
+
+    report = {"converted": 0, "skipped": 0, "failed": []}
+    for dirpath, _, filenames in os.walk(data_dir):
+        for name in sorted(filenames):
+            if not name.lower().endswith(".csv"):
+                continue
+            csv_file = os.path.join(dirpath, name)
+            target = store_path_for(csv_file)
+            if (
+                not force
+                and os.path.exists(target)
+                and os.path.getmtime(target) >= os.path.getmtime(csv_file)
+            ):
+                report["skipped"] += 1
+                continue
+            try:
+                df = load_ohlc_csv(csv_file)
+                if df.empty:
+                    raise ValueError("no candles")
+                write_candles(target, df)
+                report["converted"] += 1
+            except Exception as exc:
+                log.warning("Candle store migration failed for %s: %s", csv_file, exc)
+                report["failed"].append({"path": csv_file, "error": str(exc)})
+    log.info(
+        "Candle store migration: %d converted, %d up to date, %d failed",
+        report["converted"], report["skipped"], len(report["failed"]),
+    )
+    return report
@@ -14,8 +14,11 @@ minimum confluence count, premium/discount alignment vetoes and a
 minimum score gap between the two sides.
 """
 import numpy as np
+import pandas as pd
 
 from engine import ict, smc
+from engine.lazy_analysis import LazyAnalysis
+from engine.touch_index import TouchIndex
 from utils import settings
 from utils.compliance import DISCLAIMER
 from utils.logger import get_logger
@@ -104,16 +107,13 @@ def normalize_strategy_mode(raw) -> str:
     return mode
 
 
-def analyze(
-    df,
+def analysis_params(
     symbol: str,
-    swing_window: int = 3,
     interval: str = "60min",
-    *,
     thresholds=None,
     trading_style: str = "intraday",
 ) -> dict:
-    """Run all SMC + ICT detectors over the (tail of the) history."""
+    """Resolved thresholds plus the price-unit parameters the detectors use."""
     from engine.risk_calc import pip_size_for
     from schemas.threshold_schema import SmcIctThresholds, min_bos_break_pips, min_fvg_size_pips
     from services.threshold_service import resolve_thresholds_model
@@ -125,31 +125,91 @@ def analyze(
         thresholds = validate_threshold_config(thresholds)
 
     pip = pip_size_for(symbol)
-    min_bos = min_bos_break_pips(thresholds, interval) * pip
-    min_fvg = min_fvg_size_pips(thresholds, interval) * pip
-    disp_mult = thresholds.volatility.displacement_atr_multiplier
-    eq_tol = thresholds.swing.equal_high_low_tolerance_pips * pip
-    swing_window = thresholds.swing.swing_lookback_left
+    return {
+        "thresholds": thresholds,
+        "min_bos": min_bos_break_pips(thresholds, interval) * pip,
+        "min_fvg": min_fvg_size_pips(thresholds, interval) * pip,
+        "disp_mult": thresholds.volatility.displacement_atr_multiplier,
+        "eq_tol": thresholds.swing.equal_high_low_tolerance_pips * pip,
+        "swing_window": thresholds.swing.swing_lookback_left,
+    }
+
+
+def analyze(
+    df,
+    symbol: str,
+    swing_window: int = 3,
+    interval: str = "60min",
+    *,
+    thresholds=None,
+    trading_style: str = "intraday",
+    pattern_scan=None,
+    atr_values=None,
+) -> dict:
+    """Run all SMC + ICT detectors over the (tail of the) history.
+
+    pattern_scan: optional patterns.scan_patterns() frame over the same
+    candles; the analysis then reads its pattern row instead of scanning.
+    atr_values: optional smc.atr() values of exactly the analysed candles
+    (e.g. from an indicators.StreamingATR the caller advances).
+    """
+    params = analysis_params(symbol, interval, thresholds, trading_style)
+    swing_window = params["swing_window"]
 
     df = df.tail(MAX_BARS)
-    atr_series = smc.atr(df)
-    atr_last = float(atr_series.iloc[-1])
-    price = float(df["Close"].iloc[-1])
+    touch = TouchIndex(df)
+    if atr_values is None:
+        atr_series = smc.atr(df)
+    elif len(atr_values) != len(df):
+        raise ValueError("atr_values must cover exactly the analysed candles")
+    else:
+        atr_series = pd.Series(np.asarray(atr_values, dtype=float), index=df.index)
 
     swings = smc.find_swings(df, swing_window)
     structure = smc.detect_structure(
         df, swings, swing_window, atr_series,
-        displacement_mult=disp_mult,
-        min_break_abs=min_bos,
+        displacement_mult=params["disp_mult"],
+        min_break_abs=params["min_bos"],
+    )
+    fvgs_raw = smc.detect_fvg(df, atr_series, displacement_mult=params["disp_mult"], touch=touch)
+    return assemble_analysis(
+        df, symbol, interval, params, float(atr_series.iloc[-1]), swings, structure, fvgs_raw, touch,
+        pattern_scan=pattern_scan,
     )
-    mss_events = smc.detect_mss(structure["events"], [])
-    order_blocks = smc.detect_order_blocks(df, structure["events"])
-    fvgs_raw = smc.detect_fvg(df, atr_series, displacement_mult=disp_mult)
+
+
+def assemble_analysis(
+    df,
+    symbol: str,
+    interval: str,
+    params: dict,
+    atr_last: float,
+    swings,
+    structure: dict,
+    fvgs_raw: list[dict],
+    touch: TouchIndex,
+    pattern_scan=None,
+    order_blocks: list[dict] | None = None,
+) -> dict:
+    """The analysis mapping, from the per-bar detector outputs.
+
+    Shared by analyze() and engine/incremental.IncrementalAnalyzer, which
+    maintains swings / structure / raw FVGs / order blocks bar by bar
+    (order_blocks: detect_order_blocks() of the structure events, or
+    None to detect them here). structure is extended in place with MSS
+    events. Patterns, PDH/PDL, PWH/PWL and the market-maker model are
+    deferred (engine/lazy_analysis.py).
+    """
+    eq_tol = params["eq_tol"]
+    price = float(df["Close"].iloc[-1])
+
+    if order_blocks is None:
+        order_blocks = smc.detect_order_blocks(df, structure["events"], touch=touch)
     fvgs = [
         g for g in fvgs_raw
-        if (g["high"] - g["low"]) >= min_fvg
+        if (g["high"] - g["low"]) >= params["min_fvg"]
     ]
-    pools = smc.detect_liquidity_pools(df, swings, tolerance=max(eq_tol, 0.25 * atr_last))
+    pools = smc.detect_liquidity_pools(df, swings, tolerance=max(eq_tol, 0.25 * atr_last), touch=touch)
     sweeps = ict.detect_sweeps(
         df, pools, swings, recent_bars=SWEEP_RECENT_BARS, tolerance=max(eq_tol, 0.25 * atr_last)
     )
@@ -162,14 +222,13 @@ def analyze(
     rng = ict.dealing_range(df, structure["events"])
     pd_info = ict.premium_discount(price, rng)
     ote = ict.ote_zone(rng)
-    breakers = ict.detect_breakers(df, order_blocks, sweeps)
+    breakers = ict.detect_breakers(df, order_blocks, sweeps, touch=touch)
     killzone = ict.active_killzone(df.index[-1])
     session = ict.session_info(df.index[-1])
     from engine.patterns import analyze_patterns
     from engine.institutional import classify_market_maker_model
-    patterns = analyze_patterns(df)
 
-    result = {
+    result = LazyAnalysis({
         "symbol": symbol,
         "interval": interval,
         "bars": len(df),
@@ -195,12 +254,16 @@ def analyze(
         "breakers": breakers,
         "killzone": killzone,
         "session": session,
-        "patterns": patterns,
+        "patterns": None,
         "market_maker_model": None,
-        "pdh_pdl": ict.pdh_pdl(df),
-        "pwh_pwl": ict.pwh_pwl(df),
-    }
-    result["market_maker_model"] = classify_market_maker_model(result)
+        "pdh_pdl": None,
+        "pwh_pwl": None,
+    })
+    # context fields the parent / execution layers never read
+    result.defer("patterns", lambda: analyze_patterns(df, scan=pattern_scan))
+    result.defer("market_maker_model", lambda: classify_market_maker_model(result))
+    result.defer("pdh_pdl", lambda: ict.pdh_pdl(df))
+    result.defer("pwh_pwl", lambda: ict.pwh_pwl(df))
     return result
 
 
@@ -449,6 +512,97 @@ def _stop_and_target(analysis: dict, direction: str, decimals: int) -> dict:
     buffer = 0.25 * atr_val
     swings = analysis["swings"]
     n = analysis["bars"]
+    # swing columns as arrays: frame boolean indexing dominated decide()
+    if swings.empty:
+        sw_kind, sw_price, sw_pos = np.empty(0, dtype=object), np.empty(0), np.empty(0, dtype=np.int64)
+    else:
+        sw_kind = swings["kind"].to_numpy()
+        sw_price = swings["price"].to_numpy(dtype=float)
+        sw_pos = swings["pos"].to_numpy()
+    symbol = analysis["symbol"]
+
+    sl_cap = price * settings.get_float("sl_max_pct", SL_MAX_PCT_DEFAULT) / 100.0
+    tp_cap = price * settings.get_float("tp_max_pct", TP_MAX_PCT_DEFAULT) / 100.0
+    bullish = direction == "bullish"
+
+    # --- protective structure -> stop distance --------------------------
+    if bullish:
+        protectors = [ob["low"] for ob in analysis["valid_order_blocks"]
+                      if ob["direction"] == "bullish" and ob["low"] < price]
+        protectors += [s["level"] for s in analysis["sweeps"]
+                       if s["side"] == "sellside" and s["level"] < price]
+        lows_below = sw_price[(sw_kind == "low") & (sw_price < price)]
+        if len(lows_below):
+            protectors.append(float(lows_below[-1]))
+        stop_dist = (price - max(protectors) + buffer) if protectors else 1.5 * atr_val
+    else:
+        protectors = [ob["high"] for ob in analysis["valid_order_blocks"]
+                      if ob["direction"] == "bearish" and ob["high"] > price]
+        protectors += [s["level"] for s in analysis["sweeps"]
+                       if s["side"] == "buyside" and s["level"] > price]
+        highs_above = sw_price[(sw_kind == "high") & (sw_price > price)]
+        if len(highs_above):
+            protectors.append(float(highs_above[-1]))
+        stop_dist = (min(protectors) - price + buffer) if protectors else 1.5 * atr_val
+
+    pip = 0.01 if symbol.upper().endswith("JPY") else 0.0001
+    min_pips = settings.get_float("sl_min_pips", SL_MIN_PIPS_DEFAULT)
+    stop_dist = max(stop_dist, 0.5 * atr_val, min_pips * pip)  # never inside noise/spread
+    stop_basis = "structure"
+    stop_exceeds_cap = stop_dist > sl_cap
+    if stop_exceeds_cap:
+        stop_basis = "structure_beyond_risk_limit"
+    stop = price - stop_dist if bullish else price + stop_dist
+
+    # --- target: liquidity within reach, else capped risk multiple ------
+    if bullish:
+        candidates = [p["level"] for p in analysis["pools"]
+                      if p["side"] == "buyside" and not p["swept"] and p["level"] > price]
+        recent = (sw_kind == "high") & (sw_pos >= n - TARGET_SWING_BARS) & (sw_price > price)
+        candidates += sw_price[recent].tolist()
+        candidates = sorted(t for t in candidates if price < t <= price + tp_cap)
+        reward_of = lambda t: t - price  # noqa: E731
+    else:
+        candidates = [p["level"] for p in analysis["pools"]
+                      if p["side"] == "sellside" and not p["swept"] and p["level"] < price]
+        recent = (sw_kind == "low") & (sw_pos >= n - TARGET_SWING_BARS) & (sw_price < price)
+        candidates += sw_price[recent].tolist()
+        candidates = sorted((t for t in candidates if price - tp_cap <= t < price), reverse=True)
+        reward_of = lambda t: price - t  # noqa: E731
+
+    target = next((t for t in candidates if reward_of(t) / stop_dist >= MIN_RISK_REWARD), None)
+    target_basis = "liquidity"
+    if target is None and candidates:
+        target = candidates[-1]  # best reachable liquidity even if RR < min
+    if target is None:
+        reward = min(2.0 * stop_dist, tp_cap)
+        target = price + reward if bullish else price - reward
+        target_basis = "risk_multiple"
+
+    risk = abs(price - stop)
+    reward = abs(target - price)
+    return {
+        "entry": round(price, decimals),
+        "stop_loss": round(stop, decimals),
+        "take_profit": round(target, decimals),
+        "risk_reward": round(reward / risk, 2) if risk > 0 else None,
+        "sl_pips": round(risk / pip, 1),
+        "tp_pips": round(reward / pip, 1),
+        "sl_pct": round(risk / price * 100, 3),
+        "tp_pct": round(reward / price * 100, 3),
+        "stop_basis": stop_basis,
+        "stop_exceeds_cap": stop_exceeds_cap,
+        "target_basis": target_basis,
+    }
+
+
+def _stop_and_target_legacy(analysis: dict, direction: str, decimals: int) -> dict:
+    """Frame-filtering version (kept for regression comparison)."""
+    price = analysis["price"]
+    atr_val = analysis["atr"]
+    buffer = 0.25 * atr_val
+    swings = analysis["swings"]
+    n = analysis["bars"]
     symbol = analysis["symbol"]
 
     sl_cap = price * settings.get_float("sl_max_pct", SL_MAX_PCT_DEFAULT) / 100.0
@@ -14,7 +14,10 @@ Providers (DATA_PROVIDER env: auto | oanda | alphavantage):
     DATA_TZ (New York — the ICT kill-zone clock) so all data sources and
     the existing CSV cache share one clock.
   - Alpha Vantage (fallback): already ships US/Eastern timestamps.
-  - Cached CSV (last resort): whatever was fetched previously.
+  - Local cache (last resort): whatever was fetched previously. Fresh
+    fetches are persisted to the binary candle store
+    (engine/candle_store.py, data/{SYMBOL}_{interval}.candles); hand-placed
+    or legacy CSVs are still read when they are newer than the store.
 """
 import glob
 import os
@@ -24,7 +27,6 @@ import threading
 
 import numpy as np
 import pandas as pd
-import requests
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -33,10 +35,16 @@ from utils.config import (
     DATA_PROVIDER,
     DATA_TZ,
     FETCH_COOLDOWN_MINUTES,
+    FETCH_SINGLE_FLIGHT,
     INTERVAL,
     OANDA_API_KEY,
+    OANDA_DELTA_FETCH,
     OANDA_ENV,
+    TIMEFRAME_INDEX,
 )
+from engine import candle_store, provider_http, timeframe_index
+from engine.frame_cache import FrameCache, file_version
+from engine.single_flight import RedisFlight, SingleFlight
 from utils.logger import get_logger
 
 log = get_logger("engine.data")
@@ -46,7 +54,10 @@ DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 BASE_URL = "https://www.alphavantage.co/query"
 REQUEST_TIMEOUT = 30
 PROVIDER_RETRIES = int(os.getenv("DATA_PROVIDER_RETRIES", "3"))
+FRAME_CACHE_MAX_MB = float(os.getenv("FRAME_CACHE_MAX_MB", "128"))
+_frames = FrameCache(int(FRAME_CACHE_MAX_MB * 1024 * 1024))
 _diagnostics = threading.local()
+_flights = SingleFlight()
 _provider_health: dict[str, dict] = {}
 _health_lock = threading.Lock()
 
@@ -64,6 +75,10 @@ OANDA_GRANULARITY = {
     "daily": "D",
     "day": "D",
 }
+# Sent with every candles request (they are also the v20 defaults): H4 and
+# daily candles open on this hour of this timezone, not on UTC boundaries.
+OANDA_DAILY_ALIGNMENT = 17
+OANDA_ALIGNMENT_TZ = "America/New_York"
 
 # LTF -> HTF mapping for bias context
 HTF_INTERVAL_MAP = {
@@ -83,6 +98,13 @@ def htf_interval(interval: str) -> str | None:
     key = validate_interval(interval) if interval else INTERVAL
     return HTF_INTERVAL_MAP.get(key)
 OANDA_CANDLE_COUNT = 2000  # engine analyses 1500 bars + label horizon
+OANDA_MAX_COUNT = 5000     # v20 per-request candle limit (delta-fetch page size)
+OANDA_MAX_PAGES = 10       # page cap per delta fetch
+
+INTERVAL_MINUTES = {
+    "1min": 1, "5min": 5, "15min": 15, "30min": 30,
+    "60min": 60, "240min": 240, "daily": 1440, "day": 1440,
+}
 
 COLUMN_MAP = {
     "1. open": "Open",
@@ -101,6 +123,11 @@ def get_last_data_diagnostics() -> dict:
     return getattr(_diagnostics, "value", {}).copy()
 
 
+def frame_cache_stats() -> dict:
+    """Hit/miss/byte counters of the in-process parsed-frame cache."""
+    return _frames.stats()
+
+
 def provider_health() -> dict:
     with _health_lock:
         return {name: state.copy() for name, state in _provider_health.items()}
@@ -165,15 +192,52 @@ RESAMPLE_FALLBACKS = {
 }
 
 
+# base interval -> intervals a cached base frame can stand in for
+DERIVED_INTERVALS: dict[str, tuple[str, ...]] = {}
+for _target, _chain in RESAMPLE_FALLBACKS.items():
+    if _target != "day":
+        for _source, _ in _chain:
+            DERIVED_INTERVALS[_source] = DERIVED_INTERVALS.get(_source, ()) + (_target,)
+
+
+def derived_frame(
+    symbol: str, base_interval: str, interval: str, base: pd.DataFrame, rule: str | None = None,
+) -> pd.DataFrame:
+    """`interval` candles aggregated from `base` (the pair's base_interval candles).
+
+    With TIMEFRAME_INDEX the bars come from the pair's persisted
+    alignment index (engine/timeframe_index.py), extended as base grows,
+    instead of a fresh resample per call.
+    """
+    rule = rule or f"{INTERVAL_MINUTES[interval]}min"
+    if TIMEFRAME_INDEX and base.index.tz is None:
+        try:
+            path = align_path(symbol, base_interval, interval)
+            return timeframe_index.synced(path, base, rule).frame()
+        except ValueError as exc:
+            log.info("No timeframe index for %s %s -> %s: %s", symbol, base_interval, interval, exc)
+    return timeframe_index.resample_ohlc(base, rule)
+
+
+def _refresh_derived(symbol: str, interval: str, df: pd.DataFrame) -> None:
+    """Extend the alignment indexes of intervals this pair has no cache of."""
+    if not TIMEFRAME_INDEX:
+        return
+    for target in DERIVED_INTERVALS.get(interval, ()):
+        if cache_file(symbol, target) is not None:
+            continue
+        try:
+            derived_frame(symbol, interval, target, df)
+        except Exception as exc:
+            log.warning("Timeframe index %s %s -> %s not refreshed: %s", symbol, interval, target, exc)
+
+
 def _resample_cached(symbol: str, interval: str) -> tuple[pd.DataFrame, str] | None:
     for source_interval, rule in RESAMPLE_FALLBACKS.get(interval, ()):
         source = load_cached(symbol, source_interval)
         if source is None or source.empty:
             continue
-        frame = source.resample(rule).agg({
-            "Open": "first", "High": "max", "Low": "min",
-            "Close": "last", "Volume": "sum",
-        }).dropna(subset=["Open", "High", "Low", "Close"])
+        frame = derived_frame(symbol, source_interval, interval, source, rule)
         if len(frame) >= 20:
             return frame, source_interval
     return None
@@ -183,6 +247,47 @@ def csv_path(symbol: str, interval: str = INTERVAL) -> str:
     return os.path.join(DATA_DIR, f"{symbol.upper()}_{interval}.csv")
 
 
+def align_path(symbol: str, base_interval: str, interval: str) -> str:
+    """Alignment index deriving `interval` from the pair's base_interval cache."""
+    return os.path.join(
+        DATA_DIR, f"{symbol.upper()}_{base_interval}.{interval}{timeframe_index.INDEX_EXT}",
+    )
+
+
+def store_path(symbol: str, interval: str = INTERVAL) -> str:
+    """Binary candle store for a pair (see engine/candle_store.py)."""
+    return candle_store.store_path_for(csv_path(symbol, interval))
+
+
+def _cache_candidates(symbol: str, interval: str) -> list[str]:
+    """CSV-layout paths searched for cached candles, in priority order."""
+    return [
+        csv_path(symbol, interval),
+        os.path.join(DATA_DIR, "1H_DATA_MAJOR_CURRENCIES", f"{symbol}_{interval}.csv"),
+    ]
+
+
+def _newest_cache_file(csv_file: str) -> str | None:
+    """The store sibling unless the CSV was written after it."""
+    store = candle_store.store_path_for(csv_file)
+    has_store, has_csv = os.path.exists(store), os.path.exists(csv_file)
+    if has_store and (not has_csv or os.path.getmtime(store) >= os.path.getmtime(csv_file)):
+        return store
+    return csv_file if has_csv else None
+
+
+def cache_file(symbol: str, interval: str = INTERVAL) -> str | None:
+    """Primary cache file for a pair (store or CSV), None when absent."""
+    return _newest_cache_file(csv_path(symbol, interval))
+
+
+def load_candles(path: str) -> pd.DataFrame:
+    """Read a cache file in either format (store or any legacy CSV)."""
+    if path.endswith(candle_store.STORE_EXT):
+        return candle_store.read_candles(path)
+    return load_ohlc_csv(path)
+
+
 def supported_intervals() -> list[str]:
     return list(OANDA_GRANULARITY.keys())
 
@@ -239,34 +344,31 @@ def _frame_from_oanda(candles: list[dict]) -> pd.DataFrame:
     Only completed candles are kept — the still-forming one has no real
     close and would poison close-confirmed structure detection.
     """
-    rows, times = [], []
-    for c in candles:
-        if not c.get("complete", False):
-            continue
-        mid = c["mid"]
-        rows.append({
-            "Open": float(mid["o"]),
-            "High": float(mid["h"]),
-            "Low": float(mid["l"]),
-            "Close": float(mid["c"]),
-            "Volume": float(c.get("volume", 0)),
-        })
-        times.append(c["time"])
-    if not rows:
+    done = [c for c in candles if c.get("complete", False)]
+    if not done:
         return pd.DataFrame(
             columns=["Open", "High", "Low", "Close", "Volume"],
             index=pd.DatetimeIndex([], name="Timestamp"),
         )
+    # OANDA sends prices as strings; one vectorised cast beats float() per field
+    values = np.array(
+        [(c["mid"]["o"], c["mid"]["h"], c["mid"]["l"], c["mid"]["c"], c.get("volume", 0)) for c in done],
+        dtype=float,
+    )
     idx = (
-        pd.to_datetime(times, utc=True)
+        pd.to_datetime([c["time"] for c in done], utc=True, format="ISO8601")
         .tz_convert(DATA_TZ)
         .tz_localize(None)  # naive, same convention as the CSV cache
     )
-    df = pd.DataFrame(rows, index=pd.Index(idx, name="Timestamp"))
+    df = pd.DataFrame(
+        values, index=pd.Index(idx, name="Timestamp"),
+        columns=["Open", "High", "Low", "Close", "Volume"],
+    )
     return df.sort_index()
 
 
-def _fetch_oanda(symbol: str, interval: str) -> pd.DataFrame:
+def _oanda_candles(symbol: str, interval: str, params: dict) -> list[dict]:
+    """Raw v20 candles for one request (params add count / from)."""
     granularity = OANDA_GRANULARITY.get(interval)
     if not granularity:
         raise LookupError(
@@ -275,15 +377,87 @@ def _fetch_oanda(symbol: str, interval: str) -> pd.DataFrame:
         )
     host = OANDA_HOSTS.get(OANDA_ENV, OANDA_HOSTS["practice"])
     instrument = to_oanda_instrument(symbol)
-    resp = requests.get(
+    provider_http.throttle("oanda")
+    resp = provider_http.session().get(
         f"{host}/v3/instruments/{instrument}/candles",
-        params={"granularity": granularity, "count": OANDA_CANDLE_COUNT, "price": "M"},
+        params={
+            "granularity": granularity,
+            "price": "M",
+            "dailyAlignment": OANDA_DAILY_ALIGNMENT,
+            "alignmentTimezone": OANDA_ALIGNMENT_TZ,
+            **params,
+        },
         headers={"Authorization": f"Bearer {OANDA_API_KEY}"},
         timeout=REQUEST_TIMEOUT,
     )
     if resp.status_code != 200:
         raise LookupError(f"OANDA HTTP {resp.status_code}: {resp.text[:200]}")
-    return _frame_from_oanda(resp.json().get("candles", []))
+    return resp.json().get("candles", [])
+
+
+def _fetch_oanda(symbol: str, interval: str) -> pd.DataFrame:
+    return _frame_from_oanda(_oanda_candles(symbol, interval, {"count": OANDA_CANDLE_COUNT}))
+
+
+def _oanda_time(ts: pd.Timestamp) -> str:
+    """Naive DATA_TZ timestamp -> RFC3339 UTC for the v20 'from' param.
+
+    Ambiguous DST hours resolve to the earlier instant: asking from a
+    little too early only re-sends bars the merge dedups anyway.
+    """
+    utc = (
+        pd.Timestamp(ts)
+        .tz_localize(DATA_TZ, ambiguous=True, nonexistent="shift_backward")
+        .tz_convert("UTC")
+    )
+    return utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _fetch_oanda_since(symbol: str, interval: str, since: pd.Timestamp) -> pd.DataFrame:
+    """Completed candles strictly newer than `since`, paging past the
+    per-request limit. `since` is on the naive DATA_TZ clock."""
+    candles: list[dict] = []
+    start = _oanda_time(since)
+    for _ in range(OANDA_MAX_PAGES):
+        page = _oanda_candles(symbol, interval, {"from": start, "count": OANDA_MAX_COUNT})
+        candles.extend(page)
+        if len(page) < OANDA_MAX_COUNT:
+            break
+        start = page[-1]["time"]
+    else:
+        raise LookupError(f"OANDA delta fetch needed more than {OANDA_MAX_PAGES} pages")
+    df = _frame_from_oanda(candles)
+    df = df[~df.index.duplicated(keep="last")]
+    return df[df.index > since]
+
+
+def _fetch_delta(symbol: str, interval: str) -> tuple[pd.DataFrame, list[str], int] | None:
+    """Extend the local cache with only the candles it is missing.
+
+    Returns (merged_frame, warnings, appended) or None when a full pull
+    is the better call (no cache, or the gap is so large that none of
+    the cached bars would survive the trim anyway). Only the appended
+    tail (plus the last cached bar, for gap/continuity checks) is
+    validated — the cached body was validated when it was written.
+    """
+    cached = load_cached(symbol, interval)
+    if cached is None or len(cached) < 50:
+        return None
+    keep = max(len(cached), OANDA_CANDLE_COUNT)
+    last = cached.index[-1]
+    minutes = INTERVAL_MINUTES.get(interval)
+    if minutes:
+        gap_bars = (pd.Timestamp.now(tz=DATA_TZ).tz_localize(None) - last).total_seconds() / 60 / minutes
+        if gap_bars >= keep:
+            return None
+
+    new = _fetch_oanda_since(symbol, interval, last)
+    if new.empty:
+        return cached, [], 0
+    warnings = _validate_provider_frame(pd.concat([cached.iloc[-1:], new]), interval)
+    merged = pd.concat([cached, new])
+    merged = merged[~merged.index.duplicated(keep="last")].sort_index().tail(keep)
+    return merged, warnings, len(new)
 
 
 def _fetch_fx_intraday(symbol: str, interval: str) -> pd.DataFrame:
@@ -295,7 +469,8 @@ def _fetch_fx_intraday(symbol: str, interval: str) -> pd.DataFrame:
         "outputsize": "full",
         "apikey": ALPHA_VANTAGE_API_KEY,
     }
-    resp = requests.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
+    provider_http.throttle("alphavantage")
+    resp = provider_http.session().get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
     resp.raise_for_status()
     payload = resp.json()
     key = f"Time Series FX ({interval})"
@@ -312,7 +487,8 @@ def _fetch_ts_intraday(symbol: str, interval: str) -> pd.DataFrame:
         "outputsize": "full",
         "apikey": ALPHA_VANTAGE_API_KEY,
     }
-    resp = requests.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
+    provider_http.throttle("alphavantage")
+    resp = provider_http.session().get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
     resp.raise_for_status()
     payload = resp.json()
     key = f"Time Series ({interval})"
@@ -322,19 +498,24 @@ def _fetch_ts_intraday(symbol: str, interval: str) -> pd.DataFrame:
 
 
 def load_cached(symbol: str, interval: str = INTERVAL) -> pd.DataFrame | None:
-    """Load the most recent cached CSV for a pair, searching known layouts."""
+    """Load the most recent cached candles for a pair, searching known layouts.
+
+    Parsed frames are shared process-wide (engine/frame_cache.py) until
+    the file on disk changes; the returned frame's values are read-only.
+    """
     symbol = normalize_symbol(symbol)
-    candidates = [
-        csv_path(symbol, interval),
-        os.path.join(DATA_DIR, "1H_DATA_MAJOR_CURRENCIES", f"{symbol}_{interval}.csv"),
-    ]
-    for path in candidates:
-        if os.path.exists(path):
+    for candidate in _cache_candidates(symbol, interval):
+        path = _newest_cache_file(candidate)
+        if path:
             try:
-                df = load_ohlc_csv(path)
+                version = file_version(path)
+                hit = _frames.get((symbol, interval), version)
+                if hit is not None:
+                    return hit
+                df = load_candles(path)
                 if not df.empty:
                     log.info("Loaded cached data for %s from %s (%d candles)", symbol, path, len(df))
-                    return df
+                    return _frames.put((symbol, interval), version, df)
             except Exception as exc:
                 log.warning("Cached file %s unreadable: %s", path, exc)
     return None
@@ -373,6 +554,122 @@ def active_provider() -> str:
     return chain[0][0] if chain else "none"
 
 
+def _persist_delta(symbol: str, interval: str, df: pd.DataFrame, appended: int) -> pd.DataFrame:
+    """Write a delta-merged frame; with nothing new just mark the store fresh."""
+    path = store_path(symbol, interval)
+    if appended == 0 and cache_file(symbol, interval) == path:
+        os.utime(path)  # restarts the fetch cooldown without rewriting
+    else:
+        candle_store.write_candles(path, df)
+    return _frames.put((symbol, interval), file_version(path), df)
+
+
+def _fetch_live(symbol: str, interval: str) -> dict:
+    """Walk the provider chain once and persist the first good frame.
+
+    Returns {"df", "provider", "warnings", "attempts"}; df/provider are
+    None when every provider failed. Never raises, so the outcome can be
+    shared with every coalesced caller.
+    """
+    outcome = {"df": None, "provider": None, "warnings": [], "attempts": []}
+    chain = _provider_chain()
+    if not chain:
+        log.warning(
+            "No data provider configured (set OANDA_API_KEY or "
+            "ALPHA_VANTAGE_API_KEY) — using cached data for %s", symbol,
+        )
+    for provider, fetcher in chain:
+        for attempt in range(1, PROVIDER_RETRIES + 1):
+            try:
+                delta = (
+                    _fetch_delta(symbol, interval)
+                    if fetcher is _fetch_oanda and OANDA_DELTA_FETCH else None
+                )
+                if delta is not None:
+                    df, warnings, appended = delta
+                    df = _persist_delta(symbol, interval, df, appended)
+                    detail = f"{len(df)} candles ({appended} new)"
+                else:
+                    df = fetcher(symbol, interval)
+                    if len(df) < 50:
+                        raise LookupError(f"provider returned only {len(df)} candles")
+                    warnings = _validate_provider_frame(df, interval)
+                    path = store_path(symbol, interval)
+                    candle_store.write_candles(path, df)
+                    df = _frames.put((symbol, interval), file_version(path), df)
+                    detail = f"{len(df)} candles"
+                _refresh_derived(symbol, interval, df)
+                detail += f"; {'; '.join(warnings)}" if warnings else ""
+                outcome["attempts"].append({"provider": provider, "ok": True, "detail": detail})
+                _record_provider(provider, True, detail)
+                log.info("Fetched %d candles for %s @ %s via %s", len(df), symbol, interval, provider)
+                outcome.update(df=df, provider=provider, warnings=warnings)
+                return outcome
+            except Exception as exc:
+                detail = f"{fetcher.__name__} attempt {attempt}/{PROVIDER_RETRIES}: {exc}"
+                outcome["attempts"].append({"provider": provider, "ok": False, "detail": detail})
+                _record_provider(provider, False, detail)
+                log.warning("%s failed for %s: %s", provider, symbol, detail)
+                if attempt < PROVIDER_RETRIES:
+                    time.sleep(0.25 * (2 ** (attempt - 1)))
+    return outcome
+
+
+_redis_client = None  # created on first use; False when Redis is not configured / importable
+
+
+def _redis_flight() -> RedisFlight | None:
+    global _redis_client
+    if _redis_client is None:
+        try:
+            import redis
+            url = os.getenv("REDIS_URL", "").strip()
+            _redis_client = redis.from_url(url, decode_responses=True) if url else False
+        except Exception:
+            _redis_client = False
+    return RedisFlight(_redis_client) if _redis_client else None
+
+
+def _coalesced_fetch(symbol: str, interval: str) -> tuple[dict, bool]:
+    """_fetch_live() shared by every concurrent caller for the same pair.
+
+    Returns (outcome, shared); shared is True when another thread (or,
+    with FETCH_SINGLE_FLIGHT=redis, another worker process) made the
+    provider call. Peers in other processes re-read the cache file the
+    leader wrote instead of receiving the frame itself.
+    """
+    if FETCH_SINGLE_FLIGHT == "off":
+        return _fetch_live(symbol, interval), False
+
+    def publish(outcome: dict) -> dict:
+        return {k: v for k, v in outcome.items() if k != "df"}
+
+    def on_peer(payload: dict) -> dict:
+        outcome = dict(payload, df=None)
+        if outcome.get("provider"):
+            outcome["df"] = load_cached(symbol, interval)
+            if outcome["df"] is None:
+                outcome["provider"] = None
+        return outcome
+
+    def run() -> dict:
+        flight = _redis_flight() if FETCH_SINGLE_FLIGHT == "redis" else None
+        if flight is None:
+            return _fetch_live(symbol, interval)
+        outcome, shared = flight.do(
+            f"{symbol}:{interval}", lambda: _fetch_live(symbol, interval), publish, on_peer
+        )
+        return dict(outcome, shared_across_processes=shared)
+
+    outcome, shared = _flights.do((symbol, interval), run)
+    return outcome, shared or bool(outcome.get("shared_across_processes"))
+
+
+def fetch_coalescing_stats() -> dict:
+    """Leader/shared counters of the in-process fetch single-flight."""
+    return dict(_flights.stats(), mode=FETCH_SINGLE_FLIGHT)
+
+
 def get_data(symbol: str, interval: str = INTERVAL, fetch: bool = True) -> tuple[pd.DataFrame, str]:
     """Return (ohlc_frame, source) for a pair.
 
@@ -387,48 +684,28 @@ def get_data(symbol: str, interval: str = INTERVAL, fetch: bool = True) -> tuple
     diagnostics = {"symbol": symbol, "interval": interval, "attempts": [], "fallback_used": False}
     _diagnostics.value = diagnostics
 
-    # Cooldown: a CSV refreshed moments ago is as good as live and the
+    # Cooldown: a cache refreshed moments ago is as good as live and the
     # provider quota (free tier: ~25 requests/day) is precious.
     if fetch and FETCH_COOLDOWN_MINUTES > 0:
-        path = csv_path(symbol, interval)
-        if os.path.exists(path):
+        path = cache_file(symbol, interval)
+        if path:
             age_min = (time.time() - os.path.getmtime(path)) / 60
             if age_min < FETCH_COOLDOWN_MINUTES:
                 log.info(
-                    "%s CSV is %.1f min old (< %d min cooldown) — serving cache",
+                    "%s cache is %.1f min old (< %d min cooldown) — serving cache",
                     symbol, age_min, FETCH_COOLDOWN_MINUTES,
                 )
                 fetch = False
 
     if fetch:
-        chain = _provider_chain()
-        if not chain:
-            log.warning(
-                "No data provider configured (set OANDA_API_KEY or "
-                "ALPHA_VANTAGE_API_KEY) — using cached data for %s", symbol,
-            )
-        for provider, fetcher in chain:
-            for attempt in range(1, PROVIDER_RETRIES + 1):
-                try:
-                    df = fetcher(symbol, interval)
-                    if len(df) < 50:
-                        raise LookupError(f"provider returned only {len(df)} candles")
-                    warnings = _validate_provider_frame(df, interval)
-                    df.to_csv(csv_path(symbol, interval))
-                    detail = f"{len(df)} candles" + (f"; {'; '.join(warnings)}" if warnings else "")
-                    diagnostics["attempts"].append({"provider": provider, "ok": True, "detail": detail})
-                    diagnostics["provider"] = provider
-                    diagnostics["warnings"] = warnings
-                    _record_provider(provider, True, detail)
-                    log.info("Fetched %d candles for %s @ %s via %s", len(df), symbol, interval, provider)
-                    return df, provider
-                except Exception as exc:
-                    detail = f"{fetcher.__name__} attempt {attempt}/{PROVIDER_RETRIES}: {exc}"
-                    diagnostics["attempts"].append({"provider": provider, "ok": False, "detail": detail})
-                    _record_provider(provider, False, detail)
-                    log.warning("%s failed for %s: %s", provider, symbol, detail)
-                    if attempt < PROVIDER_RETRIES:
-                        time.sleep(0.25 * (2 ** (attempt - 1)))
+        outcome, shared = _coalesced_fetch(symbol, interval)
+        diagnostics["attempts"].extend(outcome["attempts"])
+        if shared:
+            diagnostics["coalesced"] = True
+        if outcome["df"] is not None:
+            diagnostics["provider"] = outcome["provider"]
+            diagnostics["warnings"] = outcome["warnings"]
+            return outcome["df"].copy(deep=False), outcome["provider"]
 
     cached = load_cached(symbol, interval)
     if cached is not None:
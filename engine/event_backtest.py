@@ -0,0 +1,221 @@
+# engine/event_backtest.py
+"""Event-driven backtest: one pass over the candles, incremental detector state.
+
+engine/backtest.run_backtest re-analyses a growing window every
+STEP_BARS bars, so its cost grows with the square of the history. This
+backtest walks the candles once instead:
+
+  - an IncrementalAnalyzer advances the SMC/ICT state bar by bar;
+  - while flat, decide() runs on the bars selected by `triggers`:
+    "bar" (every closed bar) or the detector events the bar produced
+    ("structure" = BOS/CHoCH, "swing", "fvg");
+  - a trade signal on bar i's close is a market order filled at bar
+    i + 1's open, paying half the spread plus slippage (the candles are
+    mid prices); an open already beyond the stop or target cancels it;
+  - the position is then managed bar by bar against bid/ask extremes:
+    stop before target when one bar touches both, an open beyond the
+    stop fills at that open (plus slippage), and after max_hold_bars it
+    is closed at the bar's close.
+
+Trades are measured in R (multiples of the risk at the actual fill) and
+equity compounds RISK_PER_TRADE per R. The report carries the same keys
+as run_backtest plus the event-engine counters.
+"""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine import confluence
+from engine.confluence import ACTION_NO_TRADE, ACTION_WAIT, is_trade_action, trade_side_from_action
+from engine.incremental import IncrementalAnalyzer
+from engine.patterns import scan_patterns
+from engine.risk_calc import pip_size_for
+from schemas.threshold_schema import SmcIctThresholds
+from services.threshold_service import resolve_thresholds_model
+from utils.logger import get_logger
+
+log = get_logger("engine.event_backtest")
+
+TRIGGERS = ("bar", "structure", "swing", "fvg")
+DEFAULT_TRIGGERS = ("structure",)
+MIN_WARMUP = 100
+SPREAD_PIPS = 1.0
+SLIPPAGE_PIPS = 0.2
+MAX_HOLD_BARS = 20
+RISK_PER_TRADE = 0.01
+
+
+def _epoch_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """The clock IncrementalAnalyzer.update() stores (UTC for tz-aware frames)."""
+    index = index.as_unit("ns")
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.asi8
+
+
+def _exit(position: dict, o: float, h: float, l: float, c: float, held: int, cost: tuple[float, float], max_hold: int):
+    """(exit price, outcome) when the position closes on this bar, else None."""
+    half_spread, slip = cost
+    sl, tp = position["sl"], position["tp"]
+    if position["side"] == "BUY":
+        bid_open, bid_high, bid_low = o - half_spread, h - half_spread, l - half_spread
+        if bid_open <= sl:
+            return bid_open - slip, "loss"
+        if bid_low <= sl:
+            return sl - slip, "loss"
+        if bid_open >= tp:
+            return bid_open, "win"
+        if bid_high >= tp:
+            return tp, "win"
+        if held >= max_hold:
+            return c - half_spread - slip, "timeout"
+        return None
+    ask_open, ask_high, ask_low = o + half_spread, h + half_spread, l + half_spread
+    if ask_open >= sl:
+        return ask_open + slip, "loss"
+    if ask_high >= sl:
+        return sl + slip, "loss"
+    if ask_open <= tp:
+        return ask_open, "win"
+    if ask_low <= tp:
+        return tp, "win"
+    if held >= max_hold:
+        return c + half_spread + slip, "timeout"
+    return None
+
+
+def run_event_backtest(
+    df: pd.DataFrame,
+    symbol: str,
+    *,
+    interval: str = "60min",
+    thresholds: SmcIctThresholds | None = None,
+    trading_style: str = "intraday",
+    triggers=DEFAULT_TRIGGERS,
+    spread_pips: float = SPREAD_PIPS,
+    slippage_pips: float = SLIPPAGE_PIPS,
+    max_hold_bars: int = MAX_HOLD_BARS,
+    warmup: int = MIN_WARMUP,
+) -> dict:
+    """Backtest the whole of df in one pass; see the module docstring."""
+    triggers = set(triggers)
+    unknown = triggers - set(TRIGGERS)
+    if unknown:
+        raise ValueError(f"unknown backtest triggers {sorted(unknown)}; choose from {TRIGGERS}")
+    if len(df) < warmup + 50:
+        return {"error": "Not enough bars for backtest", "trades": 0}
+    if thresholds is None:
+        thresholds = resolve_thresholds_model(symbol, interval, trading_style)
+
+    started = time.monotonic()
+    pip = pip_size_for(symbol)
+    cost = (spread_pips * pip / 2, slippage_pips * pip)
+    analyzer = IncrementalAnalyzer(symbol, interval, thresholds=thresholds, trading_style=trading_style)
+    analyzer.update(df.iloc[:warmup])
+    times = _epoch_ns(df.index)
+    opens, highs, lows, closes = (df[c].to_numpy(dtype=float).tolist() for c in ("Open", "High", "Low", "Close"))
+    volumes = df["Volume"].to_numpy(dtype=float).tolist() if "Volume" in df else [0.0] * len(df)
+    pattern_scan = scan_patterns(df, start=warmup)
+
+    trades = []
+    evaluations = no_trade = wait = cancelled = 0
+    equity = peak = 10000.0
+    max_drawdown = 0.0
+    pending = position = None
+
+    def close_position(k: int, exit_price: float, outcome: str) -> None:
+        nonlocal position, equity, peak, max_drawdown
+        entry, risk = position["entry"], position["risk"]
+        r = ((exit_price - entry) if position["side"] == "BUY" else (entry - exit_price)) / risk
+        equity += equity * RISK_PER_TRADE * r
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, (peak - equity) / peak if peak > 0 else 0)
+        trades.append({
+            "outcome": outcome,
+            "rr": round(r, 2),
+            "action": position["action"],
+            "entry_time": df.index[position["pos"]].isoformat(),
+            "exit_time": df.index[k].isoformat(),
+            "entry": round(entry, 6),
+            "exit": round(exit_price, 6),
+            "bars_held": k - position["pos"] + 1,
+        })
+        position = None
+
+    last = len(df) - 1
+    for k in range(warmup, len(df)):
+        o, h, l, c = opens[k], highs[k], lows[k], closes[k]
+        if pending is not None:
+            half_spread, slip = cost
+            buy = pending["side"] == "BUY"
+            entry = o + half_spread + slip if buy else o - half_spread - slip
+            sl, tp = pending["sl"], pending["tp"]
+            if (buy and not sl < entry < tp) or (not buy and not tp < entry < sl):
+                cancelled += 1
+            else:
+                position = dict(pending, entry=entry, risk=abs(entry - sl), pos=k)
+            pending = None
+        if position is not None:
+            closed = _exit(position, o, h, l, c, k - position["pos"] + 1, cost, max_hold_bars)
+            if closed is not None:
+                close_position(k, *closed)
+
+        analyzer.append(times[k], o, h, l, c, volumes[k])
+        if position is not None or k == last:
+            continue
+        if "bar" not in triggers and not triggers & analyzer.last_signals:
+            continue
+        evaluations += 1
+        analysis = analyzer.analysis(pattern_scan)
+        analysis["trading_style"] = trading_style
+        decision = confluence.decide(analysis, ml_signal=None, thresholds=thresholds)
+        action = decision["action"]
+        if action == ACTION_NO_TRADE:
+            no_trade += 1
+        elif action == ACTION_WAIT:
+            wait += 1
+        elif is_trade_action(action) and decision["entry"] and decision["stop_loss"] and decision["take_profit"]:
+            pending = {
+                "side": trade_side_from_action(action), "action": action,
+                "sl": float(decision["stop_loss"]), "tp": float(decision["take_profit"]),
+            }
+
+    if position is not None:
+        half_spread, slip = cost
+        exit_price = closes[last] - half_spread - slip if position["side"] == "BUY" else closes[last] + half_spread + slip
+        close_position(last, exit_price, "timeout")
+
+    total = len(trades)
+    wins = sum(1 for t in trades if t["outcome"] == "win")
+    losses = sum(1 for t in trades if t["outcome"] == "loss")
+    timeouts = total - wins - losses
+    win_rs = [t["rr"] for t in trades if t["outcome"] == "win"]
+    total_r = sum(t["rr"] for t in trades)
+    return {
+        "symbol": symbol.upper(),
+        "engine": "event",
+        "bars": len(df) - warmup,
+        "evaluations": evaluations,
+        "triggers": sorted(triggers),
+        "trades": total,
+        "wins": wins,
+        "losses": losses,
+        "timeouts": timeouts,
+        "cancelled_orders": cancelled,
+        "win_rate": round(wins / total, 4) if total else 0,
+        "avg_rr": round(sum(win_rs) / len(win_rs), 2) if win_rs else 0.0,
+        "expectancy_r": round(total_r / total, 3) if total else 0.0,
+        "total_r": round(total_r, 2),
+        "accuracy": round(wins / (wins + losses), 4) if wins + losses else 0,
+        "no_trade_rate": round(no_trade / evaluations, 4) if evaluations else 0,
+        "wait_rate": round(wait / evaluations, 4) if evaluations else 0,
+        "invalidation_hit_rate": round(losses / total, 4) if total else 0,
+        "max_drawdown": round(max_drawdown, 4),
+        "max_drawdown_pct": round(max_drawdown * 100, 2),
+        "final_equity": round(equity, 2),
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "trade_log": trades[:50],
+    }
@@ -7,15 +7,26 @@ that moment and the label is the direction of the forward move, so the
 model learns from hundreds of samples of THIS pair's own history each
 time a prediction is requested.
 """
+import copy
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
 import numpy as np
 import pandas as pd
 
 from engine import ict, smc
+from engine.indicators import StreamingATR, StreamingEMA, StreamingRSI
 
 HORIZON = 6              # bars ahead used for the label
 LABEL_ATR_FRACTION = 0.25  # move must exceed this * ATR to count as up/down
 SWEEP_LOOKBACK = 20      # window defining the liquidity level being swept
 SWEEP_RECENT = 6         # bars a sweep stays "recent"
+FEATURE_WARMUP = SWEEP_LOOKBACK + SWEEP_RECENT  # context bars the widest windowed feature reads
+TAIL_CARRIES = 64        # frames (pairs x intervals) whose feature carry is kept
+
+_carries: OrderedDict[tuple, "FeatureCarry"] = OrderedDict()
+_carries_lock = threading.Lock()
 
 
 def _rsi(close: pd.Series, period: int = 14) -> pd.Series:
@@ -26,11 +37,139 @@ def _rsi(close: pd.Series, period: int = 14) -> pd.Series:
     return (100 - 100 / (1 + rs)).fillna(50.0)
 
 
-def build_features(df: pd.DataFrame, swing_window: int = 3) -> pd.DataFrame:
-    """Feature frame aligned to df.index (NaNs at the warm-up head)."""
-    out = pd.DataFrame(index=df.index)
-    close, high, low, open_ = df["Close"], df["High"], df["Low"], df["Open"]
-    atr_series = smc.atr(df)
+class FeatureCarry(NamedTuple):
+    """The recursive feature state after a frame's first `bars` candles.
+
+    stamp: (time, OHLC) of bar bars - 1, to recognise the frame again;
+    the kernels are copied before they advance, so a carry never changes.
+    """
+    bars: int
+    stamp: tuple | None
+    atr: StreamingATR
+    rsi: StreamingRSI
+    ema10: StreamingEMA
+    ema50: StreamingEMA
+    structure: smc.StructureCarry
+    dealing: ict.DealingCarry
+    event_pos: float  # last structure event / BOS / CHoCH bar, -1 for none
+    bos_pos: float
+    choch_pos: float
+    last_choch: float
+
+
+def _empty_carry() -> FeatureCarry:
+    return FeatureCarry(
+        0, None, StreamingATR(), StreamingRSI(), StreamingEMA(10), StreamingEMA(50),
+        smc.StructureCarry(), ict.DealingCarry(), -1.0, -1.0, -1.0, 0.0,
+    )
+
+
+def _stamp(df: pd.DataFrame, i: int) -> tuple:
+    return (df.index[i], *(float(df[c].to_numpy()[i]) for c in ("Open", "High", "Low", "Close")))
+
+
+def _advance(df: pd.DataFrame, carry: FeatureCarry, stop: int, swing_window: int) -> tuple[dict, FeatureCarry]:
+    """Recursive per-bar state of bars carry.bars..stop - 1, and the carry after them.
+
+    Reads a bounded stretch of history before carry.bars: the swing
+    fractal's 2 * swing_window bars, the pd fallback window and, rarely,
+    a new event's leg (ict.pd_positions).
+    """
+    start = carry.bars
+    opens, highs, lows, closes = (df[c].to_numpy(dtype=float) for c in ("Open", "High", "Low", "Close"))
+    kernels = [copy.deepcopy(k) for k in (carry.atr, carry.rsi, carry.ema10, carry.ema50)]
+    run = slice(start, stop)
+    atr = kernels[0].update_many(highs[run], lows[run], closes[run])
+
+    # swings confirmed inside the run; a fractal reads swing_window bars either side
+    lead = max(0, start - 2 * swing_window)
+    sw_pos, sw_kind, sw_price = smc.swing_points(highs[lead:stop], lows[lead:stop], swing_window)
+    events, _, structure = smc.advance_structure(
+        opens[run], highs[run], lows[run], closes[run], atr, df.index[run],
+        sw_pos + lead, sw_kind == smc.SWING_HIGH, sw_price, swing_window,
+        carry=carry.structure, offset=start,
+    )
+    pd_position, dealing = ict.pd_positions(
+        highs[:stop], lows[:stop], closes[:stop], events, carry=carry.dealing, start=start,
+    )
+
+    # Market-structure state from close-confirmed BOS/CHoCH events
+    m = stop - start
+    trend = np.full(m, float(carry.structure.trend))
+    choch_flag = np.full(m, carry.last_choch)
+    event_pos = np.full(m, carry.event_pos)
+    bos_pos = np.full(m, carry.bos_pos)
+    choch_pos = np.full(m, carry.choch_pos)
+    for ev in events:
+        at = ev["pos"] - start
+        trend[at:] = 1.0 if ev["direction"] == "bullish" else -1.0
+        choch_flag[at:] = 1.0 if ev["kind"] == "CHoCH" else 0.0
+        event_pos[at:] = ev["pos"]
+        if ev["kind"] == "BOS":
+            bos_pos[at:] = ev["pos"]
+        else:
+            choch_pos[at:] = ev["pos"]
+
+    rows = {
+        "atr": atr,
+        "rsi": kernels[1].update_many(closes[run]),
+        "ema10": kernels[2].update_many(closes[run]),
+        "ema50": kernels[3].update_many(closes[run]),
+        "pd_position": pd_position,
+        "trend": trend,
+        "choch_flag": choch_flag,
+        "event_pos": event_pos,
+        "bos_pos": bos_pos,
+        "choch_pos": choch_pos,
+    }
+    if not m:
+        return rows, carry
+    return rows, FeatureCarry(
+        stop, _stamp(df, stop - 1), *kernels, structure, dealing,
+        float(event_pos[-1]), float(bos_pos[-1]), float(choch_pos[-1]), float(choch_flag[-1]),
+    )
+
+
+def _tail_carry(df: pd.DataFrame, swing_window: int, bars: int) -> FeatureCarry:
+    """The carry after df's first `bars` candles, advanced from the last one kept for df."""
+    key = (swing_window, *_stamp(df, 0))
+    with _carries_lock:
+        carry = _carries.get(key)
+        if carry is not None:
+            _carries.move_to_end(key)
+    if carry is None or carry.bars > bars or carry.stamp != _stamp(df, carry.bars - 1):
+        carry = _empty_carry()
+    if carry.bars < bars:
+        _, carry = _advance(df, carry, bars, swing_window)
+        with _carries_lock:
+            _carries[key] = carry
+            while len(_carries) > TAIL_CARRIES:
+                _carries.popitem(last=False)
+    return carry
+
+
+def build_features(df: pd.DataFrame, swing_window: int = 3, *, tail: int | None = None) -> pd.DataFrame:
+    """Feature frame aligned to df.index (NaNs at the warm-up head).
+
+    tail=k returns only the last k rows (the live snapshot needs one) at
+    a cost that does not grow with the history: the recursive state
+    (ATR / EMA / RSI kernels, structure and premium/discount carries) is
+    kept per frame, keyed by its first candle, and advanced over the
+    candles added since the last call; every windowed feature is computed
+    on the last k + FEATURE_WARMUP bars only. The first call for a frame
+    walks its whole history once. The rows are identical to
+    build_features(df).tail(k).
+    """
+    n = len(df)
+    first = 0 if tail is None else max(n - tail, 0)
+    ctx_start = max(first - FEATURE_WARMUP, 0)
+    carry = _tail_carry(df, swing_window, ctx_start) if ctx_start else _empty_carry()
+    state, _ = _advance(df, carry, n, swing_window)
+    ctx = df.iloc[ctx_start:]
+
+    out = {}
+    close, high, low, open_ = ctx["Close"], ctx["High"], ctx["Low"], ctx["Open"]
+    atr_series = pd.Series(state["atr"], index=ctx.index)
     atr_safe = atr_series.replace(0, np.nan)
 
     # Momentum / volatility
@@ -41,15 +180,11 @@ def build_features(df: pd.DataFrame, swing_window: int = 3) -> pd.DataFrame:
     out["body_ratio"] = (close - open_).abs() / rng
     out["upper_wick"] = (high - close.where(close > open_, open_)) / rng
     out["lower_wick"] = (close.where(close < open_, open_) - low) / rng
-    out["rsi_14"] = _rsi(close)
-    ema10 = close.ewm(span=10, adjust=False).mean()
-    ema50 = close.ewm(span=50, adjust=False).mean()
-    out["ema_diff"] = (ema10 - ema50) / close
+    out["rsi_14"] = state["rsi"]
+    out["ema_diff"] = (state["ema10"] - state["ema50"]) / close
 
     # Premium/discount from structure-derived dealing range (matches confluence)
-    swings = smc.find_swings(df, swing_window)
-    structure = smc.detect_structure(df, swings, swing_window, atr_series)
-    out["pd_position"] = ict.pd_position_series(df, structure["events"])
+    out["pd_position"] = state["pd_position"]
     out["dist_high_20"] = (high.rolling(20, min_periods=5).max() - close) / atr_safe
     out["dist_low_20"] = (close - low.rolling(20, min_periods=5).min()) / atr_safe
 
@@ -63,34 +198,21 @@ def build_features(df: pd.DataFrame, swing_window: int = 3) -> pd.DataFrame:
     out["sellside_sweep_recent"] = sellside_sweep.rolling(SWEEP_RECENT, min_periods=1).max()
 
     # Displacement + session timing
-    out["displacement"] = ict.displacement_flags(df, atr_series).astype(float)
-    out["in_killzone"] = ict.killzone_flags(df).astype(float)
+    out["displacement"] = ict.displacement_flags(ctx, atr_series).astype(float)
+    out["in_killzone"] = ict.killzone_flags(ctx).astype(float)
 
     # Market-structure state from close-confirmed BOS/CHoCH events
-    trend = np.zeros(len(df))
-    choch_flag = np.zeros(len(df))
-    event_pos = np.full(len(df), -1.0)
-    bos_pos = np.full(len(df), -1.0)
-    choch_pos = np.full(len(df), -1.0)
-    for ev in structure["events"]:
-        sign = 1.0 if ev["direction"] == "bullish" else -1.0
-        trend[ev["pos"]:] = sign
-        choch_flag[ev["pos"]:] = 1.0 if ev["kind"] == "CHoCH" else 0.0
-        event_pos[ev["pos"]:] = ev["pos"]
-        if ev["kind"] == "BOS":
-            bos_pos[ev["pos"]:] = ev["pos"]
-        else:
-            choch_pos[ev["pos"]:] = ev["pos"]
-    bars_since = np.where(event_pos >= 0, np.arange(len(df)) - event_pos, 200.0)
-    bars_since_bos = np.where(bos_pos >= 0, np.arange(len(df)) - bos_pos, 200.0)
-    bars_since_choch = np.where(choch_pos >= 0, np.arange(len(df)) - choch_pos, 200.0)
-    out["structure_trend"] = trend
-    out["last_event_choch"] = choch_flag
+    bars = np.arange(ctx_start, n)
+    bars_since = np.where(state["event_pos"] >= 0, bars - state["event_pos"], 200.0)
+    bars_since_bos = np.where(state["bos_pos"] >= 0, bars - state["bos_pos"], 200.0)
+    bars_since_choch = np.where(state["choch_pos"] >= 0, bars - state["choch_pos"], 200.0)
+    out["structure_trend"] = state["trend"]
+    out["last_event_choch"] = state["choch_flag"]
     out["bars_since_structure"] = np.clip(bars_since, 0, 200)
     out["bars_since_bos"] = np.clip(bars_since_bos, 0, 200)
     out["bars_since_choch"] = np.clip(bars_since_choch, 0, 200)
 
-    return out
+    return pd.DataFrame(out, index=ctx.index).iloc[first - ctx_start:]
 
 
 def build_labels(df: pd.DataFrame, horizon: int = HORIZON) -> pd.Series:
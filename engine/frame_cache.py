@@ -0,0 +1,104 @@
+# engine/frame_cache.py
+"""Process-wide LRU of parsed candle frames.
+
+One top-down prediction reads the same (symbol, interval) frame several
+times (layer loads, latest-price lookups for risk maths, outcome checks),
+and concurrent API threads read the same popular pairs. Frames are keyed
+by (symbol, interval) and tagged with the version of the file they were
+parsed from — (path, mtime_ns, size) — so a fetch that rewrites the file
+is picked up on the next read without explicit invalidation.
+
+Entries are frozen (every column array is marked read-only) and callers
+receive shallow copies: adding or replacing columns on the copy is fine,
+but writing into the shared candle values raises instead of silently
+corrupting every other reader's frame.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+FileVersion = tuple[str, int, int]
+
+
+def file_version(path: str) -> FileVersion:
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """Private read-only copy of df's columns (index is immutable already)."""
+    columns = {}
+    for col in df.columns:
+        values = np.array(df[col].to_numpy(), copy=True)
+        values.flags.writeable = False
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index, columns=df.columns, copy=False)
+
+
+class FrameCache:
+    """Thread-safe, byte-bounded LRU of read-only DataFrames."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[object, pd.DataFrame, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple, version) -> pd.DataFrame | None:
+        """Read-only view of the cached frame when its version still matches."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1].copy(deep=False)
+
+    def put(self, key: tuple, version, df: pd.DataFrame) -> pd.DataFrame:
+        """Store df under key/version and return a read-only view of it."""
+        frozen = _freeze(df)
+        size = int(frozen.memory_usage(index=True, deep=False).sum())
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size <= self.max_bytes:
+                self._entries[key] = (version, frozen, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+                    self.evictions += 1
+        return frozen.copy(deep=False)
+
+    def invalidate(self, key: tuple | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
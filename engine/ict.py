@@ -20,12 +20,17 @@ Implemented signals (each with its validity condition):
 - Breaker blocks: an order block that failed (was traded through) after
   a liquidity sweep flips polarity and becomes a breaker.
 """
+import bisect
 import os
 from datetime import time as dtime
+from typing import NamedTuple
 
 import numpy as np
 import pandas as pd
 
+from engine.records import Breaker, Sweep
+from engine.touch_index import TouchIndex, touch_index
+
 # Kill zones in the data feed's clock (Alpha Vantage intraday = US/Eastern).
 # Override with env KILLZONES="London=02:00-05:00,NewYork=07:00-10:00".
 _DEFAULT_KILLZONES = {
@@ -176,12 +181,11 @@ def detect_sweeps(
     is discarded if any later candle closed beyond the swept level
     (the market accepted the breakout, so it was no grab).
     """
-    highs = df["High"].to_numpy()
-    lows = df["Low"].to_numpy()
-    closes = df["Close"].to_numpy()
+    highs = df["High"].to_numpy(dtype=float)
+    lows = df["Low"].to_numpy(dtype=float)
+    closes = df["Close"].to_numpy(dtype=float)
     n = len(df)
     cutoff = max(0, n - recent_bars)
-    sweeps: list[dict] = []
 
     # Levels worth hunting: equal high/low pools plus the most recent
     # significant swings (session/period highs and lows hold stops too).
@@ -190,42 +194,65 @@ def detect_sweeps(
         for p in pools
     ]
     if not swings.empty:
-        for s in swings.sort_values("pos").tail(10).to_dict("records"):
+        recent = swings.sort_values("pos").tail(10)
+        for pos, kind, price in zip(
+            recent["pos"].tolist(), recent["kind"].tolist(), recent["price"].tolist()
+        ):
             levels.append({
-                "level": s["price"],
-                "side": "buyside" if s["kind"] == "high" else "sellside",
+                "level": price,
+                "side": "buyside" if kind == "high" else "sellside",
                 "source": "swing",
-                "min_pos": s["pos"],
+                "min_pos": pos,
             })
-
-    for lv in levels:
-        level = lv["level"]
-        for i in range(max(cutoff, lv["min_pos"] + 1), n):
-            if lv["side"] == "buyside":
-                pierced = highs[i] > level and closes[i] < level
-                accepted_later = (closes[i + 1:] > level).any() if i + 1 < n else False
-            else:
-                pierced = lows[i] < level and closes[i] > level
-                accepted_later = (closes[i + 1:] < level).any() if i + 1 < n else False
-            if pierced and not accepted_later:
-                # One sweep per liquidity area: nearby levels of the same
-                # side are the same stop cluster, not extra confluence.
-                duplicate = any(
-                    s["side"] == lv["side"] and abs(s["level"] - level) <= tolerance
-                    for s in sweeps
-                )
-                if duplicate:
-                    break
-                sweeps.append({
-                    "pos": i,
-                    "time": df.index[i],
-                    "level": float(level),
-                    "side": lv["side"],
-                    "source": lv["source"],
-                    "bias": "bearish" if lv["side"] == "buyside" else "bullish",
-                    "bars_ago": n - 1 - i,
-                })
-                break
+    if not levels or cutoff >= n:
+        return []
+
+    # Highest / lowest close strictly after each recent bar: "accepted
+    # later" becomes one comparison instead of a slice per bar.
+    later_max = np.full(n + 1, -np.inf)
+    later_min = np.full(n + 1, np.inf)
+    later_max[:-1] = np.maximum.accumulate(np.where(np.isnan(closes), -np.inf, closes)[::-1])[::-1]
+    later_min[:-1] = np.minimum.accumulate(np.where(np.isnan(closes), np.inf, closes)[::-1])[::-1]
+    bars = np.arange(cutoff, n)
+    after = bars + 1
+
+    # levels x recent-bars grid of valid sweep candles; first hit per level.
+    level_arr = np.array([lv["level"] for lv in levels], dtype=float)[:, None]
+    buyside = np.array([lv["side"] == "buyside" for lv in levels])[:, None]
+    min_pos = np.array([lv["min_pos"] for lv in levels], dtype=np.int64)[:, None]
+    with np.errstate(invalid="ignore"):
+        grab_buy = (highs[bars] > level_arr) & (closes[bars] < level_arr) & ~(later_max[after] > level_arr)
+        grab_sell = (lows[bars] < level_arr) & (closes[bars] > level_arr) & ~(later_min[after] < level_arr)
+    hits = np.where(buyside, grab_buy, grab_sell) & (bars > min_pos)
+    found = hits.any(axis=1)
+    first = bars[hits.argmax(axis=1)]
+
+    # One sweep per liquidity area: nearby levels of the same side are
+    # the same stop cluster, not extra confluence. Taken levels are kept
+    # sorted per side so the check only looks at the two neighbours.
+    taken: dict[str, list[float]] = {"buyside": [], "sellside": []}
+    sweeps: list[dict] = []
+    for k in np.flatnonzero(found):
+        lv = levels[k]
+        level = float(lv["level"])
+        side_levels = taken.setdefault(lv["side"], [])
+        at = bisect.bisect_left(side_levels, level)
+        if any(
+            abs(side_levels[j] - level) <= tolerance
+            for j in (at - 1, at) if 0 <= j < len(side_levels)
+        ):
+            continue
+        side_levels.insert(at, level)
+        i = int(first[k])
+        sweeps.append(Sweep(
+            pos=i,
+            time=df.index[i],
+            level=level,
+            side=lv["side"],
+            source=lv["source"],
+            bias="bearish" if lv["side"] == "buyside" else "bullish",
+            bars_ago=n - 1 - i,
+        ))
 
     return sorted(sweeps, key=lambda s: s["pos"])
 
@@ -313,8 +340,123 @@ def price_in_zone(price: float, zone: dict | None) -> bool:
     return bool(zone and zone["low"] <= price <= zone["high"])
 
 
-def pd_position_series(df: pd.DataFrame, structure_events: list[dict]) -> pd.Series:
-    """Per-bar premium/discount position from structure-derived dealing range."""
+class DealingCarry(NamedTuple):
+    """pd_positions() state after a bar: the active structure event and
+    its dealing-range extremes so far (before any degenerate widening)."""
+    event: dict | None = None
+    high: float = np.nan
+    low: float = np.nan
+
+
+def pd_position_series(
+    df: pd.DataFrame,
+    structure_events: list[dict],
+    fallback_bars: int = 60,
+) -> pd.Series:
+    """Per-bar premium/discount position from structure-derived dealing range.
+
+    Single pass: bar i sees exactly what dealing_range(df.iloc[:i+1], ...)
+    would see (the last listed event with pos <= i), but the range
+    extremes are carried forward per active event instead of being
+    recomputed from the start of history every bar.
+    """
+    positions, _ = pd_positions(
+        df["High"].to_numpy(dtype=float),
+        df["Low"].to_numpy(dtype=float),
+        df["Close"].to_numpy(dtype=float),
+        structure_events,
+        fallback_bars,
+    )
+    return pd.Series(positions, index=df.index)
+
+
+def pd_positions(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    structure_events: list[dict],
+    fallback_bars: int = 60,
+    *,
+    carry: DealingCarry = DealingCarry(),
+    start: int = 0,
+) -> tuple[np.ndarray, DealingCarry]:
+    """pd_position_series values of bars start.. of the arrays, resumed from carry.
+
+    The arrays are the whole history, but little of it before start is
+    read: the fallback_bars - 1 bars of the trailing window, and the leg
+    of an event formed from start on that has no origin price.
+    structure_events: the events from start on, in pos order when
+    resuming (earlier ones are in carry, the state after bar start - 1).
+    Returns (positions, carry after the last bar).
+    """
+    n = len(closes)
+    m = n - start
+    if m <= 0:
+        return np.empty(0), carry
+
+    # Fallback range: extremes of the trailing window (no events / degenerate).
+    lead = max(0, start - fallback_bars + 1)
+    win_low = pd.Series(lows[lead:]).rolling(fallback_bars, min_periods=1).min().to_numpy()[start - lead:]
+    win_high = pd.Series(highs[lead:]).rolling(fallback_bars, min_periods=1).max().to_numpy()[start - lead:]
+    range_low = win_low.copy()
+    range_high = win_high.copy()
+
+    # active[i]: list index of the last-listed event already formed at bar
+    # start + i (-1: the carried event, if any).
+    active = np.full(m, -1, dtype=np.int64)
+    for k, ev in enumerate(structure_events):
+        p = ev["pos"] - start
+        if 0 <= p < m:
+            active[p] = max(active[p], k)
+    active = np.maximum.accumulate(active)
+
+    # The active event only changes on the bar where it formed, so each
+    # run of equal `active` values starts at that event's pos.
+    bounds = np.flatnonzero(np.diff(active)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [m]))
+    for a, b in zip(starts, ends):
+        k = active[a]
+        ev = structure_events[k] if k >= 0 else carry.event
+        if ev is None:
+            continue
+        # the impulse extreme since the event and the opposite extreme
+        # since the leg began (unless the origin swing fixes it)
+        bullish = ev["direction"] == "bullish"
+        since_event, since_leg = (highs, lows) if bullish else (lows, highs)
+        extreme, opposite = (np.maximum, np.minimum) if bullish else (np.minimum, np.maximum)
+        origin_price = ev.get("origin_price")
+        if k >= 0:
+            p = ev["pos"]
+            leg = ev["origin_pos"] if ev.get("origin_pos") is not None else max(0, p - fallback_bars)
+            far = extreme.accumulate(since_event[p:start + b])[start + a - p:]
+            back = None if origin_price else opposite.accumulate(since_leg[leg:start + b])[start + a - leg:]
+        else:  # the carried event, on the first run
+            seen_far, seen_back = (carry.high, carry.low) if bullish else (carry.low, carry.high)
+            far = extreme(extreme.accumulate(since_event[start:start + b]), seen_far)
+            back = None if origin_price else opposite(opposite.accumulate(since_leg[start:start + b]), seen_back)
+        back = origin_price if origin_price else back
+        if bullish:
+            range_high[a:b], range_low[a:b] = far, back
+        else:
+            range_low[a:b], range_high[a:b] = far, back
+
+    k = active[-1]
+    event = structure_events[k] if k >= 0 else carry.event
+    carry = DealingCarry(event, float(range_high[-1]), float(range_low[-1])) if event is not None else carry
+
+    degenerate = range_high <= range_low
+    range_low[degenerate] = win_low[degenerate]
+    range_high[degenerate] = win_high[degenerate]
+
+    span = range_high - range_low
+    with np.errstate(divide="ignore", invalid="ignore"):
+        positions = np.where(span <= 0, 0.5, (closes[start:] - range_low) / span)
+    return np.clip(positions, 0.0, 1.0), carry
+
+
+def _pd_position_series_legacy(df: pd.DataFrame, structure_events: list[dict]) -> pd.Series:
+    """Quadratic per-bar dealing_range() replay (kept for regression comparison)."""
     closes = df["Close"].to_numpy()
     positions = np.full(len(df), 0.5)
     for i in range(len(df)):
@@ -327,13 +469,55 @@ def pd_position_series(df: pd.DataFrame, structure_events: list[dict]) -> pd.Ser
 # --------------------------------------------------------------------
 # Breaker blocks
 # --------------------------------------------------------------------
-def detect_breakers(df: pd.DataFrame, order_blocks: list[dict], sweeps: list[dict]) -> list[dict]:
+def detect_breakers(
+    df: pd.DataFrame,
+    order_blocks: list[dict],
+    sweeps: list[dict],
+    touch: TouchIndex | None = None,
+) -> list[dict]:
     """Order blocks that failed after a liquidity sweep flip polarity.
 
     A bullish OB traded through after buy-side was swept becomes a
     bearish breaker (resistance), and vice versa. The breaker stays
     valid until price closes back through it again.
     """
+    n = len(df)
+    first_sweep = min((s["pos"] for s in sweeps), default=None)
+
+    # Validity: the failure must follow a sweep (stop hunt fueled the reversal).
+    failed = [
+        ob for ob in order_blocks
+        if ob["status"] == "invalidated" and ob["invalidated_pos"] is not None
+        and first_sweep is not None and first_sweep <= ob["invalidated_pos"]
+    ]
+    if not failed:
+        return []
+
+    # Still valid only if price hasn't closed back through the zone since.
+    touch = touch_index(df, touch)
+    starts = np.array([ob["invalidated_pos"] + 1 for ob in failed], dtype=np.int64)
+    was_bullish = np.array([ob["direction"] == "bullish" for ob in failed])
+    reclaimed = np.where(
+        was_bullish,
+        touch.first_above("Close", starts, [ob["high"] for ob in failed]),
+        touch.first_below("Close", starts, [ob["low"] for ob in failed]),
+    ) < n
+
+    return [
+        Breaker(
+            direction="bearish" if ob["direction"] == "bullish" else "bullish",
+            low=ob["low"],
+            high=ob["high"],
+            pos=ob["pos"],
+            flipped_at=ob["invalidated_pos"],
+            time=df.index[min(ob["invalidated_pos"], n - 1)],
+        )
+        for ob, gone in zip(failed, reclaimed) if not gone
+    ]
+
+
+def _detect_breakers_legacy(df: pd.DataFrame, order_blocks: list[dict], sweeps: list[dict]) -> list[dict]:
+    """Per-breaker future scans (kept for regression comparison)."""
     closes = df["Close"].to_numpy()
     n = len(df)
     breakers: list[dict] = []
@@ -369,3 +553,68 @@ def detect_breakers(df: pd.DataFrame, order_blocks: list[dict], sweeps: list[dic
         })
 
     return breakers
+
+
+def _detect_sweeps_legacy(
+    df: pd.DataFrame,
+    pools: list[dict],
+    swings: pd.DataFrame,
+    recent_bars: int = 24,
+    tolerance: float = 0.0,
+) -> list[dict]:
+    """Per-bar slice scans (kept for regression comparison)."""
+    highs = df["High"].to_numpy()
+    lows = df["Low"].to_numpy()
+    closes = df["Close"].to_numpy()
+    n = len(df)
+    cutoff = max(0, n - recent_bars)
+    sweeps: list[dict] = []
+
+    # Levels worth hunting: equal high/low pools plus the most recent
+    # significant swings (session/period highs and lows hold stops too).
+    levels: list[dict] = [
+        {"level": p["level"], "side": p["side"], "source": "pool", "min_pos": p["last_pos"]}
+        for p in pools
+    ]
+    if not swings.empty:
+        recent = swings.sort_values("pos").tail(10)
+        for pos, kind, price in zip(
+            recent["pos"].tolist(), recent["kind"].tolist(), recent["price"].tolist()
+        ):
+            levels.append({
+                "level": price,
+                "side": "buyside" if kind == "high" else "sellside",
+                "source": "swing",
+                "min_pos": pos,
+            })
+
+    for lv in levels:
+        level = lv["level"]
+        for i in range(max(cutoff, lv["min_pos"] + 1), n):
+            if lv["side"] == "buyside":
+                pierced = highs[i] > level and closes[i] < level
+                accepted_later = (closes[i + 1:] > level).any() if i + 1 < n else False
+            else:
+                pierced = lows[i] < level and closes[i] > level
+                accepted_later = (closes[i + 1:] < level).any() if i + 1 < n else False
+            if pierced and not accepted_later:
+                # One sweep per liquidity area: nearby levels of the same
+                # side are the same stop cluster, not extra confluence.
+                duplicate = any(
+                    s["side"] == lv["side"] and abs(s["level"] - level) <= tolerance
+                    for s in sweeps
+                )
+                if duplicate:
+                    break
+                sweeps.append({
+                    "pos": i,
+                    "time": df.index[i],
+                    "level": float(level),
+                    "side": lv["side"],
+                    "source": lv["source"],
+                    "bias": "bearish" if lv["side"] == "buyside" else "bullish",
+                    "bars_ago": n - 1 - i,
+                })
+                break
+
+    return sorted(sweeps, key=lambda s: s["pos"])
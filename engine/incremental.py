@@ -0,0 +1,394 @@
+# engine/incremental.py
+"""Stateful SMC/ICT analysis that advances one closed bar at a time.
+
+confluence.analyze() recomputes everything over up to MAX_BARS candles
+on every call, although between two calls usually a single candle has
+closed. IncrementalAnalyzer keeps the per-bar state instead and updates
+it when a bar is appended:
+
+  - ATR: an indicators.StreamingATR kernel (bit-identical to smc.atr)
+  - swings: the one candidate bar that a new candle confirms
+  - structure: smc.advance_structure over the new bar, resumed from
+    the previous bar's StructureCarry (the same code detect_structure
+    runs over a whole frame)
+  - order blocks: the origin candle of each new BOS/CHoCH; a block's
+    mitigation / invalidation bar, once seen, never changes, so
+    analysis() only queries the blocks still waiting for one, and only
+    over the bars added since the last call
+  - FVG candidates: the 3-candle gap the new candle completes; like
+    block touches, fills are resolved once and filled gaps dropped
+  - first-touch tables: one new cell per level (engine/touch_index)
+
+analysis() then resolves pool / breaker status with batched
+first-touch queries and assembles the usual dict through
+confluence.assemble_analysis, so it has the same shape as analyze() and
+equals confluence.analyze(analyzer.frame(), ...). Pools, sweeps, MSS,
+breakers and the dealing range are still rebuilt per call: pool
+clustering depends on the latest ATR, so a new bar can regroup every
+swing. On a 2,000-bar window a call costs about 4.5 ms (analyze():
+about 11 ms), half of it in pools and sweeps, so a call is O(window),
+not O(1).
+
+last_signals names what the newest bar produced ("structure" for a
+BOS/CHoCH, "swing", "fvg"), so a caller can react to detector events
+instead of re-deciding on every bar.
+
+The window is anchored, not sliding: bars accumulate up to max_bars,
+then the oldest rebase_bars are dropped in one go and the state is
+replayed over the kept bars (update() is amortised O(1) per bar).
+frame() therefore holds between max_bars - rebase_bars and max_bars
+candles.
+
+to_state() / from_state() give a JSON-safe snapshot (config plus the
+window's bars); restoring replays the window, so a worker resumes with
+exactly the state it had. Instances also pickle through the same state.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from engine import confluence, smc
+from engine.indicators import StreamingATR
+from engine.touch_index import TouchIndex
+
+STATE_VERSION = 1
+ATR_PERIOD = 14
+_NOT_YET = np.iinfo(np.int64).max  # no mitigating / invalidating bar so far
+_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _record_hits(hits: np.ndarray, rows: np.ndarray, found: tuple[np.ndarray, ...], n: int) -> None:
+    """Store first-touch bars seen for the first time (found[c] < n) in hits[rows, c]."""
+    for col, bars in enumerate(found):
+        seen = (bars < n) & (hits[rows, col] == _NOT_YET)
+        hits[rows[seen], col] = bars[seen]
+
+
+class IncrementalAnalyzer:
+    """Per-(symbol, interval, thresholds) analysis state, advanced bar by bar."""
+
+    def __init__(
+        self,
+        symbol: str,
+        interval: str = "60min",
+        *,
+        thresholds=None,
+        trading_style: str = "intraday",
+        max_bars: int = confluence.MAX_BARS,
+        rebase_bars: int | None = None,
+    ):
+        if not 0 < max_bars <= confluence.MAX_BARS:
+            raise ValueError(f"max_bars must be in 1..{confluence.MAX_BARS}")
+        rebase_bars = rebase_bars or max(1, max_bars // 4)
+        if not 0 < rebase_bars <= max_bars:
+            raise ValueError("rebase_bars must be in 1..max_bars")
+        self.symbol = symbol
+        self.interval = interval
+        self.trading_style = trading_style
+        self.params = confluence.analysis_params(symbol, interval, thresholds, trading_style)
+        self.max_bars = max_bars
+        self.rebase_bars = rebase_bars
+        self._index_tz = None
+        self._index_name = "Timestamp"
+        self._reset()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def _reset(self) -> None:
+        self.n = 0
+        self._times = np.empty(self.max_bars, dtype=np.int64)
+        self._bars = {c: np.empty(self.max_bars) for c in _COLUMNS}
+        self._atr = np.empty(self.max_bars)
+        self._atr_kernel = StreamingATR(ATR_PERIOD)
+        self._swings: list[dict] = []
+        self._swing_frame: pd.DataFrame | None = None
+        self._structure = smc.StructureCarry()
+        self._events: list[dict] = []
+        self._rejected: list[dict] = []
+        self._blocks: list[tuple[dict, int]] = []
+        self._block_zones: tuple[list[float], list[float]] = ([], [])
+        self._block_hits = np.empty((0, 2), dtype=np.int64)  # (touched, broken); _NOT_YET until seen
+        self._block_checked = 0
+        self._fvg_mid: list[int] = []
+        self._fvg_bullish: list[bool] = []
+        self._fvg_displaced: list[bool] = []
+        self._fvg_hits = np.empty((0, 2), dtype=np.int64)  # (filled, partial); _NOT_YET until seen
+        self._fvg_checked = 0
+        self.last_signals: set[str] = set()
+        self._touch = TouchIndex(pd.DataFrame(columns=list(_COLUMNS)))
+        self._frame: pd.DataFrame | None = None
+
+    @property
+    def last_time(self) -> pd.Timestamp | None:
+        return self._timestamp(self.n - 1) if self.n else None
+
+    def _timestamp(self, i: int) -> pd.Timestamp:
+        ts = pd.Timestamp(int(self._times[i]))
+        return ts.tz_localize("UTC").tz_convert(self._index_tz) if self._index_tz else ts
+
+    # ------------------------------------------------------------------
+    # Feeding bars
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, symbol: str, interval: str = "60min", **kwargs) -> "IncrementalAnalyzer":
+        analyzer = cls(symbol, interval, **kwargs)
+        analyzer.update(df.tail(analyzer.max_bars))
+        return analyzer
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Append the closed bars of df newer than last_time; returns how many."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("IncrementalAnalyzer needs a DatetimeIndex")
+        if self.n == 0:
+            self._index_tz = str(df.index.tz) if df.index.tz is not None else None
+            self._index_name = df.index.name
+        else:
+            df = df.iloc[df.index.searchsorted(self.last_time, side="right"):]
+        if df.empty:
+            return 0
+        index = df.index.as_unit("ns")
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        times = index.asi8
+        columns = [df[c].to_numpy(dtype=float) if c in df else np.zeros(len(df)) for c in _COLUMNS]
+        for k in range(len(df)):
+            self.append(times[k], *(col[k] for col in columns))
+        return len(df)
+
+    def append(self, time, open_, high, low, close, volume=0.0) -> None:
+        """Append one closed bar (time: Timestamp or epoch ns, newer than last_time)."""
+        if isinstance(time, pd.Timestamp):
+            if time.tz is not None:
+                time = time.tz_convert("UTC").tz_localize(None)
+            time = time.as_unit("ns").value
+        time = int(time)
+        if self.n and time <= self._times[self.n - 1]:
+            raise ValueError("bars must be appended in time order")
+        if self.n == self.max_bars:
+            self._rebase()
+        self._step(time, float(open_), float(high), float(low), float(close), float(volume))
+
+    def _rebase(self) -> None:
+        keep = self.max_bars - self.rebase_bars
+        times = self._times[self.n - keep:self.n].copy()
+        bars = {c: self._bars[c][self.n - keep:self.n].copy() for c in _COLUMNS}
+        self._reset()
+        for k in range(keep):
+            self._step(int(times[k]), *(float(bars[c][k]) for c in _COLUMNS))
+
+    def _step(self, time: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        i = self.n
+        signals = self.last_signals = set()
+        self._times[i] = time
+        row = {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}
+        for c, value in row.items():
+            self._bars[c][i] = value
+        self.n = i + 1
+        self._frame = None
+        self._touch.append(row)
+
+        highs, lows, opens, closes = (self._bars[c] for c in ("High", "Low", "Open", "Close"))
+        self._atr[i] = self._atr_kernel.update(high, low, close)
+
+        # The new candle completes the 3-candle gap centred on i - 1.
+        if i >= 2:
+            mid = i - 1
+            bullish = highs[mid - 1] < lows[i]
+            if bullish or lows[mid - 1] > highs[i]:
+                atr_mid = self._atr[mid]
+                body = abs(closes[mid] - opens[mid])
+                signals.add("fvg")
+                self._fvg_mid.append(mid)
+                self._fvg_bullish.append(bool(bullish))
+                self._fvg_displaced.append(
+                    bool(not np.isnan(atr_mid) and atr_mid > 0 and body >= self.params["disp_mult"] * atr_mid)
+                )
+                self._fvg_hits = np.vstack([self._fvg_hits, [[_NOT_YET, _NOT_YET]]])
+
+        # ...and confirms (or not) the swing candidate `window` bars back,
+        # which detect_structure may use from this bar on.
+        window = self.params["swing_window"]
+        j = i - window
+        confirmed: list[dict] = []
+        if j >= window:
+            # Strict fractal test of smc.swing_points (a NaN neighbour blocks it).
+            left, right = slice(j - window, j), slice(j + 1, i + 1)
+            if highs[j] > highs[left].max() and highs[j] > highs[right].max():
+                confirmed.append(self._add_swing(j, "high", highs[j]))
+            if lows[j] < lows[left].min() and lows[j] < lows[right].min():
+                confirmed.append(self._add_swing(j, "low", lows[j]))
+            if confirmed:
+                signals.add("swing")
+
+        # Only a new reference, or a close beyond an armed one, can move
+        # the structure state (the break margin is never negative).
+        carry = self._structure
+        if not (
+            confirmed
+            or (carry.ref_high is not None and close > carry.ref_high)
+            or (carry.ref_low is not None and close < carry.ref_low)
+        ):
+            return
+        bar = slice(i, i + 1)
+        events, rejected, self._structure = smc.advance_structure(
+            opens[bar], highs[bar], lows[bar], closes[bar], self._atr[bar],
+            np.array([self._timestamp(i)], dtype=object),
+            np.array([s["pos"] for s in confirmed], dtype=np.int64),
+            np.array([s["kind"] == "high" for s in confirmed], dtype=bool),
+            np.array([s["price"] for s in confirmed], dtype=float),
+            window,
+            displacement_mult=self.params["disp_mult"],
+            min_break_abs=self.params["min_bos"],
+            carry=carry,
+            offset=i,
+        )
+        self._rejected.extend(rejected)
+        if events:
+            signals.add("structure")
+            self._events.extend(events)
+            for ev in events:
+                origin = smc.order_block_origin(opens, closes, ev)
+                if origin is not None:
+                    self._blocks.append((ev, origin))
+                    self._block_zones[0].append(float(lows[origin]))
+                    self._block_zones[1].append(float(highs[origin]))
+                    self._block_hits = np.vstack([self._block_hits, [[_NOT_YET, _NOT_YET]]])
+
+    def _add_swing(self, pos: int, kind: str, price) -> dict:
+        swing = {"pos": pos, "time": self._timestamp(pos), "kind": kind, "price": float(price)}
+        self._swings.append(swing)
+        self._swing_frame = None
+        return swing
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def frame(self) -> pd.DataFrame:
+        """The candles the state covers (read-only arrays; copy to modify)."""
+        if self._frame is None:
+            index = pd.DatetimeIndex(self._times[:self.n].view("M8[ns]"), name=self._index_name)
+            if self._index_tz:
+                index = index.tz_localize("UTC").tz_convert(self._index_tz)
+            columns = {}
+            for c in _COLUMNS:
+                values = self._bars[c][:self.n].copy()
+                values.flags.writeable = False
+                columns[c] = values
+            self._frame = pd.DataFrame(columns, index=index, copy=False)
+        return self._frame
+
+    def swings(self) -> pd.DataFrame:
+        """Confirmed swings, as smc.find_swings(self.frame()) (a fresh copy)."""
+        if self._swing_frame is None:
+            if not self._swings:
+                self._swing_frame = pd.DataFrame([], columns=["pos", "time", "kind", "price"])
+            else:
+                self._swing_frame = pd.DataFrame({
+                    "pos": np.array([s["pos"] for s in self._swings], dtype=np.int64),
+                    "time": pd.DatetimeIndex([s["time"] for s in self._swings]),
+                    "kind": np.array([s["kind"] for s in self._swings], dtype=object),
+                    "price": np.array([s["price"] for s in self._swings], dtype=float),
+                })
+        return self._swing_frame.copy()
+
+    def _order_blocks(self, df: pd.DataFrame) -> list[dict]:
+        """smc.detect_order_blocks(df, events), querying only unresolved blocks."""
+        if not self._blocks:
+            return []
+        zone_low, zone_high = (np.array(z) for z in self._block_zones)
+        pending = np.flatnonzero(self._block_hits[:, 1] == _NOT_YET)  # invalidation implies a touch
+        if len(pending):
+            found = smc.order_block_touches(
+                self._touch, [self._blocks[k] for k in pending],
+                zone_low[pending], zone_high[pending], from_bar=self._block_checked,
+            )
+            _record_hits(self._block_hits, pending, found, len(df))
+        self._block_checked = len(df)
+        hits = self._block_hits
+        return smc.order_block_records(df, self._blocks, zone_low, zone_high, hits[:, 0], hits[:, 1])
+
+    def _fvgs(self, df: pd.DataFrame) -> list[dict]:
+        """smc.fvg_records() of the raw gaps; filled gaps are never queried again."""
+        mid = np.array(self._fvg_mid, dtype=np.int64)
+        bullish = np.array(self._fvg_bullish, dtype=bool)
+        unfilled = np.flatnonzero(self._fvg_hits[:, 0] == _NOT_YET)  # a fill is also a partial fill
+        if len(unfilled):
+            zone_low, zone_high = smc.fvg_zones(df, mid[unfilled], bullish[unfilled])
+            found = smc.fvg_touches(
+                self._touch, mid[unfilled], bullish[unfilled], zone_low, zone_high,
+                from_bar=self._fvg_checked,
+            )
+            _record_hits(self._fvg_hits, unfilled, found, len(df))
+            unfilled = unfilled[self._fvg_hits[unfilled, 0] == _NOT_YET]
+        self._fvg_checked = len(df)
+        hits = self._fvg_hits[unfilled]
+        return smc.fvg_records(
+            df, mid[unfilled], bullish[unfilled], np.array(self._fvg_displaced, dtype=bool)[unfilled],
+            hits=(hits[:, 0], hits[:, 1]),
+        )
+
+    def analysis(self, pattern_scan=None) -> dict:
+        """Same dict as confluence.analyze(self.frame(), ...) — fresh containers each call.
+
+        pattern_scan: optional patterns.scan_patterns() frame covering these
+        candles (e.g. one scan of a whole backtest history).
+        """
+        if self.n == 0:
+            raise ValueError("no bars yet")
+        df = self.frame()
+        self._touch.rebind(df)
+        fvgs_raw = self._fvgs(df)
+        structure = {
+            "events": list(self._events),
+            "trend": self._structure.trend,
+            "rejected_breaks": list(self._rejected),
+        }
+        return confluence.assemble_analysis(
+            df, self.symbol, self.interval, self.params, float(self._atr[self.n - 1]),
+            self.swings(), structure, fvgs_raw, self._touch, pattern_scan=pattern_scan,
+            order_blocks=self._order_blocks(df),
+        )
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def to_state(self) -> dict:
+        """JSON-safe snapshot: config plus the window's bars."""
+        return {
+            "version": STATE_VERSION,
+            "symbol": self.symbol,
+            "interval": self.interval,
+            "trading_style": self.trading_style,
+            "thresholds": self.params["thresholds"].model_dump(mode="json"),
+            "max_bars": self.max_bars,
+            "rebase_bars": self.rebase_bars,
+            "index": {"tz": self._index_tz, "name": self._index_name},
+            "time_ns": self._times[:self.n].tolist(),
+            "bars": {c: self._bars[c][:self.n].tolist() for c in _COLUMNS},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "IncrementalAnalyzer":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"unsupported analyzer state version {state.get('version')!r}")
+        analyzer = cls(
+            state["symbol"], state["interval"],
+            thresholds=state["thresholds"],
+            trading_style=state["trading_style"],
+            max_bars=state["max_bars"],
+            rebase_bars=state["rebase_bars"],
+        )
+        analyzer._index_tz = state["index"]["tz"]
+        analyzer._index_name = state["index"]["name"]
+        bars = state["bars"]
+        for k, time in enumerate(state["time_ns"]):
+            analyzer._step(int(time), *(float(bars[c][k]) for c in _COLUMNS))
+        return analyzer
+
+    def __getstate__(self) -> dict:
+        return self.to_state()
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(type(self).from_state(state).__dict__)
@@ -0,0 +1,246 @@
+# engine/indicators.py
+"""Streaming ATR / EMA / RSI kernels with resumable state.
+
+The whole-history indicators (smc.atr, features._rsi, the EMA columns)
+are pandas ewm(adjust=False) calls over a full column. A consumer that
+sees one new candle at a time (IncrementalAnalyzer, a walk-forward
+backtest) would otherwise recompute the column per bar. These kernels
+hold the ewm recursion state instead:
+
+    kernel = StreamingATR()
+    kernel.update_many(high, low, close)     # seed from history (batch)
+    kernel.update(h, l, c)                   # then one bar at a time
+
+Every value equals the pandas output bit for bit, including leading and
+interior NaNs (pandas' ignore_na=False decay of the old weight over a
+gap). update_many() on a fresh kernel runs pandas itself and derives
+the state from its output, so a backfill costs one vectorised pass.
+
+state() / from_state() give a JSON-safe snapshot (NaN stored as None).
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def _nan_to_none(value: float):
+    return None if value != value else float(value)
+
+
+def _none_to_nan(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+class EwmMean:
+    """pandas Series.ewm(..., adjust=False).mean(), one value per update()."""
+
+    __slots__ = ("com", "alpha", "weighted", "old_wt", "nobs")
+
+    def __init__(self, *, com: float | None = None, span: float | None = None, alpha: float | None = None):
+        if sum(arg is not None for arg in (com, span, alpha)) != 1:
+            raise ValueError("pass exactly one of com, span or alpha")
+        if com is not None:
+            if com < 0:
+                raise ValueError("com must satisfy: com >= 0")
+        elif alpha is not None:
+            if not 0 < alpha <= 1:
+                raise ValueError("alpha must satisfy: 0 < alpha <= 1")
+            com = (1 - alpha) / alpha
+        else:
+            if span < 1:
+                raise ValueError("span must satisfy: span >= 1")
+            com = (span - 1) / 2
+        # The same float round trip as pandas (alpha -> com -> alpha).
+        self.com = float(com)
+        self.alpha = 1.0 / (1.0 + self.com)
+        self.weighted = np.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    @property
+    def value(self) -> float:
+        return self.weighted if self.nobs else np.nan
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        observed = x == x
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if observed:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif observed:
+            self.weighted = x
+        self.nobs += observed
+        return self.weighted
+
+    def update_many(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        if self.nobs or not len(values):
+            return np.array([self.update(x) for x in values], dtype=float)
+        out = pd.Series(values).ewm(com=self.com, adjust=False).mean().to_numpy()
+        observed = np.flatnonzero(values == values)
+        if len(observed):
+            # old_wt decays once per value after the last observation.
+            self.weighted = float(out[-1])
+            self.old_wt = 1.0
+            for _ in range(len(values) - 1 - observed[-1]):
+                self.old_wt *= 1.0 - self.alpha
+            self.nobs = len(observed)
+        return out
+
+    def state(self) -> dict:
+        return {
+            "com": self.com,
+            "weighted": _nan_to_none(self.weighted),
+            "old_wt": self.old_wt,
+            "nobs": self.nobs,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "EwmMean":
+        kernel = cls(com=state["com"])
+        kernel.weighted = _none_to_nan(state["weighted"])
+        kernel.old_wt = float(state["old_wt"])
+        kernel.nobs = int(state["nobs"])
+        return kernel
+
+
+class StreamingEMA:
+    """Close.ewm(span=span, adjust=False).mean()."""
+
+    __slots__ = ("span", "_ewm")
+
+    def __init__(self, span: int):
+        self.span = span
+        self._ewm = EwmMean(span=span)
+
+    @property
+    def value(self) -> float:
+        return self._ewm.value
+
+    def update(self, close: float) -> float:
+        return self._ewm.update(close)
+
+    def update_many(self, close) -> np.ndarray:
+        return self._ewm.update_many(close)
+
+    def state(self) -> dict:
+        return {"span": self.span, "ewm": self._ewm.state()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreamingEMA":
+        kernel = cls(state["span"])
+        kernel._ewm = EwmMean.from_state(state["ewm"])
+        return kernel
+
+
+class StreamingATR:
+    """smc.atr: true range, then Wilder smoothing (ewm alpha=1/period)."""
+
+    __slots__ = ("period", "prev_close", "_ewm")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = np.nan
+        self._ewm = EwmMean(alpha=1 / period)
+
+    @property
+    def value(self) -> float:
+        return self._ewm.value
+
+    def update(self, high: float, low: float, close: float) -> float:
+        ranges = [high - low, abs(high - self.prev_close), abs(low - self.prev_close)]
+        ranges = [r for r in ranges if r == r]
+        self.prev_close = float(close)
+        return self._ewm.update(max(ranges) if ranges else np.nan)
+
+    def update_many(self, high, low, close) -> np.ndarray:
+        high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+        if not len(close):
+            return np.empty(0)
+        prev_close = np.empty_like(close)
+        prev_close[0] = self.prev_close
+        prev_close[1:] = close[:-1]
+        ranges = np.vstack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+        with np.errstate(invalid="ignore"):
+            tr = np.fmax(np.fmax(ranges[0], ranges[1]), ranges[2])
+        self.prev_close = float(close[-1])
+        return self._ewm.update_many(tr)
+
+    def state(self) -> dict:
+        return {
+            "period": self.period,
+            "prev_close": _nan_to_none(self.prev_close),
+            "ewm": self._ewm.state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreamingATR":
+        kernel = cls(state["period"])
+        kernel.prev_close = _none_to_nan(state["prev_close"])
+        kernel._ewm = EwmMean.from_state(state["ewm"])
+        return kernel
+
+
+class StreamingRSI:
+    """features._rsi: Wilder RSI of close, 50 while undefined."""
+
+    __slots__ = ("period", "prev_close", "_gain", "_loss")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = np.nan
+        self._gain = EwmMean(alpha=1 / period)
+        self._loss = EwmMean(alpha=1 / period)
+
+    @staticmethod
+    def _rsi(gain, loss):
+        gain, loss = np.asarray(gain, dtype=float), np.asarray(loss, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = np.where(loss == 0, np.nan, gain / loss)
+            rsi = 100 - 100 / (1 + rs)
+        return np.where(np.isnan(rsi), 50.0, rsi)
+
+    @property
+    def value(self) -> float:
+        return float(self._rsi(self._gain.value, self._loss.value))
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain = self._gain.update(delta if not delta < 0 else 0.0)
+        loss = self._loss.update(-delta if not delta > 0 else 0.0)
+        return float(self._rsi(gain, loss))
+
+    def update_many(self, close) -> np.ndarray:
+        close = np.asarray(close, dtype=float)
+        if not len(close):
+            return np.empty(0)
+        prev = np.empty_like(close)
+        prev[0] = self.prev_close
+        prev[1:] = close[:-1]
+        delta = close - prev
+        self.prev_close = float(close[-1])
+        gain = self._gain.update_many(np.where(delta < 0, 0.0, delta))
+        loss = self._loss.update_many(np.where(delta > 0, 0.0, -delta))
+        return self._rsi(gain, loss)
+
+    def state(self) -> dict:
+        return {
+            "period": self.period,
+            "prev_close": _nan_to_none(self.prev_close),
+            "gain": self._gain.state(),
+            "loss": self._loss.state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "StreamingRSI":
+        kernel = cls(state["period"])
+        kernel.prev_close = _none_to_nan(state["prev_close"])
+        kernel._gain = EwmMean.from_state(state["gain"])
+        kernel._loss = EwmMean.from_state(state["loss"])
+        return kernel
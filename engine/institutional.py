@@ -61,7 +61,12 @@ def execution_confirmation(analysis: dict, direction: str, max_bars: int = 8) ->
     elif event and sweep.get("pos", 10**9) > event.get("pos", -1):
         reasons.append("Liquidity sweep occurred after the structure shift")
     confirmed = not reasons
-    return {"confirmed": confirmed, "event": event, "sweep": sweep, "reasons": reasons}
+    return {
+        "confirmed": confirmed,
+        "event": dict(event) if event else None,  # decisions are JSON-serialised
+        "sweep": dict(sweep) if sweep else None,
+        "reasons": reasons,
+    }
 
 
 def classify_market_maker_model(analysis: dict) -> dict:
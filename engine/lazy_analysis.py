@@ -0,0 +1,169 @@
+# engine/lazy_analysis.py
+"""Analysis dict whose expensive context fields are computed on first read.
+
+confluence.analyze() used to build chart patterns, the PDH/PDL and
+PWH/PWL resamples and the market-maker model for every frame, although
+the top-down parent and execution layers only read structure. A
+LazyAnalysis is a real dict (isinstance, json.dumps, dict(), {**a}, ==
+all behave as before) whose deferred values sit behind a placeholder
+until someone reads them; the value is then computed once and stored.
+Copies share placeholders, so a memoised analysis and its private_copy
+never compute the same field twice. Pickle / deepcopy produce a plain,
+fully computed dict.
+
+Instrumentation: analysis_access_stats() counts, per deferred field,
+how many analyses were built and how many actually needed it. With
+ANALYSIS_ACCESS_TRACE=1 every read is also attributed to the calling
+function ("module:function" -> fields), to see which caller touches
+what before moving more fields behind a placeholder.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Callable
+
+ANALYSIS_ACCESS_TRACE = os.getenv("ANALYSIS_ACCESS_TRACE", "").strip().lower() in ("1", "true", "yes")
+
+_stats_lock = threading.Lock()
+_deferred: Counter = Counter()
+_computed: Counter = Counter()
+_trace: defaultdict[str, Counter] = defaultdict(Counter)
+
+
+class _Pending:
+    __slots__ = ("name", "fn", "value", "done", "lock")
+
+    def __init__(self, name: str, fn: Callable[[], object]):
+        self.name = name
+        self.fn = fn
+        self.value = None
+        self.done = False
+        self.lock = threading.Lock()
+
+    def resolve(self):
+        if not self.done:
+            with self.lock:
+                if not self.done:
+                    self.value = self.fn()
+                    self.done = True
+                    self.fn = None
+                    with _stats_lock:
+                        _computed[self.name] += 1
+        return self.value
+
+
+def _record(key, depth: int = 2) -> None:
+    frame = sys._getframe(depth)
+    caller = f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+    with _stats_lock:
+        _trace[caller][key] += 1
+
+
+class LazyAnalysis(dict):
+    """dict with deferred fields; see the module docstring."""
+
+    def defer(self, key: str, fn: Callable[[], object]) -> None:
+        """Make self[key] = fn(), computed on first read."""
+        dict.__setitem__(self, key, _Pending(key, fn))
+        with _stats_lock:
+            _deferred[key] += 1
+
+    def _value(self, key, value):
+        if type(value) is _Pending:
+            value = value.resolve()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def pending(self) -> list[str]:
+        """Deferred fields nobody has read yet."""
+        return [k for k, v in dict.items(self) if type(v) is _Pending and not v.done]
+
+    def __getitem__(self, key):
+        if ANALYSIS_ACCESS_TRACE:
+            _record(key)
+        return self._value(key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        if ANALYSIS_ACCESS_TRACE:
+            _record(key)
+        if key not in self:
+            return default
+        return self._value(key, dict.__getitem__(self, key))
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        return self._value(key, dict.pop(self, key))
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def __iter__(self):
+        # a custom __iter__ makes dict(), {**a} and dict.update() go
+        # through keys() + __getitem__ instead of copying placeholders
+        return iter(dict.keys(self))
+
+    def values(self):
+        return [self._value(k, v) for k, v in list(dict.items(self))]
+
+    def items(self):
+        return [(k, self._value(k, v)) for k, v in list(dict.items(self))]
+
+    def materialize(self) -> dict:
+        """Plain dict with every deferred field computed."""
+        return dict(self.items())
+
+    def copy(self) -> "LazyAnalysis":
+        out = LazyAnalysis()
+        dict.update(out, dict.items(self))  # shares pending placeholders
+        return out
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        import copy
+        return copy.deepcopy(self.materialize(), memo)
+
+    def __reduce__(self):
+        return (dict, (self.materialize(),))
+
+    def __eq__(self, other):
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self.materialize() == (other.materialize() if isinstance(other, LazyAnalysis) else other)
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        shown = {k: ("<deferred>" if type(v) is _Pending and not v.done else v) for k, v in dict.items(self)}
+        return f"LazyAnalysis({shown!r})"
+
+
+def analysis_access_stats() -> dict:
+    """Deferred-field usage counters (and the caller trace when enabled)."""
+    with _stats_lock:
+        return {
+            "trace_enabled": ANALYSIS_ACCESS_TRACE,
+            "fields": {
+                key: {"deferred": _deferred[key], "computed": _computed[key]}
+                for key in sorted(_deferred)
+            },
+            "callers": {caller: dict(fields) for caller, fields in sorted(_trace.items())},
+        }
+
+
+def reset_access_stats() -> None:
+    with _stats_lock:
+        _deferred.clear()
+        _computed.clear()
+        _trace.clear()
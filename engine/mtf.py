@@ -20,8 +20,9 @@ in the output say exactly what was used.
 import pandas as pd
 
 from engine import confluence
-from engine.data import DataUnavailableError, get_data
+from engine.data import DataUnavailableError, derived_frame, get_data
 from engine.risk_calc import pip_size_for
+from engine.timeframe_index import resample_ohlc
 from utils.logger import get_logger
 
 log = get_logger("engine.mtf")
@@ -55,10 +56,7 @@ def _load(symbol: str, interval: str, fetch: bool):
 
 
 def _resample_4h(df_1h: pd.DataFrame) -> pd.DataFrame:
-    out = df_1h.resample("4h").agg({
-        "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
-    }).dropna(subset=["Open", "High", "Low", "Close"])
-    return out
+    return resample_ohlc(df_1h, "4h")
 
 
 def _h4_bias(analysis: dict) -> dict:
@@ -190,7 +188,7 @@ def _mtf_analyze_legacy(symbol: str, fetch: bool, progress=None) -> dict:
     # ---- 4H bias frame (resampled from 1H when not fetchable) ---------
     df_h4, _ = _load(symbol, BIAS_TF, fetch)
     if df_h4 is None and df_h1 is not None and len(df_h1) >= 120:
-        df_h4 = _resample_4h(df_h1)
+        df_h4 = derived_frame(symbol, LIQUIDITY_TF, BIAS_TF, df_h1, "4h")
         notes.append("4H data resampled from 1H")
     if df_h4 is not None and len(df_h4) < 60:
         df_h4 = None
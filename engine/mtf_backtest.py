@@ -0,0 +1,131 @@
+# engine/mtf_backtest.py
+"""Point-in-time backtest of the top-down stack (what predictions use).
+
+run_backtest() replays confluence.analyze on one frame; the prediction
+path runs topdown_analyze() over the whole style ladder (parent,
+structure, setup, execution). run_topdown_backtest() replays that stack:
+
+  - the entry frame is the clock; every step_bars entry bars the stack
+    is assembled (topdown.assemble_topdown) from every ladder frame cut
+    to the bars that had closed when the entry bar closed, so no layer
+    ever sees a forming or future candle. The cuts come from one
+    closed_htf_positions() lookup per frame, not a time filter per step;
+  - a cut only changes when one of its bars closes, and all layers go
+    through one AnalysisMemo keyed by the cut, so a 4H parent is
+    analysed once per 4H bar and the 1H structure / liquidity layers
+    once per hour instead of once per step.
+
+Decisions are confluence.decide() on the decorated entry analysis (no
+ML gate, like run_backtest); trades are resolved on the entry frame by
+backtest_report().
+"""
+from __future__ import annotations
+
+import time
+
+import pandas as pd
+
+from engine import confluence
+from engine.analysis_memo import AnalysisMemo
+from engine.backtest import HOLD_BARS, MIN_WARMUP, STEP_BARS, backtest_report
+from engine.data import INTERVAL_MINUTES
+from engine.mtf import _frame_minutes
+from engine.timeframe_index import closed_htf_positions
+from engine.topdown import assemble_topdown, entry_frame, load_ladder_frames
+from engine.trading_style import normalize_trading_style, primary_entry_tf
+from utils.logger import get_logger
+
+log = get_logger("engine.mtf_backtest")
+
+
+def _minutes(tf: str, df: pd.DataFrame) -> float:
+    return _frame_minutes(df) or float(INTERVAL_MINUTES[tf])
+
+
+def closed_cuts(frames: dict, entry_tf: str) -> dict:
+    """Per non-entry frame, the last bar closed by each entry bar's close (-1: none)."""
+    entry = frames[entry_tf]
+    entry_minutes = _minutes(entry_tf, entry)
+    return {
+        tf: closed_htf_positions(entry.index, entry_minutes, df.index, _minutes(tf, df))
+        for tf, df in frames.items()
+        if df is not None and tf != entry_tf
+    }
+
+
+def topdown_steps(
+    symbol: str,
+    frames: dict,
+    trading_style: str = "intraday",
+    *,
+    thresholds,
+    memo: AnalysisMemo | None = None,
+    start: int = MIN_WARMUP,
+    stop: int | None = None,
+    step_bars: int = STEP_BARS,
+):
+    """Yield (end, stack): the top-down stack as it stood when entry bar `end` closed."""
+    style = normalize_trading_style(trading_style)
+    entry_tf, entry = entry_frame(symbol, frames, style)
+    cuts = closed_cuts(frames, entry_tf)
+    memo = memo if memo is not None else AnalysisMemo()
+    stop = len(entry) if stop is None else stop
+    for end in range(start, stop, step_bars):
+        point_in_time = {tf: None for tf in frames}
+        point_in_time[entry_tf] = entry.iloc[: end + 1]
+        for tf, pos in cuts.items():
+            last = int(pos[end])
+            point_in_time[tf] = frames[tf].iloc[: last + 1] if last >= 0 else None
+        yield end, assemble_topdown(symbol, point_in_time, style, thresholds=thresholds, memo=memo)
+
+
+def run_topdown_backtest(
+    symbol: str,
+    trading_style: str = "intraday",
+    *,
+    frames: dict | None = None,
+    thresholds=None,
+    max_bars: int | None = None,
+    step_bars: int = STEP_BARS,
+) -> dict:
+    """Walk the top-down stack over cached ladder frames (the last max_bars entry bars).
+
+    A step_bars below one higher-timeframe bar is what the memo pays off
+    for: step_bars=1 on a 30min entry frame analyses the 4H parent once
+    per eight steps.
+    """
+    style = normalize_trading_style(trading_style)
+    started = time.monotonic()
+    notes: list[str] = []
+    if frames is None:
+        frames, _ = load_ladder_frames(symbol, style, False, notes)
+    if thresholds is None:
+        from services.threshold_service import resolve_thresholds
+        thresholds, _ = resolve_thresholds(symbol, primary_entry_tf(style), style)
+
+    entry_tf, entry = entry_frame(symbol, frames, style, notes)
+    offset = max(0, len(entry) - max_bars) if max_bars else 0
+    df = entry.iloc[offset:]
+    if len(df) < MIN_WARMUP + 50:
+        return {"symbol": symbol.upper(), "error": "Not enough bars for backtest", "trades": 0}
+
+    memo = AnalysisMemo()
+    decisions = [
+        (end - offset, confluence.decide(stack["analysis"], ml_signal=None, thresholds=thresholds))
+        for end, stack in topdown_steps(
+            symbol, frames, style, thresholds=thresholds, memo=memo,
+            start=offset + MIN_WARMUP, stop=len(entry) - HOLD_BARS, step_bars=step_bars,
+        )
+    ]
+    report = backtest_report(df, symbol, decisions, step_bars)
+    report.update({
+        "engine": "topdown",
+        "trading_style": style,
+        "entry_tf": entry_tf,
+        "timeframes": {tf: len(f) for tf, f in frames.items() if f is not None},
+        "steps": len(decisions),
+        "analyses": memo.stats(),
+        "notes": notes,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    })
+    return report
@@ -0,0 +1,322 @@
+# engine/panel.py
+"""Multi-pair panel: N pairs of one interval as aligned 2-D arrays.
+
+Scanning the catalog one pair at a time runs the per-symbol pandas code
+N times. A Panel stacks the last `bars` candles of every pair into
+(pairs x bars) arrays, right-aligned on each pair's latest candle (row
+i, column -1 is pair i's newest bar; shorter histories are NaN-padded
+on the left), and every kernel below runs once over the whole block.
+
+Kernels reproduce their per-symbol counterparts row for row:
+  atr                 smc.atr
+  swing_masks         smc.swing_points
+  displacement_flags  ict.displacement_flags
+  killzone_flags      ict.killzone_flags
+  fvg_candidates      smc.detect_fvg (displaced, not yet filled)
+  sweep_candidates    the features' wick-through-and-close-back sweep
+
+rank_setups() turns them into a ranked list of pre-screened setups; it
+is a cheap first pass that decides which pairs deserve the full
+pipeline, not a trade decision.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from engine import ict
+
+PANEL_BARS = 500         # candles per pair (ATR / swings settle well inside this)
+SCAN_RECENT_BARS = 12    # a setup's sweep / displacement / FVG must be this fresh
+SWEEP_LOOKBACK = 20      # window defining the liquidity level being swept
+SWEEP_MIN_PERIODS = 5
+
+# Pre-screen weights per aligned component (killzone / sequence are bonuses).
+SETUP_WEIGHTS = {
+    "sweep": 1.0,
+    "displacement": 1.0,
+    "fvg": 1.0,
+    "structure_break": 1.0,
+    "sweep_then_displacement": 0.5,
+    "killzone": 0.5,
+}
+
+
+class Panel:
+    """Right-aligned OHLC blocks of several pairs (see the module docstring)."""
+
+    def __init__(self, symbols: list[str], times: np.ndarray, open_: np.ndarray,
+                 high: np.ndarray, low: np.ndarray, close: np.ndarray, stale: list[str] | None = None):
+        self.symbols = list(symbols)
+        self.stale = list(stale or [])
+        self.times = times
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.lengths = (~np.isnan(close)).sum(axis=1)
+
+    @classmethod
+    def from_frames(
+        cls, frames: dict[str, pd.DataFrame], bars: int = PANEL_BARS, max_lag: pd.Timedelta | None = None,
+    ) -> "Panel":
+        """Stack the last `bars` candles of each frame (frames with no rows are skipped).
+
+        Rows are aligned by position, so a pair whose last candle trails the
+        newest one by more than max_lag would be ranked as if current; those
+        are left out and listed in .stale instead.
+        """
+        frames = {sym: df for sym, df in frames.items() if df is not None and len(df)}
+        stale = []
+        if max_lag is not None and frames:
+            last = {sym: _naive(df.index[-1]) for sym, df in frames.items()}
+            newest = max(last.values())
+            stale = [sym for sym, ts in last.items() if newest - ts > max_lag]
+            frames = {sym: df for sym, df in frames.items() if sym not in stale}
+        width = min(bars, max((len(df) for df in frames.values()), default=0))
+        shape = (len(frames), width)
+        times = np.full(shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+        cols = {c: np.full(shape, np.nan) for c in ("Open", "High", "Low", "Close")}
+        for row, df in enumerate(frames.values()):
+            tail = df.iloc[-width:]
+            index = tail.index.tz_localize(None) if tail.index.tz is not None else tail.index
+            times[row, width - len(tail):] = index.to_numpy(dtype="datetime64[ns]")
+            for col, block in cols.items():
+                block[row, width - len(tail):] = tail[col].to_numpy(dtype=float)
+        return cls(list(frames), times, cols["Open"], cols["High"], cols["Low"], cols["Close"], stale)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def width(self) -> int:
+        return self.close.shape[1]
+
+    def row(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """One pair's candles back as an OHLC frame (padding dropped)."""
+        i = self.row(symbol)
+        start = self.width - int(self.lengths[i])
+        return pd.DataFrame(
+            {
+                "Open": self.open[i, start:], "High": self.high[i, start:],
+                "Low": self.low[i, start:], "Close": self.close[i, start:],
+            },
+            index=pd.DatetimeIndex(self.times[i, start:], name="Timestamp"),
+        )
+
+
+def _naive(ts: pd.Timestamp) -> pd.Timestamp:
+    return ts.tz_convert(None) if ts.tzinfo is not None else ts
+
+
+def _shift(a: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full_like(a, np.nan)
+    out[:, periods:] = a[:, :-periods]
+    return out
+
+
+def atr(panel: Panel, period: int = 14) -> np.ndarray:
+    """smc.atr per row: true range, then Wilder smoothing (ewm alpha=1/period)."""
+    prev_close = _shift(panel.close)
+    tr = np.fmax(np.fmax(panel.high - panel.low, np.abs(panel.high - prev_close)), np.abs(panel.low - prev_close))
+    # ewm over the columns of the transposed block: pandas' own recursion,
+    # so leading NaN padding is skipped exactly as for a single pair.
+    return pd.DataFrame(tr.T).ewm(alpha=1 / period, adjust=False).mean().to_numpy().T
+
+
+def swing_masks(panel: Panel, window: int = 3) -> tuple[np.ndarray, np.ndarray]:
+    """(is_swing_high, is_swing_low) boolean blocks, smc.swing_points per row."""
+    n = panel.width
+    is_high = np.zeros(panel.close.shape, dtype=bool)
+    is_low = np.zeros(panel.close.shape, dtype=bool)
+    if n < 2 * window + 1:
+        return is_high, is_low
+    view = np.lib.stride_tricks.sliding_window_view
+    win_max = view(panel.high, window, axis=1).max(axis=2)
+    win_min = view(panel.low, window, axis=1).min(axis=2)
+    core = slice(window, n - window)
+    left, right = slice(0, n - 2 * window), slice(window + 1, n - window + 1)
+    is_high[:, core] = (panel.high[:, core] > win_max[:, left]) & (panel.high[:, core] > win_max[:, right])
+    is_low[:, core] = (panel.low[:, core] < win_min[:, left]) & (panel.low[:, core] < win_min[:, right])
+    return is_high, is_low
+
+
+def displacement_flags(panel: Panel, atr_block: np.ndarray, mult: float = 1.5,
+                       body_dominance: float = 0.55) -> np.ndarray:
+    """ict.displacement_flags per row."""
+    body = np.abs(panel.close - panel.open)
+    rng = panel.high - panel.low
+    rng = np.where(rng == 0, np.nan, rng)
+    with np.errstate(invalid="ignore"):
+        return (body > mult * atr_block) & (body / rng > body_dominance)
+
+
+def killzone_flags(panel: Panel) -> np.ndarray:
+    """ict.killzone_flags per row (each pair's own candle clock)."""
+    day = panel.times.astype("datetime64[D]")
+    seconds = (panel.times - day).astype("timedelta64[s]").astype(np.int64)
+    mask = np.zeros(panel.times.shape, dtype=bool)
+    for start, end in ict.KILLZONES.values():
+        lo = start.hour * 3600 + start.minute * 60 + start.second
+        hi = end.hour * 3600 + end.minute * 60 + end.second
+        mask |= (seconds >= lo) & (seconds < hi)
+    return mask & ~np.isnat(panel.times)
+
+
+def _suffix_extreme(a: np.ndarray, mode: str) -> np.ndarray:
+    """out[:, t] = extreme of a[:, t:] (NaN ignored); column n is the empty suffix."""
+    blank = np.inf if mode == "min" else -np.inf
+    filled = np.where(np.isnan(a), blank, a)
+    acc = np.minimum.accumulate if mode == "min" else np.maximum.accumulate
+    out = np.full((a.shape[0], a.shape[1] + 1), blank)
+    out[:, :-1] = acc(filled[:, ::-1], axis=1)[:, ::-1]
+    return out
+
+
+def fvg_candidates(panel: Panel, atr_block: np.ndarray,
+                   displacement_mult: float = 1.0) -> tuple[np.ndarray, np.ndarray]:
+    """(bullish, bearish) masks at each gap's middle candle.
+
+    Same gaps smc.detect_fvg keeps with require_displacement: the middle
+    candle is displaced and price has not traded back through the far
+    edge of the gap since.
+    """
+    shape = panel.close.shape
+    bull = np.zeros(shape, dtype=bool)
+    bear = np.zeros(shape, dtype=bool)
+    if panel.width < 3:
+        return bull, bear
+    high, low = panel.high, panel.low
+    mid = slice(1, -1)
+    body = np.abs(panel.close[:, mid] - panel.open[:, mid])
+    atr_mid = atr_block[:, mid]
+    with np.errstate(invalid="ignore"):
+        displaced = ~np.isnan(atr_mid) & (atr_mid > 0) & (body >= displacement_mult * atr_mid)
+        bull_gap = high[:, :-2] < low[:, 2:]
+        bear_gap = low[:, :-2] > high[:, 2:]
+    # filled: a later low at/under the gap's bottom (bullish), high at/over its top (bearish)
+    later_low = _suffix_extreme(low, "min")[:, 3:]
+    later_high = _suffix_extreme(high, "max")[:, 3:]
+    bull[:, mid] = bull_gap & displaced & ~(later_low <= high[:, :-2])
+    bear[:, mid] = bear_gap & displaced & ~(later_high >= low[:, :-2])
+    return bull, bear
+
+
+def sweep_candidates(panel: Panel, lookback: int = SWEEP_LOOKBACK) -> tuple[np.ndarray, np.ndarray]:
+    """(buyside, sellside) masks: a wick through the prior `lookback`-bar
+    extreme with a close back inside (rolling(lookback, min_periods=5))."""
+    view = np.lib.stride_tricks.sliding_window_view
+    pad = np.full((len(panel), lookback), np.nan)
+    high_win = view(np.hstack([pad, panel.high]), lookback, axis=1)[:, :-1]
+    low_win = view(np.hstack([pad, panel.low]), lookback, axis=1)[:, :-1]
+    enough = (~np.isnan(high_win)).sum(axis=2) >= SWEEP_MIN_PERIODS
+    prior_high = np.where(enough, np.fmax.reduce(high_win, axis=2), np.nan)
+    prior_low = np.where(enough, np.fmin.reduce(low_win, axis=2), np.nan)
+    with np.errstate(invalid="ignore"):
+        buyside = (panel.high > prior_high) & (panel.close < prior_high)
+        sellside = (panel.low < prior_low) & (panel.close > prior_low)
+    return buyside, sellside
+
+
+def _latest(mask: np.ndarray) -> np.ndarray:
+    """Column of the last True per row, -1 where none."""
+    found = mask.any(axis=1)
+    last = mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+    return np.where(found, last, -1)
+
+
+def _last_confirmed(mask: np.ndarray, prices: np.ndarray, window: int) -> np.ndarray:
+    """Price of each row's latest swing confirmed by the last bar, NaN if none."""
+    confirmed = mask.copy()
+    if window:
+        confirmed[:, -window:] = False
+    col = _latest(confirmed)
+    rows = np.arange(len(mask))
+    return np.where(col >= 0, prices[rows, np.maximum(col, 0)], np.nan)
+
+
+def rank_setups(panel: Panel, recent: int = SCAN_RECENT_BARS, swing_window: int = 3) -> list[dict]:
+    """Pre-screened setups, best first (pairs with nothing aligned are left out).
+
+    Components, each counted for the direction it supports within the
+    last `recent` bars: a liquidity sweep (buy-side -> bearish), a
+    displacement candle, an open displaced FVG, and the last close
+    beyond the latest confirmed swing. A sweep followed by a displacement
+    the same way and a last bar inside a kill zone add a bonus.
+    """
+    if not len(panel) or not panel.width:
+        return []
+    atr_block = atr(panel)
+    displaced = displacement_flags(panel, atr_block)
+    bull_fvg, bear_fvg = fvg_candidates(panel, atr_block)
+    buyside, sellside = sweep_candidates(panel)
+    swing_high, swing_low = swing_masks(panel, swing_window)
+    in_killzone = killzone_flags(panel)[:, -1]
+
+    window = slice(max(panel.width - recent, 0), None)
+    up = panel.close > panel.open
+    down = panel.close < panel.open
+    last_close = panel.close[:, -1]
+    with np.errstate(invalid="ignore"):
+        broke_up = last_close > _last_confirmed(swing_high, panel.high, swing_window)
+        broke_down = last_close < _last_confirmed(swing_low, panel.low, swing_window)
+
+    sides = {
+        "bullish": {
+            "sweep": _latest(sellside[:, window]),
+            "displacement": _latest((displaced & up)[:, window]),
+            "fvg": _latest(bull_fvg[:, window]),
+            "structure_break": broke_up,
+        },
+        "bearish": {
+            "sweep": _latest(buyside[:, window]),
+            "displacement": _latest((displaced & down)[:, window]),
+            "fvg": _latest(bear_fvg[:, window]),
+            "structure_break": broke_down,
+        },
+    }
+    scores = {}
+    for direction, parts in sides.items():
+        score = np.zeros(len(panel))
+        for name in ("sweep", "displacement", "fvg"):
+            score += SETUP_WEIGHTS[name] * (parts[name] >= 0)
+        score += SETUP_WEIGHTS["structure_break"] * parts["structure_break"]
+        sequence = (parts["sweep"] >= 0) & (parts["displacement"] >= parts["sweep"])
+        score += SETUP_WEIGHTS["sweep_then_displacement"] * sequence
+        parts["sweep_then_displacement"] = sequence
+        scores[direction] = score
+
+    offset = window.start
+    setups = []
+    for i, symbol in enumerate(panel.symbols):
+        direction = "bullish" if scores["bullish"][i] >= scores["bearish"][i] else "bearish"
+        score = float(scores[direction][i])
+        if score <= 0 or np.isnan(last_close[i]):
+            continue
+        parts = sides[direction]
+        signals = {}
+        for name in ("sweep", "displacement", "fvg"):
+            if parts[name][i] >= 0:
+                signals[name] = {"bars_ago": int(panel.width - 1 - (parts[name][i] + offset))}
+        if parts["structure_break"][i]:
+            signals["structure_break"] = True
+        if parts["sweep_then_displacement"][i]:
+            signals["sweep_then_displacement"] = True
+        if in_killzone[i]:
+            score += SETUP_WEIGHTS["killzone"]
+            signals["killzone"] = True
+        setups.append({
+            "symbol": symbol,
+            "direction": direction,
+            "score": round(score, 3),
+            "opposing_score": round(float(scores["bearish" if direction == "bullish" else "bullish"][i]), 3),
+            "signals": signals,
+            "price": float(last_close[i]),
+            "atr": float(atr_block[i, -1]),
+            "last_candle": str(pd.Timestamp(panel.times[i, -1])),
+        })
+    setups.sort(key=lambda s: (-s["score"], s["opposing_score"], s["symbol"]))
+    return setups
@@ -3,19 +3,89 @@
 These detectors never produce a trade direction by themselves. Their weights
 are intentionally bounded and are only consumed after SMC/ICT establishes a
 directional narrative.
+
+scan_patterns() evaluates every detector at every bar of a frame in one
+vectorised pass; analyze_patterns() and the detect_* helpers read the
+last row of it.
 """
 from __future__ import annotations
 
 import numpy as np
 import pandas as pd
-
-
-def _metrics(row) -> tuple[float, float, float, float]:
-    body = abs(float(row.Close) - float(row.Open))
-    span = max(float(row.High) - float(row.Low), 1e-12)
-    upper = float(row.High) - max(float(row.Open), float(row.Close))
-    lower = min(float(row.Open), float(row.Close)) - float(row.Low)
-    return body, span, upper, lower
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+PATTERN_LOOKBACK = 100  # deepest window any detector reads (chart structures)
+_DIRECT_ROWS = 32       # fewer rows than this: reduce windows directly, no pandas rolling
+_SLOPE_CHUNK = 8192     # rows per slope batch (bounds the gathered-window copy)
+
+# (name, direction, weight) in the order the detectors report them.
+CANDLESTICKS: tuple[tuple[str, str, float], ...] = (
+    ("Doji", "neutral", 0.10),
+    ("Dragonfly Doji", "bullish", 0.16),
+    ("Gravestone Doji", "bearish", 0.16),
+    ("Spinning Top", "neutral", 0.10),
+    ("Hammer", "bullish", 0.20),
+    ("Pin Bar", "bullish", 0.18),
+    ("Inverted Hammer", "bullish", 0.18),
+    ("Shooting Star", "bearish", 0.20),
+    ("Pin Bar", "bearish", 0.18),
+    ("Inside Bar", "neutral", 0.10),
+    ("Outside Bar", "bullish", 0.16),
+    ("Outside Bar", "bearish", 0.16),
+    ("Marubozu", "bullish", 0.18),
+    ("Marubozu", "bearish", 0.18),
+    ("Bullish Engulfing", "bullish", 0.24),
+    ("Bearish Engulfing", "bearish", 0.24),
+    ("Bullish Harami", "bullish", 0.16),
+    ("Bearish Harami", "bearish", 0.16),
+    ("Morning Star", "bullish", 0.24),
+    ("Evening Star", "bearish", 0.24),
+    ("Three Soldiers", "bullish", 0.26),
+    ("Three Crows", "bearish", 0.26),
+    ("Tweezer Bottom", "bullish", 0.18),
+    ("Tweezer Top", "bearish", 0.18),
+    ("Piercing Pattern", "bullish", 0.22),
+    ("Dark Cloud Cover", "bearish", 0.22),
+)
+CHART_STRUCTURES: tuple[tuple[str, str, float], ...] = (
+    ("Double Top", "bearish", 0.24),
+    ("Double Bottom", "bullish", 0.24),
+    ("Triple Top", "bearish", 0.27),
+    ("Triple Bottom", "bullish", 0.27),
+    ("Head and Shoulders", "bearish", 0.28),
+    ("Inverse Head and Shoulders", "bullish", 0.28),
+    ("Ascending Channel", "bullish", 0.18),
+    ("Descending Channel", "bearish", 0.18),
+    ("Rectangle", "neutral", 0.12),
+    ("Symmetrical Triangle", "neutral", 0.16),
+    ("Ascending Triangle", "bullish", 0.18),
+    ("Descending Triangle", "bearish", 0.18),
+    ("Falling Wedge", "bullish", 0.20),
+    ("Rising Wedge", "bearish", 0.20),
+    ("Pennant", "bullish", 0.20),
+    ("Pennant", "bearish", 0.20),
+    ("Flag", "bullish", 0.20),
+    ("Flag", "bearish", 0.20),
+    ("Cup and Handle", "bullish", 0.22),
+)
+WYCKOFF: tuple[tuple[str, str, float], ...] = (
+    ("Wyckoff Spring", "bullish", 0.24),
+    ("Wyckoff Upthrust", "bearish", 0.24),
+    ("Wyckoff Accumulation", "bullish", 0.16),
+    ("Wyckoff Distribution", "bearish", 0.16),
+    ("Wyckoff Volume Confirmation", "neutral", 0.10),
+)
+PATTERN_GROUPS = (
+    ("candlesticks", CANDLESTICKS),
+    ("chart_structures", CHART_STRUCTURES),
+    ("wyckoff", WYCKOFF),
+)
+PATTERN_WEIGHTS: dict[tuple[str, str, str], float] = {
+    (group, name, direction): weight
+    for group, specs in PATTERN_GROUPS
+    for name, direction, weight in specs
+}
 
 
 def _add(found: list[dict], name: str, direction: str, weight: float) -> None:
@@ -28,7 +98,347 @@ def _add(found: list[dict], name: str, direction: str, weight: float) -> None:
         })
 
 
+def _prev(values: np.ndarray, k: int = 1) -> np.ndarray:
+    """values shifted k bars forward (head filled with the first value)."""
+    out = np.empty_like(values)
+    out[k:] = values[:-k]
+    out[:k] = values[0]
+    return out
+
+
+def _trailing(values: np.ndarray, width: int, reduce) -> np.ndarray:
+    """reduce() over the `width` bars ending at each bar (NaN before that)."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= width:
+        out[width - 1:] = reduce(sliding_window_view(values, width), axis=1)
+    return out
+
+
+def _rolling(values: np.ndarray, width: int, rows: np.ndarray, how: str) -> np.ndarray:
+    """pandas rolling(width, min_periods=1).<how>() read at `rows`."""
+    if len(rows) > _DIRECT_ROWS:
+        return getattr(pd.Series(values).rolling(width, min_periods=1), how)().to_numpy()[rows]
+    reduce = {"median": np.median, "max": np.max, "min": np.min}[how]
+    return np.array([reduce(values[max(0, t - width + 1): t + 1]) for t in rows], dtype=float)
+
+
+def _slopes(values: np.ndarray, lengths: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Least-squares slope of the `lengths[k]` bars ending at rows[k]."""
+    out = np.zeros(len(rows))
+    for length in np.unique(lengths):
+        if length < 2:
+            continue
+        x = np.arange(length) - (length - 1) / 2
+        view = sliding_window_view(values, int(length))
+        pick = np.flatnonzero(lengths == length)
+        for chunk in np.array_split(pick, max(1, len(pick) // _SLOPE_CHUNK)):
+            windows = view[rows[chunk] - length + 1]
+            centered = windows - windows.mean(axis=1, keepdims=True)
+            out[chunk] = centered @ x / (x @ x)
+    return out
+
+
+def _scan_candlesticks(o, h, l, c, rows: np.ndarray) -> list[np.ndarray]:
+    n = len(c)
+    body = np.abs(c - o)
+    span = np.maximum(h - l, 1e-12)
+    upper = h - np.maximum(o, c)
+    lower = np.minimum(o, c) - l
+    po, ph, pl, pc = _prev(o), _prev(h), _prev(l), _prev(c)
+    fo, fc = _prev(o, 2), _prev(c, 2)
+    prev_body, first_body = _prev(body), _prev(body, 2)
+    bull = c > o
+    prev_bear = pc < po
+    midpoint = (po + pc) / 2
+
+    doji = body / span <= 0.10
+    spinning = ~doji & (body / span <= 0.30) & (upper / span >= 0.25) & (lower / span >= 0.25)
+    hammer = (lower >= np.maximum(body * 2, span * 0.55)) & (upper <= span * 0.15)
+    inverted = (upper >= np.maximum(body * 2, span * 0.55)) & (lower <= span * 0.15)
+    outside = (h > ph) & (l < pl)
+    marubozu = body / span >= 0.90
+    harami = (
+        (body <= prev_body * 0.60)
+        & (np.maximum(o, c) < np.maximum(po, pc))
+        & (np.minimum(o, c) > np.minimum(po, pc))
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = body / np.where(h - l == 0, np.nan, h - l)
+    strong = (ratio >= 0.55) & (_prev(ratio) >= 0.55) & (_prev(ratio, 2) >= 0.55)
+    bear = c < o
+    soldiers = strong & bull & _prev(bull) & _prev(bull, 2) & (fc <= pc) & (pc <= c)
+    crows = strong & bear & _prev(bear) & _prev(bear, 2) & (fc >= pc) & (pc >= c)
+
+    atr = np.zeros(n)
+    atr[rows] = _rolling(h - l, 20, rows, "median")
+    tweezer = np.maximum(atr * 0.08, c * 0.00005)
+
+    flags = [
+        doji,
+        doji & (lower / span >= 0.60) & (upper / span <= 0.10),
+        doji & (upper / span >= 0.60) & (lower / span <= 0.10),
+        spinning,
+        hammer,
+        hammer,
+        inverted,
+        inverted,
+        inverted,
+        (h < ph) & (l > pl),
+        outside & bull,
+        outside & ~bull,
+        marubozu & bull,
+        marubozu & ~bull,
+        prev_bear & bull & (o <= pc) & (c >= po),
+        ~prev_bear & ~bull & (o >= pc) & (c <= po),
+        harami & bull,
+        harami & ~bull,
+        (fc < fo) & (prev_body <= first_body * 0.50) & bull & (c >= (fo + fc) / 2),
+        (fc > fo) & (prev_body <= first_body * 0.50) & ~bull & (c <= (fo + fc) / 2),
+        soldiers,
+        crows,
+        (np.abs(l - pl) <= tweezer) & prev_bear & bull,
+        (np.abs(h - ph) <= tweezer) & ~prev_bear & ~bull,
+        prev_bear & bull & (o <= pl) & (midpoint < c) & (c < po),
+        ~prev_bear & ~bull & (o >= ph) & (po < c) & (c < midpoint),
+    ]
+    keep = np.zeros(n, dtype=bool)
+    keep[rows[rows >= 2]] = True
+    return [flag & keep for flag in flags]
+
+
+def _last_turns(turns: np.ndarray, rows: np.ndarray, first: np.ndarray, values: np.ndarray, k: int):
+    """(count, last k turning-point values) per row inside [first, row - 2]."""
+    hi = np.searchsorted(turns, rows - 2, side="right")
+    count = hi - np.searchsorted(turns, first + 2, side="left")
+    picked = []
+    for back in range(k, 0, -1):
+        idx = np.clip(hi - back, 0, max(len(turns) - 1, 0))
+        picked.append(values[turns[idx]] if len(turns) else np.zeros(len(rows)))
+    return count, picked
+
+
+def _scan_chart_structures(h, l, c, rows: np.ndarray) -> list[np.ndarray]:
+    n = len(c)
+    depth = np.minimum(rows + 1, PATTERN_LOOKBACK)
+    first = rows - depth + 1
+    spans = h - l
+    atr = np.maximum(_rolling(spans, PATTERN_LOOKBACK, rows, "median"), 1e-12)
+    tolerance = atr * 0.45
+
+    centre = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+    if n >= 5:
+        windows = sliding_window_view(c, 5)
+        centre[0][2:-2] = c[2:-2] == windows.max(axis=1)
+        centre[1][2:-2] = c[2:-2] == windows.min(axis=1)
+    high_count, (h3, h2, h1) = _last_turns(np.flatnonzero(centre[0]), rows, first, c, 3)
+    low_count, (l3, l2, l1) = _last_turns(np.flatnonzero(centre[1]), rows, first, c, 3)
+
+    def near(*values):
+        return np.maximum.reduce(values) - np.minimum.reduce(values) <= tolerance
+
+    half = np.minimum(depth, np.maximum(15, depth // 2))
+    high_slope = _slopes(h, half, rows)
+    low_slope = _slopes(l, half, rows)
+    sums = sliding_window_view(spans, 5).sum(axis=1) if n >= 5 else np.zeros(1)
+    width_start = sums[np.maximum(rows - half + 1, 0)] / 5
+    width_end = sums[np.maximum(rows - 4, 0)] / 5
+    slope_tolerance = atr / np.maximum(half, 1) * 0.35
+    narrowing = width_end < width_start * 0.75
+
+    asc_channel = (high_slope > 0) & (low_slope > 0) & (np.abs(high_slope - low_slope) <= slope_tolerance)
+    desc_channel = ~asc_channel & (high_slope < 0) & (low_slope < 0) & (np.abs(high_slope - low_slope) <= slope_tolerance)
+    rectangle = ~asc_channel & ~desc_channel & (np.abs(high_slope) <= slope_tolerance) & (np.abs(low_slope) <= slope_tolerance)
+    symmetrical = narrowing & (high_slope < 0) & (0 < low_slope)
+    asc_triangle = narrowing & ~symmetrical & (np.abs(high_slope) <= slope_tolerance) & (low_slope > 0)
+    taken = symmetrical | asc_triangle
+    desc_triangle = narrowing & ~taken & (high_slope < 0) & (np.abs(low_slope) <= slope_tolerance)
+    taken |= desc_triangle
+    falling = narrowing & ~taken & (high_slope < 0) & (low_slope < 0)
+    rising = narrowing & ~taken & ~falling & (high_slope > 0) & (low_slope > 0)
+
+    at = lambda values, back: values[np.maximum(rows - back, 0)]  # noqa: E731
+    impulse = at(c, 10) - at(c, 24)
+    consolidation = at(_trailing(h, 10, np.max), 0) - at(_trailing(l, 10, np.min), 0)
+    prior_range = at(_trailing(h, 15, np.max), 10) - at(_trailing(l, 15, np.min), 10)
+    with np.errstate(invalid="ignore"):
+        flagged = (
+            (depth >= 30) & (prior_range != 0)
+            & (consolidation < prior_range * 0.55) & (np.abs(impulse) > atr * 1.5)
+        )
+    up = impulse > 0
+
+    left, right = at(c, 49), at(c, 15)
+    bottom = at(_trailing(c, 35, np.min), 15)
+    handle = at(_trailing(c, 15, np.min), 0)
+    cup_depth = np.minimum(left, right) - bottom
+    with np.errstate(invalid="ignore"):
+        cup = (
+            (depth >= 50) & (cup_depth > atr * 2)
+            & (np.abs(left - right) <= cup_depth * 0.35) & (handle > bottom + cup_depth * 0.55)
+        )
+
+    return [
+        (high_count >= 2) & near(h2, h1),
+        (low_count >= 2) & near(l2, l1),
+        (high_count >= 3) & near(h3, h2, h1),
+        (low_count >= 3) & near(l3, l2, l1),
+        (high_count >= 3) & (h2 > np.maximum(h3, h1) + tolerance) & (np.abs(h3 - h1) <= tolerance * 1.5),
+        (low_count >= 3) & (l2 < np.minimum(l3, l1) - tolerance) & (np.abs(l3 - l1) <= tolerance * 1.5),
+        asc_channel,
+        desc_channel,
+        rectangle,
+        symmetrical,
+        asc_triangle,
+        desc_triangle,
+        falling,
+        rising,
+        flagged & narrowing & up,
+        flagged & narrowing & ~up,
+        flagged & ~narrowing & up,
+        flagged & ~narrowing & ~up,
+        cup,
+    ]
+
+
+def _scan_wyckoff(h, l, c, volume, rows: np.ndarray) -> list[np.ndarray]:
+    depth = np.minimum(rows + 1, 40)
+    prior = lambda values, how: _rolling(values, 39, rows - 1, how)  # noqa: E731
+    volume_ratio = volume[rows] / np.maximum(prior(volume, "median"), 1.0)
+    range_high, range_low = prior(h, "max"), prior(l, "min")
+    high, low, close = h[rows], l[rows], c[rows]
+    width = np.maximum(range_high - range_low, 1e-12)
+    close_position = (close - range_low) / width
+    flat = np.abs(_slopes(c, depth, rows)) <= width / depth * 0.15
+    return [
+        (low < range_low) & (close > range_low),
+        (high > range_high) & (close < range_high),
+        flat & (close_position <= 0.45) & (volume_ratio >= 1.1),
+        flat & (close_position >= 0.55) & (volume_ratio >= 1.1),
+        volume_ratio >= 1.5,
+    ]
+
+
+def _scan(df: pd.DataFrame, start: int = 0) -> list[np.ndarray]:
+    """One bool array per PATTERN_WEIGHTS column; bars before `start` stay False."""
+    n = len(df)
+    o, h, l, c = (df[col].to_numpy(dtype=float) for col in ("Open", "High", "Low", "Close"))
+    volume = df["Volume"].to_numpy(dtype=float) if "Volume" in df.columns else np.zeros(n)
+    start = max(start, 0)
+
+    columns = _scan_candlesticks(o, h, l, c, np.arange(start, n)) if n else [np.zeros(0, dtype=bool)] * len(CANDLESTICKS)
+    for min_bars, scanner, args, count in (
+        (20, _scan_chart_structures, (h, l, c), len(CHART_STRUCTURES)),
+        (30, _scan_wyckoff, (h, l, c, volume), len(WYCKOFF)),
+    ):
+        rows = np.arange(max(start, min_bars - 1), n)
+        for flag in scanner(*args, rows) if len(rows) else [np.zeros(0, dtype=bool)] * count:
+            full = np.zeros(n, dtype=bool)
+            full[rows] = flag
+            columns.append(full)
+    return columns
+
+
+def scan_patterns(df: pd.DataFrame, start: int = 0) -> pd.DataFrame:
+    """Every candlestick, chart-structure and Wyckoff detector at every bar.
+
+    Bool frame on df.index with (group, name, direction) columns in
+    PATTERN_WEIGHTS order. Row t is what the detectors report on
+    df.iloc[:t + 1] (each reads at most PATTERN_LOOKBACK bars), so one
+    scan serves a whole backtest or feature matrix. Rows before `start`
+    are left False.
+    """
+    columns = _scan(df, start)
+    return pd.DataFrame(
+        np.column_stack(columns) if len(df) else np.zeros((0, len(columns)), dtype=bool),
+        index=df.index,
+        columns=pd.MultiIndex.from_tuples(list(PATTERN_WEIGHTS), names=["group", "name", "direction"]),
+    )
+
+
+def pattern_support(scan: pd.DataFrame) -> pd.DataFrame:
+    """Per-bar bullish_support / bearish_support, summed like analyze_patterns."""
+    values = scan.to_numpy()
+    bullish = np.zeros(len(scan))
+    bearish = np.zeros(len(scan))
+    for k, (_, _, direction) in enumerate(scan.columns):
+        weight = min(PATTERN_WEIGHTS[scan.columns[k]], 0.30)
+        if direction == "bullish":
+            bullish = bullish + np.where(values[:, k], weight, 0.0)
+        elif direction == "bearish":
+            bearish = bearish + np.where(values[:, k], weight, 0.0)
+    return pd.DataFrame({"bullish_support": bullish, "bearish_support": bearish}, index=scan.index)
+
+
+def _report(flags) -> dict[str, list[dict]]:
+    found: dict[str, list[dict]] = {group: [] for group, _ in PATTERN_GROUPS}
+    for (group, name, direction), hit in zip(PATTERN_WEIGHTS, flags):
+        if hit:
+            _add(found[group], name, direction, PATTERN_WEIGHTS[(group, name, direction)])
+    return found
+
+
+def patterns_at(scan: pd.DataFrame, pos: int = -1) -> dict[str, list[dict]]:
+    """The {group: [pattern, ...]} report for one row of a scan."""
+    return _report(scan.iloc[pos].to_numpy())
+
+
+def _last_bar(df: pd.DataFrame) -> dict[str, list[dict]]:
+    tail = df.tail(PATTERN_LOOKBACK)
+    return _report([flag[-1] for flag in _scan(tail, len(tail) - 1)]) if len(tail) else _report([])
+
+
 def detect_candlesticks(df: pd.DataFrame) -> list[dict]:
+    return _last_bar(df)["candlesticks"]
+
+
+def detect_chart_structures(df: pd.DataFrame) -> list[dict]:
+    return _last_bar(df)["chart_structures"]
+
+
+def detect_wyckoff_context(df: pd.DataFrame) -> list[dict]:
+    return _last_bar(df)["wyckoff"]
+
+
+def analyze_patterns(df: pd.DataFrame, scan: pd.DataFrame | None = None) -> dict:
+    """Pattern evidence at df's last bar.
+
+    scan: an optional scan_patterns() frame built on the same candles
+    (backtests scan the history once); otherwise only the last bar is
+    evaluated.
+    """
+    found = None
+    if scan is not None and len(df) and df.index[-1] in scan.index:
+        pos = scan.index.get_loc(df.index[-1])
+        if isinstance(pos, (int, np.integer)):
+            found = patterns_at(scan, pos)
+    if found is None:
+        found = _last_bar(df)
+    candles, structures, wyckoff = found["candlesticks"], found["chart_structures"], found["wyckoff"]
+    items = candles + structures + wyckoff
+    bullish = sum(pattern["weight"] for pattern in items if pattern["direction"] == "bullish")
+    bearish = sum(pattern["weight"] for pattern in items if pattern["direction"] == "bearish")
+    return {
+        "candlesticks": candles,
+        "chart_structures": structures,
+        "wyckoff": wyckoff,
+        "bullish_support": bullish,
+        "bearish_support": bearish,
+    }
+
+
+# --------------------------------------------------------------------
+# Per-call scalar versions (kept for regression comparison)
+# --------------------------------------------------------------------
+def _metrics(row) -> tuple[float, float, float, float]:
+    body = abs(float(row.Close) - float(row.Open))
+    span = max(float(row.High) - float(row.Low), 1e-12)
+    upper = float(row.High) - max(float(row.Open), float(row.Close))
+    lower = min(float(row.Open), float(row.Close)) - float(row.Low)
+    return body, span, upper, lower
+
+
+def _detect_candlesticks_legacy(df: pd.DataFrame) -> list[dict]:
     if len(df) < 3:
         return []
     found: list[dict] = []
@@ -118,7 +528,7 @@ def _linear_slope(values: pd.Series) -> float:
     return float(np.polyfit(np.arange(len(values)), values.to_numpy(dtype=float), 1)[0])
 
 
-def detect_chart_structures(df: pd.DataFrame) -> list[dict]:
+def _detect_chart_structures_legacy(df: pd.DataFrame) -> list[dict]:
     if len(df) < 20:
         return []
     recent = df.tail(100)
@@ -195,7 +605,7 @@ def detect_chart_structures(df: pd.DataFrame) -> list[dict]:
     return found
 
 
-def detect_wyckoff_context(df: pd.DataFrame) -> list[dict]:
+def _detect_wyckoff_context_legacy(df: pd.DataFrame) -> list[dict]:
     if len(df) < 30:
         return []
     recent = df.tail(40)
@@ -220,19 +630,3 @@ def detect_wyckoff_context(df: pd.DataFrame) -> list[dict]:
     if volume_ratio >= 1.5:
         _add(found, "Wyckoff Volume Confirmation", "neutral", 0.10)
     return found
-
-
-def analyze_patterns(df: pd.DataFrame) -> dict:
-    candles = detect_candlesticks(df)
-    structures = detect_chart_structures(df)
-    wyckoff = detect_wyckoff_context(df)
-    items = candles + structures + wyckoff
-    bullish = sum(pattern["weight"] for pattern in items if pattern["direction"] == "bullish")
-    bearish = sum(pattern["weight"] for pattern in items if pattern["direction"] == "bearish")
-    return {
-        "candlesticks": candles,
-        "chart_structures": structures,
-        "wyckoff": wyckoff,
-        "bullish_support": bullish,
-        "bearish_support": bearish,
-    }
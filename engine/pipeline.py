@@ -22,7 +22,7 @@ import pandas as pd
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from engine import confluence
+from engine import confluence, result_cache
 from engine.data import get_data, normalize_symbol, htf_interval
 from engine.signals_export import export_signals
 from utils.config import INTERVAL
@@ -92,6 +92,8 @@ def predict_symbol(
     trading_style (scalping / intraday / swing).
     Passing an explicit non-default interval (or mtf=False) runs the
     single-timeframe analysis on that interval instead.
+    Identical requests between candle closes are answered from
+    engine/result_cache.py (hits carry a "result_cache" entry).
     """
     from engine.trading_style import normalize_trading_style, primary_entry_tf
 
@@ -103,8 +105,28 @@ def predict_symbol(
         mtf = interval in (None, "", "30min", primary_entry_tf(style))
     interval = interval or primary_entry_tf(style)
     lock_key = f"{symbol}_mtf_{style}" if mtf else f"{symbol}_{interval}"
-    with _lock_for(lock_key):
-        return _predict_locked(symbol, interval, fetch, strategy_mode, on_progress, mtf, style)
+    cache = result_cache.results()
+    key = None
+    if cache.enabled:
+        key = result_cache.prediction_key(
+            symbol, interval, mtf=mtf, style=style, strategy_mode=strategy_mode, fetch=fetch,
+        )
+    cached = cache.get(key.key) if key else None
+    if cached is None:
+        with _lock_for(lock_key):
+            # a caller queued behind the lock usually finds the leader's result
+            cached = cache.get(key.key) if key else None
+            if cached is None:
+                result = _predict_locked(symbol, interval, fetch, strategy_mode, on_progress, mtf, style)
+                if key:
+                    cache.put(key, result)
+                return result
+    if on_progress:
+        age = cached["result_cache"]["age_seconds"]
+        on_progress("cache", f"Reusing {symbol} prediction from {age:.0f}s ago (last candle {cached['last_candle']})")
+        decision = cached["decision"]
+        on_progress("done", f"{symbol}: {decision['action']} (confidence {decision['confidence']:.0%})")
+    return cached
 
 
 def _predict_locked(
@@ -224,8 +246,7 @@ def _predict_locked(
     )
 
     from engine.features import build_features
-    feat_df = build_features(df)
-    last_feats = feat_df.iloc[-1]
+    last_feats = build_features(df, tail=1).iloc[-1]
     feature_snapshot = {
         col: (None if pd.isna(val) else float(val))
         for col, val in last_feats.items()
@@ -0,0 +1,77 @@
+# engine/provider_http.py
+"""Shared HTTP plumbing for the market-data providers.
+
+session(): one keep-alive requests.Session for the whole process, with
+a connection pool sized for the bulk refresher, so back-to-back candle
+requests reuse TLS connections instead of opening one each.
+
+throttle(provider): per-provider token bucket. OANDA allows on the
+order of 100 requests/s per token, so its bucket is generous; the
+Alpha Vantage free tier allows 5/min, so its bucket is strict and
+replaces the fixed sleeps bulk refreshes used to need.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = int(os.getenv("DATA_HTTP_POOL_SIZE", "16"))
+OANDA_REQUESTS_PER_SECOND = float(os.getenv("OANDA_REQUESTS_PER_SECOND", "50"))
+ALPHA_VANTAGE_REQUESTS_PER_MINUTE = float(os.getenv("ALPHA_VANTAGE_REQUESTS_PER_MINUTE", "5"))
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens/second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_buckets = {
+    "oanda": TokenBucket(OANDA_REQUESTS_PER_SECOND, OANDA_REQUESTS_PER_SECOND),
+    "alphavantage": TokenBucket(
+        ALPHA_VANTAGE_REQUESTS_PER_MINUTE / 60, ALPHA_VANTAGE_REQUESTS_PER_MINUTE
+    ),
+}
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def throttle(provider: str) -> float:
+    bucket = _buckets.get(provider)
+    return bucket.acquire() if bucket else 0.0
+
+
+def session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            s = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
@@ -0,0 +1,168 @@
+# engine/records.py
+"""Fixed-field detector outputs that read like the dicts they replace.
+
+Structure events, order blocks, FVGs, pools, sweeps and breakers used to
+be one dict each; a full analysis holds a few hundred of them and the
+top-down stack builds six-plus analyses per request. A record keeps its
+fields in __slots__ (no per-object hash table), which makes it a third
+of the size of the equivalent dict.
+
+Every record is a read-only collections.abc.Mapping over its fields in
+the old key order: r["pos"], r.get(...), "pos" in r, dict(r), {**r},
+iteration, and == against a plain dict all behave as before, and
+pickle / deepcopy work. Known fields may be reassigned (r["status"] =
+...); there is no room for new keys, so variants with extra fields are
+their own type (MssEvent). json.dumps does not accept a Mapping: call
+to_dict() before serialising a record directly.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import Any
+
+
+class Record(Mapping):
+    """Mapping facade over a slotted dataclass; see the module docstring."""
+
+    __slots__ = ()
+    KEYS: tuple[str, ...] = ()
+    _keyset: frozenset = frozenset()
+
+    def __getitem__(self, key):
+        if key in self._keyset:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value) -> None:
+        if key not in self._keyset:
+            raise KeyError(f"{type(self).__name__} has no field {key!r}")
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._keyset else default
+
+    def __contains__(self, key) -> bool:
+        return key in self._keyset
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def keys(self):
+        return self.KEYS
+
+    def values(self):
+        return [getattr(self, k) for k in self.KEYS]
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.KEYS]
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.KEYS}
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self.KEYS == other.KEYS and self.values() == other.values()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+
+def record(cls):
+    """Turn an annotated Record subclass into a slotted dataclass record."""
+    cls = dataclass(slots=True, eq=False)(cls)
+    cls.KEYS = tuple(f.name for f in fields(cls))
+    cls._keyset = frozenset(cls.KEYS)
+    return cls
+
+
+@record
+class StructureEvent(Record):
+    pos: int
+    time: Any
+    kind: str
+    direction: str
+    level: float
+    displacement: bool
+    body_ratio: float
+    break_distance: float
+    quality: str
+    origin_pos: int | None
+    origin_price: float | None
+
+
+@record
+class MssEvent(StructureEvent):
+    sweep_level: float | None
+
+
+@record
+class RejectedBreak(Record):
+    pos: int
+    direction: str
+    level: float
+    reason: str
+
+
+@record
+class OrderBlock(Record):
+    direction: str
+    pos: int
+    time: Any
+    low: float
+    high: float
+    event_pos: int
+    event_kind: str
+    displacement: bool
+    status: str
+    mitigated_pos: int | None
+    invalidated_pos: int | None
+
+
+@record
+class FairValueGap(Record):
+    direction: str
+    pos: int
+    time: Any
+    low: float
+    high: float
+    displacement: bool
+    status: str
+
+
+@record
+class LiquidityPool(Record):
+    side: str
+    level: float
+    points: int
+    positions: list
+    last_pos: int
+    swept: bool
+    swept_pos: int | None
+    sweep_rejected: bool
+
+
+@record
+class Sweep(Record):
+    pos: int
+    time: Any
+    level: float
+    side: str
+    source: str
+    bias: str
+    bars_ago: int
+
+
+@record
+class Breaker(Record):
+    direction: str
+    low: float
+    high: float
+    pos: int
+    flipped_at: int
+    time: Any
@@ -0,0 +1,259 @@
+# engine/result_cache.py
+"""Finished-prediction cache shared by every predict_symbol caller.
+
+The /predict stream, /analyze, the Telegram bot, the alert scanner and
+the confirmation monitor all ask for the same pairs. Between two candle
+closes their answers only differ if something the pipeline reads has
+changed, so a result is stored under
+
+    (symbol, style, strategy, interval / MTF stack, fetch flag,
+     candle mark per timeframe, threshold version + fingerprint,
+     active model ids, ml_mode, min_final_confidence)
+
+Candle marks make invalidation automatic. With live fetching a mark is
+the open time of the candle forming on the provider's grid (a new key
+as soon as any timeframe of the stack closes a bar, and the entry
+expires at the earliest close). Up to 1H that grid is the epoch; H4 and
+daily candles are anchored at OANDA's daily alignment (17:00 New York),
+so a 4H bar closes at 21:00 / 01:00 / ... New York rather than on UTC
+multiples. Offline (fetch=False) a mark is the cache file stamp, so a
+refreshed CSV is a new key. Promoting a threshold or model version
+changes the version part of the key the same way.
+
+Backends (PREDICTION_CACHE): "memory" is a bounded in-process LRU;
+"redis" puts REDIS_URL in front as a second tier shared by all workers
+(JSON-encoded like the SSE payload, so Timestamps come back as strings);
+"off" disables caching. Redis errors degrade to the memory tier. Every
+hit is a private copy the caller may decorate.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+import pandas as pd
+
+from engine.data import (
+    INTERVAL_MINUTES,
+    OANDA_ALIGNMENT_TZ,
+    OANDA_DAILY_ALIGNMENT,
+    cache_file,
+    htf_interval,
+)
+from engine.frame_cache import file_version
+from utils.config import PREDICTION_CACHE, PREDICTION_CACHE_GRACE_SECONDS, PREDICTION_CACHE_SIZE
+from utils.logger import get_logger
+
+log = get_logger("engine.result_cache")
+
+REDIS_PREFIX = "smartflow:prediction:"
+
+
+class PredictionKey(NamedTuple):
+    key: str
+    expires_at: float
+    storable: bool  # False inside the grace window after a candle close
+
+
+def _epoch(wall: pd.Timestamp) -> float:
+    return wall.tz_localize(OANDA_ALIGNMENT_TZ, ambiguous=True, nonexistent="shift_forward").timestamp()
+
+
+def candle_bounds(interval: str, now: float) -> tuple[float, float]:
+    """(open, close) in epoch seconds of the provider candle forming at `now`."""
+    width = INTERVAL_MINUTES.get(interval, 60) * 60
+    if width < 4 * 3600:
+        # New York is a whole-hour UTC offset: intraday grids match the epoch
+        opened = now - now % width
+        return opened, opened + width
+    anchor = pd.Timedelta(hours=OANDA_DAILY_ALIGNMENT)
+    step = pd.Timedelta(seconds=width)
+    wall = pd.Timestamp(now, unit="s", tz="UTC").tz_convert(OANDA_ALIGNMENT_TZ).tz_localize(None)
+    opened = (wall - anchor).floor(step) + anchor
+    return _epoch(opened), _epoch(opened + step)
+
+
+def stack_timeframes(interval: str, mtf: bool, style: str) -> list[str]:
+    """Every timeframe the pipeline reads for this request."""
+    if mtf:
+        from engine.trading_style import all_timeframes
+        return all_timeframes(style)
+    return [tf for tf in (interval, htf_interval(interval)) if tf]
+
+
+def _file_mark(symbol: str, interval: str):
+    path = cache_file(symbol, interval)
+    return list(file_version(path)[1:]) if path else None
+
+
+def prediction_key(
+    symbol: str,
+    interval: str,
+    *,
+    mtf: bool,
+    style: str,
+    strategy_mode: str,
+    fetch: bool,
+    now: float | None = None,
+) -> PredictionKey | None:
+    """Cache key for one normalised request, or None when it cannot be built."""
+    from services.ml_service import active_model_ids
+    from services.threshold_service import resolve_thresholds
+    from engine.analysis_memo import threshold_fingerprint
+    from utils import settings as runtime_settings
+
+    now = time.time() if now is None else now
+    timeframes = stack_timeframes(interval, mtf, style)
+    finest = min(INTERVAL_MINUTES.get(tf, 60) for tf in timeframes) * 60
+    try:
+        if fetch:
+            bounds = [candle_bounds(tf, now) for tf in timeframes]
+            marks = {tf: int(opened) for tf, (opened, _) in zip(timeframes, bounds)}
+        else:
+            marks = {tf: _file_mark(symbol, tf) for tf in timeframes}
+        thresholds, threshold_version_id = resolve_thresholds(symbol, interval, style)
+        parts = {
+            "interval": interval if not mtf else None,
+            "fetch": fetch,
+            "marks": marks,
+            "threshold_version_id": threshold_version_id,
+            "thresholds": threshold_fingerprint(thresholds),
+            "models": list(active_model_ids(symbol, style)),
+            "ml_mode": runtime_settings.get("ml_mode", "active"),
+            "min_final_confidence": runtime_settings.get("min_final_confidence"),
+        }
+    except Exception as exc:
+        log.debug("No prediction cache key for %s: %s", symbol, exc)
+        return None
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:24]
+    key = f"{symbol}:{style}:{strategy_mode}:{'mtf' if mtf else interval}:{digest}"
+    if not fetch:
+        return PredictionKey(key, expires_at=now + finest, storable=True)
+    since_close = now - max(opened for opened, _ in bounds)
+    return PredictionKey(
+        key,
+        expires_at=min(closes for _, closes in bounds),
+        storable=since_close >= PREDICTION_CACHE_GRACE_SECONDS,
+    )
+
+
+class ResultCache:
+    """Expiring LRU of prediction results with an optional Redis tier."""
+
+    def __init__(self, backend: str = PREDICTION_CACHE, max_entries: int = PREDICTION_CACHE_SIZE, client=None):
+        self.backend = backend
+        self.max_entries = max_entries
+        self._client = client
+        self._entries: OrderedDict[str, tuple[float, float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend in ("memory", "redis")
+
+    def _redis(self):
+        if self.backend != "redis":
+            return None
+        if self._client is None:
+            try:
+                import redis
+                url = os.getenv("REDIS_URL", "").strip()
+                self._client = redis.from_url(url, decode_responses=True) if url else False
+            except Exception:
+                self._client = False
+        return self._client or None
+
+    def get(self, key: str) -> dict | None:
+        """Private copy of a live entry (annotated with result_cache), or None."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            return self._annotate(copy.deepcopy(entry[2]), "memory", now - entry[1])
+
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.get(REDIS_PREFIX + key)
+            except Exception as exc:
+                log.warning("Redis prediction cache unavailable: %s", exc)
+                raw = None
+            if raw:
+                body = json.loads(raw)
+                with self._lock:
+                    self.redis_hits += 1
+                return self._annotate(body["result"], "redis", now - body["stored_at"])
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: PredictionKey, result: dict) -> None:
+        if not self.enabled or not key.storable:
+            return
+        now = time.time()
+        if key.expires_at <= now:
+            return
+        with self._lock:
+            self._entries[key.key] = (key.expires_at, now, copy.deepcopy(result))
+            self._entries.move_to_end(key.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stores += 1
+
+        client = self._redis()
+        if client is not None:
+            try:
+                body = json.dumps({"stored_at": now, "result": result}, default=str)
+                client.set(REDIS_PREFIX + key.key, body, ex=max(1, int(key.expires_at - now)))
+            except Exception as exc:
+                log.warning("Could not store prediction %s in Redis: %s", key.key, exc)
+
+    @staticmethod
+    def _annotate(result: dict, backend: str, age: float) -> dict:
+        result["result_cache"] = {"hit": True, "backend": backend, "age_seconds": round(age, 3)}
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+            }
+
+
+_results = ResultCache()
+
+
+def results() -> ResultCache:
+    return _results
+
+
+def prediction_cache_stats() -> dict:
+    return _results.stats()
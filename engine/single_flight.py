@@ -0,0 +1,169 @@
+# engine/single_flight.py
+"""Request coalescing for expensive calls (live provider fetches).
+
+SingleFlight: concurrent callers for the same key inside one process
+share a single execution; the first caller runs fn(), the rest block
+until it finishes and receive the same result (or the same exception).
+
+RedisFlight: the cross-process variant for gunicorn workers. The
+leader holds a short-TTL Redis lock while it runs fn() and publishes a
+small JSON payload before releasing it; other processes wait for the
+lock to clear and rebuild their result from that payload (for candle
+fetches: re-read the cache file the leader just wrote). Any Redis
+error degrades to running fn() locally — coalescing is an optimisation,
+never a dependency.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable
+
+from utils.logger import get_logger
+
+log = get_logger("engine.single_flight")
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Per-key in-process call coalescing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Any, _Call] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """Return (result, shared); shared is True when another caller ran fn."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "shared": self.shared}
+
+
+class RedisFlight:
+    """Cross-process coalescing through a Redis lock plus a result key."""
+
+    def __init__(
+        self,
+        client,
+        *,
+        prefix: str = "smartflow:flight:",
+        lock_ttl: int = 90,
+        wait_timeout: float = 60.0,
+        poll_interval: float = 0.1,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        publish: Callable[[Any], Any],
+        on_peer: Callable[[Any], Any],
+    ) -> tuple[Any, bool]:
+        """Run fn() as the cluster-wide leader or adopt the leader's outcome.
+
+        publish(result) -> JSON-serialisable payload stored for followers;
+        on_peer(payload) -> result rebuilt in a follower process.
+        """
+        lock_key, result_key = f"{self.prefix}{key}:lock", f"{self.prefix}{key}:result"
+        token = uuid.uuid4().hex
+        try:
+            acquired = bool(self.client.set(lock_key, token, nx=True, ex=self.lock_ttl))
+            holder = None if acquired else self.client.get(lock_key)
+        except Exception as exc:
+            log.warning("Redis single-flight unavailable for %s: %s", key, exc)
+            return fn(), False
+
+        if acquired:
+            try:
+                result = fn()
+                self._publish(result_key, token, publish(result))
+                return result, False
+            finally:
+                self._release(lock_key, token)
+
+        payload = self._wait_for(lock_key, result_key, holder)
+        if payload is None:
+            log.warning("No coalesced result for %s after %.0fs — fetching locally", key, self.wait_timeout)
+            return fn(), False
+        return on_peer(payload), True
+
+    def _publish(self, result_key: str, token: str, payload) -> None:
+        try:
+            body = json.dumps({"token": token, "payload": payload}, default=str)
+            self.client.set(result_key, body, ex=self.lock_ttl)
+        except Exception as exc:
+            log.warning("Could not publish coalesced result %s: %s", result_key, exc)
+
+    def _release(self, lock_key: str, token: str) -> None:
+        # compare-and-delete in one step: a lock that expired and was taken
+        # by another leader in between must not be deleted
+        try:
+            self.client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+        except Exception:
+            pass  # the TTL clears it
+
+    def _wait_for(self, lock_key: str, result_key: str, holder: str | None):
+        """Payload published by `holder`, or None on timeout / lost leader."""
+        if holder is None:
+            return None  # lock vanished between SET and GET; nothing to adopt
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while time.monotonic() < deadline:
+                if self.client.get(lock_key) != holder:
+                    raw = self.client.get(result_key)
+                    body = json.loads(raw) if raw else None
+                    if body and body.get("token") == holder:
+                        return body.get("payload")
+                    return None
+                time.sleep(self.poll_interval)
+        except Exception as exc:
+            log.warning("Redis single-flight wait failed for %s: %s", lock_key, exc)
+        return None
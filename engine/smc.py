@@ -15,9 +15,21 @@ instead of counting every raw pattern:
 - Liquidity pools are clusters of equal highs/lows and carry their
   swept/unswept state.
 """
+from typing import NamedTuple
+
 import numpy as np
 import pandas as pd
 
+from engine.records import (
+    FairValueGap,
+    LiquidityPool,
+    MssEvent,
+    OrderBlock,
+    RejectedBreak,
+    StructureEvent,
+)
+from engine.touch_index import TouchIndex, touch_index
+
 
 # --------------------------------------------------------------------
 # Shared helpers
@@ -32,13 +44,64 @@ def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     return tr.ewm(alpha=1 / period, adjust=False).mean()
 
 
+SWING_HIGH, SWING_LOW = 1, -1
+
+
+def swing_points(
+    highs: np.ndarray, lows: np.ndarray, window: int = 3
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fractal swings as compact arrays (pos int64, kind int8, price float64).
+
+    kind is SWING_HIGH / SWING_LOW. A bar is a swing high when its high
+    is strictly above every high `window` bars either side (lows
+    mirrored). Rows are ordered by pos, a high before a low on the same
+    bar — the order find_swings() has always produced.
+    """
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    n = len(highs)
+    if n < 2 * window + 1:
+        return np.empty(0, np.int64), np.empty(0, np.int8), np.empty(0, float)
+    # win_max[j] = max(highs[j:j + window]); left of bar i is win_max[i - window],
+    # right of it win_max[i + 1]. NaN propagates, so a NaN neighbour blocks a swing.
+    win_max = np.lib.stride_tricks.sliding_window_view(highs, window).max(axis=1)
+    win_min = np.lib.stride_tricks.sliding_window_view(lows, window).min(axis=1)
+    core = slice(window, n - window)
+    left, right = slice(0, n - 2 * window), slice(window + 1, n - window + 1)
+    is_high = (highs[core] > win_max[left]) & (highs[core] > win_max[right])
+    is_low = (lows[core] < win_min[left]) & (lows[core] < win_min[right])
+
+    high_pos = np.flatnonzero(is_high) + window
+    low_pos = np.flatnonzero(is_low) + window
+    pos = np.concatenate([high_pos, low_pos])
+    kind = np.concatenate([
+        np.full(len(high_pos), SWING_HIGH, np.int8), np.full(len(low_pos), SWING_LOW, np.int8),
+    ])
+    price = np.concatenate([highs[high_pos], lows[low_pos]])
+    order = np.argsort(pos * 2 + (kind == SWING_LOW), kind="stable")
+    return pos[order], kind[order], price[order]
+
+
 def find_swings(df: pd.DataFrame, window: int = 3) -> pd.DataFrame:
     """Confirmed fractal swing highs/lows.
 
     A swing is only confirmed `window` candles after it forms — that
     confirmation delay is respected by detect_structure so no signal
-    looks into the future.
+    looks into the future. Frame adapter over swing_points().
     """
+    pos, kind, price = swing_points(df["High"].to_numpy(), df["Low"].to_numpy(), window)
+    if not len(pos):
+        return pd.DataFrame([], columns=["pos", "time", "kind", "price"])
+    return pd.DataFrame({
+        "pos": pos,
+        "time": df.index[pos],
+        "kind": np.where(kind == SWING_HIGH, "high", "low").astype(object),
+        "price": price,
+    })
+
+
+def _find_swings_legacy(df: pd.DataFrame, window: int = 3) -> pd.DataFrame:
+    """Per-bar Python loop (kept for regression comparison)."""
     highs = df["High"].to_numpy()
     lows = df["Low"].to_numpy()
     rows = []
@@ -55,6 +118,20 @@ def find_swings(df: pd.DataFrame, window: int = 3) -> pd.DataFrame:
 # --------------------------------------------------------------------
 # Market structure: BOS / CHoCH (close-confirmed)
 # --------------------------------------------------------------------
+class StructureCarry(NamedTuple):
+    """Where the BOS/CHoCH state machine stands after a run of bars.
+
+    ref_high / ref_low: the armed reference levels (None once broken, or
+    before the first confirmed swing); last_high / last_low: (pos, price)
+    of the latest confirmed swings, the next break's impulse origin.
+    """
+    trend: int = 0
+    ref_high: float | None = None
+    ref_low: float | None = None
+    last_high: tuple[int, float] | None = None
+    last_low: tuple[int, float] | None = None
+
+
 def detect_structure(
     df: pd.DataFrame,
     swings: pd.DataFrame,
@@ -63,16 +140,222 @@ def detect_structure(
     displacement_mult: float = 1.2,
     min_break_abs: float = 0.0,
 ) -> dict:
-    """Walk the candles chronologically tracking structure state.
+    """Track structure state over the candles chronologically.
 
-    Returns {'events': [...], 'trend': +1|-1|0}.
+    Returns {'events': [...], 'trend': +1|-1|0, 'rejected_breaks': [...]}.
 
     Each event: pos, time, kind ('BOS'|'CHoCH'), direction
     ('bullish'|'bearish'), level (broken swing price), displacement
     (bool — breaking candle body > displacement_mult * ATR),
     origin_pos/origin_price (swing that started the impulse leg, used
     for OTE and dealing-range maths).
+
+    A swing becomes the reference level `window` bars after it forms and
+    stays armed until the first strong close beyond it (or the next
+    confirmed swing of the same side replaces it). Frame adapter over
+    advance_structure() from an empty carry.
+    """
+    ordered = swings.sort_values("pos")
+    events, rejected, carry = advance_structure(
+        df["Open"].to_numpy(dtype=float),
+        df["High"].to_numpy(dtype=float),
+        df["Low"].to_numpy(dtype=float),
+        df["Close"].to_numpy(dtype=float),
+        None if atr_series is None else atr_series.to_numpy(dtype=float),
+        df.index,
+        ordered["pos"].to_numpy(dtype=np.int64),
+        (ordered["kind"] == "high").to_numpy(),
+        ordered["price"].to_numpy(dtype=float),
+        window,
+        displacement_mult=displacement_mult,
+        min_break_abs=min_break_abs,
+    )
+    return {"events": events, "trend": carry.trend, "rejected_breaks": rejected}
+
+
+def advance_structure(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    atr_np: np.ndarray | None,
+    index,
+    sw_pos: np.ndarray,
+    sw_high: np.ndarray,
+    sw_price: np.ndarray,
+    window: int = 3,
+    *,
+    displacement_mult: float = 1.2,
+    min_break_abs: float = 0.0,
+    carry: StructureCarry = StructureCarry(),
+    offset: int = 0,
+) -> tuple[list, list, StructureCarry]:
+    """detect_structure over bars offset.. (the arrays), resumed from carry.
+
+    Returns (events, rejected breaks, carry after the last bar); event
+    positions are absolute. sw_*: swings sorted by pos (absolute); only
+    those confirmed inside the run are read, the earlier ones are in
+    carry. Bullish and bearish references are independent, so each side
+    is resolved with array operations over its reference segments (the
+    carried level is a segment armed on the first bar); only the few
+    resulting events are walked in order to label BOS vs CHoCH. Feeding
+    one bar per call (engine/incremental.py) or the whole frame at once
+    gives the same events.
     """
+    n = len(closes)
+    body = np.abs(closes - opens)
+    body_ratio = body / np.maximum(highs - lows, 1e-12)
+    if atr_np is not None:
+        atr_ok = ~np.isnan(atr_np) & (atr_np > 0)
+        displaced = atr_ok & (body > displacement_mult * atr_np)
+        required = np.maximum(min_break_abs, np.where(atr_ok, 0.05 * atr_np, 0.0))
+    else:
+        displaced = np.zeros(n, dtype=bool)
+        required = np.full(n, max(min_break_abs, 0.0))
+
+    confirm = sw_pos + window - offset
+    in_run = (confirm >= 0) & (confirm < n)
+    high_sel, low_sel = in_run & sw_high, in_run & ~sw_high
+    high_conf, high_pos, high_price = confirm[high_sel], sw_pos[high_sel], sw_price[high_sel]
+    low_conf, low_pos, low_price = confirm[low_sel], sw_pos[low_sel], sw_price[low_sel]
+    bull_conf, bull_levels = _armed_segments(carry.ref_high, high_conf, high_price)
+    bear_conf, bear_levels = _armed_segments(carry.ref_low, low_conf, low_price)
+
+    weak = body_ratio < 0.30
+    bull = _side_breaks(closes, required, bull_conf, bull_levels, +1, weak | (closes <= opens))
+    bear = _side_breaks(
+        closes, required, bear_conf, bear_levels, -1, weak | (closes >= opens),
+        blocked=bull[0],
+    )
+
+    bars = np.concatenate([bull[1][0], bear[1][0]])
+    order = np.argsort(bars, kind="stable")
+    bars = bars[order]
+    levels = np.concatenate([bull[1][1], bear[1][1]])[order]
+    bullish = order < len(bull[1][0])
+    # impulse origin: the latest opposite swing confirmed by the break bar
+    low_k = np.searchsorted(low_conf, bars, side="right") - 1
+    high_k = np.searchsorted(high_conf, bars, side="right") - 1
+    origin_k = np.where(bullish, low_k, high_k)
+    times = index[bars]
+    ratios = np.round(body_ratio[bars], 4)
+
+    events: list[dict] = []
+    trend = carry.trend
+    for j, i in enumerate(bars.tolist()):
+        level, k = float(levels[j]), int(origin_k[j])
+        if bullish[j]:
+            kind = "BOS" if trend >= 0 else "CHoCH"
+            origin = (int(low_pos[k]), float(low_price[k])) if k >= 0 else carry.last_low
+        else:
+            kind = "BOS" if trend <= 0 else "CHoCH"
+            origin = (int(high_pos[k]), float(high_price[k])) if k >= 0 else carry.last_high
+        close = float(closes[i])
+        events.append(StructureEvent(
+            pos=offset + i,
+            time=times[j],
+            kind=kind,
+            direction="bullish" if bullish[j] else "bearish",
+            level=level,
+            displacement=bool(displaced[i]),
+            body_ratio=ratios[j],
+            break_distance=float(close - level) if bullish[j] else float(level - close),
+            quality="institutional" if displaced[i] else "confirmed",
+            origin_pos=origin[0] if origin else None,
+            origin_price=origin[1] if origin else None,
+        ))
+        trend = 1 if bullish[j] else -1
+
+    rejected = sorted(
+        [(int(i), 0, lvl) for i, lvl in zip(*bull[2])] + [(int(i), 1, lvl) for i, lvl in zip(*bear[2])]
+    )
+    rejected_breaks = [
+        RejectedBreak(
+            pos=offset + i, direction="bullish" if side == 0 else "bearish", level=float(level),
+            reason="weak or opposing break candle",
+        )
+        for i, side, level in rejected
+    ]
+    carry = StructureCarry(
+        trend=trend,
+        ref_high=_still_armed(bull_conf, bull_levels, bull[1][0]),
+        ref_low=_still_armed(bear_conf, bear_levels, bear[1][0]),
+        last_high=(int(high_pos[-1]), float(high_price[-1])) if len(high_pos) else carry.last_high,
+        last_low=(int(low_pos[-1]), float(low_price[-1])) if len(low_pos) else carry.last_low,
+    )
+    return events, rejected_breaks, carry
+
+
+def _armed_segments(
+    carried: float | None, confirm_bars: np.ndarray, levels: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """One side's reference segments, led by the carried level (armed on bar 0)."""
+    if carried is None or (len(confirm_bars) and confirm_bars[0] == 0):
+        return confirm_bars, levels
+    return np.concatenate(([0], confirm_bars)), np.concatenate(([carried], levels))
+
+
+def _still_armed(confirm_bars: np.ndarray, levels: np.ndarray, event_bars: np.ndarray) -> float | None:
+    """The last segment's level if no break has disarmed it."""
+    if not len(confirm_bars) or (len(event_bars) and event_bars[-1] >= confirm_bars[-1]):
+        return None
+    return float(levels[-1])
+
+
+def _side_breaks(
+    closes: np.ndarray,
+    required: np.ndarray,
+    confirm_bars: np.ndarray,
+    levels: np.ndarray,
+    sign: int,
+    weak: np.ndarray,
+    blocked: np.ndarray | None = None,
+) -> tuple[np.ndarray, tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]:
+    """Breaks of one side's reference swings.
+
+    Segment k runs from confirm_bars[k] to the next confirmation; its
+    level is armed until the first strong close beyond it. Returns
+    (event mask, (event bars, levels), (rejected bars, levels)).
+    blocked bars (an opposite-side break on the same candle, which wins)
+    cannot break but do not disarm the level either.
+    """
+    n = len(closes)
+    if not len(confirm_bars):
+        none = np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
+        return np.zeros(n, dtype=bool), none, none
+    bars = np.arange(n)
+    seg = np.searchsorted(confirm_bars, bars, side="right") - 1
+    armed = seg >= 0
+    level = np.where(armed, levels[np.maximum(seg, 0)], np.nan)
+    if sign > 0:
+        crossed = armed & (closes > level + required)
+    else:
+        crossed = armed & (closes < level - required)
+    strong = crossed & ~weak
+    if blocked is not None:
+        strong &= ~blocked
+
+    candidates = np.flatnonzero(strong)
+    segments, first = np.unique(seg[candidates], return_index=True)
+    break_at = np.full(len(confirm_bars), n, dtype=np.int64)
+    break_at[segments] = candidates[first]
+    event_bars = candidates[first]
+
+    mask = np.zeros(n, dtype=bool)
+    mask[event_bars] = True
+    rejected_bars = np.flatnonzero(crossed & weak & (bars < break_at[np.maximum(seg, 0)]))
+    return mask, (event_bars, level[event_bars]), (rejected_bars, level[rejected_bars])
+
+
+def _detect_structure_legacy(
+    df: pd.DataFrame,
+    swings: pd.DataFrame,
+    window: int = 3,
+    atr_series: pd.Series | None = None,
+    displacement_mult: float = 1.2,
+    min_break_abs: float = 0.0,
+) -> dict:
+    """Per-bar state-machine walk (kept for regression comparison)."""
     closes = df["Close"].to_numpy()
     opens = df["Open"].to_numpy()
     atr_np = atr_series.to_numpy() if atr_series is not None else None
@@ -185,9 +468,10 @@ def detect_mss(
             if ev["kind"] == "CHoCH":
                 expected = "bullish" if sweep["bias"] == "bullish" else "bearish"
                 if ev["direction"] == expected:
-                    tagged = dict(ev)
-                    tagged["kind"] = "MSS"
-                    tagged["sweep_level"] = sweep.get("level")
+                    if isinstance(ev, StructureEvent):
+                        tagged = MssEvent(**{**ev, "kind": "MSS"}, sweep_level=sweep.get("level"))
+                    else:
+                        tagged = {**ev, "kind": "MSS", "sweep_level": sweep.get("level")}
                     mss_events.append(tagged)
                     break
     return mss_events
@@ -200,6 +484,7 @@ def detect_order_blocks(
     df: pd.DataFrame,
     structure_events: list[dict],
     lookback: int = 15,
+    touch: TouchIndex | None = None,
 ) -> list[dict]:
     """Order blocks derived only from structure-breaking impulses.
 
@@ -209,9 +494,325 @@ def detect_order_blocks(
       mitigated   — price tapped the zone but the block held
       invalidated — price closed through the block (unusable for entry;
                     kept because it may act as a breaker block)
+
+    Mitigation/invalidation bars come from one batched first-touch query
+    (engine/touch_index.py); pass the frame's shared TouchIndex as
+    `touch` to reuse its tables.
     """
     opens = df["Open"].to_numpy()
     closes = df["Close"].to_numpy()
+    found = [
+        (ev, j) for ev in structure_events
+        if (j := order_block_origin(opens, closes, ev, lookback)) is not None
+    ]
+    if not found:
+        return []
+    touch = touch_index(df, touch)
+    zone_low, zone_high = order_block_zones(df, found)
+    touched, broken = order_block_touches(touch, found, zone_low, zone_high)
+    return order_block_records(df, found, zone_low, zone_high, touched, broken)
+
+
+def order_block_origin(opens: np.ndarray, closes: np.ndarray, event: dict, lookback: int = 15) -> int | None:
+    """The last opposite-colour candle before the event's impulse, if any."""
+    i = event["pos"]
+    scan_start = max(0, i - lookback)
+    if event.get("origin_pos") is not None:
+        scan_start = max(scan_start, event["origin_pos"])
+    bullish = event["direction"] == "bullish"
+    for j in range(i - 1, scan_start - 1, -1):
+        if (closes[j] < opens[j]) if bullish else (closes[j] > opens[j]):
+            return j
+    return None
+
+
+def order_block_zones(df: pd.DataFrame, found: list[tuple[dict, int]]) -> tuple[np.ndarray, np.ndarray]:
+    """(low, high) of each (event, origin candle) block."""
+    origin = np.array([j for _, j in found], dtype=np.int64)
+    return df["Low"].to_numpy()[origin].astype(float), df["High"].to_numpy()[origin].astype(float)
+
+
+def order_block_touches(
+    touch: TouchIndex,
+    found: list[tuple[dict, int]],
+    zone_low: np.ndarray,
+    zone_high: np.ndarray,
+    from_bar: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """First mitigating (wick into) and invalidating (close through) bar per block.
+
+    Scans from the bar after each block's event, or from_bar if later;
+    len(frame) where none has happened yet.
+    """
+    starts = np.array([max(ev["pos"] + 1, from_bar) for ev, _ in found], dtype=np.int64)
+    bullish = np.array([ev["direction"] == "bullish" for ev, _ in found])
+    touched = np.where(
+        bullish,
+        touch.first_below("Low", starts, zone_high, inclusive=True),
+        touch.first_above("High", starts, zone_low, inclusive=True),
+    )
+    broken = np.where(
+        bullish,
+        touch.first_below("Close", starts, zone_low),
+        touch.first_above("Close", starts, zone_high),
+    )
+    return touched, broken
+
+
+def order_block_records(
+    df: pd.DataFrame,
+    found: list[tuple[dict, int]],
+    zone_low: np.ndarray,
+    zone_high: np.ndarray,
+    touched: np.ndarray,
+    broken: np.ndarray,
+) -> list[dict]:
+    """OrderBlock records with their life-cycle status (bars >= len(df): not yet)."""
+    n = len(df)
+    times = df.index[np.array([j for _, j in found], dtype=np.int64)]
+    blocks: list[dict] = []
+    for k, ((ev, j), time) in enumerate(zip(found, times)):
+        mitigated_pos = int(touched[k]) if touched[k] < n else None
+        invalidated_pos = int(broken[k]) if broken[k] < n else None
+        status = "invalidated" if invalidated_pos is not None else (
+            "mitigated" if mitigated_pos is not None else "fresh"
+        )
+        blocks.append(OrderBlock(
+            direction=ev["direction"],
+            pos=j,
+            time=time,
+            low=float(zone_low[k]),
+            high=float(zone_high[k]),
+            event_pos=ev["pos"],
+            event_kind=ev["kind"],
+            displacement=ev["displacement"],
+            status=status,
+            mitigated_pos=mitigated_pos,
+            invalidated_pos=invalidated_pos,
+        ))
+    return blocks
+
+
+def valid_order_blocks(blocks: list[dict]) -> list[dict]:
+    """Blocks still usable as entry zones (fresh or once-mitigated)."""
+    return [b for b in blocks if b["status"] != "invalidated"]
+
+
+# --------------------------------------------------------------------
+# Fair value gaps (correct 3-candle logic, displacement required)
+# --------------------------------------------------------------------
+def detect_fvg(
+    df: pd.DataFrame,
+    atr_series: pd.Series,
+    require_displacement: bool = True,
+    displacement_mult: float = 1.0,
+    touch: TouchIndex | None = None,
+) -> list[dict]:
+    """Three-candle imbalances.
+
+    Bullish FVG: high[i-1] < low[i+1] (gap left under price as it drove
+    up). Bearish FVG: low[i-1] > high[i+1]. The middle candle must be a
+    displacement candle for the gap to be a valid signal. Fully filled
+    gaps are discarded; partially traded gaps stay valid.
+    """
+    return fvgs_from_candidates(
+        df, fvg_candidates(df, atr_series), require_displacement, displacement_mult, touch,
+    )
+
+
+def fvg_candidates(df: pd.DataFrame, atr_series: pd.Series) -> tuple[np.ndarray, ...]:
+    """(middle-candle index, bullish, body, ATR at the middle candle) of every raw gap.
+
+    Independent of the displacement multiplier, so a threshold sweep
+    computes it once per window (services/threshold_sweep.py).
+    """
+    highs = df["High"].to_numpy()
+    lows = df["Low"].to_numpy()
+    opens = df["Open"].to_numpy()
+    closes = df["Close"].to_numpy()
+    atr_np = atr_series.to_numpy()
+
+    bull_idx = np.where(highs[:-2] < lows[2:])[0] + 1  # middle-candle index
+    bear_idx = np.where(lows[:-2] > highs[2:])[0] + 1
+    mid = np.concatenate([bull_idx, bear_idx]).astype(np.int64)
+    bullish = np.arange(len(mid)) < len(bull_idx)
+    return mid, bullish, np.abs(closes[mid] - opens[mid]), atr_np[mid]
+
+
+def fvgs_from_candidates(
+    df: pd.DataFrame,
+    candidates: tuple[np.ndarray, ...],
+    require_displacement: bool = True,
+    displacement_mult: float = 1.0,
+    touch: TouchIndex | None = None,
+) -> list[dict]:
+    """detect_fvg() from precomputed fvg_candidates()."""
+    mid, bullish, body, atr_mid = candidates
+    if not len(mid):
+        return []
+    with np.errstate(invalid="ignore"):
+        displaced = ~np.isnan(atr_mid) & (atr_mid > 0) & (body >= displacement_mult * atr_mid)
+    gaps = fvg_records(df, mid, bullish, displaced, require_displacement, touch)
+    return sorted(gaps, key=lambda g: g["pos"])
+
+
+def fvg_records(
+    df: pd.DataFrame,
+    mid: np.ndarray,
+    bullish: np.ndarray,
+    displaced: np.ndarray,
+    require_displacement: bool = True,
+    touch: TouchIndex | None = None,
+    hits: tuple[np.ndarray, np.ndarray] | None = None,
+) -> list[dict]:
+    """Gap records (fill state resolved) for candidate middle candles, in input order.
+
+    hits: fvg_touches() of the candidates when the caller tracks them
+    (bars >= len(df): not yet); queried here otherwise.
+    """
+    mid = np.asarray(mid, dtype=np.int64)
+    if not len(mid):
+        return []
+    bullish = np.asarray(bullish, dtype=bool)
+    displaced = np.asarray(displaced, dtype=bool)
+    n = len(df)
+    zone_low, zone_high = fvg_zones(df, mid, bullish)
+    if hits is None:
+        hits = fvg_touches(touch_index(df, touch), mid, bullish, zone_low, zone_high)
+    filled, partial = hits[0] < n, hits[1] < n
+    keep = ~filled & (displaced | (not require_displacement))
+
+    return [
+        FairValueGap(
+            direction="bullish" if bullish[k] else "bearish",
+            pos=int(mid[k]),
+            time=df.index[mid[k]],
+            low=float(zone_low[k]),
+            high=float(zone_high[k]),
+            displacement=bool(displaced[k]),
+            status="partial" if partial[k] else "open",
+        )
+        for k in np.flatnonzero(keep)
+    ]
+
+
+def fvg_zones(df: pd.DataFrame, mid: np.ndarray, bullish: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(low, high) of the gap around each middle candle."""
+    highs = df["High"].to_numpy()
+    lows = df["Low"].to_numpy()
+    zone_low = np.where(bullish, highs[mid - 1], highs[mid + 1]).astype(float)
+    zone_high = np.where(bullish, lows[mid + 1], lows[mid - 1]).astype(float)
+    return zone_low, zone_high
+
+
+def fvg_touches(
+    touch: TouchIndex,
+    mid: np.ndarray,
+    bullish: np.ndarray,
+    zone_low: np.ndarray,
+    zone_high: np.ndarray,
+    from_bar: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """First filling and first partially-filling bar per gap (len(frame): none yet).
+
+    Scans from the bar after the gap's third candle, or from_bar if later.
+    """
+    starts = np.maximum(mid + 2, from_bar)
+    filled = np.where(
+        bullish,
+        touch.first_below("Low", starts, zone_low, inclusive=True),
+        touch.first_above("High", starts, zone_high, inclusive=True),
+    )
+    partial = np.where(
+        bullish,
+        touch.first_below("Low", starts, zone_high, inclusive=True),
+        touch.first_above("High", starts, zone_low, inclusive=True),
+    )
+    return filled, partial
+
+
+# --------------------------------------------------------------------
+# Liquidity pools (equal highs / equal lows, swept-state tracked)
+# --------------------------------------------------------------------
+def detect_liquidity_pools(
+    df: pd.DataFrame,
+    swings: pd.DataFrame,
+    tolerance: float,
+    min_points: int = 2,
+    touch: TouchIndex | None = None,
+) -> list[dict]:
+    """Clusters of equal swing highs (buy-side) / lows (sell-side).
+
+    tolerance is an absolute price distance (caller usually passes a
+    fraction of ATR). Each pool records whether it has been swept and
+    whether the sweeping candle closed back inside (a rejection — the
+    raw material for ICT sweep signals) or closed through (a breakout).
+    """
+    closes = df["Close"].to_numpy()
+    n = len(df)
+    groups: list[tuple[str, np.ndarray, np.ndarray]] = []
+
+    def cluster(prices: np.ndarray, positions: np.ndarray, side: str):
+        order = np.argsort(prices, kind="quicksort")  # DataFrame.sort_values' order
+        prices, positions = prices[order], positions[order]
+        bounds = np.flatnonzero(np.abs(np.diff(prices)) > tolerance) + 1
+        edges = [0, *bounds.tolist(), len(prices)]
+        for a, b in zip(edges[:-1], edges[1:]):
+            if b - a >= min_points:
+                groups.append((side, prices[a:b], positions[a:b]))
+
+    if not swings.empty:
+        is_high = (swings["kind"] == "high").to_numpy()
+        prices, positions = swings["price"].to_numpy(dtype=float), swings["pos"].to_numpy()
+        cluster(prices[is_high], positions[is_high], "buyside")
+        cluster(prices[~is_high], positions[~is_high], "sellside")
+    if not groups:
+        return []
+
+    buyside = np.array([side == "buyside" for side, _, _ in groups])
+    levels = np.array([
+        prices.max() if side == "buyside" else prices.min() for side, prices, _ in groups
+    ])
+    last = np.array([positions.max() for _, _, positions in groups], dtype=np.int64)
+    touch = touch_index(df, touch)
+    breach = np.where(
+        buyside,
+        touch.first_above("High", last + 1, levels),
+        touch.first_below("Low", last + 1, levels),
+    )
+
+    pools: list[dict] = []
+    for k, (side, prices, positions) in enumerate(groups):
+        level = levels[k]
+        swept = bool(breach[k] < n)
+        swept_pos = int(breach[k]) if swept else None
+        sweep_rejected = False
+        if swept:
+            sweep_rejected = closes[swept_pos] < level if side == "buyside" else closes[swept_pos] > level
+        pools.append(LiquidityPool(
+            side=side,
+            level=float(level),
+            points=len(prices),
+            positions=positions.tolist(),
+            last_pos=int(last[k]),
+            swept=swept,
+            swept_pos=swept_pos,
+            sweep_rejected=sweep_rejected,
+        ))
+    return pools
+
+
+# --------------------------------------------------------------------
+# Per-object scan versions (kept for regression comparison)
+# --------------------------------------------------------------------
+def _detect_order_blocks_legacy(
+    df: pd.DataFrame,
+    structure_events: list[dict],
+    lookback: int = 15,
+) -> list[dict]:
+    """Per-block future scans (kept for regression comparison)."""
+    opens = df["Open"].to_numpy()
+    closes = df["Close"].to_numpy()
     highs = df["High"].to_numpy()
     lows = df["Low"].to_numpy()
     n = len(df)
@@ -272,27 +873,13 @@ def detect_order_blocks(
     return blocks
 
 
-def valid_order_blocks(blocks: list[dict]) -> list[dict]:
-    """Blocks still usable as entry zones (fresh or once-mitigated)."""
-    return [b for b in blocks if b["status"] != "invalidated"]
-
-
-# --------------------------------------------------------------------
-# Fair value gaps (correct 3-candle logic, displacement required)
-# --------------------------------------------------------------------
-def detect_fvg(
+def _detect_fvg_legacy(
     df: pd.DataFrame,
     atr_series: pd.Series,
     require_displacement: bool = True,
     displacement_mult: float = 1.0,
 ) -> list[dict]:
-    """Three-candle imbalances.
-
-    Bullish FVG: high[i-1] < low[i+1] (gap left under price as it drove
-    up). Bearish FVG: low[i-1] > high[i+1]. The middle candle must be a
-    displacement candle for the gap to be a valid signal. Fully filled
-    gaps are discarded; partially traded gaps stay valid.
-    """
+    """Per-gap future scans (kept for regression comparison)."""
     highs = df["High"].to_numpy()
     lows = df["Low"].to_numpy()
     opens = df["Open"].to_numpy()
@@ -350,22 +937,13 @@ def detect_fvg(
     return sorted(gaps, key=lambda g: g["pos"])
 
 
-# --------------------------------------------------------------------
-# Liquidity pools (equal highs / equal lows, swept-state tracked)
-# --------------------------------------------------------------------
-def detect_liquidity_pools(
+def _detect_liquidity_pools_legacy(
     df: pd.DataFrame,
     swings: pd.DataFrame,
     tolerance: float,
     min_points: int = 2,
 ) -> list[dict]:
-    """Clusters of equal swing highs (buy-side) / lows (sell-side).
-
-    tolerance is an absolute price distance (caller usually passes a
-    fraction of ATR). Each pool records whether it has been swept and
-    whether the sweeping candle closed back inside (a rejection — the
-    raw material for ICT sweep signals) or closed through (a breakout).
-    """
+    """Per-pool future scans (kept for regression comparison)."""
     highs = df["High"].to_numpy()
     lows = df["Low"].to_numpy()
     closes = df["Close"].to_numpy()
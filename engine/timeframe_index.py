@@ -0,0 +1,241 @@
+# engine/timeframe_index.py
+"""Persisted base-bar -> higher-timeframe alignment with materialised bars.
+
+A missing higher timeframe (4H, daily, ...) is derived from a cached
+lower one by resampling, and until now that happened on every request.
+A TimeframeIndex holds the result once:
+
+    pos[i]       position of the derived bar that contains base bar i
+    frame()      the derived OHLCV bars, equal to
+                 resample_ohlc(base, rule) value for value
+
+closed_positions() turns pos into the no-lookahead view: the last
+derived bar that had fully closed when base bar i closed.
+closed_htf_positions() gives the same mapping between any two frames
+(e.g. the 15min entry frame against a fetched 4H frame) with one
+searchsorted.
+
+synced() keeps one index per file (data/EURUSD_60min.240min.align) in
+step with the base candles: an unchanged base is a cache hit, appended
+candles (a head trim included) only re-aggregate the partial first and
+last buckets, anything else rebuilds. Writes are atomic (temp file +
+os.replace), like the candle store.
+
+Base frames follow the load_ohlc_csv() contract: a tz-naive, sorted
+index and complete OHLC; derived buckets are epoch-aligned, which is
+what resample() does for rules that divide a day.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import get_logger
+
+log = get_logger("engine.timeframe_index")
+
+INDEX_EXT = ".align"
+FORMAT_VERSION = 1
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+_DAY_NS = 86_400 * 10**9
+_MINUTE_NS = 60 * 10**9
+
+_loaded: dict[str, "TimeframeIndex"] = {}
+_lock = threading.Lock()
+
+
+def resample_ohlc(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Plain pandas resample of an OHLCV frame (empty buckets dropped)."""
+    return df.resample(rule).agg(_AGG).dropna(subset=["Open", "High", "Low", "Close"])
+
+
+def _epoch_ns(index: pd.Index) -> np.ndarray:
+    return pd.DatetimeIndex(index).as_unit("ns").asi8
+
+
+def _step_ns(rule: str) -> int:
+    step = int(pd.Timedelta(rule).value)
+    if step <= 0 or _DAY_NS % step:
+        raise ValueError(f"rule {rule!r} must divide a day")
+    return step
+
+
+def _aggregate(df: pd.DataFrame, step: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(codes, bucket times, 5 x m OHLCV block) of one base segment."""
+    if df.empty:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((5, 0))
+    times = _epoch_ns(df.index)
+    buckets = times - times % step
+    bars = df[COLUMNS].groupby(buckets).agg(_AGG)
+    bucket_times = bars.index.to_numpy(dtype=np.int64)
+    return np.searchsorted(bucket_times, buckets), bucket_times, bars.to_numpy(dtype=float).T
+
+
+def closed_htf_positions(
+    ltf_index: pd.Index, ltf_minutes: float, htf_index: pd.Index, htf_minutes: float,
+) -> np.ndarray:
+    """Per lower-timeframe bar, the last higher-timeframe bar closed by its close (-1: none)."""
+    ltf_close = _epoch_ns(ltf_index) + int(ltf_minutes * _MINUTE_NS)
+    htf_close = _epoch_ns(htf_index) + int(htf_minutes * _MINUTE_NS)
+    return np.searchsorted(htf_close, ltf_close, side="right") - 1
+
+
+class TimeframeIndex:
+    """Base-bar positions into, and the bars of, one derived timeframe."""
+
+    def __init__(self, rule, base_times, base_close, pos, htf_times, ohlcv, index_name="Timestamp"):
+        self.rule = rule
+        self.base_times = base_times
+        self.base_close = base_close
+        self.pos = pos
+        self.htf_times = htf_times
+        self.ohlcv = ohlcv
+        self.index_name = index_name
+        for values in (base_times, base_close, pos, htf_times, ohlcv):
+            values.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.htf_times)
+
+    @staticmethod
+    def _check(df: pd.DataFrame) -> None:
+        if getattr(df.index, "tz", None) is not None:
+            raise ValueError("timeframe index needs a tz-naive base frame")
+        if df[["Open", "High", "Low", "Close"]].isna().to_numpy().any():
+            raise ValueError("timeframe index needs complete OHLC")
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, rule: str) -> "TimeframeIndex":
+        cls._check(df)
+        codes, htf_times, ohlcv = _aggregate(df, _step_ns(rule))
+        return cls(
+            rule, _epoch_ns(df.index).copy(), df["Close"].to_numpy(dtype=float).copy(),
+            codes.astype(np.int64), htf_times, np.ascontiguousarray(ohlcv), df.index.name,
+        )
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        """True when df holds exactly the base candles this index was built from."""
+        return (
+            len(df) == len(self.base_times)
+            and np.array_equal(_epoch_ns(df.index), self.base_times)
+            and np.array_equal(df["Close"].to_numpy(dtype=float), self.base_close)
+        )
+
+    def extend(self, df: pd.DataFrame) -> "TimeframeIndex":
+        """Index for df, reusing every derived bar appended candles cannot change.
+
+        df must continue the indexed candles (the oldest may have been
+        trimmed, the last may have been replaced); otherwise it rebuilds.
+        """
+        self._check(df)
+        times = _epoch_ns(df.index)
+        old = self.base_times
+        if not len(old) or not len(times):
+            return self.build(df, self.rule)
+        start = int(np.searchsorted(old, times[0]))
+        kept = len(old) - start
+        if start == len(old) or old[start] != times[0] or kept > len(times):
+            return self.build(df, self.rule)
+        # Bars of the last derived bucket are re-aggregated anyway (its last
+        # candle may have been replaced); everything before must be intact.
+        last_bucket = int(self.pos[-1])
+        tail_old = int(np.searchsorted(self.pos, last_bucket))
+        first_bucket = int(self.pos[start])
+        partial = start > 0 and int(self.pos[start - 1]) == first_bucket
+        head_old = int(np.searchsorted(self.pos, first_bucket, side="right")) if partial else start
+        reuse_lo, reuse_hi = first_bucket + partial, last_bucket
+        close = df["Close"].to_numpy(dtype=float)
+        if (
+            reuse_lo >= reuse_hi
+            or not np.array_equal(times[:kept], old[start:])
+            or not np.array_equal(close[:tail_old - start], self.base_close[start:tail_old])
+        ):
+            return self.build(df, self.rule)
+
+        step = _step_ns(self.rule)
+        head_codes, head_times, head_bars = _aggregate(df.iloc[:head_old - start], step)
+        tail_codes, tail_times, tail_bars = _aggregate(df.iloc[tail_old - start:], step)
+        reused = reuse_hi - reuse_lo
+        pos = np.concatenate([
+            head_codes,
+            self.pos[head_old:tail_old] - reuse_lo + len(head_times),
+            tail_codes + len(head_times) + reused,
+        ])
+        return TimeframeIndex(
+            self.rule, times.copy(), close.copy(), pos.astype(np.int64),
+            np.concatenate([head_times, self.htf_times[reuse_lo:reuse_hi], tail_times]),
+            np.ascontiguousarray(np.hstack([head_bars, self.ohlcv[:, reuse_lo:reuse_hi], tail_bars])),
+            df.index.name,
+        )
+
+    def frame(self) -> pd.DataFrame:
+        """The derived bars (read-only values, like a frame_cache entry)."""
+        index = pd.DatetimeIndex(self.htf_times.view("M8[ns]"), name=self.index_name)
+        return pd.DataFrame(dict(zip(COLUMNS, self.ohlcv)), index=index, copy=False)
+
+    def closed_positions(self, base_minutes: float) -> np.ndarray:
+        """Per base bar, the last derived bar already closed at its close (-1: none)."""
+        return closed_htf_positions(
+            self.base_times.view("M8[ns]"), base_minutes,
+            self.htf_times.view("M8[ns]"), _step_ns(self.rule) / _MINUTE_NS,
+        )
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".align-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(
+                    fh, version=np.int64(FORMAT_VERSION), rule=np.str_(self.rule),
+                    index_name=np.str_(self.index_name or ""), base_times=self.base_times,
+                    base_close=self.base_close, pos=self.pos, htf_times=self.htf_times, ohlcv=self.ohlcv,
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "TimeframeIndex":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"unsupported timeframe index version {int(data['version'])} in {path}")
+            return cls(
+                str(data["rule"]), data["base_times"], data["base_close"], data["pos"],
+                data["htf_times"], data["ohlcv"], str(data["index_name"]) or None,
+            )
+
+
+def synced(path: str, df: pd.DataFrame, rule: str) -> TimeframeIndex:
+    """The index at path brought in step with df (extended or rebuilt, then saved)."""
+    with _lock:
+        index = _loaded.get(path)
+    if index is None and os.path.exists(path):
+        try:
+            index = TimeframeIndex.load(path)
+        except (OSError, ValueError, KeyError) as exc:
+            log.warning("Timeframe index %s unreadable: %s", path, exc)
+    if index is not None and _step_ns(index.rule) != _step_ns(rule):
+        index = None
+    if index is not None and index.matches(df):
+        with _lock:
+            _loaded[path] = index
+        return index
+    index = index.extend(df) if index is not None else TimeframeIndex.build(df, rule)
+    try:
+        index.save(path)
+    except OSError as exc:
+        log.warning("Timeframe index %s not saved: %s", path, exc)
+    with _lock:
+        _loaded[path] = index
+    return index
@@ -4,8 +4,8 @@ from __future__ import annotations
 
 import pandas as pd
 
-from engine import confluence
-from engine.data import DataUnavailableError, get_data
+from engine.analysis_memo import AnalysisMemo, private_copy, request_memo
+from engine.data import DataUnavailableError, derived_frame, get_data
 from engine.mtf import (
     MAX_DRAW_DISTANCE_PCT,
     NEARBY_POOL_MERGE_PCT,
@@ -13,7 +13,6 @@ from engine.mtf import (
     _h1_liquidity_map,
     _load,
     _pick_draw,
-    _resample_4h,
 )
 from engine.trading_style import (
     TF_LABELS,
@@ -35,12 +34,6 @@ BIAS_LABELS = {
 }
 
 
-def _resample_daily(df: pd.DataFrame) -> pd.DataFrame:
-    return df.resample("1D").agg({
-        "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
-    }).dropna(subset=["Open", "High", "Low", "Close"])
-
-
 def _parent_bias(analysis: dict, tf: str) -> dict:
     """Higher timeframe bias from structure + premium/discount."""
     events = analysis["structure"]["events"]
@@ -119,14 +112,15 @@ def topdown_analyze(
     fetch: bool,
     trading_style: str = "intraday",
     progress=None,
+    memo: AnalysisMemo | None = None,
 ) -> dict:
     """Run full top-down stack for a trading style.
 
     Returns analysis dict compatible with confluence.decide(), plus layer
-    metadata for the prediction response schema.
+    metadata for the prediction response schema. Frames shared between
+    layers are analysed once through `memo` (default: request_memo()).
     """
     style = normalize_trading_style(trading_style)
-    ladder = ladder_for(style)
     notes: list[str] = []
 
     from services.threshold_service import resolve_thresholds
@@ -137,6 +131,15 @@ def topdown_analyze(
         if progress:
             progress(stage, msg)
 
+    frames, source = load_ladder_frames(symbol, style, fetch, notes)
+    return assemble_topdown(
+        symbol, frames, style, thresholds=thresholds, threshold_version_id=threshold_version_id,
+        memo=memo, notes=notes, note=note, source=source,
+    )
+
+
+def load_ladder_frames(symbol: str, style: str, fetch: bool, notes: list[str]) -> tuple[dict, str]:
+    """({tf: frame or None} for every ladder timeframe, data source)."""
     frames: dict[str, pd.DataFrame | None] = {}
     source = "cache"
 
@@ -149,14 +152,18 @@ def topdown_analyze(
     # Resample fallbacks
     if frames.get("240min") is None and frames.get("60min") is not None:
         if len(frames["60min"]) >= 120:
-            frames["240min"] = _resample_4h(frames["60min"])
+            frames["240min"] = derived_frame(symbol, "60min", "240min", frames["60min"], "4h")
             notes.append("4H resampled from 1H")
     if frames.get("daily") is None and frames.get("240min") is not None:
         if len(frames["240min"]) >= 30:
-            frames["daily"] = _resample_daily(frames["240min"])
+            frames["daily"] = derived_frame(symbol, "240min", "daily", frames["240min"], "1D")
             notes.append("Daily resampled from 4H")
+    return frames, source
 
-    # Entry frame selection
+
+def entry_frame(symbol: str, frames: dict, style: str, notes: list[str] | None = None) -> tuple[str, pd.DataFrame]:
+    """(entry timeframe, frame): the style's setup frame, else the first available fallback."""
+    ladder = ladder_for(style)
     entry_tf = primary_entry_tf(style)
     df_entry = frames.get(entry_tf)
     if df_entry is None:
@@ -164,11 +171,37 @@ def topdown_analyze(
             if frames.get(fallback) is not None:
                 entry_tf = fallback
                 df_entry = frames[fallback]
-                notes.append(f"Setup frame {primary_entry_tf(style)} unavailable — using {entry_tf}")
+                if notes is not None:
+                    notes.append(f"Setup frame {primary_entry_tf(style)} unavailable — using {entry_tf}")
                 break
     if df_entry is None:
         raise DataUnavailableError(f"No entry-frame data for {symbol} ({style})")
+    return entry_tf, df_entry
 
+
+def assemble_topdown(
+    symbol: str,
+    frames: dict[str, pd.DataFrame | None],
+    style: str,
+    *,
+    thresholds,
+    threshold_version_id=None,
+    memo: AnalysisMemo | None = None,
+    notes: list[str] | None = None,
+    note=None,
+    source: str = "cache",
+) -> dict:
+    """The top-down stack over already loaded frames (see topdown_analyze).
+
+    Frames are taken as given: the point-in-time backtest
+    (engine/mtf_backtest.py) passes each timeframe cut to its closed bars.
+    """
+    memo = memo if memo is not None else request_memo()
+    ladder = ladder_for(style)
+    notes = notes if notes is not None else []
+    note = note or (lambda stage, msg: None)
+
+    entry_tf, df_entry = entry_frame(symbol, frames, style, notes)
     note("data", f"Entry frame {entry_tf}: {len(df_entry)} candles")
 
     # Layer A — parent bias
@@ -180,7 +213,7 @@ def topdown_analyze(
             notes.append(f"Parent frame {tf} unavailable")
             continue
         note("analyze", f"Parent bias on {TF_LABELS.get(tf, tf)}...")
-        parent_analysis = confluence.analyze(df_parent, symbol, interval=tf, thresholds=thresholds, trading_style=style)
+        parent_analysis = memo.analyze(df_parent, symbol, interval=tf, thresholds=thresholds, trading_style=style)
         bias = _parent_bias(parent_analysis, tf)
         parent_biases.append(bias)
         layer_results[tf] = {"layer": "parent", "analysis": parent_analysis, "bias": bias}
@@ -195,7 +228,7 @@ def topdown_analyze(
         if df_struct is None:
             continue
         note("analyze", f"Structure on {TF_LABELS.get(tf, tf)}...")
-        struct_analysis = confluence.analyze(df_struct, symbol, interval=tf, thresholds=thresholds, trading_style=style)
+        struct_analysis = memo.analyze(df_struct, symbol, interval=tf, thresholds=thresholds, trading_style=style)
         layer_results[f"struct_{tf}"] = {"layer": "structure", "analysis": struct_analysis}
         events = struct_analysis["structure"]["events"]
         if events:
@@ -204,7 +237,10 @@ def topdown_analyze(
 
     # Layer C — setup on entry frame
     note("analyze", f"Setup analysis on {entry_tf}...")
-    analysis = confluence.analyze(df_entry, symbol, interval=entry_tf, thresholds=thresholds, trading_style=style)
+    # Private copy: the entry analysis is decorated with HTF context below.
+    analysis = private_copy(
+        memo.analyze(df_entry, symbol, interval=entry_tf, thresholds=thresholds, trading_style=style)
+    )
     layer_results[entry_tf] = {"layer": "setup", "analysis": analysis}
 
     # Layer D — execution confirmation (lower TF)
@@ -216,7 +252,7 @@ def topdown_analyze(
         df_exec = frames.get(tf)
         if df_exec is None or len(df_exec) < 30:
             continue
-        exec_analysis = confluence.analyze(df_exec, symbol, interval=tf, thresholds=thresholds, trading_style=style)
+        exec_analysis = memo.analyze(df_exec, symbol, interval=tf, thresholds=thresholds, trading_style=style)
         layer_results[f"exec_{tf}"] = {"layer": "execution", "analysis": exec_analysis}
         if target_direction in ("bullish", "bearish"):
             from engine.institutional import execution_confirmation
@@ -255,7 +291,7 @@ def topdown_analyze(
     draw = None
     if df_liq is not None:
         note("analyze", f"Liquidity map on {TF_LABELS.get(liq_tf, liq_tf)}...")
-        h1_analysis = confluence.analyze(df_liq, symbol, interval=liq_tf, thresholds=thresholds, trading_style=style)
+        h1_analysis = memo.analyze(df_liq, symbol, interval=liq_tf, thresholds=thresholds, trading_style=style)
         liquidity = _h1_liquidity_map(h1_analysis, price, symbol)
         merge_tol = price * NEARBY_POOL_MERGE_PCT / 100.0
         existing = [p["level"] for p in analysis["pools"]]
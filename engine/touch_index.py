@@ -0,0 +1,133 @@
+# engine/touch_index.py
+"""First-touch queries: "first bar at or after p where a series crosses L".
+
+Order-block mitigation/invalidation, FVG fills, pool sweeps and breaker
+reclaims all ask that question once per object. Scanning a fresh
+`series[p:] <op> L` mask per object is O(n) each; here every series gets
+a sparse table of power-of-two window extrema (O(n log n) once), and a
+query descends it from the widest window down — skipping any window
+whose extreme cannot cross L — for O(log n) per object. Queries are
+batched: one descent answers every object of a detector at once.
+
+NaN candles never count as a touch (same as the elementwise
+comparisons they replace).
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+class RangeExtrema:
+    """Sparse table of window maxima ("max") or minima ("min") of one series."""
+
+    def __init__(self, values, mode: str):
+        if mode not in ("max", "min"):
+            raise ValueError(f"mode must be 'max' or 'min', not {mode!r}")
+        self.mode = mode
+        self._blank = -np.inf if mode == "max" else np.inf
+        a = np.asarray(values, dtype=float)
+        a = np.where(np.isnan(a), self._blank, a)
+        self.n = len(a)
+        # levels[k][i] = extreme of a[i : i + 2**k]; arrays may carry spare
+        # capacity past their valid length n - 2**k + 1 (see append()).
+        self.levels = [a]
+        op = np.maximum if mode == "max" else np.minimum
+        width = 1
+        while 2 * width <= self.n:
+            prev = self.levels[-1]
+            self.levels.append(op(prev[:-width], prev[width:]))
+            width *= 2
+
+    def append(self, value) -> None:
+        """Extend the series by one value: one new cell per level, O(log n)."""
+        value = float(value)
+        if value != value:
+            value = self._blank
+        pick = max if self.mode == "max" else min
+        n = self.n + 1
+        self._put(0, n - 1, value)
+        k = 1
+        while (1 << k) <= n:
+            i = n - (1 << k)
+            below = self.levels[k - 1]
+            self._put(k, i, pick(below[i], below[i + (1 << (k - 1))]))
+            k += 1
+        self.n = n
+
+    def _put(self, k: int, i: int, value: float) -> None:
+        if k == len(self.levels):
+            self.levels.append(np.empty(max(8, i + 1)))
+        level = self.levels[k]
+        if i >= len(level):
+            grown = np.empty(max(2 * len(level), i + 1))
+            grown[: len(level)] = level
+            self.levels[k] = level = grown
+        level[i] = value
+
+    def first(self, starts, levels, strict: bool = False) -> np.ndarray:
+        """First index >= start whose value crosses the level, else n.
+
+        "max" tables cross upward (value > L, or >= unless strict);
+        "min" tables cross downward (value < L, or <=).
+        """
+        starts = np.atleast_1d(np.asarray(starts, dtype=np.int64))
+        levels = np.broadcast_to(np.asarray(levels, dtype=float), starts.shape)
+        p = np.clip(starts, 0, self.n)
+        if self.n == 0:
+            return p
+        for k in range(self.n.bit_length() - 1, -1, -1):
+            width = 1 << k
+            fits = p + width <= self.n
+            block = self.levels[k][np.where(fits, p, 0)]
+            if self.mode == "max":
+                clear = block <= levels if strict else block < levels
+            else:
+                clear = block >= levels if strict else block > levels
+            p = np.where(fits & clear, p + width, p)
+        return np.where(np.isnan(levels), self.n, p)
+
+
+class TouchIndex:
+    """Lazily built first-touch tables over a candle frame's OHLC columns.
+
+    Build one per frame and hand it to every detector that runs on that
+    frame (confluence.analyze does) so the tables are shared.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self._tables: dict[tuple[str, str], RangeExtrema] = {}
+
+    def _table(self, column: str, mode: str) -> RangeExtrema:
+        key = (column, mode)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = RangeExtrema(self.df[column].to_numpy(), mode)
+        return table
+
+    def append(self, row) -> None:
+        """Extend every built table by one bar (row maps column -> value)."""
+        for (column, _), table in self._tables.items():
+            table.append(row[column])
+        self.n += 1
+
+    def rebind(self, df: pd.DataFrame) -> None:
+        """Point the index at df, which must hold exactly the indexed bars."""
+        if len(df) != self.n:
+            raise ValueError(f"frame has {len(df)} bars, index covers {self.n}")
+        self.df = df
+
+    def first_above(self, column: str, starts, levels, inclusive: bool = False) -> np.ndarray:
+        """First bar >= start with column > level (>= when inclusive), else n."""
+        return self._table(column, "max").first(starts, levels, strict=not inclusive)
+
+    def first_below(self, column: str, starts, levels, inclusive: bool = False) -> np.ndarray:
+        """First bar >= start with column < level (<= when inclusive), else n."""
+        return self._table(column, "min").first(starts, levels, strict=not inclusive)
+
+
+def touch_index(df: pd.DataFrame, index: TouchIndex | None = None) -> TouchIndex:
+    """The caller's shared index when it belongs to df, else a fresh one."""
+    return index if index is not None and index.df is df else TouchIndex(df)
@@ -0,0 +1,124 @@
+# engine/tp_sl.py
+"""Vectorised TP/SL first-hit simulation for batches of trades.
+
+The backtest, the meta-label builder (ml/labels) and the review
+verifier (services/prediction_review) all need the same answer: walking
+forward from a start bar, which level does price touch first, on which
+bar, and how far did it run for and against the trade on the way?
+first_hit() resolves any number of trades in one pass over a
+(trades x horizon) window of the High/Low arrays instead of one Python
+loop per trade.
+
+Per trade it returns:
+
+    outcome    HIT_TARGET, HIT_STOP, HIT_BOTH (both levels inside the
+               same bar: the intrabar order is unknown) or HIT_NONE
+    exit_bar   absolute position of the bar that hit (-1: none)
+    mfe, mae   favourable / adverse excursion from entry (>= 0) over
+               the bars up to and including the exit bar
+
+A missing level (NaN) never hits. exit_excursion="hit" keeps only the
+excursion towards the level that was hit on the exit bar (favourable
+for a target, adverse for a stop or both), which is what the review
+verifier has always reported.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+HIT_NONE = 0
+HIT_TARGET = 1
+HIT_STOP = 2
+HIT_BOTH = 3
+
+
+class FirstHit(NamedTuple):
+    outcome: np.ndarray
+    exit_bar: np.ndarray
+    mfe: np.ndarray
+    mae: np.ndarray
+
+
+def _levels(values, n: int) -> np.ndarray:
+    """Per-trade float column; None reads as NaN (a level that never hits)."""
+    if values is None:
+        return np.full(n, np.nan)
+    if np.ndim(values) == 0:
+        return np.full(n, float(values))
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def first_hit(
+    highs,
+    lows,
+    starts,
+    entries,
+    stops,
+    targets,
+    long,
+    *,
+    horizon: int | None = None,
+    exit_excursion: str = "full",
+) -> FirstHit:
+    """Resolve every trade against the candles from its start bar on.
+
+    highs/lows are the full candle arrays; starts are the positions of
+    each trade's first bar; entries/stops/targets/long are per trade
+    (scalars broadcast). horizon caps the bars walked per trade (None:
+    to the end of the data).
+    """
+    if exit_excursion not in ("full", "hit"):
+        raise ValueError(f"exit_excursion must be 'full' or 'hit', not {exit_excursion!r}")
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    starts = np.atleast_1d(np.asarray(starts, dtype=np.int64))
+    n = len(starts)
+    entries = np.broadcast_to(np.asarray(entries, dtype=float), n)
+    stops = _levels(stops, n)
+    targets = _levels(targets, n)
+    long = np.broadcast_to(np.asarray(long, dtype=bool), n)
+    if n == 0:
+        empty = np.empty(0)
+        return FirstHit(np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64), empty, empty)
+
+    size = len(highs)
+    if horizon is None:
+        horizon = size - int(starts.min())
+    horizon = max(int(horizon), 1)
+    # NaN padding: bars past the end of the data never hit and never count
+    pad = np.full(horizon, np.nan)
+    high_win = sliding_window_view(np.concatenate([highs, pad]), horizon)[np.clip(starts, 0, size)]
+    low_win = sliding_window_view(np.concatenate([lows, pad]), horizon)[np.clip(starts, 0, size)]
+
+    e = entries[:, None]
+    up = long[:, None]
+    favourable = np.where(up, high_win - e, e - low_win)
+    adverse = np.where(up, e - low_win, high_win - e)
+    with np.errstate(invalid="ignore"):
+        stop_hit = np.where(up, low_win <= stops[:, None], high_win >= stops[:, None])
+        target_hit = np.where(up, high_win >= targets[:, None], low_win <= targets[:, None])
+
+    hit = stop_hit | target_hit
+    any_hit = hit.any(axis=1)
+    first = np.where(any_hit, hit.argmax(axis=1), horizon - 1)
+    rows = np.arange(n)
+    outcome = np.where(
+        ~any_hit, HIT_NONE,
+        np.where(stop_hit[rows, first], np.where(target_hit[rows, first], HIT_BOTH, HIT_STOP), HIT_TARGET),
+    ).astype(np.int8)
+
+    cols = np.arange(horizon)[None, :]
+    walked = cols <= first[:, None]
+    fav_mask, adv_mask = walked, walked
+    if exit_excursion == "hit":
+        on_exit = (cols == first[:, None]) & any_hit[:, None]
+        fav_mask = walked & ~(on_exit & (outcome != HIT_TARGET)[:, None])
+        adv_mask = walked & ~(on_exit & (outcome == HIT_TARGET)[:, None])
+    # padded bars are NaN and drop out with the bars past the exit
+    mfe = np.max(np.where(fav_mask & ~np.isnan(favourable), favourable, 0.0), axis=1, initial=0.0)
+    mae = np.max(np.where(adv_mask & ~np.isnan(adverse), adverse, 0.0), axis=1, initial=0.0)
+    exit_bar = np.where(any_hit, starts + first, -1).astype(np.int64)
+    return FirstHit(outcome, exit_bar, mfe, mae)
@@ -1,6 +1,8 @@
 """Meta-labels: WILL_RULE_SIGNAL_WIN (TP before SL)."""
 from __future__ import annotations
 
+from engine.tp_sl import HIT_BOTH, HIT_NONE, HIT_STOP, HIT_TARGET, first_hit
+
 OUTCOME_TP_BEFORE_SL = "TP_BEFORE_SL"
 OUTCOME_SL_BEFORE_TP = "SL_BEFORE_TP"
 OUTCOME_NEUTRAL = "NEUTRAL"
@@ -9,6 +11,13 @@ OUTCOME_EXPIRED = "EXPIRED"
 META_LABEL_WIN = 1
 META_LABEL_LOSS = 0
 
+_OUTCOMES = {
+    HIT_TARGET: OUTCOME_TP_BEFORE_SL,
+    HIT_STOP: OUTCOME_SL_BEFORE_TP,
+    HIT_BOTH: OUTCOME_NEUTRAL,  # same bar: order unknown
+    HIT_NONE: OUTCOME_EXPIRED,
+}
+
 EXCLUDED_ACTIONS = frozenset({"NO_TRADE", "WAIT_FOR_CONFIRMATION", "WAIT"})
 
 
@@ -36,6 +45,25 @@ def evaluate_tp_sl_path(
     if tp is None or sl is None or entry <= 0:
         return OUTCOME_NEUTRAL, 0.0, 0.0
 
+    result = first_hit(
+        candles["High"].to_numpy(dtype=float), candles["Low"].to_numpy(dtype=float),
+        0, entry, sl, tp, direction in ("bullish", "BUY", "BUY_BIAS"),
+    )
+    return _OUTCOMES[int(result.outcome[0])], float(result.mfe[0]), float(result.mae[0])
+
+
+def _evaluate_tp_sl_path_legacy(
+    candles,
+    *,
+    direction: str,
+    entry: float,
+    tp: float | None,
+    sl: float | None,
+) -> tuple[str, float, float]:
+    """Walk forward candles; return outcome, MFE, MAE."""
+    if tp is None or sl is None or entry <= 0:
+        return OUTCOME_NEUTRAL, 0.0, 0.0
+
     mfe = 0.0
     mae = 0.0
     bullish = direction in ("bullish", "BUY", "BUY_BIAS", "BUY")
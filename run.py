@@ -7,7 +7,8 @@
     python run.py predict EURUSD     One-off prediction in the terminal
     python run.py api                API server only
     python run.py bot                Telegram bot only
-    python run.py refresh            Refresh CSVs + models for all supported pairs
+    python run.py refresh            Refresh candles + models for all supported pairs
+                                     (--intervals all --workers 16 --no-train)
 
 On Windows you can also double-click start.bat or run:  start.bat
 
@@ -1071,55 +1072,97 @@ def cmd_backup() -> int:
 
 
 def cmd_backtest(args) -> int:
-    """Run walk-forward backtest over cached CSVs."""
-    import json
-    from datetime import datetime, timezone
-
-    import pandas as pd
-
-    from engine.backtest import run_backtest
-    from engine.data import csv_path
+    """Run the backtest matrix (pairs x intervals x styles x threshold versions) over cached candles."""
+    from services.backtest_runner import ACTIVE_VERSION, REPORT_PATH, run_backtest_matrix
     from utils.config import INTERVAL
     from utils.settings import get_supported_pairs
 
-    symbol_arg = (args.symbol or "all").upper()
-    symbols = get_supported_pairs() if symbol_arg == "ALL" else [symbol_arg]
-    results = []
+    def split(raw, default):
+        values = [v.strip() for v in raw.split(",") if v.strip()] if raw else []
+        return values or list(default)
 
-    for sym in symbols:
-        path = csv_path(sym, INTERVAL)
-        if not os.path.isfile(path):
-            log.warning("No CSV for %s — skipping", sym)
-            continue
-        df = pd.read_csv(path, index_col=0, parse_dates=True)
-        report = run_backtest(df, sym)
-        results.append(report)
+    symbol_arg = (args.symbol or "all").upper()
+    symbols = get_supported_pairs() if symbol_arg == "ALL" else split(symbol_arg, [])
+    engine = getattr(args, "engine", "event")
+    triggers = split(getattr(args, "triggers", None), []) or None
+    intervals = split(getattr(args, "intervals", None), [INTERVAL])
+    styles = split(getattr(args, "styles", None), ["intraday"])
+    versions = split(getattr(args, "versions", None), [ACTIVE_VERSION])
+    matrix_run = len(intervals) > 1 or len(styles) > 1 or len(versions) > 1
+
+    def show(report: dict) -> None:
+        label = report["job"] if matrix_run else report["symbol"]
         if report.get("error"):
-            print(f"{sym}: {report['error']}")
+            print(f"{label}: {report['error']}")
         else:
             print(
-                f"{sym}: win_rate={report['win_rate']:.1%} trades={report['trades']} "
+                f"{label}: win_rate={report['win_rate']:.1%} trades={report['trades']} "
                 f"avg_rr={report['avg_rr']} max_dd={report['max_drawdown_pct']}%"
             )
 
-    if not results:
+    try:
+        payload = run_backtest_matrix(
+            symbols, intervals=intervals, styles=styles, versions=versions, engine=engine,
+            triggers=triggers, jobs=getattr(args, "jobs", 1) or 1, resume=getattr(args, "resume", False),
+            on_result=show,
+        )
+    except ValueError as exc:
+        log.error("Backtest not started: %s", exc)
+        return 1
+    if not payload["pairs"]:
         log.error("No backtest results — refresh CSV data first.")
         return 1
+    print(f"Report written → {REPORT_PATH}")
+    return 0
 
-    logs_dir = os.path.join(os.path.dirname(__file__), "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-    out_path = os.path.join(logs_dir, "backtest_report.json")
-    payload = {
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "interval": INTERVAL,
-        "pairs": results,
-    }
-    with open(out_path, "w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2)
-    print(f"Report written → {out_path}")
+
+def cmd_sweep(args) -> int:
+    """Grid / random search over threshold fields; best configs per pair."""
+    from services.threshold_sweep import REPORT_PATH, run_threshold_sweep
+    from utils.config import INTERVAL
+    from utils.settings import get_supported_pairs
+
+    symbol_arg = (args.symbol or "all").upper()
+    symbols = get_supported_pairs() if symbol_arg == "ALL" else [s for s in symbol_arg.split(",") if s]
+
+    def show(result: dict) -> None:
+        if result.get("error"):
+            print(f"{result['symbol']}: {result['error']}")
+            return
+        best = result["best"][0]
+        print(
+            f"{result['symbol']}: {result['trials']} trials in {result['elapsed_ms'] / 1000:.1f}s — "
+            f"best {result['objective']}={best['metrics'][result['objective']]} "
+            f"(validation {best['validation'][result['objective']]}) "
+            f"trades={best['metrics']['trades']} patch={best['patch'] or 'baseline'}"
+        )
+
+    payload = run_threshold_sweep(
+        symbols, interval=args.interval or INTERVAL, trading_style=args.style, mode=args.mode,
+        n_trials=args.trials, seed=args.seed, objective=args.objective, on_result=show,
+    )
+    if not payload["pairs"]:
+        log.error("No sweep results — refresh CSV data first.")
+        return 1
+    print(f"Report written → {REPORT_PATH}")
     return 0
 
 
+def cmd_migrate_candles(args) -> int:
+    """Convert every cached CSV under data/ to the binary candle store."""
+    from engine.candle_store import migrate_tree
+    from engine.data import DATA_DIR
+
+    report = migrate_tree(DATA_DIR, force=args.force)
+    print(
+        f"Candle store: {report['converted']} converted, "
+        f"{report['skipped']} up to date, {len(report['failed'])} failed"
+    )
+    for failure in report["failed"]:
+        print(f"  {failure['path']}: {failure['error']}")
+    return 1 if report["failed"] else 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="SmartFlow AI - SMC/ICT forex signal platform")
     sub = parser.add_subparsers(dest="command")
@@ -1152,11 +1195,48 @@ def main():
     sub.add_parser("telegram-worker", help="dedicated supervised Telegram polling")
     sub.add_parser("migrate", help="create, migrate, verify, and seed the database")
     sub.add_parser("bot", help="Telegram bot only")
-    sub.add_parser("refresh", help="refresh data + models for all pairs")
+    p_refresh = sub.add_parser("refresh", help="refresh data + models for all pairs")
+    p_refresh.add_argument("--intervals", default=None, help="comma-separated intervals, or 'all'")
+    p_refresh.add_argument("--workers", type=int, default=None, help="concurrent fetches")
+    p_refresh.add_argument("--no-train", action="store_true", help="skip model retraining")
     sub.add_parser("build-admin", help="build React admin panel (admin-frontend)")
     sub.add_parser("backup", help="backup database to backups/")
-    p_backtest = sub.add_parser("backtest", help="walk-forward backtest on cached CSVs")
+    p_backtest = sub.add_parser("backtest", help="walk-forward backtest on cached candles")
     p_backtest.add_argument("symbol", nargs="?", default="all", help="pair symbol or 'all'")
+    p_backtest.add_argument(
+        "--engine", choices=("event", "walk", "topdown"), default="event",
+        help=(
+            "event: one pass over every cached bar; walk: re-analyse every 12 bars (last 800); "
+            "topdown: point-in-time multi-timeframe stack (ignores --intervals)"
+        ),
+    )
+    p_backtest.add_argument(
+        "--triggers", default=None,
+        help="event engine: comma list of bar,structure,swing,fvg (default structure)",
+    )
+    p_backtest.add_argument("--intervals", default=None, help="comma-separated intervals (default INTERVAL)")
+    p_backtest.add_argument("--styles", default=None, help="comma-separated trading styles (default intraday)")
+    p_backtest.add_argument(
+        "--versions", default=None, help="comma-separated threshold version ids and/or 'active' (default active)",
+    )
+    p_backtest.add_argument("--jobs", type=int, default=1, help="worker processes")
+    p_backtest.add_argument(
+        "--resume", action="store_true", help="skip jobs already in logs/backtest_report.json",
+    )
+    p_sweep = sub.add_parser("sweep", help="threshold parameter sweep on cached candles")
+    p_sweep.add_argument("symbol", nargs="?", default="all", help="pair symbol(s), comma-separated, or 'all'")
+    p_sweep.add_argument("--interval", default=None, help="candle interval (default INTERVAL)")
+    p_sweep.add_argument("--style", default="intraday", help="trading style")
+    p_sweep.add_argument("--mode", choices=("grid", "random"), default="grid")
+    p_sweep.add_argument("--trials", type=int, default=200, help="random mode: number of trials")
+    p_sweep.add_argument("--seed", type=int, default=0, help="random mode: seed")
+    p_sweep.add_argument(
+        "--objective", choices=("final_equity", "win_rate", "accuracy", "avg_rr"), default="final_equity",
+    )
+    p_migrate_candles = sub.add_parser(
+        "migrate-candles", help="convert cached CSVs under data/ to the binary candle store",
+    )
+    p_migrate_candles.add_argument("--force", action="store_true", help="rewrite stores that are up to date")
     p_dev = sub.add_parser("dev", help="run everything + Vite admin dev server (:5174)")
     p_dev.add_argument("--no-build", action="store_true", help="skip production admin build")
 
@@ -1200,12 +1280,19 @@ def main():
         from bot import run_bot
         run_bot()
     elif args.command == "refresh":
-        from batch_fetch import refresh_all
-        refresh_all()
+        from batch_fetch import main as refresh_main
+        argv = ["--workers", str(args.workers)] if args.workers else []
+        argv += ["--intervals", args.intervals] if args.intervals else []
+        argv += ["--no-train"] if args.no_train else []
+        sys.exit(refresh_main(argv))
     elif args.command == "backup":
         sys.exit(cmd_backup())
     elif args.command == "backtest":
         sys.exit(cmd_backtest(args))
+    elif args.command == "sweep":
+        sys.exit(cmd_sweep(args))
+    elif args.command == "migrate-candles":
+        sys.exit(cmd_migrate_candles(args))
     elif args.command == "build-admin":
         from scripts.frontend import build_admin_frontend
         ok = build_admin_frontend(force=True)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the hot engine paths.
+
+    python scripts/bench_engine.py pd-position
+    python scripts/bench_engine.py pd-position --sizes 2000,20000 --legacy-max 20000
+    python scripts/bench_engine.py swings
+    python scripts/bench_engine.py structure
+    python scripts/bench_engine.py touch     # OB / FVG / pools / breakers
+    python scripts/bench_engine.py sweeps
+    python scripts/bench_engine.py incremental --sizes 1500   # per closed bar
+    python scripts/bench_engine.py store
+    python scripts/bench_engine.py refresh --sizes 80   # pairs x 7 intervals, fake OANDA
+
+Candles are a seeded random walk so runs are comparable across machines
+and commits. Legacy implementations are only timed up to --legacy-max
+bars (they are quadratic; 200k bars would take hours).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Project root (parent of scripts/) so `engine` imports resolve.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SECRET_KEY", "bench-secret-key-not-for-production")
+
+DEFAULT_SIZES = "2000,20000,200000"
+
+
+def synthetic_ohlc(n: int, seed: int = 7) -> pd.DataFrame:
+    """Hourly random-walk candles (same shape as the test fixture)."""
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-06 00:00", periods=n, freq="h")
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0012, n))
+    open_ = np.roll(close, 1)
+    open_[0] = close[0]
+    spread = np.abs(rng.normal(0, 0.0008, n)) + 0.0002
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": 0.0,
+        },
+        index=pd.Index(idx, name="Timestamp"),
+    )
+
+
+def _timed(fn, repeat: int = 3) -> tuple[float, object]:
+    """Best wall time of `repeat` runs (seconds) and the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _row(label: str, n: int, seconds: float, extra: str = "") -> None:
+    print(f"{label:<28} {n:>8} bars  {seconds * 1000:>10.2f} ms  {extra}")
+
+
+def bench_pd_position(sizes: list[int], legacy_max: int) -> None:
+    from engine import ict, smc
+
+    for n in sizes:
+        df = synthetic_ohlc(n)
+        swings = smc.find_swings(df, 3)
+        events = smc.detect_structure(df, swings, 3, smc.atr(df))["events"]
+        fast_s, fast = _timed(lambda: ict.pd_position_series(df, events))
+        _row("pd_position_series", n, fast_s, f"({len(events)} events)")
+        if n <= legacy_max:
+            slow_s, slow = _timed(lambda: ict._pd_position_series_legacy(df, events), repeat=1)
+            same = np.array_equal(fast.to_numpy(), slow.to_numpy())
+            _row("  legacy replay", n, slow_s, f"x{slow_s / fast_s:,.0f}  identical={same}")
+
+
+def bench_swings(sizes: list[int], legacy_max: int) -> None:
+    from engine import smc
+
+    for n in sizes:
+        df = synthetic_ohlc(n)
+        highs, lows = df["High"].to_numpy(), df["Low"].to_numpy()
+        arrays_s, (pos, _, _) = _timed(lambda: smc.swing_points(highs, lows, 3))
+        frame_s, fast = _timed(lambda: smc.find_swings(df, 3))
+        _row("swing_points", n, arrays_s, f"({len(pos)} swings)")
+        _row("  find_swings (frame)", n, frame_s)
+        if n <= legacy_max:
+            slow_s, slow = _timed(lambda: smc._find_swings_legacy(df, 3), repeat=1)
+            _row("  legacy loop", n, slow_s, f"x{slow_s / arrays_s:,.0f}  identical={fast.equals(slow)}")
+
+
+def bench_structure(sizes: list[int], legacy_max: int) -> None:
+    from engine import smc
+
+    for n in sizes:
+        df = synthetic_ohlc(n)
+        swings, atr_s = smc.find_swings(df, 3), smc.atr(df)
+        fast_s, fast = _timed(lambda: smc.detect_structure(df, swings, 3, atr_s))
+        _row("detect_structure", n, fast_s, f"({len(fast['events'])} events)")
+        if n <= legacy_max:
+            slow_s, slow = _timed(lambda: smc._detect_structure_legacy(df, swings, 3, atr_s), repeat=1)
+            _row("  legacy walk", n, slow_s, f"x{slow_s / fast_s:,.0f}  identical={fast == slow}")
+
+
+def bench_touch(sizes: list[int], legacy_max: int) -> None:
+    from engine import ict, smc
+    from engine.touch_index import TouchIndex
+
+    for n in sizes:
+        df = synthetic_ohlc(n)
+        swings, atr_s = smc.find_swings(df, 3), smc.atr(df)
+        events = smc.detect_structure(df, swings, 3, atr_s)["events"]
+        tol = 0.25 * float(atr_s.iloc[-1])
+
+        def fast():
+            touch = TouchIndex(df)
+            blocks = smc.detect_order_blocks(df, events, touch=touch)
+            pools = smc.detect_liquidity_pools(df, swings, tol, touch=touch)
+            return (blocks, smc.detect_fvg(df, atr_s, touch=touch), pools,
+                    ict.detect_breakers(df, blocks, [{"pos": 0}], touch=touch))
+
+        def slow():
+            blocks = smc._detect_order_blocks_legacy(df, events)
+            pools = smc._detect_liquidity_pools_legacy(df, swings, tol)
+            return (blocks, smc._detect_fvg_legacy(df, atr_s), pools,
+                    ict._detect_breakers_legacy(df, blocks, [{"pos": 0}]))
+
+        fast_s, got = _timed(fast)
+        _row("OB+FVG+pools+breakers", n, fast_s, f"({sum(map(len, got))} objects)")
+        if n <= legacy_max:
+            slow_s, want = _timed(slow, repeat=1)
+            _row("  legacy per-object scans", n, slow_s, f"x{slow_s / fast_s:,.1f}  identical={got == want}")
+
+
+def bench_sweeps(sizes: list[int], legacy_max: int) -> None:
+    from engine import ict, smc
+
+    for n in sizes:
+        df = synthetic_ohlc(n)
+        swings, atr_last = smc.find_swings(df, 3), float(smc.atr(df).iloc[-1])
+        pools = smc.detect_liquidity_pools(df, swings, 0.25 * atr_last)
+        for recent in (24, 500):
+            args = (df, pools, swings, recent, 0.25 * atr_last)
+            fast_s, fast = _timed(lambda: ict.detect_sweeps(*args))
+            _row(f"detect_sweeps recent={recent}", n, fast_s, f"({len(pools)} pools, {len(fast)} sweeps)")
+            if n <= legacy_max:
+                slow_s, slow = _timed(lambda: ict._detect_sweeps_legacy(*args), repeat=1)
+                _row("  legacy slice scans", n, slow_s, f"x{slow_s / fast_s:,.0f}  identical={fast == slow}")
+
+
+def bench_incremental(sizes: list[int], legacy_max: int) -> None:
+    from engine import confluence
+    from engine.incremental import IncrementalAnalyzer
+    from schemas.threshold_schema import validate_threshold_config
+
+    thresholds = validate_threshold_config({})
+    steps = 200
+    for n in sizes:
+        n = min(n, confluence.MAX_BARS)
+        df = synthetic_ohlc(n + steps)
+        analyzer = IncrementalAnalyzer.from_frame(df.iloc[:n], "TSTUSD", thresholds=thresholds)
+        analyzer.analysis()
+        rows = list(zip(df.index[n:], *(df[c].to_numpy()[n:] for c in ("Open", "High", "Low", "Close", "Volume"))))
+        started = time.perf_counter()
+        for row in rows:
+            analyzer.append(*row)
+        _row("IncrementalAnalyzer.append", n, (time.perf_counter() - started) / steps, "(per bar)")
+        snap_s, _ = _timed(analyzer.analysis)
+        _row("  .analysis()", n, snap_s)
+        full_s, _ = _timed(lambda: confluence.analyze(analyzer.frame(), "TSTUSD", thresholds=thresholds))
+        _row("  confluence.analyze", n, full_s, f"x{full_s / snap_s:,.1f} slower than the snapshot")
+
+
+def bench_store(sizes: list[int], legacy_max: int) -> None:
+    import tempfile
+
+    from engine import candle_store
+    from engine.data import load_ohlc_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            df = synthetic_ohlc(n)
+            csv_file = os.path.join(tmp, f"TSTUSD_{n}.csv")
+            df.to_csv(csv_file)
+            store = candle_store.store_path_for(csv_file)
+            candle_store.write_candles(store, df)
+            csv_s, _ = _timed(lambda: load_ohlc_csv(csv_file))
+            store_s, _ = _timed(lambda: candle_store.read_candles(store))
+            _row("load_ohlc_csv", n, csv_s)
+            _row("  candle_store.read_candles", n, store_s, f"x{csv_s / store_s:,.0f}")
+
+
+_FAKE_STEPS = {"M1": 1, "M5": 5, "M15": 15, "M30": 30, "H1": 60, "H4": 240, "D": 1440}
+_FAKE_LATENCY = 0.1  # seconds per request, roughly a round trip to OANDA's API
+
+
+def _serve_fake_oanda(port_queue) -> None:
+    """v20-shaped candle server (runs in its own process, like a remote API).
+
+    Every series ends at the last closed candle as of server start;
+    `from` requests get the candles after it (none once the cache is
+    current), `count` requests the last `count` candles.
+    """
+    import json
+    from functools import lru_cache
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    now = pd.Timestamp.now(tz="UTC")
+
+    @lru_cache(maxsize=None)
+    def body(granularity: str, count: int, since: str | None) -> bytes:
+        step = pd.Timedelta(minutes=_FAKE_STEPS[granularity])
+        end = now.floor(step) - step
+        if since:
+            times = pd.date_range(pd.Timestamp(since) + step, end, freq=step)[:count]
+        else:
+            times = pd.date_range(end=end, periods=count, freq=step)
+        mid = {"o": "1.1000", "h": "1.1010", "l": "1.0990", "c": "1.1005"}
+        return json.dumps({"candles": [
+            {"time": t, "complete": True, "volume": 1, "mid": mid}
+            for t in times.strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+        ]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            time.sleep(_FAKE_LATENCY)
+            payload = body(query["granularity"], int(query["count"]), query.get("from"))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def bench_refresh(sizes: list[int], legacy_max: int) -> None:
+    import tempfile
+
+    from batch_fetch import refresh_all
+    from engine import data as market_data
+    from utils.pairs import DEFAULT_FX_PAIRS
+
+    import multiprocessing
+
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve_fake_oanda, args=(ports,), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{ports.get(timeout=30)}"
+    market_data.OANDA_HOSTS = {"practice": url, "live": url}
+    market_data.OANDA_API_KEY, market_data.DATA_PROVIDER = "bench", "oanda"
+    market_data.FETCH_COOLDOWN_MINUTES = 0
+    try:
+        for n in sizes:
+            pairs = list(DEFAULT_FX_PAIRS)[:n]
+            for workers in (1, 16):
+                with tempfile.TemporaryDirectory() as tmp:
+                    market_data.DATA_DIR = tmp
+                    for label in ("cold", "warm"):  # warm = delta fetches against the cache
+                        summary = refresh_all(pairs, train=False, intervals="all", workers=workers)
+                        print(
+                            f"refresh_all {label} workers={workers:<3} {summary['total']:>5} jobs"
+                            f"  {summary['seconds']:>8.2f} s  {summary['ok']} ok"
+                        )
+        print(f"(old serial loop: 15 s pause per job = {len(pairs) * 7 * 15 / 60:,.0f} min)")
+    finally:
+        server.terminate()
+
+
+BENCHES = {
+    "pd-position": bench_pd_position,
+    "swings": bench_swings,
+    "structure": bench_structure,
+    "touch": bench_touch,
+    "sweeps": bench_sweeps,
+    "incremental": bench_incremental,
+    "store": bench_store,
+    "refresh": bench_refresh,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bench", choices=sorted(BENCHES), help="benchmark to run")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated bar counts")
+    parser.add_argument("--legacy-max", type=int, default=2000, help="largest size to time legacy code on")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    BENCHES[args.bench](sizes, args.legacy_max)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
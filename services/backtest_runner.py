@@ -0,0 +1,346 @@
+# services/backtest_runner.py
+"""Backtest matrix: pairs x intervals x trading styles x threshold versions.
+
+run_backtest_matrix() expands the matrix into BacktestJobs and runs them
+on a process pool:
+
+  - candles are loaded once per (pair, interval) in the parent and
+    published as one shared-memory block each (epoch-ns times + OHLCV
+    rows); workers attach by name and build their frame once, then
+    reuse it for every style and version of that pair;
+  - thresholds are resolved in the parent (the active version plus
+    overrides for "active", the stored config otherwise, merged the way
+    compare_threshold_versions does), so workers never touch the DB;
+  - every finished job is appended to the report, which is rewritten
+    atomically (temp file + os.replace). The report doubles as the
+    checkpoint: with resume=True, jobs already in it under the same
+    engine settings are skipped.
+
+engine="topdown" replays the multi-timeframe stack instead
+(engine/mtf_backtest.py): the style's ladder picks the frames, so a job
+is keyed with interval "mtf", loads the ladder itself (no frame is
+published for it) and its report's interval is the entry frame used.
+
+The report keeps the single-run shape ("generated_at", "pairs": [...])
+that the admin panel reads; each entry also carries its interval,
+trading_style, threshold_version and job key.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from multiprocessing import shared_memory
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import get_logger
+
+log = get_logger("services.backtest_runner")
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPORT_PATH = os.path.join(PROJECT_ROOT, "logs", "backtest_report.json")
+ACTIVE_VERSION = "active"
+ENGINES = ("event", "walk", "topdown")
+MTF_INTERVAL = "mtf"  # interval of topdown jobs: the style's ladder picks the frames
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class BacktestJob(NamedTuple):
+    symbol: str
+    interval: str
+    trading_style: str
+    version: str  # "active" or a ThresholdVersion id
+
+    @property
+    def key(self) -> str:
+        return "|".join(self)
+
+
+class FrameHandle(NamedTuple):
+    """What a worker needs to attach to one published candle frame."""
+    name: str
+    rows: int
+    index_name: str | None
+
+
+def build_matrix(symbols, intervals, styles, versions) -> list[BacktestJob]:
+    return [
+        BacktestJob(sym.upper(), interval, style.lower(), str(version))
+        for sym in symbols for interval in intervals for style in styles for version in versions
+    ]
+
+
+# ----------------------------------------------------------------------
+# Shared candle frames
+# ----------------------------------------------------------------------
+class SharedFrames:
+    """Parent-side owner of the shared-memory candle blocks."""
+
+    def __init__(self):
+        self._blocks: list[shared_memory.SharedMemory] = []
+
+    def publish(self, df: pd.DataFrame) -> FrameHandle:
+        rows = len(df)
+        block = shared_memory.SharedMemory(create=True, size=max(8, 6 * rows * 8))
+        self._blocks.append(block)
+        values = np.ndarray((6, rows), dtype=np.float64, buffer=block.buf)
+        values[0].view(np.int64)[:] = pd.DatetimeIndex(df.index).as_unit("ns").asi8
+        for k, col in enumerate(COLUMNS, start=1):
+            values[k] = df[col].to_numpy(dtype=float) if col in df else 0.0
+        return FrameHandle(block.name, rows, df.index.name)
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedFrames":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_attached: dict[str, tuple[shared_memory.SharedMemory, pd.DataFrame]] = {}
+
+
+def _attach(handle: FrameHandle) -> pd.DataFrame:
+    """The published frame, built once per worker process (read-only values)."""
+    if handle.name not in _attached:
+        block = shared_memory.SharedMemory(name=handle.name)
+        values = np.ndarray((6, handle.rows), dtype=np.float64, buffer=block.buf)
+        values.flags.writeable = False
+        index = pd.DatetimeIndex(values[0].view(np.int64).view("M8[ns]"), name=handle.index_name)
+        frame = pd.DataFrame(dict(zip(COLUMNS, values[1:])), index=index, copy=False)
+        _attached[handle.name] = (block, frame)
+    return _attached[handle.name][1]
+
+
+# ----------------------------------------------------------------------
+# Jobs
+# ----------------------------------------------------------------------
+def _resolve_job_thresholds(jobs: list[BacktestJob]) -> dict[str, object]:
+    from config.smc_ict_thresholds import resolve_thresholds as resolve_with_version
+    from services.threshold_backtest import _load_version_config
+    from engine.trading_style import primary_entry_tf
+    from services.threshold_service import resolve_thresholds
+
+    configs = {}
+    out = {}
+    for job in jobs:
+        # topdown resolves for the style's entry frame, as topdown_analyze does
+        interval = primary_entry_tf(job.trading_style) if job.interval == MTF_INTERVAL else job.interval
+        if job.version == ACTIVE_VERSION:
+            out[job.key], _ = resolve_thresholds(job.symbol, interval, job.trading_style)
+            continue
+        if job.version not in configs:
+            configs[job.version], _ = _load_version_config(int(job.version))
+        out[job.key] = resolve_with_version(
+            job.symbol, interval, job.trading_style, version_config=configs[job.version],
+        )
+    return out
+
+
+def run_job(job: BacktestJob, df: pd.DataFrame | None, thresholds, *, engine: str = "event", triggers=None) -> dict:
+    """One backtest of the matrix; failures come back as an error report.
+
+    The topdown engine loads the style's whole ladder itself (df is None).
+    """
+    from engine.backtest import run_backtest
+    from engine.event_backtest import DEFAULT_TRIGGERS, run_event_backtest
+    from engine.mtf_backtest import run_topdown_backtest
+
+    try:
+        if engine == "topdown":
+            report = run_topdown_backtest(job.symbol, job.trading_style, thresholds=thresholds)
+        elif engine == "walk":
+            report = run_backtest(
+                df, job.symbol, thresholds=thresholds, trading_style=job.trading_style, interval=job.interval,
+            )
+        else:
+            report = run_event_backtest(
+                df, job.symbol, interval=job.interval, thresholds=thresholds,
+                trading_style=job.trading_style, triggers=triggers or DEFAULT_TRIGGERS,
+            )
+    except Exception as exc:
+        log.exception("Backtest %s failed", job.key)
+        report = {"symbol": job.symbol, "error": f"{type(exc).__name__}: {exc}", "trades": 0}
+    return _tagged(report, job)
+
+
+def _tagged(report: dict, job: BacktestJob) -> dict:
+    report.update({
+        "interval": (report.get("entry_tf") or job.interval) if job.interval == MTF_INTERVAL else job.interval,
+        "trading_style": job.trading_style,
+        "threshold_version": job.version, "job": job.key,
+    })
+    return report
+
+
+def _run_shared_job(job: BacktestJob, handle: FrameHandle | None, thresholds, engine: str, triggers) -> dict:
+    df = _attach(handle) if handle is not None else None
+    return run_job(job, df, thresholds, engine=engine, triggers=triggers)
+
+
+# ----------------------------------------------------------------------
+# Report / checkpoint
+# ----------------------------------------------------------------------
+def _write_report(path: str, payload: dict) -> None:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".backtest-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _checkpoint(path: str, settings: dict, fingerprints: dict[str, str]) -> dict[str, dict]:
+    """Finished reports of an earlier run with the same engine settings, by job key.
+
+    Failed jobs are left out, so a resumed run retries them, and so are
+    jobs whose thresholds resolve differently now (e.g. another active
+    version was promoted since).
+    """
+    try:
+        with open(path, encoding="utf-8") as fh:
+            previous = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if previous.get("settings") != settings:
+        log.info("Backtest report %s was produced with other settings; starting over", path)
+        return {}
+    return {
+        p["job"]: p for p in previous.get("pairs") or []
+        if p.get("job") and not p.get("error")
+        and p.get("thresholds_fingerprint") == fingerprints.get(p["job"])
+    }
+
+
+def check_versions(versions) -> list[str]:
+    """Threshold versions as given to the matrix: "active" or numeric version ids."""
+    out = []
+    for version in versions:
+        version = str(version).strip().lower()
+        if version != ACTIVE_VERSION and not version.isdigit():
+            raise ValueError(f"threshold version must be {ACTIVE_VERSION!r} or a version id, got {version!r}")
+        out.append(version)
+    return out
+
+
+def run_backtest_matrix(
+    symbols,
+    *,
+    intervals=("60min",),
+    styles=("intraday",),
+    versions=(ACTIVE_VERSION,),
+    engine: str = "event",
+    triggers=None,
+    jobs: int = 1,
+    resume: bool = False,
+    report_path: str = REPORT_PATH,
+    on_result: Callable[[dict], None] | None = None,
+) -> dict:
+    """Run every job of the matrix, streaming reports to report_path.
+
+    A run in which no job could start leaves report_path untouched.
+    Unknown engines and malformed or missing threshold versions raise
+    ValueError before any work.
+    """
+    from engine.analysis_memo import threshold_fingerprint
+    from engine.data import load_cached
+    from engine.event_backtest import DEFAULT_TRIGGERS
+
+    if engine not in ENGINES:
+        raise ValueError(f"unknown backtest engine {engine!r}; choose from {ENGINES}")
+    versions = check_versions(versions)
+    matrix = build_matrix(symbols, intervals, styles, versions)
+    if engine == "topdown":
+        matrix = list(dict.fromkeys(job._replace(interval=MTF_INTERVAL) for job in matrix))
+        intervals = (MTF_INTERVAL,)
+    settings = {"engine": engine, "triggers": sorted(triggers or DEFAULT_TRIGGERS) if engine == "event" else None}
+    thresholds = _resolve_job_thresholds(matrix)
+    fingerprints = {key: threshold_fingerprint(config) for key, config in thresholds.items()}
+    done = _checkpoint(report_path, settings, fingerprints) if resume else {}
+    pending = [job for job in matrix if job.key not in done]
+    payload = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "interval": intervals[0] if len(intervals) == 1 else None,
+        "engine": engine,
+        "settings": settings,
+        "matrix": {
+            "symbols": sorted({job.symbol for job in matrix}), "intervals": list(intervals),
+            "trading_styles": [s.lower() for s in styles], "threshold_versions": [str(v) for v in versions],
+        },
+        "total": len(matrix),
+        "complete": False,
+        "skipped": [],
+        "pairs": [done[job.key] for job in matrix if job.key in done],
+    }
+    if done:
+        log.info("Resuming backtest matrix: %d of %d jobs already in %s", len(payload["pairs"]), len(matrix), report_path)
+
+    def record(report: dict) -> None:
+        report["thresholds_fingerprint"] = fingerprints[report["job"]]
+        payload["pairs"].append(report)
+        payload["generated_at"] = datetime.now(timezone.utc).isoformat()
+        _write_report(report_path, payload)
+        if on_result is not None:
+            on_result(report)
+
+    started = time.monotonic()
+    frames: dict[tuple[str, str], pd.DataFrame] = {}
+    for job in pending if engine != "topdown" else ():
+        frame_key = (job.symbol, job.interval)
+        if frame_key in frames or "|".join(frame_key) in payload["skipped"]:
+            continue
+        df = load_cached(job.symbol, job.interval)
+        if df is None or df.empty:
+            log.warning("No cached candles for %s %s — skipping", job.symbol, job.interval)
+            payload["skipped"].append("|".join(frame_key))
+            continue
+        frames[frame_key] = df
+    runnable = [job for job in pending if engine == "topdown" or (job.symbol, job.interval) in frames]
+
+    if jobs <= 1 or len(runnable) <= 1:
+        for job in runnable:
+            record(run_job(job, frames.get((job.symbol, job.interval)), thresholds[job.key], engine=engine, triggers=triggers))
+    else:
+        with SharedFrames() as shared, ProcessPoolExecutor(max_workers=min(jobs, len(runnable))) as pool:
+            handles = {key: shared.publish(df) for key, df in frames.items()}
+            futures = {
+                pool.submit(
+                    _run_shared_job, job, handles.get((job.symbol, job.interval)),
+                    thresholds[job.key], engine, triggers,
+                ): job
+                for job in runnable
+            }
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = futures.pop(future)
+                    try:
+                        report = future.result()
+                    except Exception as exc:  # worker crashed (e.g. killed)
+                        log.error("Backtest worker for %s failed: %s", job.key, exc)
+                        report = _tagged({"symbol": job.symbol, "error": f"worker failed: {exc}", "trades": 0}, job)
+                    record(report)
+
+    payload["complete"] = True
+    payload["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+    if payload["pairs"]:
+        _write_report(report_path, payload)
+    else:
+        log.warning("No backtest job could run; %s left as it was", report_path)
+    return payload
@@ -42,6 +42,25 @@ def get_active_model(
         db.close()
 
 
+def active_model_ids(symbol: str, trading_style: str = "intraday") -> tuple[int, ...]:
+    """Ids of every ACTIVE model for a pair and style, across intervals."""
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(ModelVersion.id)
+            .filter(
+                ModelVersion.symbol == symbol.upper(),
+                ModelVersion.trading_style == trading_style,
+                ModelVersion.status == "ACTIVE",
+            )
+            .order_by(ModelVersion.id)
+            .all()
+        )
+        return tuple(row.id for row in rows)
+    finally:
+        db.close()
+
+
 def load_active_bundle(symbol: str, interval: str, trading_style: str = "intraday") -> dict | None:
     row = get_active_model(symbol, interval, trading_style)
     if not row:
@@ -0,0 +1,107 @@
+# services/pair_scanner.py
+"""Scan every pair of the catalog for setups within one request budget."""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+import pandas as pd
+
+from engine.data import INTERVAL_MINUTES, load_cached
+from engine.panel import Panel, rank_setups
+from utils.config import INTERVAL, SCAN_BUDGET_SECONDS, SCAN_CONFIRM_TOP, SCAN_PANEL_BARS
+from utils.logger import get_logger
+
+log = get_logger("services.pair_scanner")
+
+
+def scan_all_pairs(
+    interval: str = INTERVAL,
+    *,
+    trading_style: str = "intraday",
+    limit: int = 20,
+    confirm: int = SCAN_CONFIRM_TOP,
+    budget_seconds: float = SCAN_BUDGET_SECONDS,
+    symbols: list[str] | None = None,
+    allow: Callable[[str], tuple[bool, str]] | None = None,
+    charge: Callable[[], tuple[bool, str]] | None = None,
+    refund: Callable[[], None] | None = None,
+) -> dict:
+    """Rank setups across the catalog, then confirm the best through the pipeline.
+
+    Only cached candles are read (no provider calls). Every pair goes
+    through one vectorised panel pass (engine/panel.py); pairs whose last
+    candle trails the newest by more than one interval are left out as
+    stale. The top `confirm` candidates then run predict_symbol; one is
+    started only while the budget still fits another confirmation as
+    long as the last one took.
+
+    allow(symbol) -> (ok, reason) drops refused pairs (the API passes its
+    kill switch); charge() -> (ok, reason) is called before every
+    confirmation and refund() after a failed one (the API's quota).
+    """
+    from utils.settings import get_supported_pairs
+
+    started = time.monotonic()
+    catalog = [s.upper() for s in (symbols or get_supported_pairs())]
+    frames, missing, excluded = {}, [], []
+    for symbol in catalog:
+        if allow is not None and not allow(symbol)[0]:
+            excluded.append(symbol)
+            continue
+        df = load_cached(symbol, interval)
+        if df is None or df.empty:
+            missing.append(symbol)
+        else:
+            frames[symbol] = df
+    panel = Panel.from_frames(
+        frames, bars=SCAN_PANEL_BARS, max_lag=pd.Timedelta(minutes=INTERVAL_MINUTES[interval]),
+    )
+    setups = rank_setups(panel)[:max(limit, 0)]
+    panel_ms = round((time.monotonic() - started) * 1000, 1)
+
+    from engine.pipeline import predict_symbol
+    last_seconds = 0.0
+    for setup in setups[:confirm]:
+        if time.monotonic() - started + last_seconds >= budget_seconds:
+            setup["confirmation"] = {"skipped": "budget exhausted"}
+            continue
+        if charge is not None:
+            ok, reason = charge()
+            if not ok:
+                setup["confirmation"] = {"skipped": reason}
+                continue
+        confirm_started = time.monotonic()
+        try:
+            result = predict_symbol(
+                setup["symbol"], interval=interval, fetch=False, trading_style=trading_style,
+            )
+        except Exception as exc:
+            log.warning("Scan confirmation failed for %s: %s", setup["symbol"], exc)
+            setup["confirmation"] = {"error": str(exc)}
+            if refund is not None:
+                refund()
+            continue
+        finally:
+            last_seconds = time.monotonic() - confirm_started
+        decision = result.get("decision") or {}
+        setup["confirmation"] = {
+            "action": decision.get("action"),
+            "confidence": decision.get("confidence"),
+            "cached": bool(result.get("result_cache")),
+        }
+
+    return {
+        "interval": interval,
+        "trading_style": trading_style,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "scanned": len(panel),
+        "missing_data": missing,
+        "stale_data": panel.stale,
+        "excluded": excluded,
+        "setups": setups,
+        "panel_ms": panel_ms,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "budget_seconds": budget_seconds,
+    }
@@ -10,7 +10,7 @@ import pandas as pd
 
 from db.models import PredictionReview
 from db.session import SessionLocal
-from engine.data import csv_path, get_data, load_ohlc_csv
+from engine.data import get_data, load_cached
 from services.prediction_review import list_reviews
 from utils.logger import get_logger
 
@@ -127,8 +127,8 @@ def get_review_candles(user_id: int, review_id: int, bars: int = 48) -> dict | N
                 df, data_source = get_data(review.symbol, interval, fetch=False)
                 source = data_source
             except Exception:
-                path = csv_path(review.symbol, interval)
-                if not os.path.isfile(path):
+                df = load_cached(review.symbol, interval)
+                if df is None:
                     return {
                         "review_id": review_id,
                         "symbol": review.symbol,
@@ -141,7 +141,6 @@ def get_review_candles(user_id: int, review_id: int, bars: int = 48) -> dict | N
                         "predicted_at": review.predicted_at.isoformat() if review.predicted_at else None,
                         "actual_price": review.actual_price,
                     }
-                df = load_ohlc_csv(path)
                 source = "cache"
 
             if review.predicted_at and not df.empty:
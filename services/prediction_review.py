@@ -6,12 +6,14 @@ import json
 import os
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 
 from db.models import DetectedSignal, MarketVerification, PredictionReview
 from db.session import SessionLocal
 from engine.confluence import ACTION_BUY, ACTION_NO_TRADE, ACTION_SELL, ACTION_WAIT
 from engine.data import get_data
+from engine.tp_sl import HIT_BOTH, HIT_STOP, first_hit
 from services.feedback_fields import split_feedback_fields
 from services.training_service import reconcile_training_record
 from services.user_access import FEEDBACK_DUE_HOURS
@@ -83,6 +85,85 @@ def verify_candles(
     if candles.empty or entry <= 0:
         raise ValueError("Insufficient candle data for verification")
 
+    threshold = _atr_fraction_threshold(entry, atr, sideways_atr_multiplier=sideways_atr_multiplier)
+    is_bull = predicted_action in BULLISH_ACTIONS
+    is_bear = predicted_action in BEARISH_ACTIONS
+    highs = candles["High"].to_numpy(dtype=float)
+    lows = candles["Low"].to_numpy(dtype=float)
+
+    if is_bull or is_bear:
+        hit = first_hit(highs, lows, 0, entry, invalidation, target, is_bull, exit_excursion="hit")
+        invalidation_hit = int(hit.outcome[0]) in (HIT_STOP, HIT_BOTH)
+        mfe, mae = float(hit.mfe[0]), float(hit.mae[0])
+    else:
+        invalidation_hit = False
+        up, down = highs - entry, entry - lows
+        mfe = max(0.0, float(np.nanmax(up, initial=0.0)), float(np.nanmax(down, initial=0.0)))
+        mae = max(0.0, float(np.nanmax(np.abs(down), initial=0.0)), float(np.nanmax(np.abs(up), initial=0.0)))
+
+    end_price = float(candles["Close"].iloc[-1])
+    change = (end_price - entry) / entry
+    if invalidation_hit and (is_bull or is_bear):
+        actual_direction = "INVALIDATED"
+    else:
+        actual_direction = _direction_from_change(change, threshold)
+
+    if predicted_action in NON_TRADE_ACTIONS:
+        outcome = "NO_TRADE_CONFIRMED" if actual_direction == "SIDEWAYS" else "NEUTRAL"
+        was_correct = actual_direction == "SIDEWAYS"
+    elif invalidation_hit:
+        outcome = "AI_WRONG"
+        was_correct = False
+    elif is_bull:
+        if actual_direction == "UP":
+            outcome = "AI_CORRECT"
+            was_correct = True
+        elif actual_direction == "DOWN":
+            outcome = "AI_WRONG"
+            was_correct = False
+        else:
+            outcome = "NEUTRAL"
+            was_correct = None
+    elif is_bear:
+        if actual_direction == "DOWN":
+            outcome = "AI_CORRECT"
+            was_correct = True
+        elif actual_direction == "UP":
+            outcome = "AI_WRONG"
+            was_correct = False
+        else:
+            outcome = "NEUTRAL"
+            was_correct = None
+    else:
+        outcome = "NEUTRAL"
+        was_correct = None
+
+    return {
+        "start_price": entry,
+        "end_price": end_price,
+        "max_favorable_excursion": round(mfe, 6),
+        "max_adverse_excursion": round(mae, 6),
+        "actual_direction": actual_direction,
+        "outcome": outcome,
+        "invalidation_hit": invalidation_hit,
+        "was_correct": was_correct,
+    }
+
+
+def _verify_candles_legacy(
+    candles: pd.DataFrame,
+    *,
+    entry: float,
+    invalidation: float | None,
+    target: float | None,
+    predicted_action: str,
+    atr: float,
+    sideways_atr_multiplier: float | None = None,
+) -> dict:
+    """Candle-based MFE/MAE with invalidation-first logic."""
+    if candles.empty or entry <= 0:
+        raise ValueError("Insufficient candle data for verification")
+
     threshold = _atr_fraction_threshold(entry, atr, sideways_atr_multiplier=sideways_atr_multiplier)
     mfe = 0.0
     mae = 0.0
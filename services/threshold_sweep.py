@@ -0,0 +1,368 @@
+# services/threshold_sweep.py
+"""Grid / random search over SmcIctThresholds fields, ranked per pair.
+
+A trial is a patch of dotted threshold fields
+({"volatility.displacement_atr_multiplier": 1.5, ...}) merged over the
+pair's resolved thresholds, scored with the walk-forward backtest
+(engine/backtest: same steps, same trades, same metrics as
+run_backtest() with those thresholds).
+
+What makes thousands of trials affordable is that most of the work does
+not depend on most fields:
+
+  - per step: the window, its ATR, touch index, swings and raw FVG
+    candidates are built once for the whole sweep;
+  - per step and displacement multiplier: the displacement-filtered
+    FVGs; per step, displacement and BOS minimum: the structure;
+  - per detector key (swing window, displacement, BOS minimum, FVG
+    minimum, equal-high/low tolerance): the assembled analysis, shared
+    by every trial that only moves decision / risk-reward cutoffs; for
+    those, a trial is one decide() per step.
+
+Trials are run grouped by detector key, so only one group's analyses
+are alive at a time.
+
+Each pair's last SWEEP_BARS candles are split in time: trials are
+ranked on the older tuning segment, and the best patches (and the
+baseline) are re-scored on the later validation segment they never saw,
+so an overfit winner shows up as a validation drop. The validation walk
+starts MIN_WARMUP bars before the split, so its first decision is the
+first bar after it.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+import annotated_types
+import pandas as pd
+
+from engine import confluence, smc
+from engine.backtest import MIN_WARMUP, backtest_report, walk_steps
+from engine.patterns import scan_patterns
+from engine.touch_index import TouchIndex
+from schemas.threshold_schema import (
+    SmcIctThresholds,
+    ThresholdValidationError,
+    get_tf_key,
+    merge_threshold_patch,
+)
+from utils.logger import get_logger
+
+log = get_logger("services.threshold_sweep")
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPORT_PATH = os.path.join(PROJECT_ROOT, "logs", "threshold_sweep.json")
+OBJECTIVES = ("final_equity", "win_rate", "accuracy", "avg_rr")
+MODES = ("grid", "random")
+MIN_TRADES = 5
+TOP_N = 10
+SWEEP_BARS = 800          # candles per pair, tuning + validation
+VALIDATION_SHARE = 0.3    # newest share of SWEEP_BARS held out for validation
+METRIC_KEYS = (
+    "trades", "wins", "losses", "win_rate", "avg_rr", "accuracy", "no_trade_rate", "wait_rate",
+    "invalidation_hit_rate", "max_drawdown_pct", "final_equity",
+)
+
+
+# ----------------------------------------------------------------------
+# Search space
+# ----------------------------------------------------------------------
+def _field(path: str):
+    section, name = path.split(".")
+    model = SmcIctThresholds.model_fields[section].annotation
+    return model.model_fields[name]
+
+
+def field_bounds(path: str) -> tuple[float, float]:
+    """The (ge, le) validation bounds of a dotted threshold field."""
+    lo = hi = None
+    for meta in _field(path).metadata:
+        if isinstance(meta, annotated_types.Ge):
+            lo = meta.ge
+        elif isinstance(meta, annotated_types.Le):
+            hi = meta.le
+    if lo is None or hi is None:
+        raise ValueError(f"threshold field {path!r} has no numeric bounds to sweep")
+    return lo, hi
+
+
+def _around_default(path: str, factors=(0.6, 1.0, 1.5)) -> list:
+    default = _field(path).default
+    lo, hi = field_bounds(path)
+    values = sorted({min(max(round(default * f, 2), lo), hi) for f in factors})
+    return [int(v) for v in values] if isinstance(default, int) else values
+
+
+def default_space(interval: str = "60min") -> dict[str, list]:
+    """Displacement, BOS / FVG minimums, equal-high/low tolerance and decision cutoffs."""
+    tf = get_tf_key(interval).lower()
+    return {
+        "volatility.displacement_atr_multiplier": [1.0, 1.2, 1.5, 1.8],
+        f"bos.min_bos_break_pips_{tf}": _around_default(f"bos.min_bos_break_pips_{tf}"),
+        f"fvg.min_fvg_size_pips_{tf}": _around_default(f"fvg.min_fvg_size_pips_{tf}"),
+        "swing.equal_high_low_tolerance_pips": _around_default("swing.equal_high_low_tolerance_pips"),
+        "decision.score_bias_minimum": [55, 60, 65],
+        "decision.min_confidence_for_bias": [0.5, 0.6, 0.7],
+    }
+
+
+def grid_trials(space: dict[str, list]) -> list[dict]:
+    paths = list(space)
+    return [dict(zip(paths, values)) for values in itertools.product(*(space[p] for p in paths))]
+
+
+def random_trials(space: dict[str, list], n: int, seed: int = 0) -> list[dict]:
+    """n distinct patches, each field drawn uniformly between its swept min and max."""
+    rng = random.Random(seed)
+    trials, seen = [], set()
+    for _ in range(n * 20):
+        if len(trials) >= n:
+            break
+        patch = {}
+        for path, values in space.items():
+            lo, hi = min(values), max(values)
+            if isinstance(_field(path).default, int):
+                patch[path] = rng.randint(int(lo), int(hi))
+            else:
+                patch[path] = round(rng.uniform(lo, hi), 2)
+        key = tuple(patch.values())
+        if key not in seen:
+            seen.add(key)
+            trials.append(patch)
+    return trials
+
+
+def _nested(patch: dict) -> dict:
+    out: dict = {}
+    for path, value in patch.items():
+        section, name = path.split(".")
+        out.setdefault(section, {})[name] = value
+    return out
+
+
+# ----------------------------------------------------------------------
+# Shared detector stages
+# ----------------------------------------------------------------------
+class _Step:
+    __slots__ = ("end", "window", "atr", "touch", "swings", "candidates", "fvgs", "structures")
+
+    def __init__(self, end: int, window: pd.DataFrame, atr_values):
+        window = window.tail(confluence.MAX_BARS)
+        self.end = end
+        self.window = window
+        self.atr = (
+            smc.atr(window) if atr_values is None
+            else pd.Series(atr_values, index=window.index, dtype=float)
+        )
+        self.touch = TouchIndex(window)
+        self.swings: dict[int, pd.DataFrame] = {}
+        self.candidates = smc.fvg_candidates(window, self.atr)
+        self.fvgs: dict[float, list] = {}
+        self.structures: dict[tuple, dict] = {}
+
+
+class SweepContext:
+    """One pair's candles walked once; analyses built per detector key on demand."""
+
+    def __init__(self, df: pd.DataFrame, symbol: str, *, interval: str = "60min",
+                 trading_style: str = "intraday", max_bars: int = SWEEP_BARS):
+        self.df = df.tail(max_bars).copy()
+        self.symbol = symbol
+        self.interval = interval
+        self.trading_style = trading_style
+        self.pattern_scan = scan_patterns(self.df, start=MIN_WARMUP)
+        self.steps = [_Step(end, window, atr) for end, window, atr in walk_steps(self.df)]
+        self.analyses_built = 0
+
+    def analyses(self, params: dict) -> list:
+        """Per step, the analysis confluence.analyze() would return for these params."""
+        window_size, disp, min_bos = params["swing_window"], params["disp_mult"], params["min_bos"]
+        out = []
+        for step in self.steps:
+            swings = step.swings.get(window_size)
+            if swings is None:
+                swings = step.swings[window_size] = smc.find_swings(step.window, window_size)
+            fvgs_raw = step.fvgs.get(disp)
+            if fvgs_raw is None:
+                fvgs_raw = step.fvgs[disp] = smc.fvgs_from_candidates(
+                    step.window, step.candidates, displacement_mult=disp, touch=step.touch,
+                )
+            structure = step.structures.get((window_size, disp, min_bos))
+            if structure is None:
+                structure = step.structures[(window_size, disp, min_bos)] = smc.detect_structure(
+                    step.window, swings, window_size, step.atr, displacement_mult=disp, min_break_abs=min_bos,
+                )
+            analysis = confluence.assemble_analysis(
+                step.window, self.symbol, self.interval, params, float(step.atr.iloc[-1]), swings,
+                dict(structure), fvgs_raw, step.touch, pattern_scan=self.pattern_scan,
+            )
+            analysis["trading_style"] = self.trading_style
+            out.append(analysis)
+        self.analyses_built += len(out)
+        return out
+
+    def evaluate(self, analyses: list, thresholds: SmcIctThresholds) -> dict:
+        decisions = [
+            (step.end, confluence.decide(analysis, ml_signal=None, thresholds=thresholds))
+            for step, analysis in zip(self.steps, analyses)
+        ]
+        return backtest_report(self.df, self.symbol, decisions)
+
+
+def _detector_key(params: dict) -> tuple:
+    return tuple(params[k] for k in ("swing_window", "disp_mult", "min_bos", "min_fvg", "eq_tol"))
+
+
+def _rank_key(metrics: dict, objective: str, min_trades: int):
+    return (metrics["trades"] >= min_trades, metrics.get(objective) or 0, metrics["trades"])
+
+
+# ----------------------------------------------------------------------
+# Sweeps
+# ----------------------------------------------------------------------
+def split_segments(df: pd.DataFrame, max_bars: int = SWEEP_BARS,
+                   validation_share: float = VALIDATION_SHARE) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(tuning, validation) frames of the last max_bars candles (see the module docstring)."""
+    df = df.tail(max_bars)
+    cut = len(df) - int(round(len(df) * validation_share))
+    return df.iloc[:cut], df.iloc[max(0, cut - MIN_WARMUP):]
+
+
+def _score(context: SweepContext, members: list) -> list[tuple[dict, dict]]:
+    """(patch, metrics) per trial, one analysis pass per detector group."""
+    groups: dict[tuple, list] = {}
+    for member in members:
+        groups.setdefault(_detector_key(member[2]), []).append(member)
+    results = []
+    for group in groups.values():
+        analyses = context.analyses(group[0][2])
+        for patch, thresholds, _ in group:
+            report = context.evaluate(analyses, thresholds)
+            results.append((patch, {k: report[k] for k in METRIC_KEYS}))
+    return results
+
+
+def sweep_pair(
+    symbol: str,
+    df: pd.DataFrame,
+    trials: list[dict],
+    *,
+    interval: str = "60min",
+    trading_style: str = "intraday",
+    base: SmcIctThresholds | None = None,
+    objective: str = "final_equity",
+    min_trades: int = MIN_TRADES,
+    top_n: int = TOP_N,
+    max_bars: int = SWEEP_BARS,
+    validation_share: float = VALIDATION_SHARE,
+) -> dict:
+    """Rank every trial patch on the tuning segment, re-score the best on validation.
+
+    The baseline (empty patch) is always included.
+    """
+    from services.threshold_service import resolve_thresholds_model
+
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown sweep objective {objective!r}; choose from {OBJECTIVES}")
+    started = time.monotonic()
+    if base is None:
+        base = resolve_thresholds_model(symbol, interval, trading_style)
+    tuning, validation = split_segments(df, max_bars, validation_share)
+    if min(len(tuning), len(validation)) < MIN_WARMUP + 50:
+        return {"symbol": symbol.upper(), "error": "Not enough bars for a tuning and a validation segment", "trials": 0}
+
+    members = []
+    invalid = 0
+    for patch in [{}] + [t for t in trials if t]:
+        try:
+            thresholds = merge_threshold_patch(base, _nested(patch)) if patch else base
+        except ThresholdValidationError:
+            invalid += 1
+            continue
+        members.append((patch, thresholds, confluence.analysis_params(symbol, interval, thresholds, trading_style)))
+
+    kwargs = dict(interval=interval, trading_style=trading_style, max_bars=max_bars)
+    context = SweepContext(tuning, symbol, **kwargs)
+    results = _score(context, members)
+    ranked = sorted(results, key=lambda r: _rank_key(r[1], objective, min_trades), reverse=True)[:top_n]
+
+    best_patches = [patch for patch, _ in ranked]
+    held_out = SweepContext(validation, symbol, **kwargs)
+    validated = _score(held_out, [m for m in members if not m[0] or m[0] in best_patches])
+    out_of_sample = {tuple(patch.items()): metrics for patch, metrics in validated}
+    return {
+        "symbol": symbol.upper(),
+        "interval": interval,
+        "trading_style": trading_style,
+        "objective": objective,
+        "min_trades": min_trades,
+        "trials": len(results),
+        "invalid_trials": invalid,
+        "detector_groups": len({_detector_key(m[2]) for m in members}),
+        "tuning_bars": len(tuning),
+        "validation_bars": len(validation) - min(MIN_WARMUP, len(tuning)),
+        "steps": len(context.steps),
+        "analyses_built": context.analyses_built,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "baseline": next(metrics for patch, metrics in results if not patch),
+        "baseline_validation": out_of_sample[()],
+        "best": [
+            {"rank": i + 1, "patch": patch, "metrics": metrics, "validation": out_of_sample[tuple(patch.items())]}
+            for i, (patch, metrics) in enumerate(ranked)
+        ],
+    }
+
+
+def run_threshold_sweep(
+    symbols,
+    *,
+    interval: str = "60min",
+    trading_style: str = "intraday",
+    space: dict[str, list] | None = None,
+    mode: str = "grid",
+    n_trials: int = 200,
+    seed: int = 0,
+    objective: str = "final_equity",
+    min_trades: int = MIN_TRADES,
+    top_n: int = TOP_N,
+    report_path: str = REPORT_PATH,
+    on_result=None,
+) -> dict:
+    """Sweep every pair over the same trials; the report is rewritten after each pair."""
+    from engine.data import load_cached
+    from services.backtest_runner import _write_report
+
+    if mode not in MODES:
+        raise ValueError(f"unknown sweep mode {mode!r}; choose from {MODES}")
+    space = space or default_space(interval)
+    for path in space:
+        field_bounds(path)  # unknown / non-numeric fields fail before any work
+    trials = grid_trials(space) if mode == "grid" else random_trials(space, n_trials, seed)
+    payload = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "interval": interval,
+        "trading_style": trading_style,
+        "mode": mode,
+        "space": space,
+        "trials": len(trials),
+        "pairs": [],
+    }
+    for symbol in symbols:
+        df = load_cached(symbol, interval)
+        if df is None or df.empty:
+            log.warning("No cached candles for %s %s — skipping", symbol, interval)
+            continue
+        result = sweep_pair(
+            symbol, df, trials, interval=interval, trading_style=trading_style,
+            objective=objective, min_trades=min_trades, top_n=top_n,
+        )
+        payload["pairs"].append(result)
+        payload["generated_at"] = datetime.now(timezone.utc).isoformat()
+        _write_report(report_path, payload)
+        if on_result is not None:
+            on_result(result)
+    return payload
@@ -20,6 +20,7 @@ os.environ["ALPHA_VANTAGE_API_KEY"] = ""      # tests never fetch live data
 os.environ["OANDA_API_KEY"] = ""
 os.environ["TELEGRAM_BOT_TOKEN"] = ""
 os.environ["FETCH_COOLDOWN_MINUTES"] = "0"
+os.environ["PREDICTION_CACHE"] = "off"         # tests opt in explicitly
 os.environ["RATELIMIT_STORAGE_URI"] = "memory://"
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -50,12 +51,17 @@ def synthetic_ohlc() -> pd.DataFrame:
 @pytest.fixture(scope="session")
 def synthetic_csv(synthetic_ohlc, tmp_path_factory) -> str:
     """Synthetic pair CSV placed in the real data dir (cleaned afterwards)."""
+    import glob
+
     from engine.data import DATA_DIR
+    from engine.timeframe_index import INDEX_EXT
     path = os.path.join(DATA_DIR, "TSTUSD_60min.csv")
     synthetic_ohlc.to_csv(path)
     yield path
-    if os.path.exists(path):
-        os.remove(path)
+    # ...together with the timeframe indexes derived from it
+    for leftover in [path, *glob.glob(os.path.join(DATA_DIR, f"TSTUSD_*{INDEX_EXT}"))]:
+        if os.path.exists(leftover):
+            os.remove(leftover)
 
 
 @pytest.fixture(scope="session")
@@ -197,3 +197,13 @@ def test_refresh_status(client, admin_token):
     res = client.get("/admin/api/data/refresh/status", headers=auth(admin_token))
     assert res.status_code == 200
     assert "running" in res.get_json()
+
+
+def test_refresh_all_rejects_unknown_intervals(client, admin_token):
+    res = client.post(
+        "/admin/api/data/refresh",
+        json={"all": True, "intervals": ["60min", "3min"]},
+        headers=auth(admin_token),
+    )
+    assert res.status_code == 400
+    assert "supported_intervals" in res.get_json()
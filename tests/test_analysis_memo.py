@@ -0,0 +1,66 @@
+"""Per-request analysis memo: one analyze() per distinct frame, same output."""
+import pytest
+
+from engine import analysis_memo, confluence
+from engine import data as market_data
+from engine.analysis_memo import AnalysisMemo
+from engine.topdown import topdown_analyze
+
+
+@pytest.fixture
+def counted_analyze(monkeypatch):
+    calls = []
+    real = confluence.analyze
+
+    def wrapper(df, symbol, *args, **kwargs):
+        calls.append(kwargs.get("interval"))
+        return real(df, symbol, *args, **kwargs)
+
+    monkeypatch.setattr(analysis_memo.confluence, "analyze", wrapper)
+    return calls
+
+
+def test_memo_keys_on_frame_thresholds_and_style(synthetic_ohlc, initialized_db, counted_analyze):
+    from services.threshold_service import resolve_thresholds_model
+
+    memo = AnalysisMemo()
+    thresholds = resolve_thresholds_model("TSTUSD", "60min", "intraday")
+    first = memo.analyze(synthetic_ohlc, "TSTUSD", "60min", thresholds=thresholds)
+    assert memo.analyze(synthetic_ohlc.copy(), "tstusd", "60min", thresholds=thresholds) is first
+    assert memo.analyze(synthetic_ohlc, "TSTUSD", "60min", thresholds=thresholds, trading_style="swing") is not first
+    assert memo.analyze(synthetic_ohlc.iloc[:-1], "TSTUSD", "60min", thresholds=thresholds) is not first
+
+    forming = synthetic_ohlc.copy()
+    forming.iloc[-1, forming.columns.get_loc("Close")] += 0.0005  # same bar time, new price
+    assert memo.analyze(forming, "TSTUSD", "60min", thresholds=thresholds) is not first
+
+    looser = thresholds.model_copy(update={"swing": thresholds.swing.model_copy(update={"swing_lookback_left": 2})})
+    assert memo.analyze(synthetic_ohlc, "TSTUSD", "60min", thresholds=looser) is not first
+    assert len(counted_analyze) == 5
+    assert memo.stats()["hits"] == 1
+
+
+def test_topdown_analyses_each_frame_once_with_identical_output(
+    synthetic_ohlc, initialized_db, counted_analyze, monkeypatch, tmp_path,
+):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    synthetic_ohlc.to_csv(tmp_path / "TSTUSD_60min.csv")
+    baseline = topdown_analyze("TSTUSD", fetch=False, memo=AnalysisMemo(max_entries=0))
+    uncached_calls = len(counted_analyze)
+    counted_analyze.clear()
+
+    memo = AnalysisMemo()
+    stack = topdown_analyze("TSTUSD", fetch=False, memo=memo)
+    # Only 1H exists (4H is resampled from it): 1H serves the parent,
+    # structure, setup (fallback) and liquidity layers.
+    assert uncached_calls == 5
+    assert sorted(counted_analyze) == ["240min", "60min"]
+    assert stack["context"] == baseline["context"]
+
+    got, want = stack["analysis"], baseline["analysis"]
+    assert confluence.decide(got) == confluence.decide(want)
+    for key in ("structure", "order_blocks", "fvgs", "pools", "sweeps", "breakers", "htf_bias", "liquidity_draw"):
+        assert got.get(key) == want.get(key), key
+    # the decorated entry analysis never leaks into the shared layers
+    struct = got["layer_results"]["struct_60min"]["analysis"]
+    assert "htf_bias" not in struct and struct["pools"] is not got["pools"]
@@ -0,0 +1,68 @@
+"""Backtest matrix: pooled workers on shared candles, streamed report, resumable."""
+import json
+
+import pytest
+
+from schemas.threshold_schema import merge_threshold_patch, validate_threshold_config
+from services import backtest_runner
+from services.backtest_runner import run_backtest_matrix
+
+
+def _strip(payload: dict) -> list[dict]:
+    return sorted(
+        ({k: v for k, v in p.items() if k != "elapsed_ms"} for p in payload["pairs"]),
+        key=lambda p: p["job"],
+    )
+
+
+def test_pool_on_shared_frames_matches_a_serial_run(synthetic_csv, tmp_path):
+    kwargs = dict(intervals=("60min",), styles=("intraday", "swing"), versions=("active",))
+    serial = run_backtest_matrix(["TSTUSD", "NOPAIR"], report_path=str(tmp_path / "a.json"), **kwargs)
+    pooled = run_backtest_matrix(["TSTUSD", "NOPAIR"], jobs=2, report_path=str(tmp_path / "b.json"), **kwargs)
+
+    assert [p["job"] for p in serial["pairs"]] == ["TSTUSD|60min|intraday|active", "TSTUSD|60min|swing|active"]
+    assert _strip(pooled) == _strip(serial)
+    assert pooled["skipped"] == ["NOPAIR|60min"] and pooled["complete"]
+    with open(tmp_path / "b.json", encoding="utf-8") as fh:
+        assert _strip(json.load(fh)) == _strip(serial)
+
+
+def test_resume_skips_finished_jobs(synthetic_csv, tmp_path, monkeypatch):
+    path = str(tmp_path / "report.json")
+    first = run_backtest_matrix(["TSTUSD"], styles=("intraday",), report_path=path)
+
+    ran = []
+    real_run_job = backtest_runner.run_job
+
+    def counting_run_job(job, *args, **kwargs):
+        ran.append(job.key)
+        return real_run_job(job, *args, **kwargs)
+
+    monkeypatch.setattr(backtest_runner, "run_job", counting_run_job)
+    resumed = run_backtest_matrix(["TSTUSD"], styles=("intraday", "swing"), report_path=path, resume=True)
+    assert ran == ["TSTUSD|60min|swing|active"]
+    assert resumed["pairs"][0] == first["pairs"][0] and len(resumed["pairs"]) == 2
+
+    # other engine settings: the checkpoint does not apply
+    ran.clear()
+    run_backtest_matrix(["TSTUSD"], styles=("intraday",), triggers=("swing",), report_path=path, resume=True)
+    assert ran == ["TSTUSD|60min|intraday|active"]
+
+    # "active" now resolves to other thresholds: the finished job is stale
+    from services import threshold_service
+    promoted = merge_threshold_patch(validate_threshold_config({}), {"decision": {"score_bias_minimum": 70}})
+    monkeypatch.setattr(threshold_service, "resolve_thresholds", lambda *a, **k: (promoted, 99))
+    ran.clear()
+    run_backtest_matrix(["TSTUSD"], styles=("intraday",), triggers=("swing",), report_path=path, resume=True)
+    assert ran == ["TSTUSD|60min|intraday|active"]
+
+
+def test_a_run_without_jobs_keeps_the_last_report(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_text('{"pairs": [{"symbol": "EURUSD"}]}', encoding="utf-8")
+    payload = run_backtest_matrix(["NOPAIR"], report_path=str(path))
+    assert payload["pairs"] == [] and payload["skipped"] == ["NOPAIR|60min"]
+    assert json.loads(path.read_text(encoding="utf-8")) == {"pairs": [{"symbol": "EURUSD"}]}
+
+    with pytest.raises(ValueError, match="version id"):
+        run_backtest_matrix(["NOPAIR"], versions=("actve",), report_path=str(path))
@@ -0,0 +1,130 @@
+"""Bulk refresh: concurrent pairs x intervals against a local fake OANDA."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from engine import data as market_data
+from engine.provider_http import TokenBucket
+
+STEP_MINUTES = {"M15": 15, "H1": 60, "H4": 240, "D": 1440}
+FAILING_GRANULARITIES = {"M1"}  # answered with an OANDA-style 400
+
+
+class FakeOanda(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        FakeOanda.hits.append(url.path)
+        if query["granularity"] in FAILING_GRANULARITIES:
+            body = json.dumps({"errorMessage": "Invalid value specified for 'granularity'"}).encode()
+            self.send_response(400)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        step = pd.Timedelta(minutes=STEP_MINUTES[query["granularity"]])
+        end = pd.Timestamp("2025-07-01 12:00", tz="UTC")
+        times = pd.date_range(end=end, periods=int(query["count"]), freq=step)
+        candles = [
+            {
+                "time": t.strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+                "complete": True,
+                "volume": 1,
+                "mid": {"o": "1.1000", "h": "1.1010", "l": "1.0990", "c": "1.1005"},
+            }
+            for t in times
+        ]
+        body = json.dumps({"candles": candles}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def fake_oanda(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOanda)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    FakeOanda.hits = []
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(market_data, "OANDA_HOSTS", {"practice": url, "live": url})
+    monkeypatch.setattr(market_data, "OANDA_API_KEY", "token")
+    monkeypatch.setattr(market_data, "ALPHA_VANTAGE_API_KEY", None)
+    monkeypatch.setattr(market_data, "DATA_PROVIDER", "oanda")
+    monkeypatch.setattr(market_data, "OANDA_CANDLE_COUNT", 300)
+    yield FakeOanda.hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_refresh_all_fetches_pairs_and_intervals_concurrently(fake_oanda):
+    from batch_fetch import refresh_all
+
+    pairs = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "USDCAD", "NZDUSD"]
+    intervals = ["15min", "60min", "240min", "daily"]
+    seen = []
+    summary = refresh_all(pairs, train=False, intervals=intervals, workers=8, progress=seen.append)
+
+    assert summary["ok"] == summary["total"] == 24 and summary["failed"] == 0
+    assert len(fake_oanda) == 24
+    assert [s["done"] for s in seen] == list(range(1, 25))
+    for symbol in pairs:
+        for interval in intervals:
+            cached = market_data.load_cached(symbol, interval)
+            assert cached is not None and len(cached) == 300
+
+
+def test_refresh_reports_failures_without_aborting(fake_oanda):
+    from batch_fetch import refresh_all
+
+    summary = refresh_all(["EURUSD", "GBPUSD"], train=False, intervals=["1min", "60min"], workers=4)
+    # the fake server rejects M1: those jobs fail, the rest land
+    assert (summary["ok"], summary["failed"]) == (2, 2)
+    failed = {r["interval"] for r in summary["results"] if not r["ok"]}
+    assert failed == {"1min"}
+
+
+def test_training_runs_serially_while_fetches_share_the_pool(fake_oanda, monkeypatch):
+    import batch_fetch
+    from utils.config import INTERVAL
+
+    active, peak, trained = [0], [0], []
+    lock = threading.Lock()
+
+    def fake_train(symbol, df, interval):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        trained.append((symbol, interval, threading.current_thread().name))
+        with lock:
+            active[0] -= 1
+
+    monkeypatch.setattr(batch_fetch, "train_and_predict", fake_train)
+    pairs = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD"]
+    summary = batch_fetch.refresh_all(pairs, train=True, intervals=[INTERVAL, "1min"], workers=8)
+    assert summary["ok"] == 4 and summary["failed"] == 4
+    assert sorted(t[0] for t in trained) == sorted(pairs) and {t[1] for t in trained} == {INTERVAL}
+    assert peak[0] == 1 and not any(t[2].startswith("refresh") for t in trained)
+
+
+def test_token_bucket_enforces_rate_after_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+    # 2 free tokens, then 4 more at 20/s
+    assert time.perf_counter() - started >= 0.18
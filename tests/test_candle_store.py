@@ -0,0 +1,89 @@
+"""Binary columnar candle store: round trip, cache precedence, migration."""
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import candle_store
+from engine import data as market_data
+
+SHIPPED_CSV = os.path.join(market_data.DATA_DIR, "EURUSD_60min.csv")
+
+
+def test_store_round_trip_matches_csv_reader(tmp_path):
+    expected = market_data.load_ohlc_csv(SHIPPED_CSV)
+    path = str(tmp_path / "EURUSD_60min.candles")
+    candle_store.write_candles(path, expected)
+
+    loaded = candle_store.read_candles(path)
+    pd.testing.assert_frame_equal(loaded, expected)
+    assert loaded.index.name == "Timestamp"
+    assert loaded.index.dtype == np.dtype("datetime64[ns]")
+    assert candle_store.last_timestamp(path) == expected.index[-1]
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".candles-")]
+
+
+def test_load_cached_prefers_newest_of_store_and_csv(monkeypatch, tmp_path, synthetic_ohlc):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    csv_file = market_data.csv_path("TSTUSD", "60min")
+    synthetic_ohlc.to_csv(csv_file)
+
+    candle_store.write_candles(market_data.store_path("TSTUSD", "60min"), synthetic_ohlc.tail(100))
+    assert market_data.cache_file("TSTUSD", "60min").endswith(".candles")
+    assert len(market_data.load_cached("TSTUSD", "60min")) == 100
+
+    # a CSV dropped in after the store was written wins
+    future = time.time() + 5
+    os.utime(csv_file, (future, future))
+    assert market_data.cache_file("TSTUSD", "60min") == csv_file
+    assert len(market_data.load_cached("TSTUSD", "60min")) == len(synthetic_ohlc)
+
+
+def test_migrate_tree_converts_nested_csvs(tmp_path):
+    nested = tmp_path / "1H_DATA_MAJOR_CURRENCIES"
+    nested.mkdir()
+    shutil.copy(SHIPPED_CSV, tmp_path / "EURUSD_60min.csv")
+    shutil.copy(
+        os.path.join(market_data.DATA_DIR, "1H_DATA_MAJOR_CURRENCIES", "EURUSD_60min.csv"),
+        nested / "EURUSD_60min.csv",
+    )
+    (tmp_path / "BROKEN_60min.csv").write_text("garbage\n")
+
+    report = candle_store.migrate_tree(str(tmp_path))
+    assert report["converted"] == 2
+    assert len(report["failed"]) == 1
+    pd.testing.assert_frame_equal(
+        candle_store.read_candles(str(nested / "EURUSD_60min.candles")),
+        market_data.load_ohlc_csv(str(nested / "EURUSD_60min.csv")),
+    )
+
+    again = candle_store.migrate_tree(str(tmp_path))
+    assert again["converted"] == 0 and again["skipped"] == 2
+
+
+def test_get_data_persists_fetch_to_store(monkeypatch, tmp_path, synthetic_ohlc):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(market_data, "_provider_chain", lambda: [("oanda", lambda s, i: synthetic_ohlc.copy())])
+
+    df, source = market_data.get_data("TSTUSD", "60min", fetch=True)
+    assert source == "oanda"
+    assert not os.path.exists(market_data.csv_path("TSTUSD", "60min"))
+    stored = candle_store.read_candles(market_data.store_path("TSTUSD", "60min"))
+    pd.testing.assert_frame_equal(stored, synthetic_ohlc, check_freq=False)
+
+
+def test_corrupt_store_is_rejected(tmp_path, synthetic_ohlc):
+    path = tmp_path / "X.candles"
+    candle_store.write_candles(str(path), synthetic_ohlc.head(5))
+    good = path.read_bytes()
+
+    path.write_bytes(good[:8] + (99).to_bytes(8, "little") + good[16:])
+    with pytest.raises(ValueError, match="version"):
+        candle_store.read_candles(str(path))
+
+    path.write_bytes(good[:-8])
+    with pytest.raises(ValueError, match="truncated"):
+        candle_store.read_candles(str(path))
@@ -84,3 +84,107 @@ def test_get_data_uses_cache_when_no_provider(synthetic_csv):
     df, source = market_data.get_data("TSTUSD", fetch=True)
     assert source == "cache"
     assert len(df) > 0
+
+
+# ---------------------------------------------------------------------
+# Delta fetch: only candles newer than the cache go over the wire
+# ---------------------------------------------------------------------
+def _recent_frame(n=300):
+    import numpy as np
+
+    end = (pd.Timestamp.now(tz=market_data.DATA_TZ).tz_localize(None) - pd.Timedelta(hours=3)).floor("h")
+    idx = pd.date_range(end=end, periods=n, freq="h", name="Timestamp")
+    close = 1.10 + np.cumsum(np.random.default_rng(3).normal(0, 0.0005, n))
+    return pd.DataFrame(
+        {"Open": close, "High": close + 0.0004, "Low": close - 0.0004, "Close": close, "Volume": 1.0},
+        index=idx,
+    )
+
+
+def _as_oanda(frame, complete=True):
+    utc = frame.index.tz_localize(market_data.DATA_TZ).tz_convert("UTC")
+    return [
+        {
+            "time": ts.strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+            "complete": complete,
+            "volume": 1,
+            "mid": {"o": str(r.Open), "h": str(r.High), "l": str(r.Low), "c": str(r.Close)},
+        }
+        for ts, r in zip(utc, frame.itertuples())
+    ]
+
+
+@pytest.fixture()
+def oanda_delta_env(monkeypatch, tmp_path):
+    from engine import candle_store
+
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(market_data, "OANDA_API_KEY", "token")
+    monkeypatch.setattr(market_data, "ALPHA_VANTAGE_API_KEY", None)
+    monkeypatch.setattr(market_data, "DATA_PROVIDER", "oanda")
+    monkeypatch.setattr(market_data, "OANDA_DELTA_FETCH", True)
+    full = _recent_frame()
+    cached = full.iloc[:-2]
+    candle_store.write_candles(market_data.store_path("TSTUSD", "60min"), cached)
+    calls = []
+
+    def serve(candles):
+        def fake(symbol, interval, params):
+            calls.append(params)
+            return candles(params)
+        monkeypatch.setattr(market_data, "_oanda_candles", fake)
+
+    return full, cached, calls, serve
+
+
+def test_delta_fetch_requests_only_newer_candles(oanda_delta_env):
+    from engine import candle_store
+
+    full, cached, calls, serve = oanda_delta_env
+    forming = full.tail(1).copy()
+    forming.index = forming.index + pd.Timedelta(hours=1)
+    # from= includes the last cached bar again; the forming bar is dropped
+    serve(lambda params: _as_oanda(full.tail(3)) + _as_oanda(forming, complete=False))
+
+    df, source = market_data.get_data("TSTUSD", "60min", fetch=True)
+    assert source == "oanda"
+    assert len(calls) == 1 and "from" in calls[0]
+    assert pd.Timestamp(calls[0]["from"]) == cached.index[-1:].tz_localize(market_data.DATA_TZ).tz_convert("UTC")[0]
+    assert df.index.equals(full.index)
+    assert "2 new" in market_data.get_last_data_diagnostics()["attempts"][-1]["detail"]
+    stored = candle_store.read_candles(market_data.store_path("TSTUSD", "60min"))
+    assert stored.index.equals(full.index)
+
+
+def test_delta_fetch_pages_past_the_request_limit(oanda_delta_env, monkeypatch):
+    full, cached, calls, serve = oanda_delta_env
+    monkeypatch.setattr(market_data, "OANDA_MAX_COUNT", 2)
+    pages = iter([_as_oanda(full.tail(3).head(2)), _as_oanda(full.tail(2)), []])
+    serve(lambda params: next(pages))
+
+    df, _ = market_data.get_data("TSTUSD", "60min", fetch=True)
+    assert len(calls) == 3
+    assert df.index.equals(full.index)
+
+
+def test_delta_fetch_without_new_candle_keeps_store(oanda_delta_env):
+    full, cached, calls, serve = oanda_delta_env
+    serve(lambda params: _as_oanda(cached.tail(1)))
+    path = market_data.store_path("TSTUSD", "60min")
+    before = open(path, "rb").read()
+
+    df, source = market_data.get_data("TSTUSD", "60min", fetch=True)
+    assert source == "oanda"
+    assert df.index.equals(cached.index)
+    assert open(path, "rb").read() == before
+
+
+def test_stale_cache_falls_back_to_full_fetch(oanda_delta_env, monkeypatch):
+    full, cached, calls, serve = oanda_delta_env
+    monkeypatch.setattr(market_data, "OANDA_CANDLE_COUNT", 1)
+    monkeypatch.setattr(market_data, "load_cached", lambda s, i: cached.iloc[:60])
+    serve(lambda params: _as_oanda(full))
+
+    df, _ = market_data.get_data("TSTUSD", "60min", fetch=True)
+    assert calls == [{"count": 1}]
+    assert df.index.equals(full.index)
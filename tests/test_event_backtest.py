@@ -0,0 +1,73 @@
+"""Event-driven backtest: detector triggers, next-open fills, bar-by-bar exits."""
+import pytest
+
+from engine import confluence
+from engine.event_backtest import run_event_backtest
+from engine.incremental import IncrementalAnalyzer
+from schemas.threshold_schema import validate_threshold_config
+
+THRESHOLDS = validate_threshold_config({})
+
+
+def test_last_signals_mark_the_bars_detectors_fired_on(synthetic_ohlc):
+    analyzer = IncrementalAnalyzer("TSTUSD", thresholds=THRESHOLDS)
+    fired = {"structure": set(), "swing": set(), "fvg": set()}
+    for k in range(len(synthetic_ohlc)):
+        analyzer.update(synthetic_ohlc.iloc[k:k + 1])
+        for name in analyzer.last_signals:
+            fired[name].add(k)
+    assert fired["structure"] == {e["pos"] for e in analyzer.analysis()["structure"]["events"] if e["kind"] != "MSS"}
+    window = analyzer.params["swing_window"]
+    assert fired["swing"] == {int(p) + window for p in analyzer.swings()["pos"]}
+    assert fired["fvg"] == {mid + 1 for mid in analyzer._fvg_mid}
+
+
+def test_signal_fills_at_next_open_and_exits_on_the_first_level_hit(synthetic_ohlc, monkeypatch):
+    calls = []
+
+    def fake_decide(analysis, **kwargs):
+        calls.append(analysis["bars"])
+        if len(calls) > 1:
+            return {"action": confluence.ACTION_NO_TRADE}
+        price = analysis["price"]
+        return {
+            "action": confluence.ACTION_BUY, "entry": price,
+            "stop_loss": price - 0.002, "take_profit": price + 0.003,
+        }
+
+    monkeypatch.setattr(confluence, "decide", fake_decide)
+    report = run_event_backtest(
+        synthetic_ohlc, "TSTUSD", thresholds=THRESHOLDS, triggers=("bar",),
+        spread_pips=1.0, slippage_pips=0.5, max_hold_bars=1000,
+    )
+    assert report["trades"] == 1 and report["engine"] == "event"
+    trade = report["trade_log"][0]
+
+    signal = 100 + len(calls) - report["evaluations"]  # first evaluated bar
+    assert signal == 100
+    df = synthetic_ohlc
+    close = float(df["Close"].iloc[signal])
+    sl, tp = close - 0.002, close + 0.003
+    entry = float(df["Open"].iloc[signal + 1]) + 0.00005 + 0.00005
+    assert trade["entry_time"] == df.index[signal + 1].isoformat()
+    assert trade["entry"] == pytest.approx(entry)
+    for k in range(signal + 1, len(df)):
+        if float(df["Low"].iloc[k]) - 0.00005 <= sl:
+            expected = ("loss", min(sl, float(df["Open"].iloc[k]) - 0.00005) - 0.00005)
+            break
+        if float(df["High"].iloc[k]) - 0.00005 >= tp:
+            expected = ("win", max(tp, float(df["Open"].iloc[k]) - 0.00005))
+            break
+    assert (trade["outcome"], trade["exit"]) == (expected[0], pytest.approx(expected[1]))
+    assert trade["exit_time"] == df.index[k].isoformat()
+    # bars spent in the position are not evaluated; the exit bar is flat again
+    assert report["evaluations"] == len(df) - 100 - 1 - (k - signal - 1)
+
+
+def test_event_backtest_runs_on_structure_triggers(synthetic_ohlc):
+    report = run_event_backtest(synthetic_ohlc, "TSTUSD", thresholds=THRESHOLDS)
+    assert report["triggers"] == ["structure"]
+    assert 0 < report["evaluations"] < report["bars"]
+    assert report["trades"] == report["wins"] + report["losses"] + report["timeouts"]
+    with pytest.raises(ValueError):
+        run_event_backtest(synthetic_ohlc, "TSTUSD", thresholds=THRESHOLDS, triggers=("tick",))
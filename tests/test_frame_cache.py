@@ -0,0 +1,68 @@
+"""Process-wide parsed-frame cache: versioning, eviction, read-only views."""
+import os
+import time
+
+import numpy as np
+import pytest
+
+from engine import candle_store
+from engine import data as market_data
+from engine.frame_cache import FrameCache
+
+
+def test_hit_miss_and_version_mismatch(synthetic_ohlc):
+    cache = FrameCache(10 * 1024 * 1024)
+    assert cache.get(("TSTUSD", "60min"), "v1") is None
+    cache.put(("TSTUSD", "60min"), "v1", synthetic_ohlc)
+
+    hit = cache.get(("TSTUSD", "60min"), "v1")
+    assert hit is not None and hit.equals(synthetic_ohlc)
+    assert cache.get(("TSTUSD", "60min"), "v2") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+    assert stats["bytes"] == synthetic_ohlc.memory_usage(index=True).sum()
+
+
+def test_views_are_read_only_but_extensible(synthetic_ohlc):
+    cache = FrameCache(10 * 1024 * 1024)
+    view = cache.put(("TSTUSD", "60min"), "v1", synthetic_ohlc)
+    with pytest.raises(ValueError):
+        view["Close"].to_numpy()[0] = 0.0
+
+    view["ATR"] = 1.0  # new columns stay private to this caller
+    view["Close"] = view["Close"] * 2
+    again = cache.get(("TSTUSD", "60min"), "v1")
+    assert "ATR" not in again.columns
+    np.testing.assert_array_equal(again["Close"].to_numpy(), synthetic_ohlc["Close"].to_numpy())
+
+
+def test_byte_bound_evicts_least_recently_used(synthetic_ohlc):
+    size = int(synthetic_ohlc.memory_usage(index=True).sum())
+    cache = FrameCache(2 * size)
+    cache.put(("A", "60min"), 1, synthetic_ohlc)
+    cache.put(("B", "60min"), 1, synthetic_ohlc)
+    cache.get(("A", "60min"), 1)
+    cache.put(("C", "60min"), 1, synthetic_ohlc)
+
+    assert cache.get(("B", "60min"), 1) is None
+    assert cache.get(("A", "60min"), 1) is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= 2 * size
+
+
+def test_load_cached_reuses_frame_until_file_changes(monkeypatch, tmp_path, synthetic_ohlc):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(market_data, "_frames", FrameCache(10 * 1024 * 1024))
+    path = market_data.store_path("TSTUSD", "60min")
+    candle_store.write_candles(path, synthetic_ohlc)
+
+    first = market_data.load_cached("TSTUSD", "60min")
+    second = market_data.load_cached("TSTUSD", "60min")
+    assert len(first) == len(second) == len(synthetic_ohlc)
+    assert market_data.frame_cache_stats()["hits"] == 1
+
+    candle_store.write_candles(path, synthetic_ohlc.tail(100))
+    future = time.time() + 5
+    os.utime(path, (future, future))
+    assert len(market_data.load_cached("TSTUSD", "60min")) == 100
+    assert market_data.frame_cache_stats()["misses"] == 2
@@ -0,0 +1,82 @@
+"""IncrementalAnalyzer: bar-by-bar state == analyze() over the same window."""
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import confluence, smc
+from engine.incremental import IncrementalAnalyzer
+from schemas.threshold_schema import validate_threshold_config
+
+THRESHOLDS = validate_threshold_config({})
+
+
+def assert_same(got, want, path="analysis"):
+    """Deep equality, including value types (np.float64 vs float etc.)."""
+    if isinstance(want, pd.DataFrame):
+        assert got.equals(want) and list(got.dtypes) == list(want.dtypes), path
+    elif isinstance(want, dict):
+        assert isinstance(got, dict) and got.keys() == want.keys(), path
+        for key in want:
+            assert_same(got[key], want[key], f"{path}.{key}")
+    elif isinstance(want, list):
+        assert isinstance(got, list) and len(got) == len(want), path
+        for k, (a, b) in enumerate(zip(got, want)):
+            assert_same(a, b, f"{path}[{k}]")
+    else:
+        assert type(got) is type(want), (path, type(got), type(want))
+        assert got == want or (got != got and want != want), (path, got, want)
+
+
+def test_bar_by_bar_matches_full_analysis(synthetic_ohlc):
+    analyzer = IncrementalAnalyzer("TSTUSD", thresholds=THRESHOLDS)
+    for end in (40, 41, 150, 151, 380, 599, 600):
+        analyzer.update(synthetic_ohlc.iloc[:end])
+        assert analyzer.n == end
+        pd.testing.assert_frame_equal(analyzer.frame(), synthetic_ohlc.iloc[:end], check_freq=False)
+        want = confluence.analyze(synthetic_ohlc.iloc[:end], "TSTUSD", thresholds=THRESHOLDS)
+        assert_same(analyzer.analysis(), want)
+    np.testing.assert_array_equal(analyzer._atr[:analyzer.n], smc.atr(synthetic_ohlc).to_numpy())
+    # re-feeding known bars is a no-op; analysis() hands out fresh containers
+    assert analyzer.update(synthetic_ohlc) == 0
+    first = analyzer.analysis()
+    first["structure"]["events"].append({"pos": -1})
+    assert_same(analyzer.analysis(), want)
+
+
+def test_rebase_keeps_window_bounded_and_exact(synthetic_ohlc):
+    analyzer = IncrementalAnalyzer("TSTUSD", thresholds=THRESHOLDS, max_bars=200, rebase_bars=50)
+    for end in range(120, len(synthetic_ohlc) + 1, 23):
+        analyzer.update(synthetic_ohlc.iloc[:end])
+        assert 150 <= analyzer.n <= 200 or end < 200
+        frame = analyzer.frame()
+        assert frame.index[-1] == synthetic_ohlc.index[end - 1]
+        assert_same(analyzer.analysis(), confluence.analyze(frame, "TSTUSD", thresholds=THRESHOLDS))
+
+
+def test_state_round_trip_resumes_exactly(synthetic_ohlc):
+    analyzer = IncrementalAnalyzer.from_frame(
+        synthetic_ohlc.iloc[:450], "TSTUSD", thresholds=THRESHOLDS, max_bars=300,
+    )
+    restored = IncrementalAnalyzer.from_state(json.loads(json.dumps(analyzer.to_state())))
+    unpickled = pickle.loads(pickle.dumps(analyzer))
+    for other in (restored, unpickled):
+        assert other.n == analyzer.n == 300 and other.last_time == analyzer.last_time
+        other.update(synthetic_ohlc)
+    analyzer.update(synthetic_ohlc)
+    want = analyzer.analysis()
+    assert_same(restored.analysis(), want)
+    assert_same(unpickled.analysis(), want)
+
+
+def test_rejects_out_of_order_bars_and_bad_state(synthetic_ohlc):
+    analyzer = IncrementalAnalyzer.from_frame(synthetic_ohlc.iloc[:50], "TSTUSD", thresholds=THRESHOLDS)
+    bar = synthetic_ohlc.iloc[10]
+    with pytest.raises(ValueError):
+        analyzer.append(synthetic_ohlc.index[10], bar["Open"], bar["High"], bar["Low"], bar["Close"])
+    with pytest.raises(ValueError):
+        analyzer.update(synthetic_ohlc.reset_index(drop=True))
+    with pytest.raises(ValueError):
+        IncrementalAnalyzer.from_state({**analyzer.to_state(), "version": 99})
@@ -0,0 +1,60 @@
+"""Streaming ATR/EMA/RSI kernels equal the pandas indicators bit for bit."""
+import json
+
+import numpy as np
+import pandas as pd
+
+from engine import smc
+from engine.features import _rsi
+from engine.indicators import StreamingATR, StreamingEMA, StreamingRSI
+
+
+def _with_gaps(df: pd.DataFrame) -> pd.DataFrame:
+    gapped = df.copy()
+    gapped.iloc[[0, 40, 41, 42, 300]] = np.nan
+    return gapped
+
+
+def _resume(kernel):
+    return type(kernel).from_state(json.loads(json.dumps(kernel.state())))
+
+
+def test_kernels_match_pandas_per_bar_batched_and_resumed(synthetic_ohlc):
+    for df in (synthetic_ohlc, _with_gaps(synthetic_ohlc)):
+        high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+        expected_atr = smc.atr(df).to_numpy()
+        expected_rsi = _rsi(df["Close"]).to_numpy()
+
+        stepped = StreamingATR()
+        np.testing.assert_array_equal([stepped.update(*bar) for bar in zip(high, low, close)], expected_atr)
+        batched = StreamingATR()
+        head = batched.update_many(high[:41], low[:41], close[:41])
+        resumed = _resume(batched)
+        tail = [resumed.update(*bar) for bar in zip(high[41:], low[41:], close[41:])]
+        np.testing.assert_array_equal(np.r_[head, tail], expected_atr)
+        assert resumed.value == expected_atr[-1]
+
+        rsi = StreamingRSI()
+        head = np.array([rsi.update(x) for x in close[:41]])
+        resumed = _resume(rsi)
+        np.testing.assert_array_equal(np.r_[head, resumed.update_many(close[41:])], expected_rsi)
+        fresh = StreamingRSI()
+        np.testing.assert_array_equal(fresh.update_many(close), expected_rsi)
+
+        for span in (10, 50):
+            expected = df["Close"].ewm(span=span, adjust=False).mean().to_numpy()
+            ema = StreamingEMA(span)
+            head = ema.update_many(close[:42])
+            resumed = _resume(ema)
+            np.testing.assert_array_equal(np.r_[head, [resumed.update(x) for x in close[42:]]], expected)
+
+
+def test_backtest_reuses_one_atr_kernel_with_the_same_result(synthetic_ohlc, monkeypatch):
+    from engine import backtest, confluence
+    from schemas.threshold_schema import validate_threshold_config
+
+    thresholds = validate_threshold_config({})
+    shared = backtest.run_backtest(synthetic_ohlc, "TSTUSD", max_bars=400, thresholds=thresholds)
+    analyze = confluence.analyze
+    monkeypatch.setattr(confluence, "analyze", lambda *a, atr_values=None, **kw: analyze(*a, **kw))
+    assert backtest.run_backtest(synthetic_ohlc, "TSTUSD", max_bars=400, thresholds=thresholds) == shared
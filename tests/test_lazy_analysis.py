@@ -0,0 +1,53 @@
+"""LazyAnalysis: deferred fields behave like the eager dict they replace."""
+import copy
+import json
+import pickle
+
+from engine import confluence, ict, lazy_analysis
+from engine import data as market_data
+from engine.analysis_memo import AnalysisMemo, private_copy
+from engine.institutional import classify_market_maker_model
+from engine.lazy_analysis import LazyAnalysis
+from engine.patterns import analyze_patterns
+from engine.topdown import topdown_analyze
+from schemas.threshold_schema import validate_threshold_config
+
+THRESHOLDS = validate_threshold_config({})
+DEFERRED = ["patterns", "market_maker_model", "pdh_pdl", "pwh_pwl"]
+
+
+def test_deferred_fields_match_eager_values_and_dict_protocol(synthetic_ohlc):
+    analysis = confluence.analyze(synthetic_ohlc, "TSTUSD", thresholds=THRESHOLDS)
+    assert isinstance(analysis, LazyAnalysis) and isinstance(analysis, dict)
+    assert sorted(analysis.pending()) == sorted(DEFERRED)
+
+    shared = private_copy(analysis)
+    assert shared["patterns"] == analyze_patterns(synthetic_ohlc)
+    assert analysis.pending() == ["market_maker_model", "pdh_pdl", "pwh_pwl"]  # copies share work
+    assert analysis.get("pdh_pdl") == ict.pdh_pdl(synthetic_ohlc)
+    assert analysis["pwh_pwl"] == ict.pwh_pwl(synthetic_ohlc)
+    assert analysis["market_maker_model"] == classify_market_maker_model(analysis)
+
+    fresh = confluence.analyze(synthetic_ohlc, "TSTUSD", thresholds=THRESHOLDS)
+    plain = dict(fresh)  # goes through __getitem__, no placeholders leak
+    assert type(plain) is dict and not fresh.pending()
+    assert list(plain) == list(analysis) and {**analysis}.keys() == plain.keys()
+    body = {k: v for k, v in analysis.items() if k not in ("df", "swings")}
+    assert json.loads(json.dumps(body, default=str))["pdh_pdl"] == json.loads(json.dumps(plain["pdh_pdl"], default=str))
+    for clone in (pickle.loads(pickle.dumps(analysis)), copy.deepcopy(analysis)):
+        assert type(clone) is dict and clone["patterns"] == analysis["patterns"]
+
+
+def test_topdown_parent_layers_skip_context_fields(synthetic_ohlc, initialized_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(lazy_analysis, "ANALYSIS_ACCESS_TRACE", True)
+    synthetic_ohlc.to_csv(tmp_path / "TSTUSD_60min.csv")
+    lazy_analysis.reset_access_stats()
+
+    stack = topdown_analyze("TSTUSD", fetch=False, memo=AnalysisMemo())
+    confluence.decide(stack["analysis"])
+    stats = lazy_analysis.analysis_access_stats()
+    assert stats["fields"]["patterns"]["deferred"] == 2  # 4H and 1H analyses
+    assert stats["fields"]["patterns"]["computed"] == 1  # only the entry layer scores patterns
+    assert "patterns" in stats["callers"]["engine.confluence:_collect_votes"]
+    assert stats["callers"]["engine.topdown:_parent_bias"].keys() >= {"pdh_pdl", "pwh_pwl"}
@@ -0,0 +1,81 @@
+"""Top-down backtest: point-in-time ladder frames, HTF layers reused until their bar closes."""
+from collections import Counter
+
+import pandas as pd
+
+from engine import analysis_memo, confluence
+from engine.analysis_memo import AnalysisMemo
+from engine.mtf_backtest import closed_cuts, run_topdown_backtest, topdown_steps
+from engine.timeframe_index import resample_ohlc
+from engine.topdown import assemble_topdown
+from schemas.threshold_schema import validate_threshold_config
+from services.backtest_runner import run_backtest_matrix
+
+BASE = validate_threshold_config({})
+MINUTES = {"60min": 60, "240min": 240}
+
+
+def _frames(df: pd.DataFrame) -> dict:
+    # intraday ladder on an hourly-only pair: 1H entry (fallback), 4H parent
+    return {"240min": resample_ohlc(df, "4h"), "60min": df, "30min": None, "15min": None, "5min": None}
+
+
+def _decisions(frames: dict, **kwargs) -> dict:
+    return {
+        end: confluence.decide(stack["analysis"], ml_signal=None, thresholds=BASE)
+        for end, stack in topdown_steps("TSTUSD", frames, thresholds=BASE, **kwargs)
+    }
+
+
+def test_steps_match_a_stack_on_time_filtered_frames(synthetic_ohlc):
+    frames = _frames(synthetic_ohlc)
+    entry = frames["60min"]
+    for end, stack in topdown_steps("TSTUSD", frames, thresholds=BASE):
+        clock = entry.index[end] + pd.Timedelta(minutes=60)
+        cut = {
+            tf: df[df.index + pd.Timedelta(minutes=MINUTES[tf]) <= clock] if df is not None else None
+            for tf, df in frames.items()
+        }
+        expected = assemble_topdown("TSTUSD", cut, "intraday", thresholds=BASE, memo=AnalysisMemo())
+        assert stack["analysis"]["parent_biases"] == expected["analysis"]["parent_biases"], end
+        assert confluence.decide(stack["analysis"], thresholds=BASE) == \
+            confluence.decide(expected["analysis"], thresholds=BASE), end
+
+
+def test_future_candles_never_change_a_decision(synthetic_ohlc):
+    cutoff = 400
+    future = synthetic_ohlc.copy()
+    future.iloc[cutoff:, :4] *= 1.05
+    seen = _decisions(_frames(synthetic_ohlc))
+    shifted = _decisions(_frames(future))
+    # a forming 4H bar is not visible, so only steps at or after the cutoff may move
+    assert all(seen[end] == shifted[end] for end in seen if end < cutoff)
+    assert any(seen[end] != shifted[end] for end in seen if end >= cutoff)
+
+
+def test_htf_layers_are_analysed_once_per_closed_bar(synthetic_ohlc, monkeypatch):
+    frames = _frames(synthetic_ohlc)
+    calls = Counter()
+    real_analyze = confluence.analyze
+
+    def counting_analyze(df, symbol, interval="60min", **kwargs):
+        calls[interval] += 1
+        return real_analyze(df, symbol, interval=interval, **kwargs)
+
+    monkeypatch.setattr(analysis_memo.confluence, "analyze", counting_analyze)
+    ends = list(_decisions(frames, start=100, stop=200, step_bars=1))
+    closed_4h = closed_cuts(frames, "60min")["240min"]
+    assert calls["60min"] == len(ends) == 100
+    assert calls["240min"] == len({int(closed_4h[end]) for end in ends}) == 26
+
+
+def test_matrix_runs_the_topdown_engine(synthetic_csv, tmp_path):
+    payload = run_backtest_matrix(["TSTUSD"], engine="topdown", report_path=str(tmp_path / "report.json"))
+    report = payload["pairs"][0]
+    assert report["job"] == "TSTUSD|mtf|intraday|active" and not report.get("error")
+    # no 30min cache: the stack falls back to 1H, and the report says so
+    assert report["interval"] == report["entry_tf"] == "60min"
+    assert report["timeframes"] == {"240min": 150, "60min": 600, "daily": 25}
+    direct = run_topdown_backtest("TSTUSD", "intraday")
+    for key in ("trades", "wins", "no_trade_rate", "wait_rate", "final_equity", "steps", "trade_log"):
+        assert report[key] == direct[key], key
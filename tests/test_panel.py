@@ -0,0 +1,149 @@
+"""Panel kernels equal the per-symbol detectors; catalog scan and its API."""
+import numpy as np
+import pandas as pd
+
+from engine import ict, panel, smc
+from engine import data as market_data
+from services.pair_scanner import scan_all_pairs
+from tests.helpers import auth, register_and_login
+
+
+def _walk(seed: int, n: int, start: str = "2025-01-06 00:00") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0015, n))
+    open_ = np.roll(close, 1)
+    open_[0] = close[0]
+    spread = np.abs(rng.normal(0, 0.0008, n)) + 0.0002
+    return pd.DataFrame(
+        {
+            "Open": open_, "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread, "Close": close, "Volume": 0.0,
+        },
+        index=pd.Index(pd.date_range(start, periods=n, freq="h"), name="Timestamp"),
+    )
+
+
+def test_panel_kernels_match_the_per_symbol_detectors(synthetic_ohlc):
+    frames = {"AAABBB": synthetic_ohlc, "CCCDDD": _walk(11, 420, "2025-02-03 05:00"), "EEEFFF": _walk(3, 60)}
+    pn = panel.Panel.from_frames(frames, bars=500)
+    assert pn.width == 500 and list(pn.lengths) == [500, 420, 60]
+
+    atr = panel.atr(pn)
+    displaced = panel.displacement_flags(pn, atr)
+    killzone = panel.killzone_flags(pn)
+    bull_fvg, bear_fvg = panel.fvg_candidates(pn, atr)
+    buyside, sellside = panel.sweep_candidates(pn)
+    swing_high, swing_low = panel.swing_masks(pn)
+    for symbol, source in frames.items():
+        i, df = pn.row(symbol), pn.frame(symbol)
+        pd.testing.assert_frame_equal(df, source.iloc[-500:][["Open", "High", "Low", "Close"]], check_freq=False)
+        cols = slice(pn.width - len(df), None)
+        df_atr = smc.atr(df)
+        np.testing.assert_array_equal(atr[i, cols], df_atr.to_numpy())
+        np.testing.assert_array_equal(displaced[i, cols], ict.displacement_flags(df, df_atr).to_numpy())
+        np.testing.assert_array_equal(killzone[i, cols], ict.killzone_flags(df).to_numpy())
+
+        gaps = [(g["pos"], g["direction"]) for g in smc.detect_fvg(df, df_atr)]
+        found = [(int(p), "bullish") for p in np.flatnonzero(bull_fvg[i, cols])]
+        found += [(int(p), "bearish") for p in np.flatnonzero(bear_fvg[i, cols])]
+        assert sorted(found) == sorted(gaps)
+
+        pos, kind, _ = smc.swing_points(df["High"].to_numpy(), df["Low"].to_numpy(), 3)
+        np.testing.assert_array_equal(np.flatnonzero(swing_high[i, cols]), pos[kind == smc.SWING_HIGH])
+        np.testing.assert_array_equal(np.flatnonzero(swing_low[i, cols]), pos[kind == smc.SWING_LOW])
+
+        prior_high = df["High"].shift(1).rolling(20, min_periods=5).max()
+        prior_low = df["Low"].shift(1).rolling(20, min_periods=5).min()
+        np.testing.assert_array_equal(buyside[i, cols], ((df["High"] > prior_high) & (df["Close"] < prior_high)).to_numpy())
+        np.testing.assert_array_equal(sellside[i, cols], ((df["Low"] < prior_low) & (df["Close"] > prior_low)).to_numpy())
+
+    setups = panel.rank_setups(pn)
+    assert [s["score"] for s in setups] == sorted((s["score"] for s in setups), reverse=True)
+    assert all(s["direction"] in ("bullish", "bearish") and s["signals"] for s in setups)
+
+
+def test_scan_all_pairs_ranks_cached_catalog_and_confirms_the_best(
+    initialized_db, synthetic_ohlc, monkeypatch, tmp_path,
+):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    for seed, symbol in enumerate(("AAABBB", "CCCDDD", "EEEFFF")):
+        (synthetic_ohlc if seed == 0 else _walk(seed, 600)).to_csv(tmp_path / f"{symbol}_60min.csv")
+    from app import _check_kill_switch
+    from utils import settings as runtime_settings
+    monkeypatch.setattr(runtime_settings, "get", lambda key, default=None: "EEEFFF" if key == "disabled_pairs" else default)
+
+    report = scan_all_pairs(
+        "60min", symbols=["AAABBB", "CCCDDD", "EEEFFF", "GGGHHH"], confirm=1, budget_seconds=60,
+        allow=_check_kill_switch,
+    )
+    assert report["scanned"] == 2 and report["missing_data"] == ["GGGHHH"] and report["excluded"] == ["EEEFFF"]
+    symbols = [s["symbol"] for s in report["setups"]]
+    assert symbols and set(symbols) <= {"AAABBB", "CCCDDD"}
+    assert report["setups"][0]["confirmation"]["action"]
+    assert all("confirmation" not in s for s in report["setups"][1:])
+
+    exhausted = scan_all_pairs("60min", symbols=["AAABBB", "CCCDDD"], confirm=1, budget_seconds=0)
+    assert exhausted["setups"][0]["confirmation"] == {"skipped": "budget exhausted"}
+
+
+def test_scan_budget_counts_the_last_confirmation(monkeypatch, tmp_path, synthetic_ohlc):
+    import time
+
+    from engine import pipeline
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    for seed, symbol in enumerate(("AAABBB", "CCCDDD", "EEEFFF")):
+        (synthetic_ohlc if seed == 0 else _walk(seed, 600)).to_csv(tmp_path / f"{symbol}_60min.csv")
+
+    def slow_predict(symbol, **kwargs):
+        time.sleep(0.3)
+        return {"decision": {"action": "WAIT", "confidence": 0.5}}
+
+    monkeypatch.setattr(pipeline, "predict_symbol", slow_predict)
+    report = scan_all_pairs("60min", symbols=["AAABBB", "CCCDDD", "EEEFFF"], confirm=3, budget_seconds=0.5)
+    confirmations = [s["confirmation"] for s in report["setups"][:3]]
+    # the second would end past the budget, so it is not started
+    assert confirmations[0]["action"] == "WAIT"
+    assert confirmations[1:] == [{"skipped": "budget exhausted"}] * (len(confirmations) - 1)
+
+
+def test_stale_pairs_are_left_out_of_the_panel(synthetic_ohlc):
+    stale = synthetic_ohlc.iloc[:-3]
+    pn = panel.Panel.from_frames(
+        {"AAABBB": synthetic_ohlc, "CCCDDD": stale, "EEEFFF": synthetic_ohlc.iloc[:-1]},
+        max_lag=pd.Timedelta(hours=1),
+    )
+    assert pn.symbols == ["AAABBB", "EEEFFF"] and pn.stale == ["CCCDDD"]
+    assert panel.Panel.from_frames({"AAABBB": synthetic_ohlc, "CCCDDD": stale}).stale == []
+
+
+def test_scan_endpoint(client, admin_token, monkeypatch, tmp_path, synthetic_ohlc):
+    assert client.get("/api/scan").status_code == 401
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    synthetic_ohlc.to_csv(tmp_path / "EURUSD_60min.csv")
+    user = register_and_login(client, admin_token, username="scanner", email="scan@test.local", password="pw12345678")
+
+    res = client.get("/api/scan?interval=60min&confirm=0", headers=auth(user["token"]))
+    assert res.status_code == 200, res.get_json()
+    body = res.get_json()
+    assert body["interval"] == "60min" and body["scanned"] >= 1
+    assert client.get("/api/scan?interval=7min", headers=auth(user["token"])).status_code == 400
+    assert "confirmation" not in str(body["setups"])
+    assert client.get("/me", headers=auth(user["token"])).get_json()["signals_remaining"] == 100
+
+    # confirmations cost quota, like /analyze
+    res = client.get("/api/scan?interval=60min&confirm=1", headers=auth(user["token"]))
+    assert res.status_code == 200, res.get_json()
+    assert "action" in res.get_json()["setups"][0]["confirmation"]
+    assert client.get("/me", headers=auth(user["token"])).get_json()["signals_remaining"] == 99
+
+    from db.models import User
+    from db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == user["user_id"]).update({"risk_disclosure_accepted_at": None})
+        db.commit()
+    finally:
+        db.close()
+    res = client.get("/api/scan?interval=60min&confirm=1", headers=auth(user["token"]))
+    assert res.status_code == 403 and res.get_json()["code"] == "disclosure_required"
+    assert client.get("/api/scan?interval=60min", headers=auth(user["token"])).status_code == 200
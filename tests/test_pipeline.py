@@ -3,9 +3,10 @@
 confluence decision invariants, full pipeline."""
 import os
 
+import pandas as pd
 import pytest
 
-from engine.features import HORIZON, build_dataset
+from engine.features import HORIZON, build_dataset, build_features
 
 
 def test_dataset_shapes_and_labels(synthetic_ohlc):
@@ -17,6 +18,32 @@ def test_dataset_shapes_and_labels(synthetic_ohlc):
     assert set(y.dropna().unique()) <= {"up", "down", "flat"}
 
 
+def test_tail_features_equal_the_last_rows_of_the_full_frame(synthetic_ohlc):
+    full = build_features(synthetic_ohlc)
+    for k in (1, 7, 150, len(synthetic_ohlc), len(synthetic_ohlc) + 10):
+        pd.testing.assert_frame_equal(build_features(synthetic_ohlc, tail=k), full.tail(k))
+
+
+def test_tail_features_advance_the_kept_carry_as_bars_arrive(synthetic_ohlc, monkeypatch):
+    from engine import features
+    full = build_features(synthetic_ohlc)
+    advanced = []
+    real_advance = features._advance
+    monkeypatch.setattr(features, "_advance", lambda df, carry, stop, w: (
+        advanced.append(stop - carry.bars) or real_advance(df, carry, stop, w)
+    ))
+    for end in range(400, 431):
+        got = build_features(synthetic_ohlc.iloc[:end], tail=1)
+        pd.testing.assert_frame_equal(got, full.iloc[end - 1:end])
+    # after the first call, each new bar advances the carry by one bar
+    # and then computes the warm-up window plus the row itself
+    assert advanced[2:] == [1, 1 + features.FEATURE_WARMUP] * 30
+    # a rewritten candle behind the carry's stamp is not reused
+    revised = synthetic_ohlc.iloc[:431].copy()
+    revised.iloc[380:, :4] *= 1.01
+    pd.testing.assert_frame_equal(build_features(revised, tail=3), build_features(revised).tail(3))
+
+
 def test_train_and_predict_returns_calibrated_probabilities(synthetic_ohlc):
     from engine.model_trainer import model_path, train_and_predict
     result = train_and_predict("TSTUSD", synthetic_ohlc, "60min")
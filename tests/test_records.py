@@ -0,0 +1,51 @@
+"""Slotted detector records: same keys, values and dict behaviour as before."""
+import copy
+import json
+import pickle
+
+import pytest
+
+from engine import confluence, smc
+from engine.institutional import execution_confirmation
+from engine.records import MssEvent, Record, StructureEvent
+from schemas.threshold_schema import validate_threshold_config
+
+THRESHOLDS = validate_threshold_config({})
+
+
+def test_analysis_records_read_like_the_legacy_dicts(synthetic_ohlc):
+    analysis = confluence.analyze(synthetic_ohlc, "TSTUSD", thresholds=THRESHOLDS)
+    records = (
+        analysis["structure"]["events"] + analysis["structure"]["rejected_breaks"]
+        + analysis["order_blocks"] + analysis["fvgs"] + analysis["pools"] + analysis["sweeps"]
+    )
+    assert records and all(isinstance(r, Record) for r in records)
+
+    atr = smc.atr(synthetic_ohlc)
+    swings = smc.find_swings(synthetic_ohlc, 3)
+    legacy = smc._detect_structure_legacy(synthetic_ohlc, swings, 3, atr)["events"]
+    events = smc.detect_structure(synthetic_ohlc, swings, 3, atr)["events"]
+    assert events == legacy and legacy == events
+    assert [list(e) for e in events] == [list(e) for e in legacy]
+    assert all(dict(e) == {**e} == e.to_dict() for e in events)
+
+    event = events[-1]
+    assert event.get("origin_pos") == event["origin_pos"] and event.get("missing", 1) == 1
+    assert "kind" in event and "keys" not in event
+    with pytest.raises(KeyError):
+        event["missing"]
+    with pytest.raises(KeyError):
+        event["missing"] = 1
+    for clone in (pickle.loads(pickle.dumps(event)), copy.deepcopy(event)):
+        assert type(clone) is StructureEvent and clone == event
+
+    mss = MssEvent(**{**event, "kind": "MSS"}, sweep_level=1.1)
+    assert list(mss) == list(event) + ["sweep_level"] and mss != event
+
+
+def test_decision_payload_holds_plain_dicts(synthetic_ohlc):
+    analysis = confluence.analyze(synthetic_ohlc, "TSTUSD", thresholds=THRESHOLDS)
+    direction = analysis["structure"]["events"][-1]["direction"]
+    details = execution_confirmation(analysis, direction, max_bars=len(synthetic_ohlc))
+    assert type(details["event"]) is dict
+    assert json.loads(json.dumps(details, default=str))["event"]["direction"] == direction
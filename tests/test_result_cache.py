@@ -0,0 +1,133 @@
+"""Prediction result cache: reuse between candle closes, new key on any input change."""
+import json
+
+import pandas as pd
+import pytest
+
+from engine import data as market_data
+from engine import pipeline, result_cache
+from engine.result_cache import ResultCache, prediction_key
+
+
+@pytest.fixture
+def offline_pair(synthetic_ohlc, initialized_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    path = tmp_path / "TSTUSD_60min.csv"
+    synthetic_ohlc.iloc[:-1].to_csv(path)
+    return path
+
+
+@pytest.fixture
+def counted_runs(monkeypatch):
+    runs = []
+    real = pipeline._predict_locked
+
+    def wrapper(*args, **kwargs):
+        runs.append(args[0])
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "_predict_locked", wrapper)
+    monkeypatch.setattr(result_cache, "_results", ResultCache("memory"))
+    return runs
+
+
+def _payload(result: dict) -> str:
+    body = {k: v for k, v in result.items() if k != "result_cache"}
+    return json.dumps(body, sort_keys=True, default=str)
+
+
+def test_repeat_request_is_served_from_cache_until_inputs_change(
+    offline_pair, synthetic_ohlc, counted_runs, monkeypatch,
+):
+    first = pipeline.predict_symbol("TSTUSD", interval="60min", fetch=False)
+    stages = []
+    second = pipeline.predict_symbol(
+        "tstusd", interval="60min", fetch=False, on_progress=lambda stage, msg: stages.append(stage),
+    )
+    assert len(counted_runs) == 1
+    assert second["result_cache"]["backend"] == "memory" and "result_cache" not in first
+    assert _payload(second) == _payload(first)
+    assert stages == ["cache", "done"]
+
+    # hits are private copies
+    second["decision"]["action"] = "MUTATED"
+    assert pipeline.predict_symbol("TSTUSD", interval="60min", fetch=False)["decision"]["action"] != "MUTATED"
+
+    # another strategy mode is a different request
+    pipeline.predict_symbol("TSTUSD", interval="60min", fetch=False, strategy_mode="smc")
+    assert len(counted_runs) == 2
+
+    # a newly closed candle lands in the cache file -> recompute
+    synthetic_ohlc.to_csv(offline_pair)
+    fresh = pipeline.predict_symbol("TSTUSD", interval="60min", fetch=False)
+    assert len(counted_runs) == 3 and fresh["last_candle"] != first["last_candle"]
+
+    # promoting a model for the pair -> recompute
+    from services import ml_service
+    monkeypatch.setattr(ml_service, "active_model_ids", lambda symbol, style="intraday": (42,))
+    pipeline.predict_symbol("TSTUSD", interval="60min", fetch=False)
+    assert len(counted_runs) == 4
+
+
+def test_live_keys_roll_with_the_finest_candle(initialized_db):
+    slot_start = 1_760_000_400.0  # a 5-minute boundary
+    assert slot_start % 300 == 0
+    common = dict(mtf=True, style="intraday", strategy_mode="both", fetch=True)
+
+    early = prediction_key("TSTUSD", "30min", now=slot_start + 2, **common)
+    later = prediction_key("TSTUSD", "30min", now=slot_start + 200, **common)
+    assert early.key == later.key
+    assert not early.storable and later.storable  # grace window after the close
+    assert later.expires_at == slot_start + 300
+
+    rolled = prediction_key("TSTUSD", "30min", now=slot_start + 300, **common)
+    assert rolled.key != later.key
+    single = prediction_key("TSTUSD", "60min", now=slot_start + 200, **{**common, "mtf": False})
+    assert single.key != later.key and single.expires_at == slot_start - slot_start % 3600 + 3600
+
+
+def test_h4_keys_roll_on_the_new_york_close_not_the_utc_boundary(initialized_db):
+    # summer: the 17:00 New York H4 / daily close is 21:00 UTC, mid UTC 4h slot
+    close = pd.Timestamp("2026-07-15 21:00", tz="UTC").timestamp()
+    assert close % (4 * 3600) != 0
+    common = dict(mtf=False, style="intraday", strategy_mode="both", fetch=True)
+
+    before = prediction_key("TSTUSD", "240min", now=close - 600, **common)
+    after = prediction_key("TSTUSD", "240min", now=close + 2, **common)
+    settled = prediction_key("TSTUSD", "240min", now=close + 600, **common)
+    assert before.expires_at == close
+    assert after.key != before.key and after.key == settled.key
+    assert not after.storable and settled.storable
+    # next H4 close is 21:00 New York (01:00 UTC), not 00:00 UTC
+    assert settled.expires_at == close + 4 * 3600
+    assert result_cache.candle_bounds("daily", close + 600) == (close, close + 24 * 3600)
+
+    # winter: the same wall-clock close is 22:00 UTC
+    winter = pd.Timestamp("2026-01-15 22:00", tz="UTC").timestamp()
+    assert result_cache.candle_bounds("240min", winter - 1) == (winter - 4 * 3600, winter)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+def test_redis_tier_shares_results_across_workers():
+    client = _FakeRedis()
+    key = result_cache.PredictionKey("TSTUSD:intraday:both:mtf:abc", expires_at=4e9, storable=True)
+    result = {"symbol": "TSTUSD", "decision": {"action": "NO_TRADE", "confidence": 0.0}, "last_candle": "x"}
+
+    ResultCache("redis", client=client).put(key, result)
+    other_worker = ResultCache("redis", client=client)
+    hit = other_worker.get(key.key)
+    assert hit["result_cache"]["backend"] == "redis"
+    assert {k: v for k, v in hit.items() if k != "result_cache"} == result
+    assert other_worker.get("missing") is None
+    assert other_worker.stats()["redis_hits"] == 1 and other_worker.stats()["misses"] == 1
+    assert ResultCache("off").get(key.key) is None
@@ -0,0 +1,166 @@
+"""Fetch coalescing: in-process single-flight and the Redis variant."""
+import json
+import threading
+import time
+
+from engine import data as market_data
+from engine.single_flight import RedisFlight, SingleFlight
+
+
+def _run_threads(n, target):
+    results = [None] * n
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target())) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    return results
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls, release = [], threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "frame"
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results = _run_threads(6, lambda: flight.do("EURUSD", slow))
+    assert len(calls) == 1
+    assert all(r[0] == "frame" for r in results)
+    assert sorted(r[1] for r in results) == [False] + [True] * 5
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "shared": 5}
+
+
+def test_leader_error_reaches_followers_and_next_call_retries():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def boom():
+        release.wait(5)
+        raise LookupError("provider down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("EURUSD", boom)
+        except LookupError as exc:
+            errors.append(str(exc))
+
+    threading.Timer(0.2, release.set).start()
+    _run_threads(3, call)
+    assert errors == ["provider down"] * 3
+    assert flight.do("EURUSD", lambda: "ok") == ("ok", False)
+
+
+def test_get_data_makes_one_provider_call_per_pair(monkeypatch, tmp_path, synthetic_ohlc):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(market_data, "FETCH_SINGLE_FLIGHT", "local")
+    monkeypatch.setattr(market_data, "_flights", SingleFlight())
+    calls = []
+
+    def fetcher(symbol, interval):
+        calls.append(symbol)
+        time.sleep(0.3)
+        return synthetic_ohlc.copy()
+
+    monkeypatch.setattr(market_data, "_provider_chain", lambda: [("oanda", fetcher)])
+    results = _run_threads(8, lambda: market_data.get_data("TSTUSD", "60min", fetch=True))
+    assert calls == ["TSTUSD"]
+    assert all(source == "oanda" and len(df) == len(synthetic_ohlc) for df, source in results)
+    assert market_data.fetch_coalescing_stats()["shared"] == 7
+
+
+class FakeRedis:
+    """Just enough of redis-py (decode_responses=True) for RedisFlight."""
+
+    def __init__(self):
+        self.store, self.lock = {}, threading.Lock()
+
+    def set(self, key, value, nx=False, ex=None):
+        with self.lock:
+            if nx and key in self.store:
+                return None
+            self.store[key] = value
+            return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def eval(self, script, numkeys, key, token):
+        # the release script: delete the lock only while it holds our token
+        with self.lock:
+            if self.store.get(key) == token:
+                del self.store[key]
+                return 1
+            return 0
+
+
+def test_redis_follower_adopts_the_leaders_published_outcome():
+    client = FakeRedis()
+    flight = RedisFlight(client, wait_timeout=5, poll_interval=0.01)
+    # another worker process holds the lock and finishes 0.2s later
+    client.set("smartflow:flight:EURUSD:60min:lock", "other-worker")
+
+    def leader_finishes():
+        client.set(
+            "smartflow:flight:EURUSD:60min:result",
+            json.dumps({"token": "other-worker", "payload": {"provider": "oanda"}}),
+        )
+        client.delete("smartflow:flight:EURUSD:60min:lock")
+
+    threading.Timer(0.2, leader_finishes).start()
+    local = []
+    result, shared = flight.do(
+        "EURUSD:60min", lambda: local.append(1), lambda r: r, lambda p: ("peer", p["provider"])
+    )
+    assert shared and result == ("peer", "oanda") and not local
+
+
+def test_redis_leader_publishes_and_releases():
+    client = FakeRedis()
+    flight = RedisFlight(client)
+    result, shared = flight.do("EURUSD:60min", lambda: {"n": 3}, lambda r: r, lambda p: p)
+    assert (result, shared) == ({"n": 3}, False)
+    assert "smartflow:flight:EURUSD:60min:lock" not in client.store
+    assert json.loads(client.store["smartflow:flight:EURUSD:60min:result"])["payload"] == {"n": 3}
+
+
+def test_redis_release_keeps_a_lock_taken_over_by_another_leader():
+    client = FakeRedis()
+    flight = RedisFlight(client)
+
+    def slow_fetch():
+        # our lock expires mid-fetch and another worker takes it
+        client.store["smartflow:flight:EURUSD:60min:lock"] = "next-leader"
+        return {"n": 1}
+
+    flight.do("EURUSD:60min", slow_fetch, lambda r: r, lambda p: p)
+    assert client.store["smartflow:flight:EURUSD:60min:lock"] == "next-leader"
+
+
+def test_redis_errors_degrade_to_local_call():
+    class Down:
+        def set(self, *a, **k):
+            raise ConnectionError("no redis")
+
+    result, shared = RedisFlight(Down()).do("K", lambda: "local", lambda r: r, lambda p: p)
+    assert (result, shared) == ("local", False)
+
+
+def test_redis_flight_reuses_one_client(monkeypatch):
+    import redis
+
+    created = []
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setattr(market_data, "_redis_client", None)
+    monkeypatch.setattr(redis, "from_url", lambda url, **kw: created.append(url) or FakeRedis())
+    flights = [market_data._redis_flight() for _ in range(3)]
+    assert len(created) == 1 and len({id(f.client) for f in flights}) == 1
@@ -192,3 +192,184 @@ def test_breaker_block_after_sweep():
     assert len(breakers) == 1
     assert breakers[0]["direction"] == "bearish"
     assert breakers[0]["low"] == pytest.approx(1.0990)
+
+
+# ---------------------------------------------------------------------
+# Premium/discount series: single-pass tracker == per-bar dealing_range
+# ---------------------------------------------------------------------
+def test_pd_position_series_matches_legacy_replay(synthetic_ohlc):
+    df = synthetic_ohlc
+    swings = smc.find_swings(df, 3)
+    structure = smc.detect_structure(df, swings, 3, smc.atr(df))
+    assert structure["events"]
+
+    fast = ict.pd_position_series(df, structure["events"])
+    slow = ict._pd_position_series_legacy(df, structure["events"])
+    np.testing.assert_array_equal(fast.to_numpy(), slow.to_numpy())
+    assert fast.index.equals(df.index)
+
+
+def test_pd_position_series_edge_cases_match_legacy(synthetic_ohlc):
+    df = synthetic_ohlc.iloc[:200]
+    events = [
+        # listed out of order, missing origin, and a degenerate range
+        {"pos": 120, "direction": "bearish", "origin_pos": None, "origin_price": None},
+        {"pos": 40, "direction": "bullish", "origin_pos": 35, "origin_price": float(df["Low"].iloc[35])},
+        {"pos": 150, "direction": "bullish", "origin_pos": 149, "origin_price": 9.99},
+        {"pos": 500, "direction": "bullish", "origin_pos": 490, "origin_price": 1.0},
+    ]
+    fast = ict.pd_position_series(df, events)
+    slow = ict._pd_position_series_legacy(df, events)
+    np.testing.assert_array_equal(fast.to_numpy(), slow.to_numpy())
+    assert ict.pd_position_series(df, []).equals(ict._pd_position_series_legacy(df, []))
+
+
+def test_pd_positions_resume_from_a_carry(synthetic_ohlc):
+    df = synthetic_ohlc
+    events = smc.detect_structure(df, smc.find_swings(df, 3), 3, smc.atr(df))["events"]
+    # no origin price: the range's far side is tracked since the leg began
+    events += [{"pos": 590, "direction": "bearish", "origin_pos": None, "origin_price": None}]
+    whole = ict.pd_position_series(df, events).to_numpy()
+    arrays = [df[c].to_numpy(dtype=float) for c in ("High", "Low", "Close")]
+    for cuts in ([0, 1, 2, 300, 600], list(range(0, 600, 13)) + [600]):
+        carry, got = ict.DealingCarry(), []
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            chunk = [col[:b] for col in arrays]
+            values, carry = ict.pd_positions(
+                *chunk, [e for e in events if a <= e["pos"] < b], carry=carry, start=a,
+            )
+            got.append(values)
+        np.testing.assert_array_equal(np.concatenate(got), whole)
+
+
+# ---------------------------------------------------------------------
+# Swings: sliding-window arrays == per-bar loop
+# ---------------------------------------------------------------------
+@pytest.mark.parametrize("window", [2, 3, 5])
+def test_find_swings_matches_legacy_loop(synthetic_ohlc, window):
+    df = synthetic_ohlc
+    pd.testing.assert_frame_equal(smc.find_swings(df, window), smc._find_swings_legacy(df, window))
+
+    pos, kind, price = smc.swing_points(df["High"].to_numpy(), df["Low"].to_numpy(), window)
+    assert pos.dtype == np.int64 and kind.dtype == np.int8
+    assert np.all(np.diff(pos) >= 0)
+
+
+def test_find_swings_edge_cases_match_legacy(synthetic_ohlc):
+    df = synthetic_ohlc.iloc[:120].copy()
+    df.iloc[30:33, df.columns.get_loc("High")] = np.nan
+    df.iloc[[60, 61], df.columns.get_loc("Low")] = np.nan
+    # a bar that is both a swing high and a swing low (outside bar)
+    df.iloc[90, df.columns.get_loc("High")] = df["High"].max() + 0.01
+    df.iloc[90, df.columns.get_loc("Low")] = df["Low"].min() - 0.01
+    for frame in (df, df.iloc[:6], df.iloc[:7], df.reset_index(drop=True)):
+        pd.testing.assert_frame_equal(smc.find_swings(frame, 3), smc._find_swings_legacy(frame, 3))
+    both = smc.find_swings(df, 3)
+    assert both.loc[both["pos"] == 90, "kind"].tolist() == ["high", "low"]
+
+
+# ---------------------------------------------------------------------
+# First-touch index: batched descents == per-object future scans
+# ---------------------------------------------------------------------
+@pytest.mark.parametrize("n", [0, 1, 2, 7, 64, 257])
+def test_range_extrema_first_matches_brute_force(n):
+    from engine.touch_index import RangeExtrema
+
+    rng = np.random.default_rng(n)
+    values = rng.normal(size=n)
+    if n > 4:
+        values[rng.integers(0, n, n // 4)] = np.nan
+    starts = rng.integers(-2, n + 3, 200)
+    levels = rng.normal(size=200)
+    levels[::17] = np.nan
+    for mode in ("max", "min"):
+        table = RangeExtrema(values, mode)
+        for strict in (False, True):
+            got = table.first(starts, levels, strict=strict)
+            for s, lvl, g in zip(starts, levels, got):
+                seg = values[min(max(s, 0), n):]
+                with np.errstate(invalid="ignore"):
+                    if mode == "max":
+                        hit = seg > lvl if strict else seg >= lvl
+                    else:
+                        hit = seg < lvl if strict else seg <= lvl
+                want = min(max(s, 0), n) + int(np.argmax(hit)) if hit.any() else n
+                assert g == want, (mode, strict, s, lvl)
+
+
+def test_touch_detectors_match_legacy_scans(synthetic_ohlc):
+    from engine.touch_index import TouchIndex
+
+    df = synthetic_ohlc
+    swings, atr_s = smc.find_swings(df, 3), smc.atr(df)
+    events = smc.detect_structure(df, swings, 3, atr_s)["events"]
+    tol = 0.25 * float(atr_s.iloc[-1])
+    touch = TouchIndex(df)
+
+    blocks = smc.detect_order_blocks(df, events, touch=touch)
+    assert blocks == smc._detect_order_blocks_legacy(df, events)
+    assert {b["status"] for b in blocks} >= {"mitigated", "invalidated"}
+    for kwargs in ({}, {"require_displacement": False, "displacement_mult": 0.5}):
+        assert smc.detect_fvg(df, atr_s, touch=touch, **kwargs) == smc._detect_fvg_legacy(df, atr_s, **kwargs)
+    pools = smc.detect_liquidity_pools(df, swings, tol, touch=touch)
+    assert pools == smc._detect_liquidity_pools_legacy(df, swings, tol)
+    assert any(p["swept"] for p in pools)
+    sweeps = ict.detect_sweeps(df, pools, swings)
+    assert ict.detect_breakers(df, blocks, sweeps, touch=touch) == ict._detect_breakers_legacy(df, blocks, sweeps)
+    # an index built for another frame is never reused
+    tail, tail_atr = df.iloc[-300:], atr_s.iloc[-300:]
+    assert smc.detect_fvg(tail, tail_atr, touch=touch) == smc._detect_fvg_legacy(tail, tail_atr)
+
+
+# ---------------------------------------------------------------------
+# Sweeps: suffix close extrema + sorted dedup == per-bar slice scans
+# ---------------------------------------------------------------------
+@pytest.mark.parametrize("recent_bars", [1, 24, 400])
+def test_detect_sweeps_matches_legacy(synthetic_ohlc, recent_bars):
+    df = synthetic_ohlc
+    swings, atr_last = smc.find_swings(df, 3), float(smc.atr(df).iloc[-1])
+    pools = smc.detect_liquidity_pools(df, swings, 0.25 * atr_last)
+    seen = 0
+    for tolerance in (0.0, 0.25 * atr_last, 3 * atr_last):
+        got = ict.detect_sweeps(df, pools, swings, recent_bars=recent_bars, tolerance=tolerance)
+        assert got == ict._detect_sweeps_legacy(df, pools, swings, recent_bars=recent_bars, tolerance=tolerance)
+        seen += len(got)
+    assert recent_bars < 24 or seen
+    assert ict.detect_sweeps(df.iloc[:0], pools, swings) == []
+    assert ict.detect_sweeps(df, [], swings.iloc[:0]) == []
+
+
+# ---------------------------------------------------------------------
+# Patterns: one vectorised scan == per-bar scalar detectors
+# ---------------------------------------------------------------------
+def test_pattern_scan_matches_legacy_detectors_at_every_bar(synthetic_ohlc):
+    from engine import patterns
+
+    rng = np.random.default_rng(3)
+    volume = synthetic_ohlc.assign(Volume=rng.integers(50, 200, len(synthetic_ohlc)).astype(float))
+    for df in (synthetic_ohlc.iloc[:400], volume.iloc[:400]):
+        scan = patterns.scan_patterns(df)
+        support = patterns.pattern_support(scan)
+        hits = 0
+        for end in range(len(df)):
+            window = df.iloc[: end + 1]
+            want = {
+                "candlesticks": patterns._detect_candlesticks_legacy(window),
+                "chart_structures": patterns._detect_chart_structures_legacy(window),
+                "wyckoff": patterns._detect_wyckoff_context_legacy(window),
+            }
+            assert patterns.patterns_at(scan, end) == want, end
+            hits += sum(map(len, want.values()))
+            if end % 50 == 0:
+                report = patterns.analyze_patterns(window)
+                assert report == patterns.analyze_patterns(window, scan=scan)
+                assert report["bullish_support"] == support["bullish_support"].iloc[end]
+                assert report["bearish_support"] == support["bearish_support"].iloc[end]
+        assert hits
+    assert patterns.scan_patterns(synthetic_ohlc.iloc[:0]).shape == (0, len(patterns.PATTERN_WEIGHTS))
+
+    # a dead-flat market is a rectangle (polyfit round-off made it a rising channel)
+    flat = synthetic_ohlc.iloc[:60].copy()
+    flat[["Open", "High", "Low", "Close"]] = 1.1
+    names = [item["name"] for item in patterns.detect_chart_structures(flat)]
+    assert "Rectangle" in names and "Ascending Channel" not in names
@@ -1,8 +1,14 @@
 # tests/test_structure_events.py
 """BOS, CHOCH, MSS detection tests."""
+from collections import Counter
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
+import pytest
 
+from engine import smc
+from engine.data import load_ohlc_csv
 from engine.smc import detect_mss, detect_structure, find_swings, atr
 
 
@@ -34,3 +40,89 @@ def test_mss_after_sweep():
     mss = detect_mss(events, sweeps)
     assert len(mss) == 1
     assert mss[0]["kind"] == "MSS"
+
+
+# ---------------------------------------------------------------------
+# Golden output on shipped candles: array rewrite == per-bar walk
+# ---------------------------------------------------------------------
+GOLDEN = {
+    # file: ({(kind, direction): count}, rejected breaks, final trend, last event pos)
+    "data/EURUSD_60min.csv": (
+        {("BOS", "bearish"): 42, ("BOS", "bullish"): 21, ("CHoCH", "bearish"): 36, ("CHoCH", "bullish"): 36},
+        11, -1, 1995,
+    ),
+    "data/GBPUSD_60min.csv": (
+        {("BOS", "bearish"): 36, ("BOS", "bullish"): 21, ("CHoCH", "bearish"): 36, ("CHoCH", "bullish"): 37},
+        17, 1, 1992,
+    ),
+    "data/USDJPY_240min.csv": (
+        {("BOS", "bearish"): 21, ("BOS", "bullish"): 46, ("CHoCH", "bearish"): 36, ("CHoCH", "bullish"): 35},
+        12, -1, 1984,
+    ),
+}
+
+
+@pytest.mark.parametrize("path", sorted(GOLDEN))
+def test_structure_golden_output_on_shipped_csv(path):
+    if not Path(path).exists():
+        pytest.skip(f"{path} not shipped")
+    df = load_ohlc_csv(path)
+    swings = find_swings(df, 3)
+    result = detect_structure(df, swings, 3, atr(df))
+
+    counts, rejected, trend, last_pos = GOLDEN[path]
+    assert Counter((e["kind"], e["direction"]) for e in result["events"]) == counts
+    assert len(result["rejected_breaks"]) == rejected
+    assert result["trend"] == trend
+    assert result["events"][-1]["pos"] == last_pos
+    assert result == smc._detect_structure_legacy(df, swings, 3, atr(df))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"atr_series": None, "min_break_abs": 0.0001},
+    {"min_break_abs": 0.002},
+    {"displacement_mult": 0.5},
+])
+def test_structure_matches_legacy_walk_for_options(kwargs):
+    path = "data/EURUSD_15min.csv"
+    if not Path(path).exists():
+        pytest.skip(f"{path} not shipped")
+    df = load_ohlc_csv(path)
+    kwargs = {"atr_series": atr(df), **kwargs}
+    for window in (2, 3):
+        swings = find_swings(df, window)
+        fast = detect_structure(df, swings, window, **kwargs)
+        slow = smc._detect_structure_legacy(df, swings, window, **kwargs)
+        assert fast == slow
+        for a, b in zip(fast["events"], slow["events"]):
+            assert {k: type(v) for k, v in a.items()} == {k: type(v) for k, v in b.items()}
+
+
+def test_structure_edge_cases_match_legacy(synthetic_ohlc):
+    df = synthetic_ohlc
+    swings = find_swings(df, 3)
+    atr_s = atr(df)
+    for subset in (swings.iloc[:0], swings[swings["kind"] == "high"], swings[swings["kind"] == "low"]):
+        assert detect_structure(df, subset, 3, atr_s) == smc._detect_structure_legacy(df, subset, 3, atr_s)
+    empty = df.iloc[:0]
+    assert detect_structure(empty, find_swings(empty), 3) == smc._detect_structure_legacy(empty, find_swings(empty), 3)
+
+
+def test_structure_resumes_from_a_carry_in_any_chunks(synthetic_ohlc):
+    df = synthetic_ohlc
+    swings = find_swings(df, 3).sort_values("pos")
+    atr_s = atr(df)
+    whole = detect_structure(df, swings, 3, atr_s)
+    arrays = [df[c].to_numpy(dtype=float) for c in ("Open", "High", "Low", "Close")]
+    sw = (swings["pos"].to_numpy(), (swings["kind"] == "high").to_numpy(), swings["price"].to_numpy())
+    for cuts in ([0, 600], [0, 1, 97, 98, 300, 301, 450, 600], list(range(0, 601, 7)) + [600]):
+        carry, events, rejected = smc.StructureCarry(), [], []
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            run = [col[a:b] for col in arrays]
+            got, rej, carry = smc.advance_structure(
+                *run, atr_s.to_numpy()[a:b], df.index[a:b], *sw, 3, carry=carry, offset=a,
+            )
+            events += got
+            rejected += rej
+        assert events == whole["events"] and rejected == whole["rejected_breaks"]
+        assert carry.trend == whole["trend"]
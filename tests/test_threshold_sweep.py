@@ -0,0 +1,63 @@
+"""Threshold sweep: shared detector stages give the analyses and metrics of separate runs."""
+from engine import confluence
+from engine.backtest import run_backtest
+from schemas.threshold_schema import merge_threshold_patch, validate_threshold_config
+from services import threshold_sweep
+from services.threshold_sweep import SweepContext, field_bounds, grid_trials, random_trials, sweep_pair
+
+BASE = validate_threshold_config({})
+FIELDS = ("structure", "fvgs", "order_blocks", "pools", "sweeps", "breakers", "premium_discount", "price", "atr")
+
+
+def test_shared_stages_match_a_fresh_analyze(synthetic_ohlc):
+    context = SweepContext(synthetic_ohlc, "TSTUSD")
+    patches = [
+        {"volatility": {"displacement_atr_multiplier": 1.0}, "bos": {"min_bos_break_pips_h1": 3}},
+        {"volatility": {"displacement_atr_multiplier": 1.5}, "swing": {"equal_high_low_tolerance_pips": 5}},
+        {"volatility": {"displacement_atr_multiplier": 1.0}, "fvg": {"min_fvg_size_pips_h1": 2}},
+    ]
+    for patch in patches:
+        thresholds = merge_threshold_patch(BASE, patch)
+        params = confluence.analysis_params("TSTUSD", "60min", thresholds)
+        for step, shared in zip(context.steps, context.analyses(params)):
+            fresh = confluence.analyze(step.window, "TSTUSD", thresholds=thresholds, atr_values=step.atr.to_numpy())
+            for field in FIELDS:
+                assert shared[field] == fresh[field], (patch, step.end, field)
+            for direction in ("bullish", "bearish"):
+                assert confluence._stop_and_target(shared, direction, 5) == \
+                    confluence._stop_and_target_legacy(shared, direction, 5)
+
+
+def test_sweep_metrics_equal_separate_backtests(synthetic_ohlc):
+    trials = grid_trials({
+        "volatility.displacement_atr_multiplier": [1.0, 1.5],
+        "decision.score_bias_minimum": [50, 60],
+        "decision.min_confidence_for_bias": [0.45],
+    })
+    report = sweep_pair("TSTUSD", synthetic_ohlc, trials, base=BASE, min_trades=0, top_n=3)
+    assert report["trials"] == 5 and report["detector_groups"] == 3 and len(report["best"]) == 3
+    assert report["analyses_built"] == 3 * report["steps"]
+    assert (report["tuning_bars"], report["validation_bars"]) == (420, 180)
+
+    tuning, validation = threshold_sweep.split_segments(synthetic_ohlc)
+    assert validation.index[threshold_sweep.MIN_WARMUP] == tuning.index[-1] + (tuning.index[1] - tuning.index[0])
+    for ranked in report["best"]:
+        thresholds = merge_threshold_patch(BASE, threshold_sweep._nested(ranked["patch"]))
+        for segment, metrics in ((tuning, ranked["metrics"]), (validation, ranked["validation"])):
+            expected = run_backtest(segment, "TSTUSD", thresholds=thresholds)
+            assert metrics == {k: expected[k] for k in threshold_sweep.METRIC_KEYS}
+    expected = run_backtest(validation, "TSTUSD", thresholds=BASE)
+    assert report["baseline_validation"] == {k: expected[k] for k in threshold_sweep.METRIC_KEYS}
+
+
+def test_trials_stay_inside_the_schema():
+    space = threshold_sweep.default_space("15min")
+    assert "bos.min_bos_break_pips_m15" in space
+    for path, values in space.items():
+        lo, hi = field_bounds(path)
+        assert all(lo <= v <= hi for v in values)
+    trials = random_trials(space, 50, seed=3)
+    assert len(trials) == 50 and len({tuple(t.values()) for t in trials}) == 50
+    assert all(isinstance(t["decision.score_bias_minimum"], int) for t in trials)
+    for trial in trials:
+        merge_threshold_patch(BASE, threshold_sweep._nested(trial))
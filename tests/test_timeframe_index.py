@@ -0,0 +1,77 @@
+"""Persisted timeframe alignment: derived bars equal resample, positions never look ahead."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine import data as market_data
+from engine.timeframe_index import TimeframeIndex, closed_htf_positions, resample_ohlc
+
+
+def _hourly(n: int, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-03-03 02:00", periods=n, freq="h")
+    index = index[rng.random(n) > 0.05]  # missing candles
+    close = 1.10 + np.cumsum(rng.normal(0, 0.001, len(index)))
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.0003, len(index)), "High": close + 0.002,
+            "Low": close - 0.002, "Close": close, "Volume": rng.random(len(index)) * 1000,
+        },
+        index=pd.Index(index, name="Timestamp"),
+    )
+
+
+def test_index_matches_resample_and_extends_like_a_rebuild():
+    df = _hourly(3000)
+    for rule in ("4h", "1D"):
+        index = TimeframeIndex.build(df.iloc[:2500], rule)
+        pd.testing.assert_frame_equal(index.frame(), resample_ohlc(df.iloc[:2500], rule), check_freq=False)
+
+        # delta fetch: oldest candles trimmed, last one replaced, new ones appended
+        grown = df.iloc[9:2540].copy()
+        grown.iloc[2490, grown.columns.get_loc("Close")] += 0.0004
+        extended, rebuilt = index.extend(grown), TimeframeIndex.build(grown, rule)
+        for name in ("base_times", "base_close", "pos", "htf_times", "ohlcv"):
+            np.testing.assert_array_equal(getattr(extended, name), getattr(rebuilt, name))
+        pd.testing.assert_frame_equal(extended.frame(), resample_ohlc(grown, rule), check_freq=False)
+
+        # a rewritten body is not mistaken for an append
+        rewritten = grown.copy()
+        rewritten.iloc[100, rewritten.columns.get_loc("Close")] += 0.01
+        pd.testing.assert_frame_equal(
+            index.extend(rewritten).frame(), resample_ohlc(rewritten, rule), check_freq=False,
+        )
+
+        frame = extended.frame()
+        closed = extended.closed_positions(60)
+        base_close = grown.index + pd.Timedelta("1h")
+        bar_close = frame.index + pd.Timedelta(rule)
+        for i in range(len(grown)):
+            if closed[i] >= 0:
+                assert bar_close[closed[i]] <= base_close[i]
+            if closed[i] + 1 < len(frame):
+                assert bar_close[closed[i] + 1] > base_close[i]
+        assert (extended.pos >= closed).all()
+        np.testing.assert_array_equal(closed, closed_htf_positions(grown.index, 60, frame.index, 24 * 60 if rule == "1D" else 240))
+
+
+def test_derived_interval_is_persisted_and_followed(monkeypatch, tmp_path):
+    monkeypatch.setattr(market_data, "DATA_DIR", str(tmp_path))
+    df = _hourly(800)
+    df.iloc[:700].to_csv(market_data.csv_path("EURUSD", "60min"))
+
+    frame, source = market_data.get_data("EURUSD", "240min", fetch=False)
+    assert source == "resampled_cache"
+    path = market_data.align_path("EURUSD", "60min", "240min")
+    assert os.path.exists(path)
+    base = market_data.load_cached("EURUSD", "60min")
+    pd.testing.assert_frame_equal(frame, resample_ohlc(base, "240min"), check_freq=False)
+    assert TimeframeIndex.load(path).matches(base)
+
+    df.to_csv(market_data.csv_path("EURUSD", "60min"))
+    frame, _ = market_data.get_data("EURUSD", "240min", fetch=False)
+    base = market_data.load_cached("EURUSD", "60min")
+    assert len(base) == len(df)
+    pd.testing.assert_frame_equal(frame, resample_ohlc(base, "4h"), check_freq=False)
+    assert TimeframeIndex.load(path).matches(base)
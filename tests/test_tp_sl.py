@@ -0,0 +1,91 @@
+"""Vectorised TP/SL first hit: same outcomes and excursions as the per-candle walks."""
+import numpy as np
+import pandas as pd
+
+from engine import backtest, confluence
+from engine.tp_sl import HIT_BOTH, HIT_NONE, HIT_STOP, HIT_TARGET, first_hit
+from ml.labels import _evaluate_tp_sl_path_legacy, evaluate_tp_sl_path
+from schemas.threshold_schema import validate_threshold_config
+from services.prediction_review import _verify_candles_legacy, verify_candles
+
+
+def _candles(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.001, n))
+    spread = rng.random((2, n)) * 0.002
+    return pd.DataFrame({
+        "Open": close, "High": close + spread[0], "Low": close - spread[1], "Close": close,
+    })
+
+
+def test_callers_match_their_candle_walks():
+    rng = np.random.default_rng(11)
+    for case in range(300):
+        candles = _candles(int(rng.integers(1, 40)), case)
+        entry = float(candles["Close"].iloc[0])
+        bull = bool(rng.random() < 0.5)
+        sign = 1 if bull else -1
+        tp = entry + sign * float(rng.random()) * 0.006
+        sl = entry - sign * float(rng.random()) * 0.006
+        direction = "bullish" if bull else "bearish"
+        assert evaluate_tp_sl_path(candles, direction=direction, entry=entry, tp=tp, sl=sl) == \
+            _evaluate_tp_sl_path_legacy(candles, direction=direction, entry=entry, tp=tp, sl=sl)
+
+        action = str(rng.choice(["BUY_BIAS", "SELL_BIAS", "NO_TRADE", "WAIT"]))
+        kwargs = dict(
+            entry=entry, predicted_action=action, atr=0.001,
+            invalidation=None if rng.random() < 0.2 else sl,
+            target=None if rng.random() < 0.2 else tp,
+        )
+        assert verify_candles(candles, **kwargs) == _verify_candles_legacy(candles, **kwargs)
+
+
+def test_batch_resolves_each_trade_like_a_single_call():
+    candles = _candles(300, 3)
+    highs, lows = candles["High"].to_numpy(), candles["Low"].to_numpy()
+    rng = np.random.default_rng(4)
+    starts = rng.integers(0, 300, 500)
+    entries = candles["Close"].to_numpy()[np.maximum(starts - 1, 0)]
+    longs = rng.random(500) < 0.5
+    sign = np.where(longs, 1, -1)
+    stops = entries - sign * rng.random(500) * 0.004
+    targets = entries + sign * rng.random(500) * 0.004
+    batch = first_hit(highs, lows, starts, entries, stops, targets, longs, horizon=25)
+    assert set(batch.outcome.tolist()) == {HIT_NONE, HIT_TARGET, HIT_STOP, HIT_BOTH}
+    for k in range(500):
+        end = min(starts[k] + 25, 300)
+        one = first_hit(highs[:end], lows[:end], starts[k], entries[k], stops[k], targets[k], longs[k])
+        assert (batch.outcome[k], batch.exit_bar[k]) == (one.outcome[0], one.exit_bar[0])
+        assert (batch.mfe[k], batch.mae[k]) == (one.mfe[0], one.mae[0])
+
+
+def test_backtest_trades_follow_the_stop_first_walk(synthetic_ohlc, monkeypatch):
+    def fake_decide(analysis, **kwargs):
+        price = analysis["price"]
+        buy = analysis["bars"] % 2 == 0
+        sign = 1 if buy else -1
+        return {
+            "action": confluence.ACTION_BUY if buy else confluence.ACTION_SELL, "entry": price,
+            "stop_loss": price - sign * 0.002, "take_profit": price + sign * 0.003,
+        }
+
+    monkeypatch.setattr(confluence, "decide", fake_decide)
+    df = synthetic_ohlc.tail(400)
+    result = backtest.run_backtest(df, "TSTUSD", max_bars=400, thresholds=validate_threshold_config({}))
+
+    expected = []
+    for end in range(backtest.MIN_WARMUP, len(df) - backtest.HOLD_BARS, backtest.STEP_BARS):
+        price = float(df["Close"].iloc[end])
+        buy = (end + 1) % 2 == 0
+        sign = 1 if buy else -1
+        sl, tp = price - sign * 0.002, price + sign * 0.003
+        for j in range(end + 1, end + 1 + backtest.HOLD_BARS):
+            hi, lo = float(df["High"].iloc[j]), float(df["Low"].iloc[j])
+            if (lo <= sl) if buy else (hi >= sl):
+                expected.append("loss")
+                break
+            if (hi >= tp) if buy else (lo <= tp):
+                expected.append("win")
+                break
+    assert [t["outcome"] for t in result["trade_log"]] == expected[:50]
+    assert result["trades"] == len(expected) > 10
@@ -69,10 +69,51 @@ DATA_TZ = os.getenv("DATA_TZ", "America/New_York")
 
 INTERVAL = os.getenv("DATA_INTERVAL", "60min")
 
+# OANDA delta fetch: with a local cache, only candles newer than the last
+# cached bar are requested and merged in (instead of a full 2000-bar pull).
+OANDA_DELTA_FETCH = (
+    os.getenv("OANDA_DELTA_FETCH", "true").strip().lower()
+    not in {"0", "false", "no", "off"}
+)
+
+# A missing higher timeframe is derived from a cached lower one (4H from
+# 1H, daily from 4H, ...). With TIMEFRAME_INDEX the derived bars and the
+# base-bar -> derived-bar positions are kept next to the candle store
+# (data/EURUSD_60min.240min.align), extended at ingest, instead of being
+# resampled on every request.
+TIMEFRAME_INDEX = (
+    os.getenv("TIMEFRAME_INDEX", "true").strip().lower()
+    not in {"0", "false", "no", "off"}
+)
+
 # Skip live re-fetch when the pair's CSV is younger than this — protects
 # the provider quota when several predictions arrive close together.
 FETCH_COOLDOWN_MINUTES = int(os.getenv("FETCH_COOLDOWN_MINUTES", "5"))
 
+# Concurrent live fetches for the same pair share one provider call:
+# "local" coalesces threads in this process, "redis" also coalesces
+# across gunicorn workers via REDIS_URL, "off" disables it.
+FETCH_SINGLE_FLIGHT = os.getenv("FETCH_SINGLE_FLIGHT", "local").strip().lower()
+
+# Finished predictions are reused until a new candle closes or a
+# threshold / model version is promoted: "memory" keeps them in this
+# process, "redis" also shares them across workers via REDIS_URL, "off"
+# recomputes every request. Results computed in the first
+# PREDICTION_CACHE_GRACE_SECONDS after a candle close are not stored
+# (the provider may not have published that candle yet).
+PREDICTION_CACHE = os.getenv("PREDICTION_CACHE", "memory").strip().lower()
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "256"))
+PREDICTION_CACHE_GRACE_SECONDS = int(os.getenv("PREDICTION_CACHE_GRACE_SECONDS", "10"))
+
+# "Scan all pairs" (GET /api/scan): every cached pair of one interval is
+# pre-screened in a single vectorised panel pass over its last
+# SCAN_PANEL_BARS candles; on request (confirm=N, at most SCAN_CONFIRM_TOP,
+# one quota unit each) the best candidates run the full pipeline while
+# SCAN_BUDGET_SECONDS lasts.
+SCAN_PANEL_BARS = int(os.getenv("SCAN_PANEL_BARS", "500"))
+SCAN_CONFIRM_TOP = int(os.getenv("SCAN_CONFIRM_TOP", "3"))
+SCAN_BUDGET_SECONDS = float(os.getenv("SCAN_BUDGET_SECONDS", "20"))
+
 # Pairs offered in the bot / CLI menus. Defaults to the full OANDA-style list
 # in utils/pairs.py; override with SUPPORTED_PAIRS in .env if needed.
 SUPPORTED_PAIRS = pairs_from_env(os.getenv("SUPPORTED_PAIRS")) or list(DEFAULT_FX_PAIRS)
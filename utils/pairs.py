@@ -37,7 +37,7 @@ DEFAULT_FX_PAIRS: list[str] = [
 ]
 
 _CATALOG_VERSION = "2026-04-100"
-_CSV_PAIR_RE = re.compile(r"^([A-Z]{6})_\d+min\.csv$", re.I)
+_CSV_PAIR_RE = re.compile(r"^([A-Z]{6})_\d+min\.(?:csv|candles)$", re.I)
 
 
 def normalize_pair_code(raw: str) -> str:
@@ -61,16 +61,16 @@ def pairs_from_env(raw: str | None) -> list[str] | None:
 
 
 def pairs_from_data_dir(data_dir: str, interval: str) -> list[str]:
-    """Discover pairs that already have a cached CSV on disk."""
+    """Discover pairs that already have cached candles (CSV or store) on disk."""
     if not os.path.isdir(data_dir):
         return []
     found: list[str] = []
-    suffix = f"_{interval}.csv"
+    suffixes = tuple(f"_{interval}{ext}".lower() for ext in (".csv", ".candles"))
     for name in os.listdir(data_dir):
-        if not name.lower().endswith(suffix.lower()):
+        if not name.lower().endswith(suffixes):
             continue
         m = _CSV_PAIR_RE.match(name)
-        if m:
+        if m and m.group(1).upper() not in found:
             found.append(m.group(1).upper())
     return found
 
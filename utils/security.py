@@ -209,20 +209,28 @@ def prediction_access_required(f):
         except jwt.InvalidTokenError:
             return jsonify({"error": "Invalid token"}), 401
 
-        from services.user_access import get_user, can_use_predictions
-
-        user = get_user(user_id)
-        ok, msg = can_use_predictions(user)
-        if not ok:
-            status = getattr(user, "status", None) if user else None
-            code = 429 if user and status == "active" and user.signals_remaining <= 0 else 403
-            return jsonify({"error": msg, "status": status}), code
+        denied = prediction_access_error(user_id)
+        if denied is not None:
+            return denied
 
         return f(user_id, *args, **kwargs)
 
     return decorated
 
 
+def prediction_access_error(user_id):
+    """The prediction_access_required refusal for this user, or None when allowed."""
+    from services.user_access import get_user, can_use_predictions
+
+    user = get_user(user_id)
+    ok, msg = can_use_predictions(user)
+    if ok:
+        return None
+    status = getattr(user, "status", None) if user else None
+    code = 429 if user and status == "active" and user.signals_remaining <= 0 else 403
+    return jsonify({"error": msg, "status": status}), code
+
+
 def admin_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):